@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import os
+import sqlite3
 from datetime import datetime
 import settings
+import cube
+from instantanes import GestionnaireInstantanes
+from filtres import MoteurFiltres
+from explorateur import Explorateur
+from search_index import IndexInverse, COLONNES_INDEX, mots
+from journal_offres import JournalOffres, CHEMIN_JOURNAL
+from utils import charger_donnees, donnees_existent, date_modification, empreinte_fichier, lire_json
 
 
 # region 1. --- CONFIGURATION DE LA PAGE ---
@@ -18,37 +28,230 @@ st.set_page_config(
 settings.charger_style()
 
 # --- CHARGEMENT DES DONNÉES ---
-@st.cache_data
-def load_data():
-    file_path = "data/clean/global_job_market.csv"   
-    if not os.path.exists(file_path):
-        st.error(f"❌ Fichier introuvable : {file_path}")
-        return None    
+# Les KPI et graphes viennent du cube : les offres ne servent plus qu'aux filtres et à l'explorateur.
+# On ne charge donc que ces colonnes (ni 'Description', ni salaires, ni technos).
+COLONNES_APP = [
+    "Titre", "Entreprise", "Ville", "Type_Contrat", "Teletravail", "Date_Publication", "Date_Expiration",
+    "Source", "URL", "Niveau", "Handicap_Friendly"
+]
+# Colonnes proposées pour le tri de l'explorateur (colonne -> libellé)
+COLONNES_TRI = {
+    "Date_Publication": "Date", "Titre": "Titre", "Entreprise": "Entreprise",
+    "Ville": "Ville", "Type_Contrat": "Contrat"
+}
+# Peu de valeurs distinctes : en 'category', chaque valeur est stockée une fois
+# et les filtres isin() comparent des codes entiers au lieu de chaînes Python
+COLONNES_CATEGORIES = ["Source", "Type_Contrat", "Ville", "Niveau", "Teletravail", "Entreprise"]
+
+FICHIER_GLOBAL = "data/clean/global_job_market.csv"
+FICHIER_CUBE = "data/clean/global_cube.csv"
+FICHIER_INDEX = "data/clean/global_index.npz"
+FICHIER_MANIFESTE = "data/clean/global_manifest.json"
+
+def charger_offres(colonnes):
+    """Lecture projetée du fichier global, colonnes texte répétitives en 'category', dates en datetime64."""
+    df = charger_donnees(
+        FICHIER_GLOBAL,
+        colonnes=colonnes,
+        dtype={c: "category" for c in COLONNES_CATEGORIES if c in colonnes}
+    )
+    df['Date_Publication'] = pd.to_datetime(df['Date_Publication'], errors='coerce')
+    df['Date_Expiration'] = pd.to_datetime(df['Date_Expiration'], errors='coerce')
+    return df
+
+def lire_version():
+    """
+    Version publiée des données : celle du manifeste écrit par fusion_csv.py,
+    sinon date + taille du fichier global (pipeline sans manifeste).
+    """
+    manifeste = lire_json(FICHIER_MANIFESTE)
+    if manifeste and "version" in manifeste:
+        return manifeste["version"]
+    empreinte = empreinte_fichier(FICHIER_GLOBAL, avec_hash=False)
+    return f"{empreinte['mtime']:.0f}-{empreinte['taille']}" if empreinte else None
+
+
+def load_cube(version):
+    """
+    Cube d'agrégats écrit par fusion_csv.py (voir cube.py) : tous les KPI et graphes en sont tirés,
+    sans repasser sur les offres. Invalidé avec la même clé que les offres : s'il n'a pas été tiré
+    de cette version (selon le manifeste, ou plus ancien que le fichier global), il est recalculé ici.
+    """
+    manifeste = lire_json(FICHIER_MANIFESTE)
+    if manifeste and manifeste.get("version") == version:
+        a_jour = (manifeste.get("cube") or {}).get("version") == version and donnees_existent(FICHIER_CUBE)
+    else:
+        date_cube = date_modification(FICHIER_CUBE)
+        a_jour = date_cube is not None and date_cube >= (date_modification(FICHIER_GLOBAL) or 0)
+    if a_jour:
+        return charger_donnees(FICHIER_CUBE, dtype=cube.TYPES_CUBE)
+    return cube.construire_cube(charger_offres(cube.COLONNES_CUBE))
+
+
+def load_index(version, nb_lignes):
+    """
+    Index inversé écrit par fusion_csv.py (voir search_index.py), même règle d'invalidation que le cube.
+    Ses numéros de ligne doivent correspondre aux offres chargées, sinon il est reconstruit ici.
+    """
+    manifeste = lire_json(FICHIER_MANIFESTE)
+    if not os.path.exists(FICHIER_INDEX):
+        a_jour = False
+    elif manifeste and manifeste.get("version") == version:
+        a_jour = (manifeste.get("index") or {}).get("version") == version
+    else:
+        a_jour = os.path.getmtime(FICHIER_INDEX) >= (date_modification(FICHIER_GLOBAL) or 0)
+    if a_jour:
+        index = IndexInverse.charger(FICHIER_INDEX)
+        if index.nb_lignes == nb_lignes:
+            return index
+    return IndexInverse.construire(charger_donnees(FICHIER_GLOBAL, colonnes=COLONNES_INDEX))
+
+
+def load_data(version):
+    """
+    Instantané d'une version : offres (explorateur), cube (KPI et graphes),
+    moteur de filtres (bitmaps des dimensions de la sidebar, voir filtres.py),
+    explorateur (rangs de tri et texte de recherche, voir explorateur.py)
+    et index de recherche par mots-clés (voir search_index.py).
+    """
+    df = charger_offres(COLONNES_APP)
+    dimensions = df[["Source", "Type_Contrat", "Ville", "Niveau"]].assign(
+        Handicap_Friendly=df['Handicap_Friendly'].eq(True),
+        Actif=df['Date_Expiration'].isna()
+    )
+    explorateur = Explorateur(df, colonnes_tri=list(COLONNES_TRI))
+    return df, load_cube(version), MoteurFiltres(dimensions), explorateur, load_index(version, len(df))
+
+# cache_resource : un seul gestionnaire, partagé par toutes les sessions et tous les reruns
+# (cache_data renverrait une copie à chaque appel). Les DataFrames servis ne sont jamais modifiés sur place.
+# Quand fusion_csv.py publie une nouvelle version, elle est chargée en arrière-plan pendant que
+# l'ancienne reste affichée (voir instantanes.py) : pas de redémarrage ni de vidage de cache.
+@st.cache_resource
+def gestionnaire_donnees():
+    return GestionnaireInstantanes(lire_version, load_data)
+
+# Recherche par mots-clés : le cube de fusion_csv.py ne connaît pas le texte des offres, on agrège donc
+# les offres trouvées par l'index (mêmes colonnes que le cube complet), une fois par (version, mots de la requête).
+# Les colonnes du cube (salaires, technos) ne sont lues qu'à la première recherche d'une version.
+@st.cache_resource(max_entries=1, show_spinner=False)
+def offres_cube(version):
+    return charger_offres(cube.COLONNES_CUBE)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cube_mots_cles(version, mots_requete, _positions):
+    return cube.construire_cube(offres_cube(version).iloc[_positions])
+
+# Préparation des onglets, mémorisée par (version des données, filtres de la sidebar) :
+# un rerun qui ne touche pas aux filtres (slider de police, multiselect des technos...) ne recalcule rien.
+# Les paramètres préfixés par '_' ne sont pas hachés par Streamlit : la version suffit à identifier le cube.
+@st.cache_data(max_entries=64, show_spinner=False)
+def filtrer_marche(version, selection, _cube_marche):
+    return cube.filtrer(_cube_marche, **{k: list(v) if isinstance(v, tuple) else v for k, v in selection.items()})
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def preparer_marche_actuel(version, selection, _cube_filtre):
+    """KPI et petits tableaux de l'onglet 'Aujourd'hui' (offres actives, sauf les niveaux)."""
+    cube_actif = cube.filtrer(_cube_filtre, actif=True)
+    salaire_moyen, nb_salaires = cube.salaire_moyen(cube_actif)
+    return {
+        "nb_offres": cube.nb_offres(cube_actif),
+        "salaire_moyen": salaire_moyen,
+        "nb_salaires": nb_salaires,
+        "villes": cube.compter(cube_actif, 'Ville').head(10).reset_index(),
+        "salaires": cube.stats_salaires(cube_actif, par='Source'),
+        "techs": cube.compter_techs(cube_actif).reset_index(),
+        "contrats": cube.compter(cube_actif, 'Type_Contrat').reset_index(),
+        "niveaux": cube.compter(_cube_filtre, 'Niveau').reset_index(),
+    }
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def preparer_tendances(version, selection, _cube_filtre, start_date):
+    """
+    Séries hebdomadaires de l'onglet 'Tendances' (toutes offres publiées à partir de start_date).
+    Les semaines sont déjà calculées dans le cube (arrondi vectorisé au lundi), il ne reste que des sommes groupées.
+    """
+    cube_dates = _cube_filtre[_cube_filtre['Semaine'].notna()]
+    cube_trends = cube.filtrer(cube_dates, semaine_min=start_date)
+    semaines = sorted(cube_trends['Semaine'].unique())
+
+    df_weekly = cube.compter(cube_trends, 'Semaine').sort_index().reset_index(name="Nombre d'offres")
+    df_weekly['Semaine'] = pd.to_datetime(df_weekly['Semaine'])
+
+    # Une colonne par techno, toutes les semaines en ligne (0 si la techno n'apparaît pas)
+    techs = cube.compter_techs(cube_trends, par='Semaine').unstack('Tech', fill_value=0)
+    techs = techs.reindex(index=semaines, columns=sorted(techs.columns), fill_value=0)
+    techs.index = pd.to_datetime(techs.index)
+
+    contrats = cube.compter(cube_trends, ['Semaine', 'Type_Contrat']).unstack(fill_value=0).sort_index()
+    contrats.index = pd.to_datetime(contrats.index)
+
+    return {
+        "nb_dates": cube.nb_offres(cube_dates),
+        "nb_offres": cube.nb_offres(cube_trends),
+        "nb_entreprises": cube.nb_entreprises(cube_trends),
+        "duree_moyenne": cube.duree_moyenne(cube_trends),
+        "semaines": df_weekly,
+        "techs": techs,
+        "contrats": contrats,
+    }
+
+
+def lire_version_journal():
+    """Dernier événement du journal des offres (journal_offres.py), None s'il n'existe pas encore."""
+    if not os.path.exists(CHEMIN_JOURNAL):
+        return None
     try:
-        df = pd.read_csv(file_path)
-        df['Date_Publication'] = pd.to_datetime(df['Date_Publication'], errors='coerce')
-        df['Date_Expiration'] = pd.to_datetime(df['Date_Expiration'], errors='coerce')
-        return df
-
-        
-    except Exception as e:
-        st.error(f"Erreur de lecture : {e}")
+        with JournalOffres() as journal:
+            return journal.version()
+    except sqlite3.Error:
         return None
 
-df = load_data()
 
-if df is None:
+@st.cache_data(max_entries=64, show_spinner=False)
+def preparer_flux(version_journal, sources, start_date, date_etat):
+    """
+    'Stock vs Flux' de l'onglet 'Tendances', lu dans le journal des offres : entrées (premières vues) et sorties
+    (expirations) réellement observées chaque semaine, et offres actives à `date_etat` (rejeu depuis un instantané).
+    """
+    with JournalOffres() as journal:
+        etat = journal.etat_au(date_etat)
+        return {
+            "flux": journal.flux(debut=start_date, sources=list(sources)),
+            "actives": int(etat.loc[etat["Source"].isin(sources), "Active"].sum()),
+        }
+
+try:
+    version_donnees, instantane = gestionnaire_donnees().obtenir()
+except Exception as e:
+    st.error(f"Erreur de lecture : {e}")
+    st.stop()
+
+if instantane is None:
+    st.error(f"❌ Fichier introuvable : {FICHIER_GLOBAL}")
     st.stop()
 
+df, cube_marche, moteur_filtres, explorateur, index_recherche = instantane
+
 # --- TITRE ---
 st.title("🔎 PathFinder : Analyse du Marché Data")
-st.markdown(f"**{len(df)}** offres analysées provenant de **France Travail, APEC** et **Welcome to the Jungle**.")
+st.markdown(f"**{cube.nb_offres(cube_marche)}** offres analysées provenant de **France Travail, APEC** et **Welcome to the Jungle**.")
 
 # --- SIDEBAR (FILTRES) ---
 #st.sidebar.header("Filtres").venv
 
+# 0. Recherche par mots-clés (index inversé : Titre, Entreprise, Description)
+mots_cles = st.sidebar.text_input(
+    "🔎 Mots-clés",
+    placeholder="ex : data engineer python",
+    help="Toutes les offres dont le titre, l'entreprise ou la description contient tous les mots (accents ignorés). "
+         "Les KPI, les graphes et l'explorateur ne portent alors que sur ces offres."
+)
+
 # 1. Filtre Source
-source_list = df['Source'].unique().tolist()
+source_list = cube_marche['Source'].unique().tolist()
 choix_source = st.sidebar.multiselect(
     "Source", 
     source_list, 
@@ -58,7 +261,7 @@ choix_source = st.sidebar.multiselect(
 selected_source = choix_source if choix_source else source_list
 
 # 2. Filtre Contrat
-contrat_list = sorted(df['Type_Contrat'].dropna().unique().tolist())
+contrat_list = sorted(cube_marche['Type_Contrat'].dropna().unique().tolist())
 choix_contrat = st.sidebar.multiselect(
     "Type de Contrat", 
     contrat_list, 
@@ -68,8 +271,8 @@ choix_contrat = st.sidebar.multiselect(
 selected_contrat = choix_contrat if choix_contrat else contrat_list
 
 # 3. Filtre Ville (Top 20)
-top_villes = df['Ville'].value_counts().head(20).index.tolist()
-ville_list = df['Ville'].dropna().unique().tolist()
+top_villes = cube.compter(cube_marche, 'Ville').head(20).index.tolist()
+ville_list = cube_marche['Ville'].dropna().unique().tolist()
 
 choix_ville = st.sidebar.multiselect(
     "Filtrer par Ville", 
@@ -81,7 +284,7 @@ selected_ville = choix_ville if choix_ville else ville_list
 
 # 4. Filtre Niveau
 ordre_niveaux = ["En formation", "Junior", "Confirmé", "Senior", "Non spécifié"]
-niveau_list = [n for n in ordre_niveaux if n in df['Niveau'].unique()]
+niveau_list = [n for n in ordre_niveaux if n in cube_marche['Niveau'].unique()]
 
 choix_niveau = st.sidebar.multiselect(
     "Niveau de Séniorité", 
@@ -115,44 +318,75 @@ taille_police = st.sidebar.slider(
 )
 
 # --- APPLICATION DES FILTRES ---
-df_filtered = df[
-    (df['Source'].isin(selected_source)) &
-    (df['Type_Contrat'].isin(selected_contrat)) &
-    (df['Ville'].isin(selected_ville)) &
-    (df['Niveau'].isin(selected_niveau))
-]
-
-if rqth_only:    
-    df_filtered = df_filtered[df_filtered['Handicap_Friendly'] == True]
+# Les KPI et graphes lisent la tranche du cube, les offres filtrées ne servent qu'à l'explorateur.
+# Avec des mots-clés, le cube est celui des offres trouvées : sa clé (version, mots) remplace la version
+# dans les caches des onglets.
+positions_mots_cles = index_recherche.rechercher(mots_cles)
+if positions_mots_cles is None:
+    cle_cube, cube_recherche = version_donnees, cube_marche
+else:
+    mots_requete = tuple(mots(mots_cles))
+    cle_cube = (version_donnees, mots_requete)
+    cube_recherche = cube_mots_cles(version_donnees, mots_requete, positions_mots_cles)
+
+selection = dict(
+    sources=tuple(selected_source),
+    contrats=tuple(selected_contrat),
+    villes=tuple(selected_ville),
+    niveaux=tuple(selected_niveau),
+    rqth=rqth_only
+)
+cube_filtre = filtrer_marche(cle_cube, selection, cube_recherche)
+
+# Offres actives de la sélection (explorateur) : ET de bitmaps, mémorisé par sélection
+# -> un rerun qui ne touche pas aux filtres (slider, onglet) ne recalcule rien
+positions_actives = moteur_filtres.selectionner(
+    Source=selected_source,
+    Type_Contrat=selected_contrat,
+    Ville=selected_ville,
+    Niveau=selected_niveau,
+    Handicap_Friendly=[True] if rqth_only else None,
+    Actif=[True]
+)
 
+# Mots-clés : intersection des listes de l'index, puis ET avec les filtres (positions triées des deux côtés)
+if positions_mots_cles is not None:
+    positions_actives = np.intersect1d(positions_actives, positions_mots_cles, assume_unique=True)
 
 # Affichage du nombre de résultats en temps réel dans la sidebar
+if positions_mots_cles is not None:
+    st.sidebar.caption(
+        f"🔎 {len(positions_mots_cles)} offres correspondent aux mots-clés, "
+        f"dont {len(positions_actives)} actives avec les filtres."
+    )
 
 
 
-if df_filtered.empty:
+if cube.nb_offres(cube_filtre) == 0:
     st.warning("Aucune offre ne correspond à ces critères.")
     st.stop()
 
 # --- 4. GESTION DES ONGLETS ---
-tab_actuel, tab_trends = st.tabs(["⚡ Aujourd'hui", "📅 Évolution & Tendances"])
+# st.tabs exécuterait le code des deux onglets à chaque rerun : avec un sélecteur,
+# seul l'onglet affiché est calculé (et ses données sont mémorisées par filtres)
+ONGLET_ACTUEL, ONGLET_TENDANCES = "⚡ Aujourd'hui", "📅 Évolution & Tendances"
+onglet = st.radio("Vue", [ONGLET_ACTUEL, ONGLET_TENDANCES], horizontal=True, label_visibility="collapsed", key="onglet")
 
 # endregion
 # region 2. Onglet 1
 # ====================================================================
 # ONGLET 1 : MARCHÉ ACTUEL
 # ====================================================================
-with tab_actuel:
+if onglet == ONGLET_ACTUEL:
     st.markdown("### 🎯 Marché actuel")
-    df_active = df_filtered[df_filtered['Date_Expiration'].isna()]
+    marche = preparer_marche_actuel(cle_cube, selection, cube_filtre)
 
     # --- KPI ---
     st.markdown("---")
     col1, col2, col3 = st.columns(3)
 
-    nb_offres = len(df_active)
-    df_salaires = df_active[df_active['Salaire_Annuel'].notna()]
-    salaire_moyen = df_salaires['Salaire_Annuel'].mean()
+    nb_offres = marche["nb_offres"]
+    salaire_moyen, nb_salaires = marche["salaire_moyen"], marche["nb_salaires"]
 
     col1.metric("Offres affichées",
                 nb_offres,
@@ -163,7 +397,7 @@ with tab_actuel:
                 help="Moyenne des salaires bruts annuels extraits. Pour les fourchettes (ex: 40-50k), la valeur moyenne est utilisée."
                 )
     col3.metric("Offres avec salaire affiché",
-                f"{len(df_salaires)}",
+                f"{nb_salaires}",
                 help="Nombre d'offres qui mentionnent explicitement un salaire. Le salaire moyen est calculé uniquement sur cet échantillon."
                 )
 
@@ -175,7 +409,7 @@ with tab_actuel:
 
     with col_g1:
         st.subheader("📍 Répartition par Ville")
-        ville_counts = df_active['Ville'].value_counts().head(10).reset_index()
+        ville_counts = marche["villes"].copy()
         ville_counts.columns = ['Ville', 'Nombre']
         ville_counts = ville_counts.sort_values(by="Nombre", ascending=True)
         fig_ville = px.bar(ville_counts, x='Nombre', y='Ville', orientation='h', color='Nombre', title="Top 10 Villes")
@@ -202,26 +436,35 @@ with tab_actuel:
     # --- GRAPHE SALAIRES PAR SOURCE ---
     with col_g2:
         st.subheader("💰 Distribution des Salaires")
-        if not df_salaires.empty:
-            fig_salaire = px.box(
-                df_salaires,
-                x='Source',
-                y='Salaire_Annuel',
-                color='Source',
-                title="Salaires par Source",
-                color_discrete_sequence=px.colors.qualitative.Pastel)
+        stats_salaires = marche["salaires"]
+        if not stats_salaires.empty:
+            # Boîtes tracées à partir des quartiles pré-calculés (histogrammes du cube)
+            fig_salaire = go.Figure()
+            for i, stats in enumerate(stats_salaires.itertuples()):
+                fig_salaire.add_trace(go.Box(
+                    x=[stats.Source],
+                    q1=[stats.Q1],
+                    median=[stats.Mediane],
+                    q3=[stats.Q3],
+                    lowerfence=[stats.Moustache_Basse],
+                    upperfence=[stats.Moustache_Haute],
+                    name=stats.Source,
+                    marker_color=px.colors.qualitative.Pastel[i % len(px.colors.qualitative.Pastel)]
+                ))
             fig_salaire.update_layout(
             font=dict(size=taille_police), # Taille globale
-            title=dict(font=dict(size=taille_police + 2), x=0.5),
+            title=dict(text="Salaires par Source", font=dict(size=taille_police + 2), x=0.5),
             showlegend=False, # Souvent inutile sur un boxplot coloré par X, ça gagne de la place
             
             # Axe X (Sources : Indeed, Glassdoor...)
             xaxis=dict(
+                title="Source",
                 title_font=dict(size=taille_police),
                 tickfont=dict(size=taille_police)
             ),
             # Axe Y (Montants : 30k, 40k...)
             yaxis=dict(
+                title="Salaire_Annuel",
                 title_font=dict(size=taille_police),
                 tickfont=dict(size=taille_police)
             )
@@ -235,10 +478,8 @@ with tab_actuel:
     st.markdown("---")
     st.subheader("🛠️ Les Technologies les plus demandées")   
         
-    stack_data = df_active['Tech_Stack'].dropna().str.split(', ').explode()
-
-    # 2. Calcul nombre occurences
-    stack_series = stack_data.value_counts().reset_index()
+    # Nombre d'offres par techno (lignes "techno" du cube)
+    stack_series = marche["techs"].copy()
     stack_series.columns = ['Tech', 'Mentions']
 
     # 3. On trie pour que le .tail(10) prenne bien les plus grands
@@ -294,8 +535,9 @@ with tab_actuel:
         st.subheader("📄 Répartition des Contrats")
 
         fig_contrat = px.pie(
-            df_active, 
-            names='Type_Contrat', 
+            marche["contrats"],
+            names='Type_Contrat',
+            values='Nb_Offres',
             title='Répartition par Type de Contrat',
             hole=0.4,            
             color_discrete_sequence=settings.palette_c
@@ -329,8 +571,9 @@ with tab_actuel:
         st.subheader("🎓 Niveau de Séniorité Ciblé")
 
         fig_niveau = px.pie(
-            df_filtered, 
-            names='Niveau', 
+            marche["niveaux"],
+            names='Niveau',
+            values='Nb_Offres',
             title='Répartition par Séniorité',
             hole=0.4,
             color_discrete_sequence=settings.palette_b
@@ -361,20 +604,39 @@ with tab_actuel:
 
     # --- TABLEAU DE DONNÉES ---
     st.markdown("---")
+    # Le contenu d'un expander est exécuté même replié : on n'envoie que la page affichée
+    # (+ quelques lignes d'avance), la recherche et le tri se font côté serveur sur les positions
     with st.expander("📋 Explorateur d'Offres"):    
+        col_recherche, col_tri, col_ordre = st.columns([3, 2, 1])
+        with col_recherche:
+            recherche = st.text_input("🔎 Rechercher (titre, entreprise)", key="explorateur_recherche")
+        with col_tri:
+            colonne_tri = st.selectbox("Trier par", list(COLONNES_TRI), format_func=COLONNES_TRI.get, key="explorateur_tri")
+        with col_ordre:
+            croissant = st.toggle("Croissant", value=False, key="explorateur_croissant")
+
+        positions = explorateur.trier(explorateur.rechercher(positions_actives, recherche), colonne_tri, croissant)
+
+        # Si la sélection a rétréci, la page mémorisée peut ne plus exister
+        nb_pages = Explorateur.nb_pages(positions)
+        if st.session_state.get("explorateur_page", 1) > nb_pages:
+            st.session_state["explorateur_page"] = 1
+        numero_page = st.number_input("Page", min_value=1, max_value=nb_pages, step=1, key="explorateur_page")
+        st.caption(f"{len(positions)} offres · page {numero_page}/{nb_pages}")
 
         colonnes_a_afficher = [
             'Titre', 
+            'Entreprise',
             'Ville', 
             'Type_Contrat', 
             'Teletravail',
             'Date_Publication', 
             'URL'              # ou 'URL' selon ton fichier
         ]
-        cols_final = [c for c in colonnes_a_afficher if c in df_active.columns]
+        cols_final = [c for c in colonnes_a_afficher if c in df.columns]
 
         st.dataframe(
-        df_active[cols_final],
+        Explorateur.page(df, positions, numero_page - 1, colonnes=cols_final),
         width="stretch", # Prend toute la largeur
         hide_index=True,          # Cache la colonne d'index (0, 1, 2...)
         
@@ -397,28 +659,18 @@ with tab_actuel:
 # ====================================================================
 # ONGLET 2 : ANALYSE TEMPORELLE
 # ====================================================================
-with tab_trends:  
+if onglet == ONGLET_TENDANCES:
 
     st.markdown("### ⏳ Historique et Tendances")
     #st.info("Cette vue inclut toutes les offres (actives et expirées) pour analyser l'évolution.")
     
-    # 1. Évolution du volume d'offres par mois
-    # On groupe par mois (M) sur la date de publication
-    df_trends = df_filtered.dropna(subset=['Date_Publication']).copy()
-    df_trends['Date_Publication'] = pd.to_datetime(df_trends['Date_Publication'])
-        
-    if not df_trends.empty:
-        df_trends['Mois'] = df_trends['Date_Publication'].dt.to_period('M').astype(str)        
-
-        # =========================================================
-        # ✂️ FILTRE TEMPOREL (On coupe le début trop vide)
-        # =========================================================
-        # On s'assure que c'est bien un format date
-        df_trends['Date_Publication'] = pd.to_datetime(df_trends['Date_Publication'])
+    # 1. Évolution du volume d'offres par semaine
+    # Le cube est déjà agrégé par semaine de publication (lundi), les offres sans date n'ont pas de semaine
+    # On ne garde que ce qui est APRES start_date (un lundi : les semaines tombent juste)
+    start_date = '2025-09-01'
+    tendances = preparer_tendances(cle_cube, selection, cube_filtre, start_date)
         
-        # On ne garde que ce qui est APRES start_date
-        start_date = '2025-09-01'
-        df_trends = df_trends[df_trends['Date_Publication'] >= start_date]
+    if tendances["nb_dates"] > 0:
 
         # Marqueurs historiques
         Date_debut = "2026-01-26"
@@ -426,32 +678,23 @@ with tab_trends:
         # =========================================================
 
         # Si jamais le filtre est trop violent et qu'il ne reste rien :
-        if df_trends.empty:
+        if tendances["nb_offres"] == 0:
             st.warning(f"Pas assez de données après le {start_date} pour afficher les tendances.")
         else:
-            df_trends['Semaine'] = df_trends['Date_Publication'].dt.to_period('W').apply(lambda r: r.start_time)
-            df_weekly = df_trends.groupby('Semaine').size().reset_index(name="Nombre d'offres")
+            df_weekly = tendances["semaines"]
 
-            # --- CALCUL DES KPIs HISTORIQUES ---
+            # --- KPIs HISTORIQUES ---
         
             # 1. Volume total sur la période
-            total_offres = len(df_trends)        
+            total_offres = tendances["nb_offres"]
             # 2. Nombre d'entreprises uniques
-            # On normalise un peu (strip/upper) pour éviter de compter "Google" et "GOOGLE " en double
-            nb_entreprises = df_trends['Entreprise'].str.strip().str.upper().nunique()
+            # Les noms sont normalisés (strip/upper) dans le cube pour ne pas compter "Google" et "GOOGLE " en double
+            nb_entreprises = tendances["nb_entreprises"]
             
             # 3. Durée de vie moyenne des offres (Vélocité)
-            # On ne garde que celles qui ont une date d'expiration (donc les offres finies/archivées)
-            df_finished = df_trends.dropna(subset=['Date_Expiration']).copy()
-            
-            if not df_finished.empty:
-                # Calcul de la différence en jours
-                df_finished['Duree_Vie'] = (df_finished['Date_Expiration'] - df_finished['Date_Publication']).dt.days
-                # On filtre les durées négatives (bugs de dates) ou nulles
-                avg_duree = df_finished[df_finished['Duree_Vie'] > 0]['Duree_Vie'].mean()
-                label_duree = f"{avg_duree:.0f} jours"
-            else:
-                label_duree = "N/A"
+            # Seules les offres expirées avec une durée > 0 (pas de bug de dates) comptent
+            avg_duree = tendances["duree_moyenne"]
+            label_duree = f"{avg_duree:.0f} jours" if not pd.isna(avg_duree) else "N/A"
 
 # ------------------------------------------------------------------------------------------------------------------------------------------------------
 
@@ -485,7 +728,6 @@ with tab_trends:
 
             # ===== GRAPHIQUE VOLUME =====
             st.markdown("#### 📈 Dynamique des Recrutements")
-            volume_par_mois = df_trends.groupby('Mois').size().reset_index(name='Nombre d\'offres')
             
             fig_evol = px.area(
                 df_weekly,
@@ -518,6 +760,37 @@ with tab_trends:
                 )
             st.plotly_chart(fig_evol, width="stretch")
 
+            # ===== STOCK VS FLUX (journal des offres) =====
+            # Le graphe ci-dessus suit les dates de publication : le stock récupéré à l'initialisation y ressemble à un flux.
+            # Le journal date chaque entrée et chaque sortie au moment où elle est observée (sources de la sidebar uniquement).
+            version_journal = lire_version_journal()
+            if version_journal:
+                st.markdown("#### 🔁 Stock vs Flux")
+                date_etat = st.date_input("État du marché au :", value=datetime.now().date(), key="date_etat")
+                flux = preparer_flux(version_journal, tuple(selected_source), start_date, date_etat)
+                df_flux = flux["flux"]
+
+                st.metric(
+                    label=f"Offres actives au {date_etat.strftime('%d/%m/%Y')}",
+                    value=f"{flux['actives']}",
+                    help="Offres vues en ligne et pas encore expirées à cette date, d'après le journal des offres."
+                )
+
+                fig_flux = go.Figure()
+                fig_flux.add_bar(x=df_flux['Semaine'], y=df_flux['Nouvelles'], name="Entrées (nouvelles offres)", marker_color="#ffba74")
+                fig_flux.add_bar(x=df_flux['Semaine'], y=-df_flux['Expirées'], name="Sorties (offres expirées)", marker_color="#2980b9")
+                fig_flux.add_scatter(x=df_flux['Semaine'], y=df_flux['Stock'], name="Stock actif", mode="lines+markers", line=dict(color="#e74c3c"))
+                fig_flux.update_layout(
+                    barmode="relative",
+                    title=dict(text="Entrées, sorties et stock d'offres actives par semaine", font=dict(size=taille_police + 2)),
+                    font=dict(size=taille_police),
+                    xaxis=dict(title="Semaine", tickfont=dict(size=taille_police), title_font=dict(size=taille_police)),
+                    yaxis=dict(title="Nombre d'offres", tickfont=dict(size=taille_police), title_font=dict(size=taille_police)),
+                    legend=dict(font=dict(size=taille_police)),
+                    hovermode="x unified"
+                )
+                st.plotly_chart(fig_flux, width="stretch")
+
             
 
             st.divider() # Ligne de séparation visuelle
@@ -526,8 +799,8 @@ with tab_trends:
 
             # ===== ANALYSE DES STACKS =====
             st.markdown("#### 🔥 Popularité des compétences Tech")
-            tech_series = df_trends['Tech_Stack'].dropna().str.split(', ').explode()
-            technos_dispo = sorted(tech_series.dropna().unique())
+            tech_par_semaine = tendances["techs"]
+            technos_dispo = list(tech_par_semaine.columns)
 
             # --- Sélection par défaut ---
             # On veut afficher Python et SQL par défaut, MAIS seulement s'ils existent dans la liste
@@ -544,18 +817,8 @@ with tab_trends:
 
             # --- Boucle de calcul ---
             if selected_techs:
-                # On prépare l'index avec tous les mois
-                #all_months = sorted(df_trends['Mois'].unique())
-                all_weeks = sorted(df_trends['Semaine'].unique())
-                data_tech = pd.DataFrame(index=all_weeks)
-
-                for tech in selected_techs:
-                    # On utilise la colonne Tech_Stack
-                    mask = df_trends['Tech_Stack'].str.contains(tech, case=False, regex=False, na=False)
-                    counts = df_trends[mask].groupby('Semaine').size()
-                    data_tech[tech] = counts
-
-                data_tech = data_tech.fillna(0)           
+                # On prépare l'index avec toutes les semaines (0 si la techno n'apparaît pas)
+                data_tech = tech_par_semaine[selected_techs]
                 
                 fig_tech = px.line(
                     data_tech, 
@@ -600,7 +863,7 @@ with tab_trends:
                 # 1. Préparation des données (Pivot pour gérer les mois vides)
                 # On groupe par Mois et Contrat, puis on 'unstack' pour avoir les contrats en colonnes
                 # fill_value=0 est CRUCIAL : si un mois n'a pas de "Stage", ça met 0 au lieu de rien
-                evol_contrat = df_trends.groupby(['Semaine', 'Type_Contrat']).size().unstack(fill_value=0)
+                evol_contrat = tendances["contrats"]
 
                 # 2. Création du graphique Plotly
                 fig_contrat = px.line(
@@ -0,0 +1,338 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Base locale des offres : un seul fichier SQLite (pas de serveur), activée par PATHFINDER_STOCKAGE=sqlite.
+# Les scripts gardent leurs chemins en .csv : chaque fichier de données devient une table "<couche>_<nom>"
+# (data/enriched/offres_apec_full.csv -> enriched_offres_apec_full, data/clean/global_job_market.csv -> clean_global_job_market),
+# lue et écrite par utils.py comme un fichier CSV ou Parquet.
+# - Index sur URL (clé des offres) et sur les colonnes de dates : un upsert ou une offre passée en "expirée"
+#   est une mise à jour d'une ligne, pas la réécriture du fichier entier
+# - Réécriture complète d'une table dans une seule transaction : les lecteurs voient l'ancienne version
+#   jusqu'au COMMIT (journal WAL), comme avec le .tmp + os.replace des fichiers
+# - Vues SQL pour la fusion et le dashboard (voir VUES), recalculées à chaque écriture de table
+# Ex : sqlite3 data/pathfinder.sqlite "SELECT Source, COUNT(*) FROM offres_actives GROUP BY Source"
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CHEMIN_BASE = os.getenv("PATHFINDER_BASE", os.path.join(current_dir, "data", "pathfinder.sqlite"))
+COLONNE_CLE = "URL"
+COLONNES_DATES = ["Date_Publication", "Date", "Date_Expiration"]   # Indexées si présentes
+ATTENTE_VERROU = 60   # Secondes d'attente si une autre étape du pipeline écrit dans la base
+
+TABLE_GLOBAL = "clean_global_job_market"
+# Valeurs de Date_Expiration qui veulent dire "offre encore en ligne" (mêmes filtres que les updaters)
+EXPIRATION_VIDE = "(Date_Expiration IS NULL OR Date_Expiration IN ('', 'nan', 'Non spécifié'))"
+
+
+def nom_table(chemin_fichier):
+    """data/<couche>/<nom>.csv -> '<couche>_<nom>' (lettres, chiffres et _ seulement)."""
+    couche = os.path.basename(os.path.dirname(os.path.abspath(chemin_fichier)))
+    nom = os.path.splitext(os.path.basename(chemin_fichier))[0]
+    return re.sub(r"\W", "_", f"{couche}_{nom}")
+
+
+def _q(identifiant):
+    """Identifiant SQL entre guillemets (noms de colonnes avec espaces, accents...)."""
+    return '"' + str(identifiant).replace('"', '""') + '"'
+
+
+def _type_colonne(serie):
+    """(type SQL, type à restaurer à la lecture) d'une colonne pandas."""
+    if pd.api.types.is_bool_dtype(serie):
+        return "INTEGER", "bool"
+    if serie.dtype == "uint64":
+        return "TEXT", "uint64"    # Empreintes 64 bits : au-delà des entiers signés de SQLite
+    if pd.api.types.is_integer_dtype(serie):
+        return "INTEGER", "int"
+    if pd.api.types.is_float_dtype(serie):
+        return "REAL", "float"
+    return "TEXT", "texte"
+
+
+def _valeurs(df):
+    """Lignes de df en tuples de types Python (None pour les manquants), textes pour les colonnes object / dates."""
+    colonnes = []
+    for colonne in df.columns:
+        serie = df[colonne]
+        if pd.api.types.is_datetime64_any_dtype(serie) or serie.dtype in (object, "uint64"):
+            serie = serie.astype(object).where(serie.isna(), serie.astype(str))
+        colonnes.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return list(zip(*colonnes))
+
+
+# ======================================================================================================================================================
+
+class EcritureTable:
+    """
+    Réécriture complète d'une table, morceau par morceau, dans une seule transaction (voir utils.EcritureParMorceaux).
+    Rien n'est visible des autres connexions avant terminer() ; sans terminer(), la table reste inchangée.
+    """
+
+    def __init__(self, base, table, colonnes):
+        self.base, self.table, self.colonnes = base, table, list(colonnes)
+        self.types = None
+        self.nb_lignes = 0
+
+    def creer(self, df):
+        """Début de la transaction : la table est recréée avec les types des colonnes de df (premier morceau)."""
+        self.types = {c: _type_colonne(df[c]) for c in self.colonnes}
+        self.base.connexion.execute("BEGIN IMMEDIATE")
+        self.base.connexion.execute(f"DROP TABLE IF EXISTS {_q(self.table)}")
+        self.base.connexion.execute(f"CREATE TABLE {_q(self.table)} ({', '.join(f'{_q(c)} {t}' for c, (t, _) in self.types.items())})")
+
+    def ecrire(self, df):
+        if df.empty:
+            return
+        df = df.reindex(columns=self.colonnes)
+        connexion = self.base.connexion
+        if self.types is None:
+            self.creer(df)
+        marqueurs = ", ".join("?" * len(self.colonnes))
+        connexion.executemany(f"INSERT INTO {_q(self.table)} VALUES ({marqueurs})", _valeurs(df))
+        self.nb_lignes += len(df)
+
+    def terminer(self):
+        if self.types is None:
+            return
+        self.base._indexer(self.table, self.colonnes)
+        self.base._noter_ecriture(self.table, {c: t for c, (_, t) in self.types.items()}, self.nb_lignes)
+        self.base.rafraichir_vues()
+        self.base.connexion.execute("COMMIT")
+
+
+class BaseOffres:
+    """
+    Exemple :
+        base = BaseOffres()
+        base.remplacer("enriched_offres_apec_full", df)                         # sauvegarde complète
+        base.upsert("enriched_offres_apec_full", df_nouvelles)                  # ajout / mise à jour par URL
+        base.mettre_a_jour("enriched_offres_apec_full", url, {"Date_Expiration": "2026-03-01"})
+        df = base.lire("clean_global_job_market", colonnes=["Titre", "URL"])
+    """
+
+    def __init__(self, chemin=CHEMIN_BASE):
+        os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+        self.chemin = chemin
+        self.connexion = sqlite3.connect(chemin, timeout=ATTENTE_VERROU, isolation_level=None)
+        self.connexion.execute("PRAGMA journal_mode=WAL")     # Lecteurs jamais bloqués par une écriture
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS _tables (
+                nom TEXT PRIMARY KEY, types TEXT, maj REAL, version INTEGER, nb_lignes INTEGER
+            )
+        """)
+
+    def fermer(self):
+        self.connexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fermer()
+
+    # --- MÉTADONNÉES ---
+
+    def existe(self, table):
+        return self.connexion.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+    def colonnes(self, table):
+        return [ligne[1] for ligne in self.connexion.execute(f"PRAGMA table_info({_q(table)})")]
+
+    def infos(self, table):
+        """{'maj': timestamp de la dernière écriture, 'version': compteur d'écritures, 'nb_lignes'} ou None."""
+        ligne = self.connexion.execute("SELECT maj, version, nb_lignes FROM _tables WHERE nom = ?", (table,)).fetchone()
+        if ligne is None or not self.existe(table):
+            return None
+        return {"maj": ligne[0], "version": ligne[1], "nb_lignes": ligne[2]}
+
+    def _types(self, table):
+        ligne = self.connexion.execute("SELECT types FROM _tables WHERE nom = ?", (table,)).fetchone()
+        return json.loads(ligne[0]) if ligne and ligne[0] else {}
+
+    def _noter_ecriture(self, table, types=None, nb_lignes=None):
+        """Date, version et nombre de lignes de la table (pour date_modification / empreinte_fichier / compter_lignes)."""
+        nb = nb_lignes if nb_lignes is not None else self.connexion.execute(f"SELECT COUNT(*) FROM {_q(table)}").fetchone()[0]
+        types = dict(self._types(table), **(types or {}))
+        self.connexion.execute("""
+            INSERT INTO _tables VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT(nom) DO UPDATE SET types = excluded.types, maj = excluded.maj, version = version + 1, nb_lignes = excluded.nb_lignes
+        """, (table, json.dumps(types), time.time(), nb))
+
+    def _indexer(self, table, colonnes):
+        for colonne in [COLONNE_CLE] + COLONNES_DATES:
+            if colonne in colonnes:
+                self.connexion.execute(f"CREATE INDEX IF NOT EXISTS {_q(f'idx_{table}_{colonne}')} ON {_q(table)} ({_q(colonne)})")
+
+    # --- ÉCRITURE ---
+
+    def ecriture(self, table, colonnes):
+        return EcritureTable(self, table, colonnes)
+
+    def remplacer(self, table, df):
+        """Réécriture complète (atomique) de la table avec les lignes de df."""
+        ecriture = self.ecriture(table, df.columns)
+        ecriture.ecrire(df)
+        ecriture.terminer()
+
+    def _ajouter_colonnes(self, table, df):
+        """Colonnes de df absentes de la table (ex: nouvelle colonne d'un scraper) : ALTER TABLE ADD COLUMN."""
+        existantes = set(self.colonnes(table))
+        nouvelles = {c: _type_colonne(df[c]) for c in df.columns if c not in existantes}
+        for colonne, (type_sql, _) in nouvelles.items():
+            self.connexion.execute(f"ALTER TABLE {_q(table)} ADD COLUMN {_q(colonne)} {type_sql}")
+        return {c: t for c, (_, t) in nouvelles.items()}
+
+    def upsert(self, table, df, cle=COLONNE_CLE):
+        """
+        Ajoute les lignes de df, ou met à jour celles dont la clé (URL) existe déjà.
+        Une ligne nouvelle va en fin de table (même ordre qu'un ajout en fin de CSV).
+        Avec un df vide, la table est seulement créée si elle n'existe pas (en-tête seul d'un CSV).
+        """
+        if not self.existe(table):
+            ecriture = self.ecriture(table, df.columns)
+            ecriture.creer(df)
+            ecriture.ecrire(df)
+            ecriture.terminer()
+            return
+        if df.empty:
+            return
+        colonnes = list(df.columns)
+        autres = [c for c in colonnes if c != cle]
+        valeurs = _valeurs(df)
+        position = colonnes.index(cle)
+        self.connexion.execute("BEGIN IMMEDIATE")
+        try:
+            types = self._ajouter_colonnes(table, df)
+            nouvelles = []
+            for ligne in valeurs:
+                modifiees = 0
+                if autres:
+                    modifiees = self.connexion.execute(
+                        f"UPDATE {_q(table)} SET {', '.join(f'{_q(c)} = ?' for c in autres)} WHERE {_q(cle)} = ?",
+                        [v for c, v in zip(colonnes, ligne) if c != cle] + [ligne[position]],
+                    ).rowcount
+                elif self.connexion.execute(f"SELECT 1 FROM {_q(table)} WHERE {_q(cle)} = ?", (ligne[position],)).fetchone():
+                    modifiees = 1
+                if modifiees == 0:
+                    nouvelles.append(ligne)
+            self.connexion.executemany(
+                f"INSERT INTO {_q(table)} ({', '.join(map(_q, colonnes))}) VALUES ({', '.join('?' * len(colonnes))})", nouvelles
+            )
+            avant = self.infos(table)
+            self._noter_ecriture(table, types, avant["nb_lignes"] + len(nouvelles) if avant else None)
+            if types:
+                self.rafraichir_vues()
+            self.connexion.execute("COMMIT")
+        except BaseException:
+            self.connexion.execute("ROLLBACK")
+            raise
+
+    def mettre_a_jour(self, table, valeur_cle, valeurs, cle=COLONNE_CLE):
+        """Modifie quelques colonnes de l'offre `valeur_cle` (ex: Date_Expiration) : une seule ligne touchée. Renvoie le nb de lignes modifiées."""
+        self.connexion.execute("BEGIN IMMEDIATE")
+        try:
+            types = self._ajouter_colonnes(table, pd.DataFrame({c: [v] for c, v in valeurs.items()}))
+            nb = self.connexion.execute(
+                f"UPDATE {_q(table)} SET {', '.join(f'{_q(c)} = ?' for c in valeurs)} WHERE {_q(cle)} = ?",
+                list(valeurs.values()) + [valeur_cle],
+            ).rowcount
+            self.connexion.execute(
+                "UPDATE _tables SET maj = ?, version = version + 1 WHERE nom = ?", (time.time(), table)
+            )
+            if types:
+                self._noter_ecriture(table, types)
+                self.rafraichir_vues()
+            self.connexion.execute("COMMIT")
+            return nb
+        except BaseException:
+            self.connexion.execute("ROLLBACK")
+            raise
+
+    # --- LECTURE ---
+
+    def _requete(self, table, colonnes=None):
+        presentes = self.colonnes(table)
+        if colonnes is not None:
+            presentes = [c for c in colonnes if c in presentes]
+        return f"SELECT {', '.join(map(_q, presentes)) or '*'} FROM {_q(table)} ORDER BY rowid"
+
+    def _retyper(self, df, types):
+        """Booléens stockés en 0/1 : rendus en bool (en object s'il y a des manquants). Textes manquants : NaN, comme read_csv."""
+        for colonne in df.columns:
+            if df[colonne].dtype == object:
+                df[colonne] = df[colonne].where(df[colonne].notna(), np.nan)
+            if types.get(colonne) == "bool":
+                serie = df[colonne]
+                df[colonne] = serie.astype(bool) if serie.notna().all() else serie.map({1: True, 0: False})
+            elif types.get(colonne) == "uint64" and df[colonne].notna().all():
+                df[colonne] = df[colonne].astype("uint64")
+        return df
+
+    def lire(self, table, colonnes=None):
+        """Contenu de la table dans l'ordre d'insertion (projection `colonnes`, les absentes sont ignorées)."""
+        return self._retyper(pd.read_sql_query(self._requete(table, colonnes), self.connexion), self._types(table))
+
+    def morceaux(self, table, taille_morceau, colonnes=None):
+        """Générateur de DataFrames de `taille_morceau` lignes (même lecture que lire)."""
+        types = self._types(table)
+        for df in pd.read_sql_query(self._requete(table, colonnes), self.connexion, chunksize=taille_morceau):
+            yield self._retyper(df, types)
+
+    def compter(self, table):
+        return self.connexion.execute(f"SELECT COUNT(*) FROM {_q(table)}").fetchone()[0]
+
+    # --- VUES ---
+
+    def rafraichir_vues(self):
+        """(Re)crée les vues de VUES à partir des tables présentes (les vues sans table sont supprimées)."""
+        for nom, definition in VUES.items():
+            self.connexion.execute(f"DROP VIEW IF EXISTS {_q(nom)}")
+            sql = definition(self)
+            if sql:
+                self.connexion.execute(f"CREATE VIEW {_q(nom)} AS {sql}")
+
+
+def _tables_commencant_par(base, prefixe):
+    return [ligne[0] for ligne in base.connexion.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ? ORDER BY name", (prefixe + "%",)
+    )]
+
+
+def _vue_dashboard(base):
+    """Offres du fichier global sans Description (la colonne la plus lourde), avec Active (0/1)."""
+    if not base.existe(TABLE_GLOBAL):
+        return None
+    colonnes = [c for c in base.colonnes(TABLE_GLOBAL) if c != "Description"]
+    return f"SELECT {', '.join(map(_q, colonnes))}, {EXPIRATION_VIDE} AS Active FROM {_q(TABLE_GLOBAL)}"
+
+
+def _vue_sources_fusion(base):
+    """Lignes préparées de chaque source (fusion_csv.py --preparer), colonnes communes, avec la table d'origine."""
+    tables = _tables_commencant_par(base, "staging_fusion_")
+    if not tables:
+        return None
+    communes = [c for c in base.colonnes(tables[0]) if all(c in base.colonnes(t) for t in tables[1:])]
+    return " UNION ALL ".join(f"SELECT '{t}' AS Table_Source, {', '.join(map(_q, communes))} FROM {_q(t)}" for t in tables)
+
+
+def _vue_a_verifier(base):
+    """Offres encore en ligne des fichiers enrichis (celles que les updaters vérifient)."""
+    tables = [t for t in _tables_commencant_par(base, "enriched_") if {COLONNE_CLE, "Date_Expiration"} <= set(base.colonnes(t))]
+    if not tables:
+        return None
+    return " UNION ALL ".join(f"SELECT '{t}' AS Table_Source, {_q(COLONNE_CLE)} FROM {_q(t)} WHERE {EXPIRATION_VIDE}" for t in tables)
+
+
+VUES = {
+    "offres_dashboard": _vue_dashboard,
+    "offres_actives": lambda base: "SELECT * FROM offres_dashboard WHERE Active" if base.existe(TABLE_GLOBAL) else None,
+    "sources_fusion": _vue_sources_fusion,
+    "offres_a_verifier": _vue_a_verifier,
+}
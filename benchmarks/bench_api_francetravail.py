@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Serveur local qui imite l'API France Travail (pagination 200/206 + Content-Range)
+# pour tester la récolte asynchrone sans clés ni réseau.
+# Usage : python benchmarks/bench_api_francetravail.py [offres_par_mot_cle] [requetes_par_seconde]
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+
+OFFRES_PAR_MOT = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+DEBIT = sys.argv[2] if len(sys.argv) > 2 else "20"
+LATENCE = 0.15          # Temps de réponse simulé de l'API (secondes)
+PAUSE_ANCIENNE = 0.3    # time.sleep() entre deux pages dans l'ancienne version séquentielle
+
+horodatages = []
+deja_limite = set()
+
+
+class FausseAPI(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def repondre(self, code, corps=None, en_tetes=None):
+        contenu = json.dumps(corps).encode() if corps is not None else b""
+        self.send_response(code)
+        for cle, valeur in (en_tetes or {}).items():
+            self.send_header(cle, valeur)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.repondre(200, {"access_token": "jeton-de-test"})
+
+    def do_GET(self):
+        horodatages.append(time.monotonic())
+        time.sleep(LATENCE)
+        if self.headers.get("Authorization") != "Bearer jeton-de-test":
+            return self.repondre(401, {"message": "token invalide"})
+
+        params = parse_qs(urlparse(self.path).query)
+        mot = params["motsCles"][0]
+        debut, fin = map(int, params["range"][0].split("-"))
+
+        # Un 429 par mot-clé sur la 3e page, pour vérifier la reprise
+        if debut == 280 and mot not in deja_limite:
+            deja_limite.add(mot)
+            return self.repondre(429, {"message": "trop de requêtes"}, {"Retry-After": "1"})
+
+        if debut >= OFFRES_PAR_MOT:
+            return self.repondre(204)
+
+        fin = min(fin, OFFRES_PAR_MOT - 1)
+        # Les 100 premières offres sont communes à tous les mots-clés (doublons à filtrer)
+        resultats = [{"id": f"COMMUN{i}" if i < 100 else f"{mot.replace(' ', '').upper()}{i}", "intitule": f"{mot} {i}",
+                      "origineOffre": {"urlOrigine": f"https://exemple.fr/{mot}/{i}"}}
+                     for i in range(debut, fin + 1)]
+        code = 200 if fin >= OFFRES_PAR_MOT - 1 else 206
+        self.repondre(code, {"resultats": resultats}, {"Content-Range": f"offres {debut}-{fin}/{OFFRES_PAR_MOT}"})
+
+
+if __name__ == "__main__":
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), FausseAPI)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{serveur.server_port}"
+
+    # La configuration est lue à l'import du module : on la fixe avant
+    os.environ.update({
+        "FT_CLIENT_ID": "test", "FT_CLIENT_SECRET": "test",
+        "FT_URL_AUTH": f"{base}/auth", "FT_URL_SEARCH": f"{base}/offres/search",
+        "FT_REQUETES_PAR_SECONDE": DEBIT,
+    })
+    sys.path.append(os.path.join(project_root, "scrapers", "francetravail"))
+    import api_francetravail as api
+    from utils import charger_donnees
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "offres_francetravail_full.csv")
+        start = time.time()
+        nb = asyncio.run(api.recolter(api.liste_mots_cles, chemin, set()))
+        duree = time.time() - start
+        df = charger_donnees(chemin, dtype=str)
+
+    serveur.shutdown()
+
+    nb_mots = len(api.liste_mots_cles)
+    attendu = nb_mots * (OFFRES_PAR_MOT - 100) + 100
+    pages = len(horodatages)
+    pic = max(sum(1 for t in horodatages if t0 <= t < t0 + 1) for t0 in horodatages)
+    sequentiel = (pages - nb_mots) * (LATENCE + PAUSE_ANCIENNE) + nb_mots * LATENCE
+
+    if nb != attendu or len(df) != attendu or df["id"].duplicated().any():
+        print(f"❌ {nb} offres récoltées, {len(df)} écrites, {attendu} attendues (ids uniques) !")
+        sys.exit(1)
+
+    print(f"✅ {len(df)} offres uniques récoltées en {duree:.2f} s ({pages} requêtes, dont {nb_mots} 429)")
+    print(f"   Débit max observé : {pic} requêtes sur 1 s (quota : {DEBIT}/s)")
+    print(f"   Ancienne boucle séquentielle (estimation) : {sequentiel:.1f} s")
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEUR = int(sys.argv[1]) if len(sys.argv) > 1 else 20  # Pour simuler un historique plus gros
+
+# Mêmes listes que app.py
+COLONNES_APP = [
+    "Titre", "Entreprise", "Ville", "Type_Contrat", "Teletravail", "Date_Publication", "Date_Expiration",
+    "Source", "URL", "Niveau", "Handicap_Friendly"
+]
+COLONNES_CATEGORIES = ["Source", "Type_Contrat", "Ville", "Niveau", "Teletravail", "Entreprise"]
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def filtrer(df, sources, contrats, villes, niveaux):
+    """Filtre de la sidebar de app.py."""
+    return df[
+        (df['Source'].isin(sources)) &
+        (df['Type_Contrat'].isin(contrats)) &
+        (df['Ville'].isin(villes)) &
+        (df['Niveau'].isin(niveaux))
+    ]
+
+
+def chronometre(fonction, repetitions=20):
+    start = time.time()
+    for _ in range(repetitions):
+        resultat = fonction()
+    return resultat, (time.time() - start) / repetitions
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    complet = charger_donnees(FICHIER_GLOBAL)
+    complet = pd.concat([complet] * FACTEUR, ignore_index=True)
+    for col in ["Date_Publication", "Date_Expiration"]:
+        complet[col] = pd.to_datetime(complet[col], errors="coerce")
+
+    # Avant : toutes les colonnes sauf Description, en texte (object)
+    ancien = complet.drop(columns=["Description"])
+    # Après : projection + catégories
+    nouveau = complet[COLONNES_APP].copy()
+    for col in COLONNES_CATEGORIES:
+        if col in nouveau.columns:
+            nouveau[col] = nouveau[col].astype("category")
+
+    # Sélection type "utilisateur" : 2 contrats, 5 grandes villes, tous les niveaux et sources
+    sources = complet["Source"].dropna().unique().tolist()
+    contrats = complet["Type_Contrat"].value_counts().head(2).index.tolist()
+    villes = complet["Ville"].value_counts().head(5).index.tolist()
+    niveaux = complet["Niveau"].dropna().unique().tolist()
+
+    res_ancien, t_ancien = chronometre(lambda: filtrer(ancien, sources, contrats, villes, niveaux))
+    res_nouveau, t_nouveau = chronometre(lambda: filtrer(nouveau, sources, contrats, villes, niveaux))
+    if not res_ancien.index.equals(res_nouveau.index):
+        print("❌ Les deux filtres ne renvoient pas les mêmes offres !")
+        sys.exit(1)
+
+    memoire_ancien = ancien.memory_usage(deep=True).sum() / 1e6
+    memoire_nouveau = nouveau.memory_usage(deep=True).sum() / 1e6
+    print(f"📂 {len(complet)} offres (x{FACTEUR}), {len(res_nouveau)} après filtre\n")
+    print("           | Mémoire  | Filtre sidebar")
+    print(f" object    | {memoire_ancien:6.1f} Mo | {t_ancien * 1000:8.1f} ms")
+    print(f" category  | {memoire_nouveau:6.1f} Mo | {t_nouveau * 1000:8.1f} ms")
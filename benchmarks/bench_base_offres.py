@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Stockage des offres en CSV (réécriture complète) contre la base SQLite (base_offres.py), sur un historique grossi :
+# - passer quelques offres en "expirée" (ce que font les updaters) : relecture + réécriture du CSV / UPDATE d'une ligne
+# - upsert d'un lot d'offres (moitié déjà connues, moitié nouvelles) : relecture + fusion + réécriture / upsert par URL
+# - aller-retour : la table relue redonne les mêmes valeurs que le DataFrame écrit
+# Usage : python benchmarks/bench_base_offres.py [facteur]
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from base_offres import BaseOffres
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEUR = int(sys.argv[1]) if len(sys.argv) > 1 else 20     # Historique = FACTEUR copies du fichier global
+NB_EXPIRATIONS = 5
+TAILLE_LOT = 1000
+TABLE = "enriched_historique"
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def chronometre(fonction):
+    start = time.time()
+    resultat = fonction()
+    return resultat, time.time() - start
+
+
+def grossir(df, facteur):
+    copies = [df.assign(URL=df["URL"].astype(str) + f"?copie={k}") for k in range(facteur)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def expirer_csv(chemin, urls, date):
+    """Ancien fonctionnement des updaters : une sauvegarde complète du fichier par offre expirée."""
+    for url in urls:
+        df = pd.read_csv(chemin, dtype=str)
+        df.loc[df["URL"] == url, "Date_Expiration"] = date
+        df.to_csv(chemin, index=False, encoding="utf-8-sig")
+
+
+def upsert_csv(chemin, lot):
+    df = pd.read_csv(chemin)
+    connues = df["URL"].isin(lot["URL"])
+    df = pd.concat([df[~connues], lot], ignore_index=True)   # Pas l'ordre exact de l'upsert, même coût
+    df.to_csv(chemin, index=False, encoding="utf-8-sig")
+
+
+def identiques(a, b):
+    return len(a) == len(b) and all(
+        np.allclose(a[c], b[c], equal_nan=True) if a[c].dtype.kind in "fi" and b[c].dtype.kind in "fi"
+        else a[c].astype(str).equals(b[c].astype(str))
+        for c in a.columns
+    )
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+    historique = grossir(charger_donnees(FICHIER_GLOBAL), FACTEUR)
+    rng = np.random.default_rng(0)
+    urls = historique["URL"].iloc[rng.choice(len(historique), NB_EXPIRATIONS, replace=False)].tolist()
+    lot = historique.iloc[rng.choice(len(historique), TAILLE_LOT // 2, replace=False)].copy()
+    lot = pd.concat([lot, lot.assign(URL=lot["URL"] + "&nouvelle=1")], ignore_index=True)
+    lot["Date_Expiration"] = "2026-01-01"
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_csv = os.path.join(dossier, "historique.csv")
+        historique.to_csv(chemin_csv, index=False, encoding="utf-8-sig")
+        base = BaseOffres(os.path.join(dossier, "pathfinder.sqlite"))
+        _, t_ecriture = chronometre(lambda: base.remplacer(TABLE, historique))
+        print(f"\n📦 Historique : {len(historique)} offres (CSV {os.path.getsize(chemin_csv) / 1e6:.0f} Mo), écriture initiale en base : {t_ecriture:.1f} s\n")
+
+        relue, t_lecture = chronometre(lambda: base.lire(TABLE))
+        _, t_lecture_csv = chronometre(lambda: pd.read_csv(chemin_csv))
+        print(f" Lecture complète          | CSV {t_lecture_csv:7.3f} s | SQLite {t_lecture:7.3f} s")
+
+        _, t_csv = chronometre(lambda: expirer_csv(chemin_csv, urls, "2026-10-18"))
+        _, t_base = chronometre(lambda: [base.mettre_a_jour(TABLE, url, {"Date_Expiration": "2026-10-18"}) for url in urls])
+        print(f" 1 offre expirée (moyenne) | CSV {t_csv / NB_EXPIRATIONS:7.3f} s | SQLite {t_base / NB_EXPIRATIONS:7.3f} s  ({t_csv / t_base:.0f}x)")
+
+        _, t_csv = chronometre(lambda: upsert_csv(chemin_csv, lot))
+        _, t_base = chronometre(lambda: base.upsert(TABLE, lot))
+        print(f" Upsert de {len(lot)} offres     | CSV {t_csv:7.3f} s | SQLite {t_base:7.3f} s  ({t_csv / t_base:.0f}x)")
+
+        attendu = historique.copy()
+        attendu.loc[attendu["URL"].isin(urls), "Date_Expiration"] = "2026-10-18"
+        connues = lot["URL"].isin(historique["URL"])
+        lignes = attendu.index[pd.Index(attendu["URL"]).get_indexer(lot.loc[connues, "URL"])]
+        for colonne in historique.columns:
+            attendu.loc[lignes, colonne] = lot.loc[connues, colonne].to_numpy()
+        attendu = pd.concat([attendu, lot[~connues]], ignore_index=True)
+        finale = base.lire(TABLE)[historique.columns]
+        base.fermer()
+
+    if not identiques(historique, relue[historique.columns]) or not identiques(attendu, finale):
+        print("\n❌ La base ne redonne pas les valeurs écrites.")
+        sys.exit(1)
+    print(f"\n✅ Mêmes valeurs relues depuis la base ({len(finale)} offres après upsert).")
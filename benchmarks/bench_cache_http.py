@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Serveur local qui sert des pages d'offre (~60 Ko, avec ETag) pour mesurer le cache HTTP :
+# 1er run (tout est téléchargé), run relancé (pages fraîches), run après expiration (revalidation 304),
+# run hors ligne (serveur arrêté) et éviction LRU quand le cache dépasse sa taille max.
+# Usage : python benchmarks/bench_cache_http.py [nb_pages]
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from http_client import CacheHTTP, creer_client_async, requete
+
+NB_PAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+LATENCE = 0.05
+TAILLE_PAGE = 60_000
+
+etat = {"200": 0, "304": 0, "octets": 0}
+verrou = threading.Lock()
+
+
+def page(numero):
+    return (f"<html><h1>Offre {numero}</h1>" + "Description de l'offre. " * (TAILLE_PAGE // 24) + "</html>").encode()
+
+
+class FauxSite(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(LATENCE)
+        corps = page(int(self.path.rstrip("/").split("/")[-1]))
+        etag = '"' + hashlib.md5(corps).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with verrou:
+                etat["304"] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        with verrou:
+            etat["200"] += 1
+            etat["octets"] += len(corps)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+
+async def telecharger(base, cache, numeros):
+    """Toutes les pages, 10 à la fois ; renvoie les statuts (la parité est vérifiée sur les corps)."""
+    async with creer_client_async(connexions_max=10) as client:
+        semaphore = asyncio.Semaphore(10)
+
+        async def une(numero):
+            async with semaphore:
+                reponse = await requete(client, None, "GET", f"{base}/offres/{numero}", cache=cache)
+                return reponse.status_code == 200 and reponse.content == page(numero)
+
+        return await asyncio.gather(*[une(n) for n in numeros])
+
+
+def mesurer(nom, base, cache, numeros=range(NB_PAGES)):
+    avant = dict(etat)
+    start = time.time()
+    justes = asyncio.run(telecharger(base, cache, numeros))
+    duree = time.time() - start
+    print(f" {nom:<28} | {duree:6.2f} s | {etat['200'] - avant['200']:>5} | {etat['304'] - avant['304']:>5} "
+          f"| {(etat['octets'] - avant['octets']) / 1e6:7.1f} Mo | {'oui' if all(justes) else 'NON'}")
+    return all(justes)
+
+
+if __name__ == "__main__":
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), FauxSite)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{serveur.server_port}"
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "cache.sqlite")
+        politiques = [(r"127\.0\.0\.1", 3600)]
+        print(" Run                          | Durée    |   200 |   304 | Transféré | Pages justes")
+        ok = mesurer("Sans cache", base, None)
+
+        cache = CacheHTTP(chemin, politiques=politiques)
+        ok &= mesurer("Cache vide", base, cache)
+        cache.fermer()
+        cache = CacheHTTP(chemin, politiques=politiques)          # Nouveau process : le cache est sur disque
+        ok &= mesurer("Run relancé (pages fraîches)", base, cache)
+        cache.fermer()
+        cache = CacheHTTP(chemin, politiques=[(r"127\.0\.0\.1", 0)])   # Durée de fraîcheur écoulée
+        ok &= mesurer("Après expiration (ETag)", base, cache)
+        cache.fermer()
+
+        serveur.shutdown()
+        serveur.server_close()
+        cache = CacheHTTP(chemin, politiques=politiques, hors_ligne=True)
+        ok &= mesurer("Hors ligne (serveur arrêté)", base, cache)
+        cache.fermer()
+
+        # Éviction : cache limité à 50 pages, les plus récemment lues restent
+        cache = CacheHTTP(chemin, politiques=politiques, taille_max=50 * TAILLE_PAGE)
+        cache.enregistrer(f"{base}/offres/extra", cache.lire(f"{base}/offres/0")[0])
+        restantes = cache.connexion.execute("SELECT COUNT(*) FROM reponses").fetchone()[0]
+        gardee = cache.lire(f"{base}/offres/{NB_PAGES - 1}") is not None
+        print(f"\n🧹 Éviction : {restantes} pages gardées sur {NB_PAGES + 1} ({cache.taille / 1e6:.1f} Mo), "
+              f"dernière page lue gardée : {'oui' if gardee else 'NON'}")
+        ok &= restantes <= 50 and gardee
+        cache.fermer()
+
+    if not ok:
+        print("❌ Réponses inattendues.")
+        sys.exit(1)
+    print("✅ Mêmes pages avec ou sans cache.")
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+import cube
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEURS = [1, 10, 50]  # Historique x N (mêmes semaines : marché N fois plus dense)
+START_DATE = "2025-09-01"
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def requetes_brutes(df):
+    """Ancien calcul de app.py : tout est recalculé depuis les offres à chaque interaction."""
+    df_active = df[df['Date_Expiration'].isna()]
+    salaires = df_active['Salaire_Annuel'].dropna()
+    df_trends = df[df['Date_Publication'] >= START_DATE].copy()
+    df_trends['Semaine'] = df_trends['Date_Publication'].dt.to_period('W').apply(lambda r: r.start_time)
+    return {
+        "nb": len(df_active),
+        "salaire": salaires.mean(),
+        "villes": df_active['Ville'].value_counts().head(10),
+        "box": df_active.groupby('Source')['Salaire_Annuel'].quantile([0.25, 0.5, 0.75]),
+        "techs": df_active['Tech_Stack'].dropna().str.split(', ').explode().value_counts(),
+        "contrats": df_active['Type_Contrat'].value_counts(),
+        "niveaux": df['Niveau'].value_counts(),
+        "semaines": df_trends.groupby('Semaine').size(),
+        "entreprises": df_trends['Entreprise'].str.strip().str.upper().nunique(),
+        "evol_contrats": df_trends.groupby(['Semaine', 'Type_Contrat']).size().unstack(fill_value=0),
+        "evol_python": df_trends[df_trends['Tech_Stack'].str.contains("Python", na=False)].groupby('Semaine').size(),
+    }
+
+
+def requetes_cube(cube_marche):
+    """Même tableau de bord, lu dans le cube."""
+    cube_actif = cube.filtrer(cube_marche, actif=True)
+    cube_trends = cube.filtrer(cube_marche, semaine_min=START_DATE)
+    return {
+        "nb": cube.nb_offres(cube_actif),
+        "salaire": cube.salaire_moyen(cube_actif)[0],
+        "villes": cube.compter(cube_actif, 'Ville').head(10),
+        "box": cube.stats_salaires(cube_actif),
+        "techs": cube.compter_techs(cube_actif),
+        "contrats": cube.compter(cube_actif, 'Type_Contrat'),
+        "niveaux": cube.compter(cube_marche, 'Niveau'),
+        "semaines": cube.compter(cube_trends, 'Semaine'),
+        "entreprises": cube.nb_entreprises(cube_trends),
+        "evol_contrats": cube.compter(cube_trends, ['Semaine', 'Type_Contrat']).unstack(fill_value=0),
+        "evol_python": cube.compter_techs(cube_trends, par='Semaine').xs("Python", level="Tech"),
+    }
+
+
+def chronometre(fonction, repetitions=5):
+    start = time.time()
+    for _ in range(repetitions):
+        resultat = fonction()
+    return resultat, (time.time() - start) / repetitions
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    base = charger_donnees(FICHIER_GLOBAL)
+    base['Date_Publication'] = pd.to_datetime(base['Date_Publication'], errors='coerce')
+    base['Date_Expiration'] = pd.to_datetime(base['Date_Expiration'], errors='coerce')
+
+    print(" Offres  | Cellules cube | Construction | Requêtes brutes | Requêtes cube")
+    for facteur in FACTEURS:
+        df = pd.concat([base] * facteur, ignore_index=True)
+        cube_marche, t_construction = chronometre(lambda: cube.construire_cube(df), repetitions=1)
+        brut, t_brut = chronometre(lambda: requetes_brutes(df))
+        agrege, t_cube = chronometre(lambda: requetes_cube(cube_marche))
+
+        # Parité sur les compteurs exacts
+        for cle in ["nb", "contrats", "niveaux", "semaines", "techs"]:
+            a, b = brut[cle], agrege[cle]
+            if cle == "semaines":
+                a.index = a.index.strftime("%Y-%m-%d")
+            egal = a == b if cle == "nb" else a.sort_index().astype(int).equals(b.sort_index().astype(int))
+            if not egal:
+                print(f"❌ Écart sur '{cle}' (x{facteur})")
+                sys.exit(1)
+
+        print(f" {len(df):>7} | {len(cube_marche):>13} | {t_construction:10.2f} s | {t_brut * 1000:12.1f} ms | {t_cube * 1000:10.1f} ms")
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from doublons import regrouper, signatures_minhash, textes_offres, normaliser_attribut, SEUIL_SIMILARITE, REGEX_MOT
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+# Fichiers propres des sources (données réelles) : nom de la source si le fichier n'a pas de colonne Source
+FICHIERS_SOURCES = {
+    "offres_francetravail_clean.csv": "France Travail",
+    "offres_wttj_clean.csv": "Welcome to the Jungle",
+    "offres_apec_clean.csv": "Apec",
+}
+TAILLES = [2000, 10000, 50000]
+PART_DOUBLONS = 0.2      # Part des offres republiées sur une autre source
+PART_NOUVELLES = 0.02    # Offres nouvelles au run suivant (mode incrémental)
+MOTS_PAR_OFFRE = 200
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def republier(texte, rng, part_modifiee=0.02):
+    """Même offre sur une autre source : quelques mots remplacés, une mention ajoutée en fin de texte."""
+    mots = texte.split()
+    for i in rng.choice(len(mots), size=max(1, int(len(mots) * part_modifiee)), replace=False):
+        mots[i] = "modifie"
+    return " ".join(mots) + " postulez sur notre site"
+
+
+def generer(vocabulaire, nb, rng):
+    """nb offres : des originaux (mots tirés au hasard) et PART_DOUBLONS de republications. Renvoie (df, original de chaque offre)."""
+    nb_originaux = int(nb * (1 - PART_DOUBLONS))
+    textes = [" ".join(rng.choice(vocabulaire, size=MOTS_PAR_OFFRE)) for _ in range(nb_originaux)]
+    originaux = list(range(nb_originaux))
+    for source in rng.integers(0, nb_originaux, size=nb - nb_originaux):
+        textes.append(republier(textes[source], rng))
+        originaux.append(source)
+    df = pd.DataFrame({
+        "Titre": "Data Analyst (H/F)", "Entreprise": "Entreprise", "Description": textes,
+        "URL": [f"https://exemple.fr/offre/{i}" for i in range(nb)],
+    })
+    return df, np.array(originaux)
+
+
+def toutes_les_paires(signatures, taille_bloc=2000):
+    """Référence sans LSH : chaque offre comparée à toutes les autres (n² / 2 comparaisons de signatures)."""
+    paires = []
+    for debut in range(0, len(signatures), taille_bloc):
+        bloc = signatures[debut:debut + taille_bloc]
+        egales = (bloc[:, None, :] == signatures[None, :, :]).mean(axis=2)
+        i, j = np.nonzero(egales >= SEUIL_SIMILARITE)
+        garder = debut + i < j
+        paires.append(np.column_stack([debut + i[garder], j[garder]]))
+    return np.concatenate(paires)
+
+
+def charger_sources():
+    """Offres réelles des fichiers propres présents, une ligne par URL (la dernière, comme la fusion)."""
+    dataframes = []
+    for nom, source in FICHIERS_SOURCES.items():
+        chemin = os.path.join(project_root, "data", "clean", nom)
+        if donnees_existent(chemin):
+            df = charger_donnees(chemin).rename(columns={"Ville_Clean": "Ville", "Description_Propre": "Description"})
+            if "Source" not in df.columns:
+                df["Source"] = source
+            dataframes.append(df[["Titre", "Entreprise", "Ville", "Source", "Description", "URL"]])
+    if not dataframes:
+        return None
+    return pd.concat(dataframes, ignore_index=True).drop_duplicates(subset=["URL"], keep="last").reset_index(drop=True)
+
+
+def verifier_donnees_reelles(df):
+    """Groupes trouvés sur les vraies offres : aucun ne doit réunir deux villes (même annonce publiée dans plusieurs villes)."""
+    groupes = regrouper(df)
+    multiples = pd.Series(groupes).groupby(groupes).transform("size").to_numpy() > 1
+    par_groupe = df[multiples].assign(Ville=normaliser_attribut(df.loc[multiples, "Ville"])).groupby(groupes[multiples])
+    villes, sources = par_groupe["Ville"].nunique(), par_groupe["Source"].nunique()
+    print(f"📂 Données réelles : {len(df)} offres, {len(villes)} groupes de quasi-doublons "
+          f"({multiples.sum() - len(villes)} offres fusionnées), dont {(sources > 1).sum()} entre plusieurs sources.")
+    if (villes > 1).any():
+        print(f"❌ {(villes > 1).sum()} groupe(s) réunissent plusieurs villes :")
+        print(df[multiples & np.isin(groupes, villes.index[villes > 1])][["Entreprise", "Ville", "Source"]].head(20))
+        sys.exit(1)
+    print("✅ Aucun groupe ne réunit deux villes.\n")
+
+
+def chronometre(fonction):
+    start = time.time()
+    resultat = fonction()
+    return resultat, time.time() - start
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+    base = charger_donnees(FICHIER_GLOBAL, colonnes=["Titre", "Entreprise", "Description", "URL"])
+    vocabulaire = np.array(sorted(set(REGEX_MOT.findall(" ".join(textes_offres(base))))))
+    rng = np.random.default_rng(0)
+    chemin = os.path.join(current_dir, "_bench_signatures.npz")
+
+    reelles = charger_sources()
+    if reelles is not None:
+        verifier_donnees_reelles(reelles)
+
+    # Qualité : les groupes LSH comparés à la vérité terrain (republications connues)
+    df, originaux = generer(vocabulaire, TAILLES[0], rng)
+    groupes = regrouper(df)
+    attendus = pd.Series(originaux).groupby(originaux).transform("size").to_numpy() > 1
+    retrouves = pd.Series(groupes).groupby(groupes).transform("size").to_numpy() > 1
+    purete = pd.Series(originaux).groupby(groupes).nunique().max()
+    print(f"✅ Rappel : {(retrouves & attendus).sum() / attendus.sum():.1%} des offres republiées regroupées, "
+          f"{purete} original(aux) au plus par groupe.")
+
+    # Paires au-dessus du seuil trouvées en comparant tout à tout : combien le LSH en regroupe
+    # (il est probabiliste : une paire juste au-dessus du seuil peut ne partager aucune bande)
+    signatures = signatures_minhash(textes_offres(df).tolist())
+    reference = toutes_les_paires(signatures)
+    couvertes = (groupes[reference[:, 0]] == groupes[reference[:, 1]]).mean()
+    print(f"✅ {couvertes:.1%} des {len(reference)} paires de la comparaison tout à tout sont dans le même groupe.\n")
+
+    print(" Offres  | Signatures + LSH | Run suivant (+2 %) | Toutes les paires (comparaisons seules)")
+    for taille in TAILLES:
+        df, _ = generer(vocabulaire, taille, rng)
+        if os.path.exists(chemin):
+            os.remove(chemin)
+        _, t_complet = chronometre(lambda: regrouper(df, chemin))
+
+        # Run suivant : quelques offres nouvelles, les signatures des autres sont reprises
+        nouvelles, _ = generer(vocabulaire, int(taille * PART_NOUVELLES), rng)
+        nouvelles["URL"] = nouvelles["URL"] + "-nouvelle"
+        suivant = pd.concat([df, nouvelles], ignore_index=True)
+        _, t_incremental = chronometre(lambda: regrouper(suivant, chemin))
+        os.remove(chemin)
+
+        signatures = signatures_minhash(textes_offres(df).tolist())
+        _, t_bloc = chronometre(lambda: toutes_les_paires(signatures[:2000], taille_bloc=500))
+        t_paires = t_bloc * (taille / 2000) ** 2   # Extrapolé : le coût croît en n²
+        print(f" {taille:>7} | {t_complet:14.2f} s | {t_incremental:16.2f} s | {t_paires:12.1f} s")
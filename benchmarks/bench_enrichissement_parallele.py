@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# Enrichissement (années d'exp, contrats, niveau, stack, RQTH) sur un seul cœur puis par partitions
+# sur 2, 4, ... process (parallele.py) : durée, accélération, et résultat identique à l'appel direct.
+# Sur une machine avec moins de cœurs que de process, l'accélération mesurée est < 1 (le résultat reste vérifié).
+# Usage : python benchmarks/bench_enrichissement_parallele.py [nb_offres]
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from enrichissement import enrichir_offres, COLONNES_A_ENRICHIR
+from parallele import executer_par_partitions, nb_workers_disponibles, SEUIL_PARALLELE
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+NB_OFFRES = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+TAILLES_SEUIL = [500, 1000, 2000, 5000]   # Petits lots : à partir de quand le pool est-il rentable ?
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def chronometre(fonction):
+    start = time.time()
+    resultat = fonction()
+    return resultat, time.time() - start
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+    base = charger_donnees(FICHIER_GLOBAL, colonnes=COLONNES_A_ENRICHIR)
+    df = pd.concat([base] * (NB_OFFRES // len(base) + 1), ignore_index=True).iloc[:NB_OFFRES]
+    coeurs = nb_workers_disponibles()
+    print(f"\n📦 {len(df)} offres, {coeurs} cœur(s) disponible(s)\n")
+
+    reference, t_serie = chronometre(lambda: enrichir_offres(df))
+    print(" Process | Durée     | Accélération | Identique")
+    print(f" {1:>7} | {t_serie:7.2f} s | {1:11.2f}x | -")
+    identiques = True
+    for nb in sorted({2, 4, coeurs} - {1}):
+        resultat, duree = chronometre(lambda: executer_par_partitions(enrichir_offres, df, nb_workers=nb, seuil=0))
+        identique = resultat.equals(reference)
+        identiques &= identique
+        print(f" {nb:>7} | {duree:7.2f} s | {t_serie / duree:11.2f}x | {'oui' if identique else 'NON'}")
+
+    # Seuil : coût fixe du pool (fork + résultats) face au gain sur de petits lots
+    nb = max(coeurs, 2)
+    print(f"\n Lot     | 1 process | {nb} process   (SEUIL_PARALLELE = {SEUIL_PARALLELE})")
+    for taille in TAILLES_SEUIL:
+        lot = df.iloc[:taille]
+        _, t_un = chronometre(lambda: enrichir_offres(lot))
+        _, t_pool = chronometre(lambda: executer_par_partitions(enrichir_offres, lot, nb_workers=nb, seuil=0))
+        print(f" {taille:>7} | {t_un:7.2f} s | {t_pool:7.2f} s")
+
+    if not identiques:
+        print("\n❌ Résultat différent de l'enrichissement sur un seul cœur.")
+        sys.exit(1)
+    print("\n✅ Même résultat sur un ou plusieurs process.")
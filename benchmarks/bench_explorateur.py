@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from explorateur import Explorateur
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEURS = [1, 20, 100]
+COLONNES = ["Titre", "Entreprise", "Ville", "Type_Contrat", "Teletravail", "Date_Publication", "URL"]
+COLONNES_TRI = ["Date_Publication", "Titre", "Entreprise", "Ville", "Type_Contrat"]
+RECHERCHE = "data"
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def taille_arrow(df):
+    """Octets envoyés au navigateur : st.dataframe sérialise le tableau en Arrow."""
+    return pa.Table.from_pandas(df, preserve_index=False).nbytes
+
+
+def explorateur_complet(df, positions):
+    """Ancien explorateur de app.py : toutes les offres actives partent au navigateur."""
+    return df.iloc[positions][COLONNES]
+
+
+def explorateur_pagine(explorateur, df, positions):
+    """Recherche + tri côté serveur, puis une page (+ fenêtre d'avance)."""
+    positions = explorateur.trier(explorateur.rechercher(positions, RECHERCHE), "Date_Publication", croissant=False)
+    return Explorateur.page(df, positions, 0, colonnes=COLONNES)
+
+
+def chronometre(fonction, repetitions=5):
+    start = time.time()
+    for _ in range(repetitions):
+        resultat = fonction()
+    return resultat, (time.time() - start) / repetitions
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    base = charger_donnees(FICHIER_GLOBAL, colonnes=COLONNES + ["Date_Expiration"],
+                           dtype={c: "category" for c in ["Ville", "Type_Contrat", "Teletravail", "Entreprise"]})
+    base["Date_Publication"] = pd.to_datetime(base["Date_Publication"], errors="coerce")
+
+    print(" Actives | Index   | Complet : octets / temps  | Paginé : octets / temps")
+    for facteur in FACTEURS:
+        df = pd.concat([base] * facteur, ignore_index=True)
+        positions = np.flatnonzero(pd.to_datetime(df["Date_Expiration"], errors="coerce").isna().to_numpy())
+        explorateur, t_index = chronometre(lambda: Explorateur(df, COLONNES_TRI), repetitions=1)
+
+        complet, t_complet = chronometre(lambda: taille_arrow(explorateur_complet(df, positions)))
+        page, t_page = chronometre(lambda: explorateur_pagine(explorateur, df, positions))
+        octets_page = taille_arrow(page)
+
+        # Parité : même première page que recherche + tri pandas sur les offres actives
+        actives = df.iloc[positions]
+        textes = (actives["Titre"].astype(str).where(actives["Titre"].notna(), "") + " "
+                  + actives["Entreprise"].astype(str).where(actives["Entreprise"].notna(), "")).str.lower()
+        attendu = actives[textes.str.contains(RECHERCHE, regex=False).to_numpy()]
+        attendu = attendu.sort_values("Date_Publication", ascending=False, kind="stable", na_position="last")
+        if not attendu.index[:len(page)].equals(page.index):
+            print(f"❌ Écart sur la première page (x{facteur})")
+            sys.exit(1)
+
+        print(f" {len(positions):>7} | {t_index * 1000:5.0f} ms | {complet / 1e6:8.2f} Mo / {t_complet * 1000:6.1f} ms "
+              f"| {octets_page / 1e3:6.1f} Ko / {t_page * 1000:6.1f} ms")
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import random
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from filtres import MoteurFiltres
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEURS = [1, 20, 100]
+NB_SELECTIONS = 200
+DIMENSIONS = ["Source", "Type_Contrat", "Ville", "Niveau"]
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def selections_aleatoires(df, n, seed=42):
+    """Sélections de la sidebar : rien de coché (= tout), ou quelques valeurs par filtre."""
+    rng = random.Random(seed)
+    listes = {d: df[d].dropna().unique().tolist() for d in DIMENSIONS}
+    top_villes = df["Ville"].value_counts().head(20).index.tolist()
+    selections = []
+    for _ in range(n):
+        selection = {}
+        for d in DIMENSIONS:
+            population = top_villes if d == "Ville" else listes[d]
+            choix = rng.sample(population, rng.randint(1, min(3, len(population)))) if rng.random() < 0.4 else []
+            selection[d] = choix or listes[d]
+        selection["Handicap_Friendly"] = [True] if rng.random() < 0.2 else None
+        selection["Actif"] = [True]
+        selections.append(selection)
+    return selections
+
+
+def filtre_isin(colonnes, selection):
+    """Ancien filtre de app.py : masques isin() enchaînés."""
+    masque = np.ones(len(colonnes), dtype=bool)
+    for dimension, valeurs in selection.items():
+        if valeurs is not None:
+            masque &= colonnes[dimension].isin(valeurs).to_numpy()
+    return np.flatnonzero(masque)
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    base = charger_donnees(FICHIER_GLOBAL, colonnes=DIMENSIONS + ["Handicap_Friendly", "Date_Expiration"],
+                           dtype={d: "category" for d in DIMENSIONS})
+    print(" Offres  | Index   | isin() / sélection | Bitmaps (1er calcul) | Rerun mémorisé")
+    for facteur in FACTEURS:
+        df = pd.concat([base] * facteur, ignore_index=True)
+        colonnes = df[DIMENSIONS].assign(
+            Handicap_Friendly=df["Handicap_Friendly"].eq(True),
+            Actif=df["Date_Expiration"].isna()
+        )
+        selections = selections_aleatoires(df, NB_SELECTIONS)
+
+        start = time.perf_counter()
+        moteur = MoteurFiltres(colonnes, taille_cache=NB_SELECTIONS)
+        t_index = time.perf_counter() - start
+
+        start = time.perf_counter()
+        references = [filtre_isin(colonnes, s) for s in selections]
+        t_isin = (time.perf_counter() - start) / NB_SELECTIONS
+
+        start = time.perf_counter()
+        resultats = [moteur.selectionner(**s) for s in selections]
+        t_bitmaps = (time.perf_counter() - start) / NB_SELECTIONS
+
+        start = time.perf_counter()
+        for s in selections:
+            moteur.selectionner(**s)
+        t_cache = (time.perf_counter() - start) / NB_SELECTIONS
+
+        if any(not np.array_equal(a, b) for a, b in zip(references, resultats)):
+            print(f"❌ Les bitmaps ne donnent pas les mêmes offres que isin() (x{facteur})")
+            sys.exit(1)
+        print(f" {len(df):>7} | {t_index * 1000:5.0f} ms | {t_isin * 1000:15.2f} ms | {t_bitmaps * 1000:17.2f} ms | {t_cache * 1000:11.3f} ms")
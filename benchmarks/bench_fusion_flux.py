@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Mémoire maximale (RSS) de la fusion en mémoire et de la fusion par morceaux (--flux) sur un historique grossi,
+# et vérification que les deux fusions incrémentales écrivent le même fichier global que --complet, après une
+# modification côté source (Ville et Entreprise de quelques offres WTTJ déjà dans l'historique).
+# Chaque fusion tourne dans une copie du projet (data/ compris), dans un process séparé.
+# Usage : python benchmarks/bench_fusion_flux.py [facteur] [budget_mo]
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from utils import charger_donnees, sauvegarde_securisee, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEUR = int(sys.argv[1]) if len(sys.argv) > 1 else 50      # Historique = FACTEUR copies du fichier global
+BUDGET_MO = sys.argv[2] if len(sys.argv) > 2 else "64"
+NB_MODIFIEES = 24           # Offres WTTJ modifiées par colonne
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def grossir(df, facteur, rng):
+    """Historique de `facteur` copies : URL uniques et mots de la description mélangés (pas des quasi-doublons)."""
+    copies = [df]
+    for k in range(1, facteur):
+        copie = df.copy()
+        copie["URL"] = copie["URL"].astype(str) + f"?copie={k}"
+        copie["Description"] = [" ".join(rng.permutation(str(texte).split())) for texte in copie["Description"]]
+        copies.append(copie)
+    return pd.concat(copies, ignore_index=True)
+
+
+# Sous Linux, le RSS max d'un process hérite de celui de son parent (fork + exec) : la fusion est lancée
+# par ce petit process intermédiaire, pas directement par le benchmark qui a l'historique en mémoire.
+LANCEUR = """
+import resource, subprocess, sys
+code = subprocess.run(sys.argv[1:], stdout=subprocess.DEVNULL).returncode
+print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+sys.exit(code)
+"""
+
+
+def lancer(dossier, *options):
+    """Lance fusion_csv.py dans `dossier` ; renvoie (durée, RSS max en Mo) du process."""
+    env = dict(os.environ, FUSION_BUDGET_MO=BUDGET_MO)
+    start = time.time()
+    resultat = subprocess.run(
+        [sys.executable, "-c", LANCEUR, sys.executable, "fusion_csv.py", *options],
+        cwd=dossier, env=env, capture_output=True, text=True,
+    )
+    duree = time.time() - start
+    if resultat.returncode != 0:
+        print(resultat.stderr)
+        sys.exit(1)
+    return duree, int(resultat.stdout.split()[-1]) / 1024   # ru_maxrss en Ko sous Linux
+
+
+def modifier_source(chemin):
+    """Nouvelle Ville / Entreprise pour quelques offres (toutes leurs lignes : la fusion garde la dernière)."""
+    df = pd.read_csv(chemin, dtype=str)
+    urls = df["URL"].drop_duplicates()
+    df.loc[df["URL"].isin(urls.iloc[:NB_MODIFIEES]), "Ville"] = "Lyon"
+    df.loc[df["URL"].isin(urls.iloc[NB_MODIFIEES:2 * NB_MODIFIEES]), "Entreprise"] = "Entreprise renommée"
+    df.to_csv(chemin, index=False, encoding="utf-8-sig")
+
+
+def copie_projet(dossier, historique, modifier=True):
+    for fichier in os.listdir(project_root):
+        if fichier.endswith(".py"):
+            shutil.copy(os.path.join(project_root, fichier), dossier)
+    shutil.copytree(os.path.join(project_root, "data"), os.path.join(dossier, "data"), dirs_exist_ok=True)
+    shutil.copy(historique, os.path.join(dossier, "data", "clean", os.path.basename(historique)))
+    if modifier:
+        modifier_source(os.path.join(dossier, "data", "clean", "offres_wttj_clean.csv"))
+
+
+def identiques(reference, df):
+    df = df[reference.columns]
+    return len(reference) == len(df) and all(
+        np.allclose(reference[c], df[c], equal_nan=True) if reference[c].dtype.kind in "fi" and df[c].dtype.kind in "fi"
+        else reference[c].astype(str).equals(df[c].astype(str))
+        for c in reference.columns
+    )
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        historique = grossir(charger_donnees(FICHIER_GLOBAL), FACTEUR, np.random.default_rng(0))
+        chemin_historique = os.path.join(dossier, os.path.basename(FICHIER_GLOBAL))
+        sauvegarde_securisee(historique, chemin_historique)
+        # Copies aux descriptions mélangées : colonnes calculées recalculées une fois (sources non modifiées),
+        # pour que l'historique soit celui qu'aurait écrit une fusion
+        dossier_run = os.path.join(dossier, "historique")
+        os.makedirs(dossier_run)
+        copie_projet(dossier_run, chemin_historique, modifier=False)
+        lancer(dossier_run, "--complet")
+        shutil.copy(os.path.join(dossier_run, "data", "clean", os.path.basename(FICHIER_GLOBAL)), chemin_historique)
+        taille_mo = os.path.getsize(chemin_historique) / 1e6
+        print(f"\n📦 Historique : {len(historique)} offres ({taille_mo:.0f} Mo), budget --flux : {BUDGET_MO} Mo\n")
+
+        resultats = {}
+        for nom, options in [("Complet (--complet)", ["--complet"]), ("En mémoire", []), ("Par morceaux (--flux)", ["--flux"])]:
+            dossier_run = os.path.join(dossier, options[0].strip("-") if options else "memoire")
+            os.makedirs(dossier_run)
+            copie_projet(dossier_run, chemin_historique)
+            duree, rss = lancer(dossier_run, *options)
+            resultats[nom] = pd.read_csv(os.path.join(dossier_run, "data", "clean", os.path.basename(FICHIER_GLOBAL)))
+            print(f" {nom:<22} | {duree:6.1f} s | RSS max {rss:7.0f} Mo")
+
+    complet, memoire, flux = resultats.values()
+    differentes = [nom for nom, df in [("En mémoire", memoire), ("Par morceaux (--flux)", flux)] if not identiques(complet, df)]
+    if differentes:
+        print(f"\n❌ Fichier global différent de --complet : {', '.join(differentes)}.")
+        sys.exit(1)
+    print(f"\n✅ Même fichier global ({len(complet)} offres) que --complet avec les deux fusions incrémentales.")
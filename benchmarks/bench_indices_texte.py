@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# Indices textuels (années d'expérience, mentions de contrat dans le titre / la description, RQTH) :
+# un passage par détecteur (extraire_annees_exp, str.contains de nettoyer_contrats, detecter_rqth)
+# contre un seul passage par Description et par Titre (enrichissement.extraire_indices). Mêmes valeurs attendues.
+# Usage : python benchmarks/bench_indices_texte.py [facteur]
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from enrichissement import extraire_indices
+from references_enrichissement import extraire_annees_exp, detecter_rqth
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEUR = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def contient(serie, regex):
+    return serie.astype(str).str.contains(regex, case=False, regex=True, na=False).to_numpy()
+
+
+def par_detecteur(df):
+    """Anciens masques de nettoyer_contrats + extraire_annees_exp + detecter_rqth : une passe chacun (9 par offre)."""
+    return pd.DataFrame({
+        "Annees_Exp": df["Description"].apply(extraire_annees_exp).astype(float).to_numpy(),
+        "has_cdi_mention": contient(df["Description"], r"\b(?:CDI|durée indéterminée)\b"),
+        "is_student_title": contient(df["Titre"], r"\b(?:stage|stagiaire|internship|alternance|alternant|apprentissage|contrat pro|pfe)\b"),
+        "is_senior_title": contient(df["Titre"], r"\b(?:senior|lead|manager|directeur|head of|chef de projet|international|freelance|expert|responsable)\b"),
+        "is_freelance_title": contient(df["Titre"], r"\b(?:freelance|indépendant|independant|free-lance|b2b)\b"),
+        "has_cdi_title": contient(df["Titre"], r"\bCDI\b"),
+        "has_cdd_title": contient(df["Titre"], r"\bCDD\b"),
+        "Handicap_Friendly": df["Description"].apply(detecter_rqth).astype(bool).to_numpy(),
+    }, index=df.index)
+
+
+def chronometre(fonction):
+    start = time.time()
+    resultat = fonction()
+    return resultat, time.time() - start
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+    df = charger_donnees(FICHIER_GLOBAL, colonnes=["Titre", "Description"])
+    df = pd.concat([df] * FACTEUR, ignore_index=True)
+
+    ancien, t_ancien = chronometre(lambda: par_detecteur(df))
+    nouveau, t_nouveau = chronometre(lambda: extraire_indices(df))
+    print(f"\n📦 {len(df)} offres")
+    print(f" Un passage par détecteur : {t_ancien:6.2f} s")
+    print(f" Un passage par texte     : {t_nouveau:6.2f} s  ({t_ancien / t_nouveau:.1f}x)")
+
+    differences = {c: int((ancien[c].ne(nouveau[c]) & ~(ancien[c].isna() & nouveau[c].isna())).sum()) for c in ancien.columns}
+    if any(differences.values()):
+        print(f"\n❌ Valeurs différentes : {differences}")
+        sys.exit(1)
+    print(f"\n✅ Mêmes valeurs pour les {len(ancien.columns)} indices.")
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import tempfile
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from instantanes import GestionnaireInstantanes
+from utils import charger_donnees, donnees_existent, sauvegarde_securisee, empreinte_fichier, ecrire_json, lire_json
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEUR = int(sys.argv[1]) if len(sys.argv) > 1 else 20  # Pour simuler un historique plus gros
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def publier(df, dossier):
+    """Ce que fait fusion_csv.py en fin de run : fichier global puis manifeste."""
+    chemin = os.path.join(dossier, "global_job_market.csv")
+    sauvegarde_securisee(df, chemin)
+    empreinte = empreinte_fichier(chemin)
+    ecrire_json({"version": empreinte["hash"], "global": empreinte}, os.path.join(dossier, "global_manifest.json"))
+    return empreinte["hash"]
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    base = pd.concat([charger_donnees(FICHIER_GLOBAL)] * FACTEUR, ignore_index=True)
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "global_job_market.csv")
+        lire_version = lambda: (lire_json(os.path.join(dossier, "global_manifest.json")) or {}).get("version")
+        gestionnaire = GestionnaireInstantanes(lire_version, lambda v: charger_donnees(chemin), intervalle_verif=0)
+
+        v1 = publier(base, dossier)
+        start = time.time()
+        version, df = gestionnaire.obtenir()
+        t_froid = time.time() - start
+        print(f"\n🧊 Démarrage à froid ({len(df)} offres) : {t_froid * 1000:.0f} ms")
+
+        # Nouvelle version publiée (une offre expire) : les "reruns" continuent d'être servis pendant le rechargement
+        base.loc[0, "Date_Expiration"] = "2026-03-01"
+        v2 = publier(base, dossier)
+        latences, versions_servies = [], set()
+        start = time.time()
+        while gestionnaire.version != v2 and time.time() - start < 60:
+            debut = time.perf_counter()
+            version, df = gestionnaire.obtenir()
+            latences.append(time.perf_counter() - debut)
+            versions_servies.add(version)
+            time.sleep(0.005)
+        t_bascule = time.time() - start
+
+        if gestionnaire.version != v2:
+            print("❌ La nouvelle version n'a jamais été chargée.")
+            sys.exit(1)
+        print(f"🔄 Bascule v1 -> v2 en {t_bascule * 1000:.0f} ms, pendant lesquels {len(latences)} reruns ont été servis")
+        print(f"⚡ Latence de obtenir() pendant le rechargement : max {max(latences) * 1000:.2f} ms "
+              f"(versions servies : {sorted(v[:8] for v in versions_servies)})")
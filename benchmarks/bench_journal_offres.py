@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Journal des offres (journal_offres.py) sur une collecte simulée : chaque jour, un crawler revoit les offres en ligne
+# et un updater note les expirations ; un instantané tous les INTERVALLE_INSTANTANE jours (instantane_periodique).
+# - taille du journal (octets par événement)
+# - état du marché à une date passée : rejeu depuis l'instantané le plus proche / depuis le début du journal
+# - l'état rejoué à la dernière date est bien l'état courant de la table offres
+# Usage : python benchmarks/bench_journal_offres.py [nb_offres] [nb_semaines]
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+import journal_offres
+from journal_offres import JournalOffres
+
+NB_OFFRES = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+NB_SEMAINES = int(sys.argv[2]) if len(sys.argv) > 2 else 26
+DUREE_MOYENNE = 30          # Jours en ligne d'une offre (loi exponentielle)
+NB_DATES = 10               # Dates rejouées
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def chronometre(fonction):
+    start = time.time()
+    resultat = fonction()
+    return resultat, time.time() - start
+
+
+def simuler(journal, debut, rng):
+    """Publications réparties sur la période, passages quotidiens du crawler et de l'updater."""
+    urls = np.array([f"https://exemple.fr/offre/{i}" for i in range(NB_OFFRES)])
+    publication = debut + rng.integers(0, NB_SEMAINES * 7, NB_OFFRES)
+    fin = publication + rng.exponential(DUREE_MOYENNE, NB_OFFRES).astype(int) + 1
+    for jour in range(debut, debut + NB_SEMAINES * 7):
+        journal_offres.aujourdhui = lambda: jour      # Horloge simulée (date des instantanés)
+        journal.enregistrer_vues(urls[(publication <= jour) & (fin > jour)].tolist(), source="Simulation", jour=jour)
+        journal.enregistrer_expirations(urls[fin == jour].tolist(), jour=jour)
+        journal.instantane_periodique()
+    return jour
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    debut = int(np.datetime64("2025-09-01", "D").astype(np.int64))
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "journal.sqlite")
+        journal = JournalOffres(chemin)
+        dernier_jour, duree = chronometre(lambda: simuler(journal, debut, rng))
+        nb_evenements = journal.version()
+        journal.connexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        taille = os.path.getsize(chemin)
+        nb_instantanes = journal.connexion.execute("SELECT COUNT(*) FROM instantanes").fetchone()[0]
+        print(f"\n📦 {NB_OFFRES} offres, {NB_SEMAINES} semaines : {nb_evenements} événements, {nb_instantanes} instantanés")
+        print(f"   Journal : {taille / 1e6:.1f} Mo ({taille / nb_evenements:.0f} octets par événement, instantanés compris), écrit en {duree:.1f} s")
+
+        # Même journal sans instantanés : tout est rejoué depuis le premier événement
+        shutil.copy(chemin, os.path.join(dossier, "sans_instantanes.sqlite"))
+        sans = JournalOffres(os.path.join(dossier, "sans_instantanes.sqlite"))
+        sans.connexion.execute("DELETE FROM etats")
+        sans.connexion.execute("DELETE FROM instantanes")
+
+        dates = [str(np.datetime64(int(j), "D")) for j in np.linspace(debut + 14, dernier_jour, NB_DATES).astype(int)]
+        etats, t_instantane = chronometre(lambda: [journal.etat_au(d) for d in dates])
+        etats_complets, t_complet = chronometre(lambda: [sans.etat_au(d) for d in dates])
+        print(f"\n État du marché à une date (moyenne sur {NB_DATES} dates) :")
+        print(f"   Rejeu depuis le début du journal     : {t_complet / NB_DATES * 1000:7.1f} ms")
+        print(f"   Rejeu depuis l'instantané le + proche : {t_instantane / NB_DATES * 1000:7.1f} ms  ({t_complet / t_instantane:.1f}x)")
+        flux, t_flux = chronometre(lambda: journal.flux())
+        print(f"   Stock vs Flux ({len(flux)} semaines)           : {t_flux * 1000:7.1f} ms")
+
+        courant = pd.read_sql_query("SELECT url AS URL, expiration, derniere_vue FROM offres WHERE premiere_vue IS NOT NULL", journal.connexion)
+        nb_actives = int((courant["expiration"].isna() | (courant["derniere_vue"] > courant["expiration"])).sum())
+        journal.fermer()
+        sans.fermer()
+
+    cle = ["URL", "Premiere_Vue", "Derniere_Vue", "Expiration", "Active"]
+    identiques = all(
+        a[cle].sort_values("URL").reset_index(drop=True).equals(b[cle].sort_values("URL").reset_index(drop=True))
+        for a, b in zip(etats, etats_complets)
+    )
+    if not identiques or etats[-1]["Active"].sum() != nb_actives or len(etats[-1]) != len(courant):
+        print("\n❌ Le rejeu ne redonne pas le même état.")
+        sys.exit(1)
+    print(f"\n✅ Même état avec ou sans instantané, et état courant retrouvé ({nb_actives} offres actives).")
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from enrichissement import nettoyer_contrats, determiner_niveau_colonne
+from references_enrichissement import extraire_annees_exp, determiner_niveau
+
+DOSSIER_CLEAN = os.path.join(project_root, "data", "clean")
+FICHIERS_SOURCES = ["offres_francetravail_clean.csv", "offres_wttj_clean.csv", "offres_apec_clean.csv"]
+FACTEURS = [1, 10, 100]
+
+def charger_sources():
+    """Charge les fichiers propres disponibles et les prépare comme dans fusion_csv.py."""
+    dataframes = []
+    for nom in FICHIERS_SOURCES:
+        chemin = os.path.join(DOSSIER_CLEAN, nom)
+        if not os.path.exists(chemin):
+            continue
+        df = pd.read_csv(chemin).rename(columns={
+            "Ville_Clean": "Ville",
+            "Salaire_Annuel_Estime": "Salaire_Annuel",
+            "Description_Propre": "Description"
+        })
+        dataframes.append(df[["Titre", "Ville", "Salaire_Annuel", "Type_Contrat", "Description"]])
+
+    df = pd.concat(dataframes, ignore_index=True)
+    df['Annees_Exp'] = df['Description'].apply(extraire_annees_exp)
+    return nettoyer_contrats(df)
+
+
+if __name__ == "__main__":
+    df_base = charger_sources()
+    print(f"📂 {len(df_base)} offres chargées depuis {DOSSIER_CLEAN}")
+
+    for facteur in FACTEURS:
+        df = pd.concat([df_base] * facteur, ignore_index=True)
+
+        start = time.time()
+        ancien = df.apply(determiner_niveau, axis=1)
+        duree_ancien = time.time() - start
+
+        start = time.time()
+        nouveau = determiner_niveau_colonne(df)
+        duree_nouveau = time.time() - start
+
+        differences = (ancien != nouveau).sum()
+        if differences:
+            print(f"❌ x{facteur} : {differences} niveaux différents !")
+            print(pd.DataFrame({"ancien": ancien, "nouveau": nouveau})[ancien != nouveau].head())
+            sys.exit(1)
+
+        print(f"✅ x{facteur:<3} ({len(df):>7} lignes) | apply(axis=1) : {duree_ancien:6.2f} s | "
+              f"np.select : {duree_nouveau:6.3f} s | gain x{duree_ancien / duree_nouveau:.0f}")
+
+    print("\nRépartition (x1) :")
+    print(determiner_niveau_colonne(df_base).value_counts())
@@ -0,0 +1,199 @@
+import os
+import re
+import sys
+import time
+import random
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from salaires import salaires_francetravail, salaires_wttj, salaires_apec
+
+NB_LIGNES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+# Libellés typiques de chaque source (dont les cas piégeux : virgules, unités, bruit, hors bornes...)
+LIBELLES_FT = [
+    "Annuel de 35000.0 Euros à 45000.0 Euros sur 12.0 mois", "Annuel de 42000 Euros sur 13 mois",
+    "Mensuel de 1801.80 Euros sur 12 mois", "Mensuel de 2500.0 Euros à 3000.0 Euros sur 12.0 mois",
+    "Horaire de 11.88 Euros sur 12 mois", "Horaire de 12,50 Euros", "Horaire de 15.0 Euros à 18.0 Euros",
+    "Autre de 400 Euros par jour", "TJM 550", "Mensuel de 850 Euros", "Annuel de 250000 Euros",
+    "Annuel de 12000 Euros", "Non affiché", "Confidentiel", "Selon profil", "45000", "3200",
+    "Salaire : 2 800 € brut", "Cachet de 150 Euros", "Autre de 2030 Euros", None,
+]
+INFOS_WTTJ = [
+    "CDI | Paris | Salaire : 45K à 55K € | Expérience : > 3 ans", "CDI | Lyon | Salaire : 40 k€",
+    "Stage | Paris | Salaire : 1,2K € par mois", "Freelance | Télétravail total | 500 € par jour",
+    "CDI | Bordeaux | 40-50k | Expérience : > 2 ans", "CDD | Nantes | Salaire : non spécifié",
+    "CDI | Paris | 2 jours de télétravail | 60K €", "Alternance | Lille", "CDI | 180K €", None,
+]
+# Gabarits à montants aléatoires : la plupart des libellés du corpus sont distincts (pire cas pour le cache par libellé)
+GABARITS = {
+    "France Travail": lambda r: r.choice([
+        f"Annuel de {r.randint(25, 90) * 1000}.0 Euros à {r.randint(30, 120) * 1000}.0 Euros sur 12.0 mois",
+        f"Mensuel de {r.randint(1700, 5000)},{r.randint(0, 99):02d} Euros sur 12 mois",
+        f"Horaire de {r.randint(11, 30)}.{r.randint(0, 99):02d} Euros",
+    ]),
+    "WTTJ": lambda r: f"CDI | Ville {r.randint(1, 500)} | Salaire : {r.randint(30, 70)}K à {r.randint(70, 120)}K € | Expérience : > {r.randint(1, 9)} ans",
+    "APEC": lambda r: f"{r.randint(30, 60)} - {r.randint(60, 99)} k€ brut annuel, {r.randint(1, 10 ** 6)}",
+}
+SALAIRES_APEC = [
+    "35 - 45 k€ brut annuel", "35 à 45 k€ brut annuel", "A partir de 40 k€ brut annuel", "40 k€ brut annuel",
+    "100 k€ brut annuel", "A négocier", "Non spécifié", "50-60k€", "12 k€", "55,5 k€ brut annuel", None,
+]
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Anciennes fonctions ligne à ligne des scripts de nettoyage (référence de parité)
+
+def ancien_salaire_francetravail(texte):
+    """
+    Nettoyage intelligent qui gère : Annuel, Mensuel, Taux Horaire, et TJM (Freelance).
+    Renvoie un Salaire ANNUEL estimé (int).
+    """
+    if pd.isna(texte) or "Non affiché" in str(texte) or "Confidentiel" in str(texte):
+        return None
+    
+    txt = str(texte).lower().replace(' ', '').replace(',', '.') # On standardise
+    
+    # 1. On cherche un nombre (y compris décimaux comme 11.65)
+    # On cherche d'abord les gros chiffres (> 1000)
+    match_gros = re.search(r'(\d{4,6})', txt)
+    # On cherche les petits chiffres (pour TJM ou Horaire)
+    match_petit = re.search(r'(\d{2,3}(?:\.\d+)?)', txt) 
+
+    valeur = 0
+    type_detecte = "Inconnu"
+
+    # --- SCÉNARIO 1 : C'est clairement Annuel ---
+    if "annuel" in txt or "an" in txt:
+        if match_gros:
+            valeur = float(match_gros.group(1))
+            type_detecte = "Annuel"
+
+    # --- SCÉNARIO 2 : C'est Mensuel ---
+    elif "mensuel" in txt or "mois" in txt:
+        if match_gros: # Ex: 2500
+            valeur = float(match_gros.group(1)) * 12
+            type_detecte = "Mensuel"
+        elif match_petit: # Cas rare
+            valeur = float(match_petit.group(1)) * 12
+            type_detecte = "Mensuel"
+
+    # --- SCÉNARIO 3 : C'est un Taux Horaire (SMIC, Intérim) ---
+    elif "horaire" in txt or "heure" in txt:
+        if match_petit:
+            # 11.65€/h * 151.67h * 12 mois
+            valeur = float(match_petit.group(1)) * 151.67 * 12
+            type_detecte = "Horaire"
+
+    # --- SCÉNARIO 4 : C'est un TJM (Freelance / Jour) ---
+    elif "jour" in txt or "tjm" in txt or "j/" in txt:
+        if match_petit: # Ex: 400
+            valeur = float(match_petit.group(1)) * 220 # ~220 jours ouvrés
+            type_detecte = "TJM"
+        elif match_gros and float(match_gros.group(1)) < 1000: # Ex: 500 écrit comme 500
+             valeur = float(match_gros.group(1)) * 220
+             type_detecte = "TJM"
+
+    # --- SCÉNARIO 5 : Pas de mot clé, on devine par la taille du chiffre ---
+    else:
+        if match_gros:
+            v = float(match_gros.group(1))
+            if v > 15000: # Probablement annuel
+                valeur = v
+                type_detecte = "Deviné Annuel"
+            elif 1200 < v < 8000: # Probablement mensuel
+                valeur = v * 12
+                type_detecte = "Deviné Mensuel"
+
+    # --- SÉCURITÉ / FILTRE ---
+    # On rejette si c'est absurde (< SMIC mi-temps ou > PDG du CAC40 pour un analyste)
+    # SMIC Annuel Brut ~21 203€. On accepte à partir de 15k (temps partiel/stage)
+    if valeur < 15000 or valeur > 200000:
+        return None
+    
+    # Sécurité anti-année : si le chiffre est entre 1980 et 2030 ET qu'on a "Deviné", on rejette
+    if 1980 <= valeur <= 2030 and "Deviné" in type_detecte:
+        return None
+
+    return int(valeur)
+
+
+def ancien_salaire_wttj(infos_str):
+    """ Extrait le salaire de la colonne fourre-tout de WTTJ """
+    if pd.isna(infos_str): return None
+    # Regex pour chercher "45k", "40-50k", "45 k€"
+    # On nettoie un peu la chaîne avant
+    txt = str(infos_str).lower().replace(',', '.')
+    
+    match_k = re.search(r'(\d{2,3})[ ]?k', txt)
+    if match_k:
+        val = float(match_k.group(1))
+        # Filtre anti-bruit (évite de prendre "2 jours" pour 2k salaire)
+        if 20 <= val <= 150:
+            return int(val * 1000)
+    return None
+
+
+def ancien_salaire_apec(texte):
+    if pd.isna(texte) or "Non spécifié" in str(texte):
+        return None
+    txt = str(texte).lower().replace(',', '.')
+    
+    # Cas 1 : Fourchette "35 - 45 k€"
+    match_range = re.search(r'(\d{2})[ ]?[-|à][ ]?(\d{2})[ ]?k', txt)
+    if match_range:
+        return int((float(match_range.group(1)) + float(match_range.group(2))) / 2 * 1000)
+
+    # Cas 2 : Valeur simple "40 k€"
+    match_simple = re.search(r'(\d{2})[ ]?k', txt)
+    if match_simple:
+        val = float(match_simple.group(1))
+        if 20 <= val <= 150: return int(val * 1000)
+    return None
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+SOURCES = {
+    "France Travail": (LIBELLES_FT, ancien_salaire_francetravail, salaires_francetravail),
+    "WTTJ": (INFOS_WTTJ, ancien_salaire_wttj, salaires_wttj),
+    "APEC": (SALAIRES_APEC, ancien_salaire_apec, salaires_apec),
+}
+
+
+def corpus(nom, libelles, n, seed=42):
+    """Moitié libellés piégeux répétés, moitié libellés générés (quasi tous distincts)."""
+    rng = random.Random(seed)
+    return pd.Series([rng.choice(libelles) if rng.random() < 0.5 else GABARITS[nom](rng) for _ in range(n)])
+
+
+if __name__ == "__main__":
+    print(f"{'Source':<15}| Lignes  | apply (ancien) | Vectorisé | Avec salaire | Fourchettes")
+    for nom, (libelles, ancien, nouveau) in SOURCES.items():
+        serie = corpus(nom, libelles, NB_LIGNES)
+
+        start = time.time()
+        attendu = serie.apply(ancien)
+        t_ancien = time.time() - start
+
+        start = time.time()
+        resultat = nouveau(serie)
+        t_nouveau = time.time() - start
+
+        # Parité : même estimation que l'ancienne fonction, et Min <= Estimation <= Max
+        attendu = pd.to_numeric(attendu, errors="coerce")
+        estime = resultat["Salaire_Annuel_Estime"]
+        if not np.array_equal(attendu.to_numpy(dtype=float), estime.to_numpy(), equal_nan=True):
+            ecarts = serie[~((attendu == estime) | (attendu.isna() & estime.isna()))].unique()
+            print(f"❌ {nom} : écart sur {list(ecarts)[:5]}")
+            sys.exit(1)
+        avec = estime.notna()
+        if not ((resultat.loc[avec, "Salaire_Annuel_Min"] <= estime[avec]) & (estime[avec] <= resultat.loc[avec, "Salaire_Annuel_Max"])).all():
+            print(f"❌ {nom} : fourchette incohérente")
+            sys.exit(1)
+
+        nb_fourchettes = (resultat["Salaire_Annuel_Min"] < resultat["Salaire_Annuel_Max"]).sum()
+        print(f"{nom:<15}| {len(serie):>7} | {t_ancien * 1000:11.0f} ms | {t_nouveau * 1000:6.0f} ms | {avec.sum():>12} | {nb_fourchettes:>11}")
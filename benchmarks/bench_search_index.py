@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from search_index import IndexInverse, COLONNES_INDEX, mots, LONGUEUR_PREFIXE
+from utils import charger_donnees, donnees_existent
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEURS = [1, 20, 100]
+REQUETES = ["python", "data engineer", "Ingénieur données", "power bi", "devops kubernetes", "alternance sql"]
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def recherche_naive(textes, requete):
+    """Ce qu'il faudrait sans index : un str.contains par mot sur tous les textes, à chaque frappe (sans même gérer les accents)."""
+    masque = np.ones(len(textes), dtype=bool)
+    for mot in mots(requete):
+        masque &= textes.str.contains(mot, regex=False).to_numpy()
+    return np.flatnonzero(masque)
+
+
+def recherche_attendue(mots_par_offre, requete):
+    """Même règle que l'index (mot exact, ou préfixe à partir de LONGUEUR_PREFIXE lettres), offre par offre."""
+    def correspond(mots_offre, mot):
+        return any(m.startswith(mot) for m in mots_offre) if len(mot) >= LONGUEUR_PREFIXE else mot in mots_offre
+    return np.flatnonzero([all(correspond(o, m) for m in mots(requete)) for o in mots_par_offre])
+
+
+def chronometre(fonction, repetitions=5):
+    start = time.time()
+    for _ in range(repetitions):
+        resultat = fonction()
+    return resultat, (time.time() - start) / repetitions
+
+
+if __name__ == "__main__":
+    if not donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    base = charger_donnees(FICHIER_GLOBAL, colonnes=COLONNES_INDEX)
+
+    # Parité avec une recherche offre par offre (sur le fichier réel)
+    index = IndexInverse.construire(base)
+    textes = base[COLONNES_INDEX].fillna("").astype(str).agg(" ".join, axis=1)
+    mots_par_offre = [set(mots(t)) for t in textes]
+    for requete in REQUETES:
+        if not np.array_equal(index.rechercher(requete), recherche_attendue(mots_par_offre, requete)):
+            print(f"❌ Écart sur la requête '{requete}'")
+            sys.exit(1)
+    print("✅ Résultats identiques à la recherche offre par offre.\n")
+
+    print(" Offres  | Construction | Taille .npz | Rechargement | str.contains / requête | Index / requête")
+    for facteur in FACTEURS:
+        df = pd.concat([base] * facteur, ignore_index=True)
+        index, t_construction = chronometre(lambda: IndexInverse.construire(df), repetitions=1)
+        chemin = os.path.join(current_dir, "_bench_index.npz")
+        index.sauvegarder(chemin)
+        _, t_charge = chronometre(lambda: IndexInverse.charger(chemin), repetitions=3)
+        taille = os.path.getsize(chemin)
+        os.remove(chemin)
+
+        textes_df = (df["Titre"].fillna("") + " " + df["Entreprise"].fillna("") + " " + df["Description"].fillna("")).str.lower()
+        _, t_naif = chronometre(lambda: [recherche_naive(textes_df, r) for r in REQUETES], repetitions=1)
+        _, t_index = chronometre(lambda: [index.rechercher(r) for r in REQUETES], repetitions=20)
+
+        print(f" {len(df):>7} | {t_construction:10.2f} s | {taille / 1e6:8.1f} Mo | {t_charge * 1000:9.0f} ms "
+              f"| {t_naif / len(REQUETES) * 1000:19.1f} ms | {t_index / len(REQUETES) * 1000:11.2f} ms")
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import tempfile
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+import utils
+
+FICHIER_GLOBAL = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+FACTEUR = int(sys.argv[1]) if len(sys.argv) > 1 else 20  # Pour simuler un historique plus gros
+
+def chronometre(fonction):
+    start = time.time()
+    resultat = fonction()
+    return resultat, time.time() - start
+
+
+if __name__ == "__main__":
+    if not utils.donnees_existent(FICHIER_GLOBAL):
+        print("❌ Lancez d'abord fusion_csv.py pour générer le fichier global.")
+        sys.exit(1)
+
+    df = pd.concat([utils.charger_donnees(FICHIER_GLOBAL)] * FACTEUR, ignore_index=True)
+    colonnes_legeres = [c for c in df.columns if c != "Description"]
+    print(f"📂 {len(df)} offres (x{FACTEUR})\n")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "global_job_market.csv")
+        resultats = {}
+        for format_stockage in ["csv", "parquet"]:
+            # Les chemins suivent FORMAT_FICHIERS (figé à l'import de utils) : les deux sont changés, base SQLite coupée
+            utils.FORMAT_STOCKAGE = utils.FORMAT_FICHIERS = format_stockage
+            utils.BASE_SQLITE = False
+            _, t_ecriture = chronometre(lambda: utils.sauvegarde_securisee(df, chemin))
+            relu, t_lecture = chronometre(lambda: utils.charger_donnees(chemin))
+            _, t_projection = chronometre(lambda: utils.charger_donnees(chemin, colonnes=colonnes_legeres))
+            fichier = utils.chemin_stockage(chemin)
+            if not fichier.endswith(utils.EXTENSIONS[format_stockage]) or not os.path.exists(fichier):
+                print(f"❌ {format_stockage} : fichier mesuré inattendu ({os.path.basename(fichier)}) !")
+                sys.exit(1)
+            taille = os.path.getsize(fichier) / 1e6
+            os.remove(fichier)
+
+            if len(relu) != len(df) or list(relu.columns) != list(df.columns):
+                print(f"❌ {format_stockage} : relecture incomplète !")
+                sys.exit(1)
+            resultats[format_stockage] = (t_ecriture, t_lecture, t_projection, taille)
+
+    print("\n Format  | Écriture | Lecture | Sans Description | Taille")
+    for format_stockage, (t_ecriture, t_lecture, t_projection, taille) in resultats.items():
+        print(f" {format_stockage:<7} | {t_ecriture:6.2f} s | {t_lecture:5.2f} s | {t_projection:14.2f} s | {taille:6.1f} Mo")
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import random
+import pandas as pd
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from enrichissement import detecter_stack_colonne, matrice_stack_colonne, stack_depuis_matrice, matrice_depuis_stack
+from references_enrichissement import detecter_stack
+
+NB_DESCRIPTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+MOTS_PAR_DESCRIPTION = (80, 400)
+
+# Mentions tech (dont les cas piégeux : chevauchements, sous-chaînes, majuscules...)
+MENTIONS = [
+    "Python", "python3", "SQL", "NoSQL", "no sql", "MySQL", "PowerBI", "Power BI", "power-bi",
+    "Tableau", "R&D", "langage R", "SAS", "VBA", "AWS", "Azure", "GCP", "Google Cloud", "google-cloud",
+    "Spark", "PySpark", "Hadoop", "Kafka", "Airflow", "Snowflake", "Databricks", "Docker", "Kubernetes",
+    "K8s", "Git", "GitHub", "Linux", "Pandas", "TensorFlow", "PyTorch", "scikit-learn", "sklearn",
+    "Java", "JavaScript", "Scala", "C++", "c++17", "MongoDB", "Cassandra", "dbt", "dbt-core", "Excel",
+]
+
+def vocabulaire():
+    """Mots réels issus des fichiers propres (ou une liste de secours)."""
+    mots = []
+    for nom in ("offres_francetravail_clean.csv", "offres_wttj_clean.csv"):
+        chemin = os.path.join(project_root, "data", "clean", nom)
+        if os.path.exists(chemin):
+            df = pd.read_csv(chemin, usecols=["Description_Propre"])
+            for texte in df["Description_Propre"].dropna().head(300):
+                mots.extend(str(texte).split())
+    return mots or "analyse des données pour le pilotage de la performance au sein de l'équipe".split()
+
+def corpus_synthetique(n, seed=42):
+    rng = random.Random(seed)
+    mots = vocabulaire()
+    descriptions = []
+    for _ in range(n):
+        texte = rng.choices(mots, k=rng.randint(*MOTS_PAR_DESCRIPTION))
+        for _ in range(rng.randint(0, 8)):
+            texte.insert(rng.randrange(len(texte) + 1), rng.choice(MENTIONS))
+        descriptions.append(" ".join(texte))
+    # Quelques valeurs manquantes, comme dans les vrais fichiers
+    for i in range(0, n, 997):
+        descriptions[i] = None
+    return pd.Series(descriptions)
+
+
+if __name__ == "__main__":
+    print(f"🧪 Génération d'un corpus synthétique de {NB_DESCRIPTIONS} descriptions...")
+    corpus = corpus_synthetique(NB_DESCRIPTIONS)
+
+    start = time.time()
+    ancien = corpus.apply(detecter_stack)
+    duree_ancien = time.time() - start
+    print(f"🐢 detecter_stack (apply, 1 regex par techno) : {duree_ancien:.2f} s")
+
+    start = time.time()
+    nouveau = detecter_stack_colonne(corpus)
+    duree_nouveau = time.time() - start
+    print(f"⚡ detecter_stack_colonne (passage unique)     : {duree_nouveau:.2f} s")
+
+    differences = (ancien != nouveau).sum()
+    if differences:
+        print(f"❌ {differences} descriptions donnent un Tech_Stack différent !")
+        print(pd.DataFrame({"ancien": ancien, "nouveau": nouveau})[ancien != nouveau].head())
+        sys.exit(1)
+
+    print(f"✅ Tech_Stack identiques sur {len(corpus)} descriptions. Gain : x{duree_ancien / duree_nouveau:.1f}")
+
+    # Colonnes Tech_<techno> : même information que Tech_Stack, dans les deux sens
+    matrice = matrice_stack_colonne(corpus)
+    if not (stack_depuis_matrice(matrice) == nouveau).all() or not matrice_depuis_stack(nouveau).equals(matrice):
+        print("❌ Les colonnes Tech_ ne correspondent pas à Tech_Stack !")
+        sys.exit(1)
+    print(f"✅ Colonnes Tech_ cohérentes avec Tech_Stack ({matrice.shape[1]} technos, {matrice.memory_usage(index=False).sum() / 1e6:.1f} Mo).")
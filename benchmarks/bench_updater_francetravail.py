@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+
+# Serveur local qui imite l'API France Travail (/offres/{id}) et le site public
+# pour tester le pool de vérification : 401 (token tourné), 429 (Retry-After), 204, pages "fantômes".
+# Usage : python benchmarks/bench_updater_francetravail.py [nb_offres]
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+
+NB_OFFRES = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+LATENCE = 0.1
+ROTATION_TOKEN = NB_OFFRES // 3   # Le token "expire" après ce nombre d'appels API
+
+etat = {"appels_api": 0, "appels_web": 0, "tokens_emis": 0, "erreurs_429": 0}
+verrou = threading.Lock()
+
+
+def profil(numero):
+    """Statut simulé d'une offre : expiree / recente / fantome / ancienne (vivante sur le web)."""
+    return ["expiree", "recente", "fantome", "ancienne", "recente"][numero % 5]
+
+
+def generation_courante():
+    return 1 + etat["appels_api"] // ROTATION_TOKEN
+
+
+class FausseAPI(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def repondre(self, code, corps=b"", en_tetes=None, type_contenu="application/json"):
+        self.send_response(code)
+        for cle, valeur in (en_tetes or {}).items():
+            self.send_header(cle, valeur)
+        self.send_header("Content-Type", type_contenu)
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with verrou:
+            etat["tokens_emis"] += 1
+            token = f"jeton-{generation_courante()}"
+        self.repondre(200, json.dumps({"access_token": token}).encode())
+
+    def do_GET(self):
+        time.sleep(LATENCE)
+        numero = int(self.path.rstrip("/").split("/")[-1])
+
+        if self.path.startswith("/web/"):
+            with verrou:
+                etat["appels_web"] += 1
+            texte = "Cette offre n'est plus disponible" if profil(numero) == "fantome" else "Postuler"
+            return self.repondre(200, f"<html>{texte}</html>".encode(), type_contenu="text/html")
+
+        with verrou:
+            etat["appels_api"] += 1
+            token_valide = f"Bearer jeton-{generation_courante()}"
+            trop_vite = etat["appels_api"] == NB_OFFRES // 2
+            if trop_vite:
+                etat["erreurs_429"] += 1
+        if trop_vite:
+            return self.repondre(429, b"{}", {"Retry-After": "1"})
+        if self.headers.get("Authorization") != token_valide:
+            return self.repondre(401, b"{}")
+
+        statut = profil(numero)
+        if statut == "expiree":
+            return self.repondre(204)
+        jours = 0 if statut == "recente" else 10
+        date_actu = (datetime.now() - timedelta(days=jours)).strftime("%Y-%m-%dT%H:%M:%S")
+        self.repondre(200, json.dumps({"id": str(numero), "dateActualisation": date_actu}).encode())
+
+
+if __name__ == "__main__":
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), FausseAPI)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{serveur.server_port}"
+
+    # La configuration est lue à l'import du module : on la fixe avant
+    os.environ.update({
+        "FT_CLIENT_ID": "test", "FT_CLIENT_SECRET": "test",
+        "FT_URL_AUTH": f"{base}/auth", "FT_URL_OFFRE": f"{base}/offres/", "FT_URL_WEB": f"{base}/web/",
+        "FT_REQUETES_PAR_SECONDE": "50", "FT_WEB_REQUETES_PAR_SECONDE": "20",
+        "HTTP_CACHE": "0",   # Chaque run doit interroger le faux site (voir bench_cache_http.py pour le cache)
+    })
+    sys.path.append(os.path.join(project_root, "scrapers", "francetravail"))
+    import updater_francetravail as updater
+
+    df = pd.DataFrame({"id": [str(n) for n in range(NB_OFFRES)], "Titre": "Data Analyst", "Date_Expiration": None})
+    with tempfile.TemporaryDirectory() as dossier:
+        start = time.time()
+        bilan = asyncio.run(updater.verifier_offres(df, df.index, os.path.join(dossier, "offres.csv")))
+        duree = time.time() - start
+    serveur.shutdown()
+
+    attendu_morts = sum(profil(n) in ("expiree", "fantome") for n in range(NB_OFFRES))
+    morts = df["Date_Expiration"].notna()
+    attendu = pd.Series([profil(n) in ("expiree", "fantome") for n in range(NB_OFFRES)])
+    if bilan is None or bilan["morts"] != attendu_morts or not morts.equals(attendu):
+        print(f"❌ Bilan inattendu : {bilan} (attendu : {attendu_morts} expirées)")
+        sys.exit(1)
+
+    # Ancienne boucle : latence + 0.2 s par offre, + page web et pause de 3 à 6 s pour les dates anciennes
+    nb_web = sum(profil(n) in ("fantome", "ancienne") for n in range(NB_OFFRES))
+    sequentiel = NB_OFFRES * (LATENCE + 0.2) + nb_web * (LATENCE + 4.5)
+    print(f"✅ {NB_OFFRES} offres vérifiées en {duree:.2f} s : {bilan['morts']} expirées, {bilan['vivants']} actives")
+    print(f"   {etat['tokens_emis']} tokens émis (1 initial + 1 par rotation), {etat['erreurs_429']} 429 absorbé(s), {etat['appels_web']} pages web")
+    print(f"   Ancienne boucle séquentielle (estimation) : {sequentiel:.0f} s")
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+# Vérifie l'extraction HTTP + lxml de scraper_wttj sur des pages sauvegardées (benchmarks/fixtures)
+# et la compare à l'ancienne extraction BeautifulSoup (page rendue par Selenium).
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+DOSSIER_FIXTURES = os.path.join(current_dir, "fixtures")
+sys.path.append(os.path.join(project_root, "scrapers", "wttj"))
+import scraper_wttj
+
+URL = "https://www.welcometothejungle.com/fr/companies/acme-analytics/jobs/data-analyst-h-f_lyon"
+TITRE = "Data Analyst H/F"
+REPETITIONS = 200
+
+
+def extraire_offre_bs4(html, url, titre):
+    """Ancienne extraction (BeautifulSoup html.parser), gardée comme référence."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        entreprise = url.split('/companies/')[1].split('/')[0].replace('-', ' ').upper()
+    except:
+        entreprise = "INCONNU"
+    infos_cles, ville, date_pub = [], "Non spécifié", None
+    script_json = soup.find('script', type='application/ld+json')
+    data = json.loads(script_json.string) if script_json else {}
+    candidats = data if isinstance(data, list) else [data]
+    job_data = next((item for item in candidats if item.get('@type') == 'JobPosting'), None)
+    if job_data:
+        ville = job_data['jobLocation'].get('address', {}).get('addressLocality') or ville
+        date_pub = job_data['datePosted'].split('T')[0]
+    if not date_pub:
+        date_pub = datetime.now().strftime("%Y-%m-%d")
+    for li in soup.find_all('li'):
+        texte = li.get_text(strip=True)
+        if 0 < len(texte) < 50:
+            infos_cles.append(texte)
+            if ville == "Non spécifié":
+                est_banni = any(banni.lower() in texte.lower() for banni in scraper_wttj.mots_cles_bannis)
+                if not est_banni and len(texte) < 30 and not any(char.isdigit() for char in texte):
+                    ville = texte
+    main_content = soup.find('main')
+    description = main_content.get_text(separator="\n", strip=True) if main_content else "Non trouvée"
+    return {"Titre": titre, "Entreprise": entreprise, "Ville": ville, "Experience_Salaire_Infos": " | ".join(infos_cles),
+            "Description_Complete": description, "URL": url, "Date_Publication": date_pub}
+
+
+def chronometre(fonction, *args):
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        fonction(*args)
+    return (time.perf_counter() - start) / REPETITIONS * 1000
+
+
+if __name__ == "__main__":
+    with open(os.path.join(DOSSIER_FIXTURES, "wttj_offre.html"), encoding="utf-8") as f:
+        html = f.read()
+    with open(os.path.join(DOSSIER_FIXTURES, "wttj_offre_sans_json_ld.html"), encoding="utf-8") as f:
+        html_sans_json = f.read()
+
+    ligne = scraper_wttj.extraire_offre_html(html, URL, TITRE, exiger_json_ld=True)
+    attendu = {"Entreprise": "ACME ANALYTICS", "Ville": "Lyon", "Date_Publication": "2026-02-03"}
+    erreurs = [f"{cle} = {ligne[cle]!r} (attendu {valeur!r})" for cle, valeur in attendu.items() if ligne[cle] != valeur]
+    if "CDI" not in ligne["Experience_Salaire_Infos"] or "Texte invisible" in ligne["Experience_Salaire_Infos"]:
+        erreurs.append(f"Infos = {ligne['Experience_Salaire_Infos']!r}")
+    if not ligne["Description_Complete"].startswith("Data Analyst H/F") or "__INITIAL_DATA__" in ligne["Description_Complete"]:
+        erreurs.append("Description mal extraite")
+    if scraper_wttj.extraire_offre_html(html_sans_json, URL, TITRE, exiger_json_ld=True) is not None:
+        erreurs.append("Page sans JSON-LD : le repli navigateur n'est pas demandé")
+
+    try:
+        import bs4  # noqa: F401
+        for page in (html, html_sans_json):
+            ancienne = extraire_offre_bs4(page, URL, TITRE)
+            nouvelle = scraper_wttj.extraire_offre_html(page, URL, TITRE)
+            erreurs += [f"Écart avec BeautifulSoup sur {cle}" for cle in ancienne if ancienne[cle] != nouvelle[cle]]
+        t_bs4 = chronometre(extraire_offre_bs4, html, URL, TITRE)
+    except ImportError:
+        t_bs4 = None
+
+    if erreurs:
+        print("❌ " + "\n❌ ".join(erreurs))
+        sys.exit(1)
+
+    t_lxml = chronometre(scraper_wttj.extraire_offre_html, html, URL, TITRE)
+    print(f"✅ Extraction conforme : {ligne['Ville']} | {ligne['Date_Publication']} | {ligne['Experience_Salaire_Infos'][:60]}...")
+    print(f"   lxml : {t_lxml:.2f} ms / page")
+    if t_bs4 is not None:
+        print(f"   BeautifulSoup : {t_bs4:.2f} ms / page (hors rendu Selenium de 5 à 8 s)")
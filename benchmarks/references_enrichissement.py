@@ -0,0 +1,119 @@
+import re
+import pandas as pd
+
+# Anciennes versions ligne par ligne de l'enrichissement (enrichissement.py), gardées comme références par les benchmarks :
+# - detecter_stack       -> DetecteurStack / detecter_stack_colonne      (bench_tech_stack.py)
+# - extraire_annees_exp  -> extraire_indices                             (bench_niveau.py, bench_indices_texte.py)
+# - detecter_rqth        -> extraire_indices                             (bench_indices_texte.py)
+# - determiner_niveau    -> determiner_niveau_colonne                    (bench_niveau.py)
+# Les listes de mots-clés et les seuils viennent d'enrichissement.py : une seule source pour les deux versions.
+
+from enrichissement import (
+    keywords, MOTS_TITRE_SENIOR, MOTS_TITRE_JUNIOR, MOTS_IDF, MOTS_METROPOLES, SEUILS_IDF, SEUILS_METROPOLES, SEUILS_AUTRES
+)
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def detecter_stack(description):
+    """Version ligne par ligne (une recherche regex par techno)."""
+    if pd.isna(description): return ""
+    desc_lower = str(description).lower()
+    found = []
+    for tech, pattern in keywords.items():
+        if re.search(pattern, desc_lower):
+            found.append(tech)
+
+    return ", ".join(found)
+# --------------------------------------------------
+
+#pattern_a = r"(\d{1,2})\s*?(?:-|\s)?\s*?(?:ans|années|years|year).*?(?:exp|expérience|experience)"
+REGEX_ANNEES_AVANT = re.compile(r"(\d{1,2})\s*(?:-|à)?\s*(?:\d{1,2})?\s*(?:ans|années|years).{0,20}exp")
+#pattern_b = r"(?:exp|expérience|experience).{0,20}?(\d{1,2})"
+REGEX_ANNEES_APRES = re.compile(r"exp.{0,20}(\d{1,2})\s*(?:ans|années|years)")
+
+def extraire_annees_exp(description):
+    """
+    Extrait le nombre d'années d'expérience du texte.
+    Renvoie un entier ou None.
+    """
+    if pd.isna(description): return None
+    description = description.lower()
+
+    annees = None
+    match_a = REGEX_ANNEES_AVANT.search(description)
+    match_b = REGEX_ANNEES_APRES.search(description)
+
+    if match_a:
+        try: annees = int(match_a.group(1))
+        except ValueError: pass
+    elif match_b:
+        try: annees = int(match_b.group(1))
+        except ValueError: pass
+
+    # Filtre de sécurité pour éviter les chiffres aberrants
+    if annees is not None and (annees > 15 or annees < 0):
+        return None
+
+    return annees
+# --------------------------------------------------
+
+def detecter_rqth(text):
+    if pd.isna(text): return False
+    keywords = ["rqth", "handicap", "situation de handicap", "entreprise adaptée"]
+    return any(k in text.lower() for k in keywords)
+# --------------------------------------------------
+
+def determiner_niveau(row):
+    """
+    Déduit le niveau d'expérience (Etudiant, Junior, Confirmé, Senior)
+    basé sur le salaire (distingue idf des autres zones) et les mots-clés du titre.
+    """
+    titre = str(row['Titre']).lower() if pd.notna(row['Titre']) else ""
+    lieu = str(row['Ville']).lower() if pd.notna(row['Ville']) else ""
+    salaire = row['Salaire_Annuel']
+    contrat = str(row['Type_Contrat']).lower() if pd.notna(row['Type_Contrat']) else ""
+    annees = row['Annees_Exp']
+
+    # 1. Extraction des années
+
+    if pd.notna(annees):
+        if annees > 5: return "Senior"
+        if annees > 2: return "Confirmé"
+
+    # 2. Détection des stages ---
+    if "Stage / Alternance" in contrat:
+        return "En formation"
+
+    if any(k in titre for k in MOTS_TITRE_SENIOR):
+        return "Senior"
+
+    # 3. Définition des seuils selon la géographie
+    if any(m in lieu for m in MOTS_IDF):
+        seuil_junior, seuil_senior = SEUILS_IDF
+    elif any(m in lieu for m in MOTS_METROPOLES):
+        seuil_junior, seuil_senior = SEUILS_METROPOLES
+    else:
+        seuil_junior, seuil_senior = SEUILS_AUTRES
+
+    # --- VERDICT DU SALAIRE ---
+    if pd.notna(salaire) and salaire > 0:
+        if salaire <= seuil_junior:
+            return "Junior"
+        elif seuil_junior < salaire < seuil_senior:
+            return "Confirmé"
+        else:
+            return "Senior"
+
+    # --- PAR DEFAUT ---
+    if pd.notna(annees) and annees <= 2:
+        return "Junior"
+
+    # --- FALLBACK : ANALYSE TEXTUELLE ---
+    # (Titre)
+
+    if any(k in titre for k in MOTS_TITRE_JUNIOR):
+        return "Junior"
+    if "confirmé" in titre:
+        return "Confirmé"
+
+    return "Non spécifié"
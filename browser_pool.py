@@ -0,0 +1,149 @@
+import os
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Pool de navigateurs Chrome (Selenium) partagé par les scrapers/updaters APEC et WTTJ :
+# - N navigateurs qui se partagent une file d'URLs (plusieurs offres traitées en même temps)
+# - bannière cookies fermée une seule fois par navigateur (session)
+# - pause aléatoire propre à chaque navigateur + budget de pages/seconde par site, commun à tout le pool
+# Les résultats remontent dans le thread principal : c'est lui qui écrit les fichiers.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+NAVIGATEURS_MAX = int(os.getenv("NAVIGATEURS_MAX", "3"))
+PAGES_PAR_SECONDE_PAR_SITE = float(os.getenv("NAVIGATEUR_PAGES_PAR_SECONDE", "0.5"))
+
+_chemin_driver = None
+_verrou_driver = threading.Lock()
+
+# region 1. --- CRÉATION D'UN NAVIGATEUR ---
+
+def creer_driver(headless=True):
+    """Chrome avec les options communes à tous les scrapers (le chromedriver n'est installé qu'une fois)."""
+    global _chemin_driver
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    with _verrou_driver:
+        if _chemin_driver is None:
+            _chemin_driver = ChromeDriverManager().install()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    if headless:
+        options.add_argument("--headless")
+    driver = webdriver.Chrome(service=Service(_chemin_driver), options=options)
+    driver.set_window_size(1920, 1080)
+    return driver
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- POLITESSE PAR SITE ---
+
+class LimiteurParSite:
+    """Espace les chargements de page vers un même site, tous navigateurs confondus (thread-safe)."""
+
+    def __init__(self, pages_par_seconde):
+        self.intervalle = 1.0 / pages_par_seconde if pages_par_seconde > 0 else 0.0
+        self.prochain = {}
+        self._verrou = threading.Lock()
+
+    def attendre(self, url):
+        hote = urlparse(url).netloc
+        with self._verrou:
+            maintenant = time.monotonic()
+            creneau = max(maintenant, self.prochain.get(hote, 0.0))
+            self.prochain[hote] = creneau + self.intervalle
+        if creneau > maintenant:
+            time.sleep(creneau - maintenant)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 3. --- POOL ---
+
+class PoolNavigateurs:
+    """
+    Exemple :
+        pool = PoolNavigateurs(fermer_cookies=tuer_cookies, pause=(2, 4))
+        for url, resultat, erreur in pool.traiter(urls, extraire_offre):
+            ...  # exécuté dans le thread principal, au fil des résultats
+
+    `fonction(driver, element)` est appelée une fois la page chargée (et la pause faite).
+    `url_de(element)` donne l'URL à charger si les éléments ne sont pas directement des URLs.
+    """
+
+    def __init__(self, nb_navigateurs=None, fermer_cookies=None, pause=(2, 4),
+                 pages_par_seconde=None, headless=True, fabrique_driver=None):
+        self.nb_navigateurs = nb_navigateurs or NAVIGATEURS_MAX
+        self.fermer_cookies = fermer_cookies
+        self.pause = pause
+        self.limiteur = LimiteurParSite(PAGES_PAR_SECONDE_PAR_SITE if pages_par_seconde is None else pages_par_seconde)
+        self.fabrique_driver = fabrique_driver or (lambda: creer_driver(headless=headless))
+        self._arret = threading.Event()
+
+    def _worker(self, numero, taches, resultats, fonction, url_de):
+        driver = None
+        cookies_fermes = False
+        try:
+            while not self._arret.is_set():
+                try:
+                    element = taches.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if driver is None:
+                        driver = self.fabrique_driver()
+                        print(f"🤖 [Pool] Navigateur {numero + 1} démarré.")
+
+                    url = url_de(element)
+                    self.limiteur.attendre(url)
+                    driver.get(url)
+
+                    # Bannière cookies : une seule fois par session de navigateur
+                    if self.fermer_cookies and not cookies_fermes:
+                        cookies_fermes = bool(self.fermer_cookies(driver))
+
+                    time.sleep(random.uniform(*self.pause))
+                    resultats.put((element, fonction(driver, element), None))
+                except Exception as e:
+                    resultats.put((element, None, e))
+        finally:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    def traiter(self, elements, fonction, url_de=lambda element: element):
+        """Générateur : renvoie (element, resultat, erreur) dans l'ordre de fin de traitement."""
+        elements = list(elements)
+        taches = queue.Queue()
+        for element in elements:
+            taches.put(element)
+        resultats = queue.Queue()
+
+        self._arret.clear()
+        nb_workers = min(self.nb_navigateurs, len(elements))
+        threads = [
+            threading.Thread(target=self._worker, args=(n, taches, resultats, fonction, url_de), daemon=True)
+            for n in range(nb_workers)
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            for _ in range(len(elements)):
+                yield resultats.get()
+        finally:
+            # Fin normale, Ctrl+C ou break de l'appelant : on arrête les navigateurs proprement
+            self._arret.set()
+            for t in threads:
+                t.join()
+
+# endregion
@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+from collections import Counter
+from enrichissement import keywords, COLONNES_TECH, matrice_depuis_stack
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Cube pré-agrégé du marché (écrit par fusion_csv.py, lu par app.py).
+# Une ligne = une combinaison des dimensions ci-dessous, avec des mesures additives :
+# on peut filtrer puis re-sommer n'importe quel sous-ensemble sans revenir aux offres.
+# - Tech = "*" : ligne "toutes offres" (compteurs, salaires, durées, entreprises)
+# - Tech = "Python", "SQL"... : nb d'offres de la cellule qui citent la techno
+# La taille du cube dépend du nombre de combinaisons (villes x semaines x ...), pas du nombre d'offres.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+DIMENSIONS = ["Source", "Type_Contrat", "Ville", "Niveau", "Handicap_Friendly", "Actif", "Semaine"]
+TOUTES_TECHS = "*"
+
+PAS_HISTO = 1000      # Largeur d'une case de l'histogramme des salaires (€)
+K_ENTREPRISES = 256   # Nb de hashs gardés par cellule pour estimer le nb d'entreprises distinctes
+
+# Colonnes des offres nécessaires à construire_cube
+COLONNES_CUBE = [
+    "Source", "Type_Contrat", "Ville", "Niveau", "Handicap_Friendly", "Date_Publication", "Date_Expiration",
+    "Salaire_Annuel", "Entreprise", "Tech_Stack"
+] + COLONNES_TECH
+
+# Types à la relecture (sinon une colonne de codes peut être relue en nombres)
+TYPES_CUBE = {c: str for c in ["Source", "Type_Contrat", "Ville", "Niveau", "Semaine", "Tech", "Salaire_Histo", "Entreprises"]}
+
+# region 1. --- CONSTRUCTION ---
+
+def _joindre(valeurs):
+    return " ".join(str(v) for v in valeurs)
+
+
+def _histo_salaires(cles, salaires):
+    """'case:nb case:nb ...' par cellule (case = salaire // PAS_HISTO)."""
+    cases = pd.DataFrame(cles)
+    cases["Case"] = (salaires // PAS_HISTO).astype("int64")
+    comptes = cases.groupby(list(cles.columns) + ["Case"], dropna=False).size().reset_index(name="Nb")
+    comptes["Paire"] = comptes["Case"].astype(str) + ":" + comptes["Nb"].astype(str)
+    return comptes.groupby(list(cles.columns), dropna=False)["Paire"].agg(_joindre)
+
+
+def _sketch_entreprises(cles, entreprises):
+    """Les K_ENTREPRISES plus petits hashs distincts de chaque cellule (sketch KMV, fusionnable)."""
+    hashs = pd.DataFrame(cles)
+    hashs["Hash"] = pd.util.hash_array(entreprises.str.strip().str.upper().to_numpy(dtype=object))
+    hashs = hashs.drop_duplicates().sort_values("Hash")
+    return hashs.groupby(list(cles.columns), dropna=False)["Hash"].agg(lambda h: _joindre(h.head(K_ENTREPRISES)))
+
+
+def construire_cube(df):
+    """Agrège les offres (sortie de fusion_csv) en cube. Renvoie un DataFrame (une ligne par cellule)."""
+    date_pub = pd.to_datetime(df["Date_Publication"], errors="coerce")
+    date_exp = pd.to_datetime(df["Date_Expiration"], errors="coerce")
+
+    # Dimensions en texte simple (un groupby sur des 'category' produirait toutes les combinaisons possibles)
+    cles = pd.DataFrame({
+        "Source": df["Source"].astype(object),
+        "Type_Contrat": df["Type_Contrat"].astype(object),
+        "Ville": df["Ville"].astype(object),
+        "Niveau": df["Niveau"].astype(object),
+        "Handicap_Friendly": df["Handicap_Friendly"].eq(True),
+        "Actif": date_exp.isna(),
+        "Semaine": date_pub.dt.to_period("W").dt.start_time.dt.strftime("%Y-%m-%d"),
+    }, index=df.index)
+
+    salaires = pd.to_numeric(df["Salaire_Annuel"], errors="coerce")
+    duree = (date_exp - date_pub).dt.days
+    duree = duree.where(duree > 0)
+
+    mesures = cles.assign(
+        Nb_Offres=1,
+        Salaire_Somme=salaires,
+        Salaire_Nb=salaires.notna().astype("int64"),
+        Salaire_Min=salaires,
+        Salaire_Max=salaires,
+        Duree_Somme=duree,
+        Duree_Nb=duree.notna().astype("int64"),
+    )
+    base = mesures.groupby(DIMENSIONS, dropna=False).agg(
+        Nb_Offres=("Nb_Offres", "sum"),
+        Salaire_Somme=("Salaire_Somme", "sum"),
+        Salaire_Nb=("Salaire_Nb", "sum"),
+        Salaire_Min=("Salaire_Min", "min"),
+        Salaire_Max=("Salaire_Max", "max"),
+        Duree_Somme=("Duree_Somme", "sum"),
+        Duree_Nb=("Duree_Nb", "sum"),
+    )
+
+    avec_salaire = salaires.notna()
+    base["Salaire_Histo"] = _histo_salaires(cles[avec_salaire], salaires[avec_salaire])
+    avec_entreprise = df["Entreprise"].notna()
+    base["Entreprises"] = _sketch_entreprises(cles[avec_entreprise], df.loc[avec_entreprise, "Entreprise"].astype(str))
+    base = base.reset_index()
+    base["Tech"] = TOUTES_TECHS
+
+    # Une ligne par (cellule, techno citée) : une seule somme groupée sur les colonnes Tech_ (0/1)
+    if all(c in df.columns for c in COLONNES_TECH):
+        matrice = df[COLONNES_TECH]
+    else:
+        matrice = matrice_depuis_stack(df["Tech_Stack"])  # Fichier global d'avant les colonnes Tech_
+    par_tech = pd.concat([cles, matrice], axis=1).groupby(DIMENSIONS, dropna=False)[COLONNES_TECH].sum()
+    par_tech.columns = list(keywords)
+    par_tech = par_tech.reset_index().melt(id_vars=DIMENSIONS, var_name="Tech", value_name="Nb_Offres")
+    par_tech = par_tech[par_tech["Nb_Offres"] > 0]
+
+    return pd.concat([base, par_tech], ignore_index=True)[DIMENSIONS + ["Tech"] + [c for c in base.columns if c not in DIMENSIONS + ["Tech"]]]
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- REQUÊTES ---
+
+def filtrer(cube, sources=None, contrats=None, villes=None, niveaux=None, rqth=False, actif=None, semaine_min=None):
+    """Tranche du cube (None = pas de filtre sur la dimension). Mêmes règles que le filtre de l'app."""
+    masque = np.ones(len(cube), dtype=bool)
+    for dimension, valeurs in [("Source", sources), ("Type_Contrat", contrats), ("Ville", villes), ("Niveau", niveaux)]:
+        if valeurs is not None:
+            masque &= cube[dimension].isin(valeurs).to_numpy()
+    if rqth:
+        masque &= cube["Handicap_Friendly"].to_numpy(dtype=bool)
+    if actif is not None:
+        masque &= (cube["Actif"] == actif).to_numpy()
+    if semaine_min is not None:
+        # Les dates sont au format AAAA-MM-JJ : l'ordre alphabétique est l'ordre chronologique
+        masque &= (cube["Semaine"].notna() & (cube["Semaine"] >= semaine_min)).to_numpy()
+    return cube[masque]
+
+
+def lignes_offres(cube):
+    return cube[cube["Tech"] == TOUTES_TECHS]
+
+
+def lignes_techs(cube):
+    return cube[cube["Tech"] != TOUTES_TECHS]
+
+
+def nb_offres(cube):
+    return int(lignes_offres(cube)["Nb_Offres"].sum())
+
+
+def compter(cube, par):
+    """Nb d'offres par valeur de `par` (une dimension ou une liste), trié décroissant."""
+    return lignes_offres(cube).groupby(par)["Nb_Offres"].sum().sort_values(ascending=False)
+
+
+def compter_techs(cube, par=None):
+    """Nb d'offres citant chaque techno (par techno, ou par [par, techno])."""
+    cles = ["Tech"] if par is None else [par, "Tech"]
+    return lignes_techs(cube).groupby(cles)["Nb_Offres"].sum()
+
+
+def salaire_moyen(cube):
+    """(salaire moyen, nb d'offres avec salaire). Moyenne NaN s'il n'y a aucun salaire."""
+    offres = lignes_offres(cube)
+    nb = int(offres["Salaire_Nb"].sum())
+    return (offres["Salaire_Somme"].sum() / nb if nb else np.nan), nb
+
+
+def duree_moyenne(cube):
+    """Durée de vie moyenne (jours) des offres expirées, NaN si aucune."""
+    offres = lignes_offres(cube)
+    nb = offres["Duree_Nb"].sum()
+    return offres["Duree_Somme"].sum() / nb if nb else np.nan
+
+
+def nb_entreprises(cube):
+    """
+    Nb d'entreprises distinctes. Exact tant qu'aucune cellule n'a dépassé K_ENTREPRISES entreprises,
+    sinon estimation KMV : seuls les hashs sous le plus petit seuil des cellules tronquées sont fiables.
+    """
+    hashs = set()
+    seuil = None
+    for sketch in lignes_offres(cube)["Entreprises"].dropna():
+        valeurs = [int(h) for h in sketch.split()]
+        hashs.update(valeurs)
+        if len(valeurs) >= K_ENTREPRISES:
+            seuil = valeurs[-1] if seuil is None else min(seuil, valeurs[-1])
+    if seuil is None:
+        return len(hashs)
+    nb_sous_seuil = sum(1 for h in hashs if h <= seuil)
+    return int(round((nb_sous_seuil - 1) * 2**64 / (seuil + 1)))
+
+
+def _fusionner_histos(sketches):
+    total = Counter()
+    for sketch in sketches.dropna():
+        for paire in sketch.split():
+            case, nb = paire.split(":")
+            total[int(case)] += int(nb)
+    return total
+
+
+def _quantile(histo, q):
+    """Quantile approché : interpolation linéaire dans la case qui contient le rang visé."""
+    cases = sorted(histo)
+    cible = q * sum(histo.values())
+    cumul = 0
+    for case in cases:
+        if cumul + histo[case] >= cible:
+            return (case + (cible - cumul) / histo[case]) * PAS_HISTO
+        cumul += histo[case]
+    return (cases[-1] + 1) * PAS_HISTO
+
+
+def stats_salaires(cube, par="Source"):
+    """
+    Statistiques de boîte à moustaches par groupe (q1, médiane, q3, moustaches à 1.5 IQR),
+    calculées depuis les histogrammes (précision ~PAS_HISTO / 2).
+    """
+    lignes = []
+    for groupe, cellules in lignes_offres(cube).groupby(par):
+        histo = _fusionner_histos(cellules["Salaire_Histo"])
+        if not histo:
+            continue
+        mini, maxi = cellules["Salaire_Min"].min(), cellules["Salaire_Max"].max()
+        q1, mediane, q3 = (min(max(_quantile(histo, q), mini), maxi) for q in (0.25, 0.5, 0.75))
+        lignes.append({
+            par: groupe, "Nb": sum(histo.values()), "Min": mini, "Max": maxi,
+            "Q1": q1, "Mediane": mediane, "Q3": q3,
+            "Moustache_Basse": max(mini, q1 - 1.5 * (q3 - q1)),
+            "Moustache_Haute": min(maxi, q3 + 1.5 * (q3 - q1)),
+        })
+    return pd.DataFrame(lignes)
+
+# endregion
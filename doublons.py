@@ -0,0 +1,375 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Détection des quasi-doublons entre sources (utilisé par fusion_csv.py).
+# La même offre publiée sur France Travail, l'APEC et WTTJ a 3 URL différentes : le dédoublonnage par URL la garde 3 fois.
+# - Chaque offre = ensemble de "shingles" (suites de 3 mots) de Titre + Entreprise + Description
+# - Signature MinHash (NB_PERMUTATIONS minimums de hashs) : deux offres ont la même valeur sur une permutation
+#   avec une probabilité égale à leur similarité de Jaccard
+# - LSH : la signature est coupée en NB_BANDES bandes ; deux offres qui partagent une bande sont candidates.
+#   Les candidates se trouvent par un tri des clés de bande (O(n log n)), jamais en comparant toutes les paires.
+# - Candidates vérifiées (part de permutations égales >= SEUIL_SIMILARITE), puis regroupées en composantes connexes
+# - La même annonce publiée dans plusieurs villes n'est pas un doublon : la ville normalisée entre dans la clé de
+#   chaque bande (les candidates sont cherchées ville par ville). Deux offres d'une même source ne sont fusionnées
+#   que si elles ont aussi la même Entreprise (republication sous une autre URL).
+# Les signatures sont sauvegardées (data/clean/global_signatures.npz) : au run suivant, seules les offres nouvelles
+# ou modifiées sont signées, et comparées aux bandes des offres déjà connues.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+COLONNES_TEXTE = ["Titre", "Entreprise", "Description"]
+COLONNES_ATTRIBUTS = ["Ville", "Entreprise", "Source"]     # Colonnes de attributs_offres, dans cet ordre
+NB_PERMUTATIONS = 64
+NB_BANDES = 16                  # 16 bandes de 4 valeurs : une paire à 80% de similarité est candidate dans >99,9% des cas
+SEUIL_SIMILARITE = 0.8          # Jaccard estimé minimal pour fusionner deux offres
+TAILLE_SHINGLE = 3              # Mots par shingle
+TAILLE_LOT = 5000               # Offres signées à la fois (borne la mémoire)
+REGEX_MOT = re.compile(r"\w+")
+
+_graine = np.random.default_rng(20260118)
+_A = _graine.integers(1, 2**63, size=NB_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)   # Multiplicateurs impairs
+_B = _graine.integers(0, 2**63, size=NB_PERMUTATIONS, dtype=np.uint64)
+_VIDE = np.iinfo(np.uint32).max
+
+# region 1. --- SIGNATURES ---
+
+def textes_offres(df):
+    """Titre + Entreprise + Description en minuscules (NaN -> '')."""
+    texte = pd.Series("", index=df.index)
+    for colonne in [c for c in COLONNES_TEXTE if c in df.columns]:
+        texte = texte + " " + df[colonne].fillna("").astype(str)
+    return texte.str.lower()
+
+
+def normaliser_attribut(serie):
+    """Minuscules, sans accents ni ponctuation ('Saint-Étienne ' -> 'saint etienne') ; NaN -> ''."""
+    serie = serie.fillna("").astype(str).str.lower().str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    return serie.str.findall(r"\w+").str.join(" ")
+
+
+def attributs_offres(df):
+    """Ville, Entreprise et Source (normalisées, hashées) de chaque offre : n x 3, uint64. Colonne absente -> 0."""
+    attributs = np.zeros((len(df), len(COLONNES_ATTRIBUTS)), dtype=np.uint64)
+    for k, colonne in enumerate(COLONNES_ATTRIBUTS):
+        if colonne in df.columns and len(df):
+            attributs[:, k] = pd.util.hash_array(normaliser_attribut(df[colonne]).to_numpy(dtype=object))
+    return attributs
+
+
+def empreintes_textes(textes, attributs=None):
+    """
+    Hash du texte (et des attributs) de chaque offre, en texte : une signature et son groupe ne sont repris
+    du run précédent que si rien de ce qui décide d'une fusion n'a changé.
+    """
+    hashs = pd.util.hash_array(textes.to_numpy(dtype=object))
+    if attributs is not None:
+        for k in range(attributs.shape[1]):
+            hashs = hashs * np.uint64(0x100000001B3) ^ attributs[:, k]
+    return hashs.astype(str)
+
+
+def _hashs_shingles(textes):
+    """(hashs uint64 des shingles, numéro d'offre de chaque shingle) pour une liste de textes."""
+    mots = [REGEX_MOT.findall(t) for t in textes]
+    nb_mots = np.fromiter((len(m) for m in mots), dtype="int64", count=len(mots))
+    tous = np.array([m for liste in mots for m in liste], dtype=object)
+    if len(tous) == 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype="int64")
+    hashs_mots = pd.util.hash_array(tous)
+    offres = np.repeat(np.arange(len(textes)), nb_mots)
+
+    # Shingle = combinaison des hashs de TAILLE_SHINGLE mots consécutifs d'une même offre
+    # (une offre plus courte que TAILLE_SHINGLE mots garde ses mots seuls)
+    n = len(hashs_mots) - TAILLE_SHINGLE + 1
+    if n > 0:
+        shingles = hashs_mots[:n].copy()
+        for k in range(1, TAILLE_SHINGLE):
+            shingles = shingles * np.uint64(0x9E3779B97F4A7C15) ^ hashs_mots[k:k + n]
+        complets = offres[:n] == offres[TAILLE_SHINGLE - 1:]
+        shingles, offres_shingles = shingles[complets], offres[:n][complets]
+    else:
+        shingles, offres_shingles = np.zeros(0, dtype=np.uint64), np.zeros(0, dtype="int64")
+    courtes = np.flatnonzero(nb_mots < TAILLE_SHINGLE)
+    if len(courtes):
+        a_garder = np.isin(offres, courtes)
+        shingles = np.concatenate([shingles, hashs_mots[a_garder]])
+        offres_shingles = np.concatenate([offres_shingles, offres[a_garder]])
+    ordre = np.argsort(offres_shingles, kind="stable")
+    return shingles[ordre], offres_shingles[ordre]
+
+
+def signatures_minhash(textes):
+    """Signatures MinHash (n x NB_PERMUTATIONS, uint32). Une offre sans texte a une signature 'vide' (jamais fusionnée)."""
+    textes = list(textes)
+    signatures = np.full((len(textes), NB_PERMUTATIONS), _VIDE, dtype=np.uint32)
+    for debut in range(0, len(textes), TAILLE_LOT):
+        shingles, offres = _hashs_shingles(textes[debut:debut + TAILLE_LOT])
+        if len(shingles) == 0:
+            continue
+        presentes, premiers = np.unique(offres, return_index=True)
+        for p in range(NB_PERMUTATIONS):
+            # Hash universel (multiplication + décalage) : une "permutation" différente par couple (a, b)
+            valeurs = ((_A[p] * shingles + _B[p]) >> np.uint64(32)).astype(np.uint32)
+            signatures[debut + presentes, p] = np.minimum.reduceat(valeurs, premiers)
+    return signatures
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- INDEX PERSISTANT ---
+
+class IndexSignatures:
+    """
+    Signatures des offres du dernier run (par URL), avec l'empreinte du texte dont elles sont tirées
+    et le groupe de chaque offre (numéro de la 1re offre du groupe dans l'index).
+    """
+
+    def __init__(self, urls, empreintes, signatures, groupes):
+        self.urls = np.asarray(urls, dtype=object)
+        self.empreintes = np.asarray(empreintes, dtype=object)
+        self.signatures = signatures
+        self.groupes = groupes
+
+    @classmethod
+    def vide(cls):
+        return cls([], [], np.zeros((0, NB_PERMUTATIONS), dtype=np.uint32), np.zeros(0, dtype="int64"))
+
+    @classmethod
+    def charger(cls, chemin_fichier):
+        """Index sauvegardé, ou index vide s'il est absent, illisible ou d'un autre nombre de permutations."""
+        if chemin_fichier is None or not os.path.exists(chemin_fichier):
+            return cls.vide()
+        try:
+            with np.load(chemin_fichier, allow_pickle=False) as contenu:
+                signatures = contenu["signatures"]
+                if len(signatures) == 0 or signatures.shape[1] != NB_PERMUTATIONS:
+                    return cls.vide()
+                urls = contenu["urls"].tobytes().decode("utf-8").split("\n")
+                empreintes = contenu["empreintes"].tobytes().decode("utf-8").split("\n")
+                return cls(urls, empreintes, signatures, contenu["groupes"])
+        except (OSError, ValueError, KeyError):
+            print("⚠️ [Doublons] Signatures illisibles, on recalcule tout.")
+            return cls.vide()
+
+    def sauvegarder(self, chemin_fichier):
+        """Écriture atomique (.tmp puis os.replace)."""
+        chemin_temp = chemin_fichier + ".tmp"
+        with open(chemin_temp, "wb") as f:
+            np.savez(
+                f,
+                urls=np.frombuffer("\n".join(self.urls).encode("utf-8"), dtype=np.uint8),
+                empreintes=np.frombuffer("\n".join(self.empreintes).encode("utf-8"), dtype=np.uint8),
+                signatures=self.signatures,
+                groupes=self.groupes,
+            )
+        os.replace(chemin_temp, chemin_fichier)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 3. --- REGROUPEMENT ---
+# Les fonctions de cette partie lisent les signatures par colonnes ou par blocs : elles acceptent aussi
+# un np.memmap (signatures sur disque, fusion par morceaux de fusion_csv.py).
+
+def _sans_texte(signatures):
+    """True pour les offres sans aucun shingle (signature 'vide'), calculé par blocs."""
+    taille = TAILLE_LOT * 20
+    blocs = [(signatures[d:d + taille] == _VIDE).all(axis=1) for d in range(0, len(signatures), taille)]
+    return np.concatenate(blocs) if blocs else np.zeros(0, dtype=bool)
+
+
+def _cles_bande(signatures, bande):
+    """Une clé (uint64) par offre pour la bande `bande` : hash de ses valeurs."""
+    lignes = NB_PERMUTATIONS // NB_BANDES
+    valeurs = np.asarray(signatures[:, bande * lignes:(bande + 1) * lignes]).astype(np.uint64)
+    cles = np.zeros(len(valeurs), dtype=np.uint64)
+    for k in range(lignes):
+        cles = cles * np.uint64(0x100000001B3) ^ valeurs[:, k]
+    return cles
+
+
+def paires_candidates(signatures, nouvelles, villes=None):
+    """
+    Paires (i, j), i < j, qui partagent au moins une bande LSH et dont au moins une offre est nouvelle
+    (les paires entre offres déjà connues ont été vérifiées aux runs précédents).
+    Dans chaque bande, les offres sont triées par clé et chaque offre est reliée à sa voisine de même clé :
+    un seau de k offres donne k - 1 paires (une chaîne), pas k².
+    `villes` (hash par offre) entre dans la clé de bande : seules des offres de la même ville sont candidates.
+    """
+    avec_texte = np.flatnonzero(~_sans_texte(signatures))
+    gauches, droites = [], []
+    for bande in range(NB_BANDES):
+        cles = _cles_bande(signatures, bande)
+        if villes is not None:
+            cles = cles * np.uint64(0x100000001B3) ^ villes
+        cles = cles[avec_texte]
+        ordre = np.argsort(cles, kind="stable")
+        cles, ordre = cles[ordre], avec_texte[ordre]
+        memes = cles[1:] == cles[:-1]
+        i, j = ordre[:-1][memes], ordre[1:][memes]
+        utiles = nouvelles[i] | nouvelles[j]
+        gauches.append(i[utiles])
+        droites.append(j[utiles])
+    if not gauches:
+        return np.zeros((0, 2), dtype="int64")
+    paires = np.column_stack([np.concatenate(gauches), np.concatenate(droites)]).astype("int64")
+    return np.unique(np.sort(paires, axis=1), axis=0)
+
+
+def similarites(signatures, paires):
+    """Jaccard estimé de chaque paire : part des permutations où les deux minimums sont égaux."""
+    similarite = np.zeros(len(paires))
+    for d in range(0, len(paires), TAILLE_LOT * 20):
+        bloc = paires[d:d + TAILLE_LOT * 20]
+        similarite[d:d + len(bloc)] = (signatures[bloc[:, 0]] == signatures[bloc[:, 1]]).mean(axis=1)
+    return similarite
+
+
+def compatibles(attributs, paires):
+    """Paires fusionnables : même ville, et sources différentes ou même entreprise (voir attributs_offres)."""
+    a, b = attributs[paires[:, 0]], attributs[paires[:, 1]]
+    return (a[:, 0] == b[:, 0]) & ((a[:, 2] != b[:, 2]) | (a[:, 1] == b[:, 1]))
+
+
+def composantes(nb, paires):
+    """Composantes connexes : étiquette = plus petit numéro d'offre de la composante (propagation vectorisée)."""
+    etiquettes = np.arange(nb)
+    if len(paires) == 0:
+        return etiquettes
+    while True:
+        avant = etiquettes.copy()
+        minimum = np.minimum(etiquettes[paires[:, 0]], etiquettes[paires[:, 1]])
+        np.minimum.at(etiquettes, paires[:, 0], minimum)
+        np.minimum.at(etiquettes, paires[:, 1], minimum)
+        etiquettes = etiquettes[etiquettes]   # Saut de pointeurs : converge en quelques tours
+        if np.array_equal(etiquettes, avant):
+            return etiquettes
+
+
+def grouper(signatures, nouvelles=None, paires_connues=None, attributs=None):
+    """
+    Groupe de chaque offre (étiquette = position de la 1re offre du groupe) : candidates LSH impliquant
+    une offre nouvelle (toutes par défaut), vérifiées sur la signature complète, plus les paires déjà connues.
+    `attributs` (attributs_offres) : candidates cherchées ville par ville, puis gardées si compatibles.
+    """
+    nouvelles = np.ones(len(signatures), dtype=bool) if nouvelles is None else nouvelles
+    paires = paires_candidates(signatures, nouvelles, None if attributs is None else attributs[:, 0])
+    paires = paires[similarites(signatures, paires) >= SEUIL_SIMILARITE]
+    if attributs is not None:
+        paires = paires[compatibles(attributs, paires)]
+    if paires_connues is not None:
+        paires = np.concatenate([paires_connues, paires])
+    return composantes(len(signatures), paires)
+
+
+def regrouper(df, chemin_signatures=None):
+    """
+    Groupe de chaque offre de df (ndarray, étiquette = position de la 1re offre du groupe).
+    Avec `chemin_signatures` : les offres déjà connues (même URL, même texte) reprennent leur signature
+    et leur groupe du run précédent, seules les nouvelles sont signées puis comparées aux seaux LSH ;
+    l'index est ensuite réécrit avec les offres de df.
+    """
+    if len(df) == 0:
+        return np.zeros(0, dtype="int64")
+    textes = textes_offres(df)
+    attributs = attributs_offres(df)
+    empreintes = empreintes_textes(textes, attributs)
+    urls = df["URL"].astype(str).to_numpy(dtype=object)
+
+    index = IndexSignatures.charger(chemin_signatures)
+    numeros = pd.Series(np.arange(len(index.urls)), index=index.urls)
+    numeros = numeros[~numeros.index.duplicated(keep="last")]
+    anciens = pd.Series(urls).map(numeros).fillna(-1).astype("int64").to_numpy()
+    connues = anciens >= 0
+    connues[connues] = index.empreintes[anciens[connues]] == empreintes[connues]
+    nouvelles = ~connues
+
+    signatures = np.empty((len(df), NB_PERMUTATIONS), dtype=np.uint32)
+    signatures[connues] = index.signatures[anciens[connues]]
+    if nouvelles.any():
+        print(f"🧬 [Doublons] Signatures MinHash de {nouvelles.sum()} offres ({connues.sum()} reprises du run précédent)...")
+        signatures[nouvelles] = signatures_minhash(textes[nouvelles].tolist())
+
+    # Groupes déjà connus : chaque offre est reliée à la 1re offre encore présente de son ancien groupe
+    positions_connues = np.flatnonzero(connues)
+    codes_groupes, _ = pd.factorize(index.groupes[anciens[connues]])
+    _, premieres = np.unique(codes_groupes, return_index=True)
+    paires_connues = np.column_stack([positions_connues, positions_connues[premieres[codes_groupes]]]).astype("int64")
+
+    groupes = grouper(signatures, nouvelles, paires_connues, attributs)
+    if chemin_signatures is not None:
+        IndexSignatures(urls, empreintes, signatures, groupes).sauvegarder(chemin_signatures)
+    return groupes
+
+# endregion
+# ======================================================================================================================================================
+
+# region 4. --- FUSION DES GROUPES ---
+
+def identifiants(urls):
+    """Identifiant canonique (16 caractères hexa) tiré de l'URL de l'offre retenue."""
+    return format_identifiants(pd.util.hash_array(np.asarray(urls, dtype=object)))
+
+
+def format_identifiants(hashs):
+    return pd.Series(hashs).map("{:016x}".format).to_numpy()
+
+
+def resumer_groupes(groupes, publication, expiration):
+    """
+    Tableaux alignés sur les offres (publication / expiration en datetime64, NaT = inconnue / encore active) :
+    - garder : True pour l'offre retenue de chaque groupe (la plus anciennement publiée, la 1re à égalité)
+    - retenue : position de l'offre retenue du groupe
+    - date_publication : plus ancienne du groupe
+    - date_expiration : NaT si une des offres du groupe est encore active, sinon la plus tardive
+    - multiples : True pour les offres d'un groupe de 2 offres ou plus
+    """
+    positions = np.arange(len(groupes))
+    dates_tri = publication.astype("int64")
+    dates_tri[np.isnat(publication)] = np.iinfo(np.int64).max   # Date inconnue : jamais retenue devant une date connue
+    ordre = np.lexsort((positions, dates_tri, groupes))
+    premieres = np.ones(len(ordre), dtype=bool)
+    premieres[1:] = groupes[ordre[1:]] != groupes[ordre[:-1]]
+    retenue = np.empty(len(groupes), dtype="int64")
+    retenue[groupes[ordre[premieres]]] = ordre[premieres]
+    retenue = retenue[groupes]
+
+    par_groupe = pd.DataFrame({"publication": publication, "expiration": expiration, "active": np.isnat(expiration)}).groupby(groupes)
+    tardive = par_groupe["expiration"].transform("max").to_numpy()
+    return {
+        "garder": retenue == positions,
+        "retenue": retenue,
+        "date_publication": par_groupe["publication"].transform("min").to_numpy(),
+        "date_expiration": np.where(par_groupe["active"].transform("any").to_numpy(), np.datetime64("NaT"), tardive),
+        "multiples": np.bincount(groupes, minlength=len(groupes))[groupes] > 1,
+    }
+
+
+def dedoublonner(df, chemin_signatures=None):
+    """
+    Fusion des quasi-doublons de df. Renvoie un DataFrame aligné sur df :
+    - Garder : True pour l'offre retenue de chaque groupe
+    - Date_Publication / Date_Expiration : dates du groupe (voir resumer_groupes) ;
+      les offres seules gardent leur Date_Expiration telle quelle
+    - Id_Canonique : identifiant du groupe (hash de l'URL de l'offre retenue)
+    """
+    groupes = regrouper(df, chemin_signatures)
+    publication = pd.to_datetime(df["Date_Publication"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    expiration = df["Date_Expiration"].to_numpy(dtype=object)
+    resume = resumer_groupes(groupes, publication, pd.to_datetime(pd.Series(expiration), errors="coerce").to_numpy(dtype="datetime64[ns]"))
+
+    date_expiration = expiration.copy()
+    multiples = resume["multiples"]
+    date_expiration[multiples] = pd.Series(resume["date_expiration"][multiples]).dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    date_expiration[multiples & np.isnat(resume["date_expiration"])] = None
+
+    return pd.DataFrame({
+        "Garder": resume["garder"],
+        "Date_Publication": resume["date_publication"],
+        "Date_Expiration": date_expiration,
+        "Id_Canonique": identifiants(df["URL"].astype(str).to_numpy(dtype=object)[resume["retenue"]]),
+    }, index=df.index)
+
+# endregion
@@ -0,0 +1,478 @@
+import re
+import numpy as np
+import pandas as pd
+
+# ======================================================================================================================================================
+
+# region 1. --- STACKS TECHNIQUES ---
+
+keywords = {
+        "Python": r"\bpython\b",
+        "SQL": r"\bsql\b",
+        "Excel": r"\bexcel\b",
+        "Power BI": r"power\s?bi", # Accepte "PowerBI" ou "Power BI"
+        "Tableau": r"\btableau\b",
+        "R": r"\bR\b",             # Attention, peut capter "R&D", mais souvent OK
+        "SAS": r"\bsas\b",
+        "VBA": r"\bvba\b",
+        "AWS": r"\baws\b",
+        "Azure": r"\bazure\b",
+        "GCP": r"\bgcp\b|google\scloud",
+        "Spark": r"\bspark\b",
+        "Hadoop": r"\bhadoop\b",
+        "Kafka": r"\bkafka\b",
+        "Airflow": r"\bairflow\b",
+        "Snowflake": r"\bsnowflake\b",
+        "Databricks": r"\bdatabricks\b",
+        "Docker": r"\bdocker\b",
+        "Kubernetes": r"\bkubernetes\b|k8s",
+        "Git": r"\bgit\b",
+        "Linux": r"\blinux\b",
+        "Pandas": r"\bpandas\b",
+        "TensorFlow": r"\btensorflow\b",
+        "PyTorch": r"\bpytorch\b",
+        "Scikit-learn": r"scikit[\s\-]learn|sklearn",
+        "Java": r"\bjava\b",       # Exclut Javascript grâce aux \b
+        "Scala": r"\bscala\b",
+        "C++": r"\bc\+\+",
+        "NoSQL": r"no\s?sql|mongo|cassandra",
+        "Dbt": r"\bdbt\b"
+    }
+
+def _prefixe_litteral(alternative):
+    """
+    Renvoie le texte fixe par lequel commence une alternative regex (ex: 'power' pour 'power\\s?bi').
+    Sert de pré-filtre rapide (opérateur `in`) avant de lancer la regex.
+    """
+    alternative = re.sub(r"^\\b", "", alternative)
+    prefixe = ""
+    i = 0
+    while i < len(alternative):
+        c = alternative[i]
+        if c == "\\" and i + 1 < len(alternative) and not alternative[i + 1].isalnum():
+            prefixe += alternative[i + 1] # Caractère échappé (ex: \+)
+            i += 2
+        elif c.isalnum():
+            prefixe += c
+            i += 1
+        else:
+            break
+    return prefixe
+
+
+class DetecteurStack:
+    """
+    Détecteur multi-motifs compilé une seule fois à partir du dictionnaire `keywords`.
+
+    - Les motifs du type \\bmot\\b sont résolus en UN seul passage : on découpe le texte en mots (\\w+)
+      et on fait une intersection d'ensembles (équivalent exact de la frontière de mot \\b).
+    - Les autres motifs (power\\s?bi, k8s, c++...) sont pré-filtrés par leur préfixe fixe
+      avant d'être confirmés par leur regex.
+
+    Le résultat est identique à l'ancienne recherche regex par techno (mêmes technos, même ordre ;
+    référence ligne par ligne : benchmarks/references_enrichissement.py).
+    """
+
+    MOT = re.compile(r"\w+")
+
+    def __init__(self, motifs=None):
+        motifs = motifs if motifs is not None else keywords
+        self.techs = list(motifs.keys())
+        self.mots = {}     # mot -> indices des technos
+        residus = {}       # indice techno -> alternatives non résolues par les mots
+
+        for i, pattern in enumerate(motifs.values()):
+            for alternative in pattern.split("|"):
+                match = re.fullmatch(r"\\b(\w+)\\b", alternative)
+                if match:
+                    self.mots.setdefault(match.group(1), []).append(i)
+                else:
+                    residus.setdefault(i, []).append(alternative)
+
+        self.ensemble_mots = frozenset(self.mots)
+        self.residus = [
+            (i, [_prefixe_litteral(a) for a in alternatives], re.compile("|".join(alternatives)))
+            for i, alternatives in residus.items()
+        ]
+
+    def indices(self, texte_lower):
+        """Renvoie l'ensemble des indices de technos trouvées dans un texte déjà en minuscules."""
+        found = set()
+        for mot in self.ensemble_mots.intersection(self.MOT.findall(texte_lower)):
+            found.update(self.mots[mot])
+        for i, prefixes, regex in self.residus:
+            if i in found:
+                continue
+            if any(p in texte_lower for p in prefixes) and regex.search(texte_lower):
+                found.add(i)
+        return found
+
+    def matrice(self, descriptions):
+        """
+        Travaille sur une colonne entière : renvoie un DataFrame booléen (une colonne par techno),
+        aligné sur l'index de `descriptions`.
+        """
+        descriptions = pd.Series(descriptions)
+        textes = descriptions.astype(str).str.lower()
+        valides = descriptions.notna().to_numpy()
+
+        matrice = np.zeros((len(descriptions), len(self.techs)), dtype=bool)
+        for ligne, (texte, valide) in enumerate(zip(textes.to_numpy(), valides)):
+            if valide:
+                for i in self.indices(texte):
+                    matrice[ligne, i] = True
+
+        return pd.DataFrame(matrice, index=descriptions.index, columns=self.techs)
+
+    def formater(self, matrice):
+        """Transforme la matrice booléenne en chaînes 'Python, SQL, ...' (format historique de Tech_Stack)."""
+        valeurs = matrice.to_numpy()
+        techs = np.array(self.techs, dtype=object)
+        return pd.Series(
+            [", ".join(techs[ligne]) for ligne in valeurs],
+            index=matrice.index,
+            dtype=object
+        )
+
+    def detecter_colonne(self, descriptions):
+        """Colonne de descriptions -> colonne Tech_Stack ('Python, SQL, ...')."""
+        return self.formater(self.matrice(descriptions))
+
+
+# Instance partagée (compilée une seule fois à l'import)
+detecteur_stack = DetecteurStack()
+
+def detecter_stack_colonne(descriptions):
+    return detecteur_stack.detecter_colonne(descriptions)
+
+# --------------------------------------------------
+
+# Une colonne uint8 par techno (1 = citée) : les comptages deviennent de simples sommes de colonnes
+PREFIXE_TECH = "Tech_"
+COLONNES_TECH = [PREFIXE_TECH + tech for tech in keywords]
+
+def matrice_stack_colonne(descriptions):
+    """Colonnes Tech_<techno> (uint8) pour une colonne de descriptions, dans l'ordre de `keywords`."""
+    matrice = detecteur_stack.matrice(descriptions).astype("uint8")
+    matrice.columns = COLONNES_TECH
+    return matrice
+
+
+def stack_depuis_matrice(matrice):
+    """Colonnes Tech_<techno> -> chaînes 'Python, SQL, ...' (Tech_Stack, gardée pour la lecture humaine)."""
+    return detecteur_stack.formater(matrice[COLONNES_TECH].astype(bool))
+
+
+def matrice_depuis_stack(tech_stack):
+    """
+    Chaînes Tech_Stack -> colonnes Tech_<techno> (uint8).
+    Sert pour l'historique écrit avant l'ajout des colonnes : appartenance exacte à la liste, pas de sous-chaîne.
+    """
+    techs = tech_stack.dropna().str.split(", ").explode()
+    techs = techs[techs.isin(keywords)]
+    matrice = (
+        pd.get_dummies(techs).groupby(level=0).max().astype("uint8")
+        .reindex(index=tech_stack.index, columns=list(keywords), fill_value=0)
+        .astype("uint8")
+    )
+    matrice.columns = COLONNES_TECH
+    return matrice
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- EXPÉRIENCE, CONTRATS & INCLUSION ---
+
+def nettoyer_contrats(df, verbeux=True, indices=None):
+    """
+    Nettoie et standardise la colonne Type_Contrat.
+    `indices` : résultat de extraire_indices(df) s'il est déjà calculé (sinon il est calculé ici).
+    """
+    if verbeux:
+        print("✨ Nettoyage et Harmonisation des Contrats...")
+    
+    # 1. Nettoyage de base : String + Strip + Capitalize
+    df["Type_Contrat"] = df["Type_Contrat"].astype(str).str.strip().str.capitalize()
+
+    # 2. Dictionnaire de traduction (Codes -> Libellés propres)
+    corrections_contrat = {
+        "Mis": "Intérim",
+        "Lib": "Freelance",
+        "Fra": "Freelance",
+        "Ind": "Freelance",
+        "Din": "CDI Intérimaire",
+        "Cdi": "CDI",
+        "Cdd": "CDD",
+        "Ddi": "CDD",  # Contrat à Durée Déterminée d'Insertion
+        "Cui": "CDD",  # Contrat Unique Insertion
+        "Cae": "CDD",  # Contrat d'accompagnement dans l'emploi
+        "Stage": "Stage / Alternance",
+        "Alternance": "Stage / Alternance",
+        "Apprentissage": "Stage / Alternance",
+        "Contrat pro": "Stage / Alternance",
+        "Stage / alternance": "Stage / Alternance",
+        "Professionalisation": "Stage / Alternance",
+        "Nan": "Non spécifié"
+    }
+    df["Type_Contrat"] = df["Type_Contrat"].replace(corrections_contrat)
+
+
+
+    # --- PRÉPARATION DES MASQUES (Les "Détecteurs", voir MOTIFS_TITRE / MOTIFS_DESCRIPTION) ---
+    if indices is None:
+        indices = extraire_indices(df)
+    indices = indices.set_axis(df.index)
+
+    # A. DÉTECTEUR CDI & CDD
+    mask_source_cdi = df['Type_Contrat'] == "CDI"
+    mask_titre_cdi = indices["has_cdi_title"]
+    mask_is_cdi_officiel = mask_source_cdi | mask_titre_cdi
+
+    mask_source_cdd = df['Type_Contrat'] == "CDD"
+    mask_titre_cdd = indices["has_cdd_title"]
+    mask_is_cdd_officiel = mask_source_cdd | mask_titre_cdd
+
+    # A. DÉTECTEUR SENIOR / MANAGER (Liste Noire pour Stage)
+    mask_titre_senior = indices["is_senior_title"]
+
+    # B. DÉTECTEUR ÉTUDIANT
+    mask_titre_etudiant = indices["is_student_title"]
+
+    # C. DÉTECTEUR CDI CACHÉ (Le plus complexe)
+    # 1. Inclusion : On cherche "CDI" ou "Durée indéterminée"
+    mask_contient_cdi = indices["has_cdi_mention"]
+
+    # 2. Exclusion : On fuit "possibilité de CDI", "vue sur CDI", etc.
+    #regex_cdi_piege = r"(?:possibilit|perspective|débouch|vue|objectif|finalité|suite|embauche|stage|futur|après).{0,30}\bCDI\b"
+    #mask_cdi_piege = df['Description'].astype(str).str.contains(regex_cdi_piege, case=False, regex=True, na=False)
+
+    # 3. Résultat : C'est un VRAI CDI Caché
+    mask_vrai_cdi_cache = mask_contient_cdi 
+    #& (~mask_cdi_piege)
+
+
+    # --- APPLICATION DES RÈGLES (Ordre Chronologique) ---
+    
+    df.loc[mask_titre_etudiant, 'Type_Contrat'] = "Stage / Alternance"
+    # On écrase "Stage" par CDI si...
+    # - La source dit CDI (et ce n'est pas "Stagiaire" explicite)
+    # - OU C'est un Senior (Titre)
+    # - OU On a trouvé un CDI propre dans la description
+    
+    mask_force_cdi = (
+        (mask_is_cdi_officiel & ~mask_titre_etudiant) |  # Source CDI (sauf si titre "Stagiaire")
+        mask_titre_senior |                              # Senior / Expert
+        mask_vrai_cdi_cache                              # Description CDI clean
+    )
+    
+    # On applique le CDI uniquement si ce n'est pas déjà détecté comme Freelance    
+    mask_final_cdi = mask_force_cdi & (df['Type_Contrat'] != "Freelance")
+    
+    if mask_final_cdi.sum() > 0:
+        df.loc[mask_final_cdi, 'Type_Contrat'] = "CDI"
+    
+    # 3. Correction Freelance (Le dernier mot)
+    mask_freelance = indices["is_freelance_title"]
+    df.loc[mask_freelance, 'Type_Contrat'] = "Freelance"
+    df.loc[mask_is_cdd_officiel, 'Type_Contrat'] = "CDD"
+
+    return df    
+# --------------------------------------------------
+
+# --- INDICES TEXTUELS (un seul passage par texte) ---
+# Les détecteurs d'expérience, de CDI et de RQTH (anciennes versions : benchmarks/references_enrichissement.py) réunis
+# en une regex par colonne, appliquée une fois au texte mis en minuscules
+# (les accents sont gardés : ".{0,20}" et "à" doivent compter comme avant). finditer donne le 1er match de chaque
+# motif, celui que donnerait re.search, et ne consomme que le 1er caractère de chaque motif : deux indices qui se
+# chevauchent ("12 ans d'expérience en CDI") sont tous les deux vus.
+# Chaque motif est repéré par son caractère le plus rare (chiffre, x de "exp", q de "rqth", h, c, é), le reste
+# est vérifié autour par lookbehind / lookahead : le moteur saute tous les autres caractères sans rien tester.
+REGEX_DESCRIPTION = re.compile(r"""[\dxqhcé](?:
+      (?<=(?P<chiffre1>\d))(?P<chiffre2>\d)?                                                   # "3 ans d'exp"
+          (?=\s*(?:-|à)?\s*(?:\d{1,2})?\s*(?:ans|années|years).{0,20}exp)(?P<annees_avant>)
+    | (?<=ex)(?=p.{0,20}(?P<nb_apres>\d{1,2})\s*(?:ans|années|years))(?P<annees_apres>)     # "exp. de 3 ans"
+    | (?<=\bc)(?=di\b)(?P<cdi>) | (?<=\bduré)(?=e\ indéterminée\b)(?P<duree_indeterminee>)    # CDI caché
+    | (?<=rq)(?=th)(?P<rqth>) | (?<=h)(?=andicap)(?P<handicap>)                               # RQTH
+    | (?<=entreprise\ adapté)(?=e)(?P<entreprise_adaptee>)
+)""", re.VERBOSE)
+
+# Titres (courts) : un \b commun, puis un motif par indice. "freelance" est aussi un titre senior :
+# il n'est que dans le motif freelance (une seule lookahead gagne à une position donnée)
+MOTIFS_TITRE = {
+    "cdi": r"cdi\b",
+    "cdd": r"cdd\b",
+    "etudiant": r"(?:stage|stagiaire|internship|alternance|alternant|apprentissage|contrat pro|pfe)\b",
+    "senior": r"(?:senior|lead|manager|directeur|head of|chef de projet|international|expert|responsable)\b",
+    "freelance": r"(?:freelance|indépendant|independant|free-lance|b2b)\b",
+}
+REGEX_TITRE = re.compile(r"\b(?:" + "|".join(f"(?=(?P<{nom}>{motif}))" for nom, motif in MOTIFS_TITRE.items()) + ")")
+
+
+def _indices_description(texte):
+    """(années d'expérience ou None, mention CDI, mention RQTH) d'une description en minuscules."""
+    avant = apres = None
+    cdi = rqth = False
+    for match in REGEX_DESCRIPTION.finditer(texte):
+        nom = match.lastgroup
+        if nom == "annees_avant":
+            if avant is None:
+                avant = int(match.group("chiffre1") + (match.group("chiffre2") or ""))
+        elif nom == "annees_apres":
+            if apres is None:
+                apres = int(match.group("nb_apres"))
+        elif nom in ("cdi", "duree_indeterminee"):
+            cdi = True
+        else:
+            rqth = True
+    # Même règle que l'ancien extraire_annees_exp : le 1er motif prime, valeurs aberrantes écartées
+    annees = avant if avant is not None else apres
+    if annees is not None and (annees > 15 or annees < 0):
+        annees = None
+    return annees, cdi, rqth
+
+
+def _indices_titre(texte):
+    """Motifs de MOTIFS_TITRE présents dans un titre en minuscules (+ 'freelance' au sens senior)."""
+    trouves = set()
+    for match in REGEX_TITRE.finditer(texte):
+        trouves.add(match.lastgroup)
+        if match.lastgroup == "freelance" and match.group("freelance") == "freelance":
+            trouves.add("senior")
+    return trouves
+
+
+def extraire_indices(df):
+    """
+    Indices textuels typés de chaque offre, en un passage par Description et un par Titre :
+    Annees_Exp (float, NaN si inconnu), has_cdi_mention, is_student_title, is_senior_title,
+    is_freelance_title, has_cdi_title, has_cdd_title, Handicap_Friendly (bool).
+    Mêmes valeurs que les anciens détecteurs ligne par ligne (benchmarks/references_enrichissement.py)
+    et les masques historiques de nettoyer_contrats.
+    """
+    descriptions = df["Description"].to_numpy(dtype=object)
+    description = [_indices_description(t.lower()) if isinstance(t, str) else (None, False, False) for t in descriptions]
+    # Titre manquant : lu comme le texte "nan" par les anciens masques, qui ne contient aucun motif
+    titres = [_indices_titre(str(t).lower()) for t in df["Titre"].to_numpy(dtype=object)]
+    annees, cdi, rqth = zip(*description) if description else ((), (), ())
+    return pd.DataFrame({
+        "Annees_Exp": np.array(annees, dtype=float),
+        "has_cdi_mention": np.array(cdi, dtype=bool),
+        "is_student_title": np.array(["etudiant" in t for t in titres], dtype=bool),
+        "is_senior_title": np.array(["senior" in t for t in titres], dtype=bool),
+        "is_freelance_title": np.array(["freelance" in t for t in titres], dtype=bool),
+        "has_cdi_title": np.array(["cdi" in t for t in titres], dtype=bool),
+        "has_cdd_title": np.array(["cdd" in t for t in titres], dtype=bool),
+        "Handicap_Friendly": np.array(rqth, dtype=bool),
+    }, index=df.index)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 3. --- NIVEAU D'EXPÉRIENCE ---
+
+# Mots-clés du titre
+MOTS_TITRE_SENIOR = ["senior", "lead", "manager", "head of", "directeur", "expert", "principal", "vp", "chef"]
+MOTS_TITRE_JUNIOR = ["junior", "débutant", "assistant", "graduate"]
+
+# Zone A : Paris & IDF
+MOTS_IDF = ['paris', 'île-de-france', 'ile-de-france', 'boulogne', 'courbevoie', 'la défense', '92', '75', '93', '94']
+# Zone B : Grandes Métropoles (Marché dynamique)
+MOTS_METROPOLES = ['lyon', 'toulouse', 'bordeaux', 'nantes', 'lille', 'aix', 'marseille', 'nice', 'rennes', 'sophia', 'antipolis']
+
+# Seuils (junior, senior) par zone : IDF / Métropoles / Reste de la France
+SEUILS_IDF = (40000, 60000)
+SEUILS_METROPOLES = (37000, 52000)   # Un junior à Lyon peut toucher 36-37k, 52k à Bordeaux c'est un profil Senior
+SEUILS_AUTRES = (34000, 48000)
+
+
+def _en_minuscules(serie):
+    """str(x).lower() pour les valeurs renseignées, "" pour les manquantes."""
+    return serie.where(serie.notna(), "").astype(str).str.lower()
+
+def _contient_un_de(serie_lower, mots):
+    """Masque : la chaîne contient au moins un des mots (sous-chaîne, comme `any(m in s ...)`)."""
+    return serie_lower.str.contains("|".join(re.escape(m) for m in mots), regex=True).to_numpy(dtype=bool)
+
+
+def determiner_niveau_colonne(df):
+    """
+    Niveau de chaque offre, calculé colonne par colonne (même résultat que l'ancienne règle ligne par ligne,
+    benchmarks/references_enrichissement.py).
+    Les masques (zones, seuils, mots-clés du titre) sont calculés une seule fois sur toute la colonne,
+    puis l'ordre de priorité des règles est résolu par np.select.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    titre = _en_minuscules(df['Titre'])
+    lieu = _en_minuscules(df['Ville'])
+    contrat = _en_minuscules(df['Type_Contrat'])
+    salaire = pd.to_numeric(df['Salaire_Annuel'], errors='coerce').to_numpy(dtype=float)
+    annees = pd.to_numeric(df['Annees_Exp'], errors='coerce').to_numpy(dtype=float)
+
+    # --- Masques ---
+    annees_connues = ~np.isnan(annees)
+    # Reproduit la règle historique telle quelle (le contrat est comparé après passage en minuscules)
+    mask_formation = contrat.str.contains("Stage / Alternance", regex=False).to_numpy(dtype=bool)
+    mask_titre_senior = _contient_un_de(titre, MOTS_TITRE_SENIOR)
+    mask_titre_junior = _contient_un_de(titre, MOTS_TITRE_JUNIOR)
+    mask_titre_confirme = titre.str.contains("confirmé", regex=False).to_numpy(dtype=bool)
+
+    # --- Seuils selon la géographie ---
+    mask_idf = _contient_un_de(lieu, MOTS_IDF)
+    mask_metropole = _contient_un_de(lieu, MOTS_METROPOLES)
+    seuil_junior = np.select([mask_idf, mask_metropole], [SEUILS_IDF[0], SEUILS_METROPOLES[0]], SEUILS_AUTRES[0])
+    seuil_senior = np.select([mask_idf, mask_metropole], [SEUILS_IDF[1], SEUILS_METROPOLES[1]], SEUILS_AUTRES[1])
+
+    salaire_connu = ~np.isnan(salaire) & (np.nan_to_num(salaire) > 0)
+
+    # --- Ordre de priorité des règles ---
+    with np.errstate(invalid='ignore'):
+        conditions = [
+            annees_connues & (annees > 5),
+            annees_connues & (annees > 2),
+            mask_formation,
+            mask_titre_senior,
+            salaire_connu & (salaire <= seuil_junior),
+            salaire_connu & (salaire < seuil_senior),
+            salaire_connu,
+            annees_connues & (annees <= 2),
+            mask_titre_junior,
+            mask_titre_confirme,
+        ]
+    choix = ["Senior", "Confirmé", "En formation", "Senior", "Junior", "Confirmé", "Senior", "Junior", "Junior", "Confirmé"]
+
+    niveaux = np.select(conditions, choix, default="Non spécifié")
+    return pd.Series(niveaux, index=df.index, dtype=object)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 4. --- ENRICHISSEMENT COMPLET ---
+
+# Colonnes lues et colonnes calculées par enrichir_offres
+COLONNES_A_ENRICHIR = ["Titre", "Ville", "Description", "Type_Contrat", "Salaire_Annuel"]
+COLONNES_ENRICHIES = ["Annees_Exp", "Type_Contrat", "Niveau", "Tech_Stack", "Handicap_Friendly"] + COLONNES_TECH
+
+
+def enrichir_offres(df):
+    """
+    Toutes les colonnes calculées d'un lot d'offres (DataFrame aligné sur df, colonnes COLONNES_ENRICHIES).
+    Chaque ligne est traitée indépendamment des autres : un lot peut être découpé en partitions (parallele.py).
+    """
+    offres = df[COLONNES_A_ENRICHIR].copy()
+    # Un seul passage par Description et par Titre pour l'expérience, les indices de contrat et la RQTH
+    indices = extraire_indices(offres)
+    offres["Annees_Exp"] = indices["Annees_Exp"]
+    offres = nettoyer_contrats(offres, verbeux=False, indices=indices)
+    # Calcul colonne par colonne (voir determiner_niveau_colonne)
+    offres["Niveau"] = determiner_niveau_colonne(offres)
+    # Un seul passage par description (voir DetecteurStack) :
+    # une colonne Tech_<techno> (0/1) par techno, et Tech_Stack en texte pour la lecture
+    matrice_tech = matrice_stack_colonne(offres["Description"])
+    offres["Tech_Stack"] = stack_depuis_matrice(matrice_tech)
+    offres["Handicap_Friendly"] = indices["Handicap_Friendly"]
+    offres[COLONNES_TECH] = matrice_tech
+    return offres[COLONNES_ENRICHIES]
+
+# endregion
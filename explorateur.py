@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Explorateur d'offres paginé (app.py).
+# Le navigateur ne reçoit plus toutes les offres actives : la recherche, le tri et le découpage en pages
+# se font ici, sur des positions (iloc), et seule la page affichée (+ une petite fenêtre d'avance) est sérialisée.
+# - À la construction : un rang entier par colonne triable (un seul tri des valeurs par instantané)
+#   -> trier une sélection = argsort d'entiers sur les positions sélectionnées, jamais sur des chaînes
+# - Recherche : texte "Titre Entreprise" en minuscules, calculé une fois par instantané
+# Partagé par toutes les sessions (comme MoteurFiltres) : rien n'est modifié après la construction.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+TAILLE_PAGE = 50
+PREFETCH_LIGNES = 25   # Lignes de la page suivante envoyées avec la page (défilement sans rerun)
+COLONNES_RECHERCHE = ["Titre", "Entreprise"]
+
+class Explorateur:
+    """
+    Exemple :
+        explorateur = Explorateur(df, colonnes_tri=["Date_Publication", "Titre", "Ville"])
+        positions = explorateur.rechercher(positions_actives, "data engineer")
+        positions = explorateur.trier(positions, "Date_Publication", croissant=False)
+        page = explorateur.page(df, positions, numero=0)
+    """
+
+    def __init__(self, df, colonnes_tri, colonnes_recherche=COLONNES_RECHERCHE):
+        self.rangs = {}       # colonne -> rang de chaque offre
+        self.rangs_nan = {}   # colonne -> rang donné aux offres sans valeur (après toutes les valeurs)
+        for colonne in colonnes_tri:
+            if colonne in df.columns:
+                codes, valeurs = pd.factorize(df[colonne], sort=True)
+                self.rangs_nan[colonne] = len(valeurs)
+                self.rangs[colonne] = np.where(codes < 0, len(valeurs), codes).astype("int64")
+
+        colonnes = [c for c in colonnes_recherche if c in df.columns]
+        if colonnes:
+            texte = df[colonnes[0]].astype(str).where(df[colonnes[0]].notna(), "")
+            for colonne in colonnes[1:]:
+                texte = texte + " " + df[colonne].astype(str).where(df[colonne].notna(), "")
+            self.textes = texte.str.lower().to_numpy(dtype=object)
+        else:
+            self.textes = np.full(len(df), "", dtype=object)
+
+    def rechercher(self, positions, texte):
+        """Positions dont le titre ou l'entreprise contient tous les mots de `texte` (insensible à la casse)."""
+        mots = (texte or "").lower().split()
+        if not mots:
+            return positions
+        textes = pd.Series(self.textes[positions], copy=False)
+        masque = np.ones(len(positions), dtype=bool)
+        for mot in mots:
+            masque &= textes.str.contains(mot, regex=False).to_numpy()
+        return positions[masque]
+
+    def trier(self, positions, colonne, croissant=True):
+        """Positions réordonnées selon `colonne` (tri stable : à égalité, l'ordre du fichier est conservé)."""
+        if colonne not in self.rangs:
+            return positions
+        rangs = self.rangs[colonne][positions]
+        if not croissant:
+            # On inverse les rangs plutôt que le résultat : les NaN restent en dernier, l'ordre des égalités aussi
+            rang_nan = self.rangs_nan[colonne]
+            rangs = np.where(rangs == rang_nan, rang_nan, -rangs)
+        return positions[np.argsort(rangs, kind="stable")]
+
+    @staticmethod
+    def nb_pages(positions, taille_page=TAILLE_PAGE):
+        return max(1, -(-len(positions) // taille_page))
+
+    @staticmethod
+    def page(df, positions, numero, taille_page=TAILLE_PAGE, prefetch=PREFETCH_LIGNES, colonnes=None):
+        """Lignes de la page `numero` (à partir de 0) suivies des `prefetch` premières lignes de la page d'après."""
+        debut = numero * taille_page
+        fenetre = positions[debut:debut + taille_page + prefetch]
+        if colonnes is None:
+            return df.iloc[fenetre]
+        return df.iloc[fenetre, df.columns.get_indexer(colonnes)]
@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Moteur de filtres de la sidebar (app.py).
+# - À la construction : un bitmap (bits compressés, 1 bit par offre) par valeur de chaque dimension
+# - Une sélection = OU des bitmaps des valeurs choisies dans chaque dimension, puis ET entre dimensions
+#   (une dimension où tout est coché coûte un seul bitmap "non vide", pas un OU sur toutes ses valeurs)
+# - Les résultats (positions des offres) sont mémorisés par sélection, avec éviction LRU :
+#   un rerun "cosmétique" (slider, changement d'onglet) ne refait aucun calcul
+# Partagé par toutes les sessions : le cache est protégé par un verrou, les résultats sont en lecture seule.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+TAILLE_CACHE = 64
+
+class MoteurFiltres:
+    """
+    Exemple :
+        moteur = MoteurFiltres(df[["Source", "Ville", "Actif"]])
+        positions = moteur.selectionner(Source=["Apec"], Ville=["Paris", "Lyon"], Actif=[True])
+        df.iloc[positions]
+
+    Même règle que `serie.isin(valeurs)` : une valeur NaN dans la liste sélectionne les offres sans valeur.
+    """
+
+    def __init__(self, colonnes, taille_cache=TAILLE_CACHE):
+        self.nb_lignes = len(colonnes)
+        self.bitmaps = {}     # dimension -> {valeur: bitmap}
+        self.non_vides = {}   # dimension -> bitmap des offres qui ont une valeur
+        self.vides = {}       # dimension -> bitmap des offres sans valeur (NaN)
+
+        for dimension in colonnes.columns:
+            codes, valeurs = pd.factorize(colonnes[dimension])
+            ordre = np.argsort(codes, kind="stable")
+            bornes = np.searchsorted(codes[ordre], np.arange(-1, len(valeurs) + 1))
+            self.vides[dimension] = self._bitmap(ordre[bornes[0]:bornes[1]])
+            self.non_vides[dimension] = self._bitmap(ordre[bornes[1]:])
+            self.bitmaps[dimension] = {
+                valeur: self._bitmap(ordre[bornes[k + 1]:bornes[k + 2]]) for k, valeur in enumerate(valeurs)
+            }
+
+        self.taille_cache = taille_cache
+        self._cache = OrderedDict()
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.calculs = 0
+
+    def _bitmap(self, positions):
+        bits = np.zeros(self.nb_lignes, dtype=bool)
+        bits[positions] = True
+        return np.packbits(bits)
+
+    def _bitmap_dimension(self, dimension, valeurs):
+        """OU des bitmaps des valeurs choisies (O(nb de valeurs choisies))."""
+        par_valeur = self.bitmaps[dimension]
+        presentes = [v for v in valeurs if v is not None and v in par_valeur]
+        if len(presentes) == len(par_valeur):
+            masque = self.non_vides[dimension]
+        elif presentes:
+            masque = np.bitwise_or.reduce([par_valeur[v] for v in presentes])
+        else:
+            masque = np.zeros_like(self.non_vides[dimension])
+        if None in valeurs:
+            masque = masque | self.vides[dimension]
+        return masque
+
+    @staticmethod
+    def _cle(selection):
+        """Clé de cache indépendante de l'ordre des valeurs cochées (NaN -> None)."""
+        return tuple(sorted(
+            (dimension, frozenset(None if pd.isna(v) else v for v in valeurs))
+            for dimension, valeurs in selection.items() if valeurs is not None
+        ))
+
+    def selectionner(self, **selection):
+        """
+        Positions (iloc) des offres qui correspondent à la sélection.
+        `dimension=liste de valeurs` ; None = pas de filtre sur la dimension.
+        """
+        cle = self._cle(selection)
+        with self._verrou:
+            if cle in self._cache:
+                self._cache.move_to_end(cle)
+                self.succes += 1
+                return self._cache[cle]
+
+        masque = None
+        for dimension, valeurs in cle:
+            bitmap = self._bitmap_dimension(dimension, valeurs)
+            masque = bitmap if masque is None else masque & bitmap
+        if masque is None:
+            positions = np.arange(self.nb_lignes)
+        else:
+            positions = np.flatnonzero(np.unpackbits(masque, count=self.nb_lignes))
+        positions.setflags(write=False)
+
+        with self._verrou:
+            self.calculs += 1
+            self._cache[cle] = positions
+            self._cache.move_to_end(cle)
+            while len(self._cache) > self.taille_cache:
+                self._cache.popitem(last=False)
+        return positions
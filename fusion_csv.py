@@ -1,7 +1,26 @@
 import pandas as pd
+import numpy as np
 import os
+import sys
+import shutil
+import tempfile
 from datetime import datetime
-import re
+from enrichissement import (
+    enrichir_offres, COLONNES_A_ENRICHIR, COLONNES_ENRICHIES, COLONNES_TECH, matrice_depuis_stack
+)
+from parallele import executer_par_partitions
+from utils import (
+    sauvegarde_securisee, charger_donnees, donnees_existent, date_modification, empreinte_fichier, ecrire_json,
+    lire_par_morceaux, EcritureParMorceaux
+)
+from cube import construire_cube
+from search_index import IndexInverse, COLONNES_INDEX
+from doublons import (
+    dedoublonner, signatures_minhash, textes_offres, attributs_offres, grouper, resumer_groupes, format_identifiants,
+    NB_PERMUTATIONS, COLONNES_ATTRIBUTS
+)
+from fusion_flux import IndexOffres, taille_morceau, LIGNES_ECHANTILLON
+from journal_offres import journaliser
 
 # ------------------------------------------------------------------------------------------------------------------------------------------------------
 
@@ -23,11 +42,57 @@ FILE_WTTJ = os.path.join(project_root, "data", "clean", "offres_wttj_clean.csv")
 FILE_APEC = os.path.join(project_root, "data", "clean", "offres_apec_clean.csv")
 
 OUTPUT_CSV = os.path.join(project_root, "data", "clean", "global_job_market.csv")
+# Agrégats pré-calculés pour le dashboard (voir cube.py)
+OUTPUT_CUBE = os.path.join(project_root, "data", "clean", "global_cube.csv")
+# Index inversé des textes pour la recherche par mots-clés du dashboard (voir search_index.py)
+OUTPUT_INDEX = os.path.join(project_root, "data", "clean", "global_index.npz")
+# Signatures MinHash des offres, reprises d'un run à l'autre pour la détection des quasi-doublons (voir doublons.py)
+OUTPUT_SIGNATURES = os.path.join(project_root, "data", "clean", "global_signatures.npz")
+# Manifeste de la version publiée (lu par le dashboard pour recharger à chaud)
+OUTPUT_MANIFESTE = os.path.join(project_root, "data", "clean", "global_manifest.json")
+
+# Mode incrémental par défaut : on ne ré-enrichit que les offres nouvelles ou modifiées.
+# "python fusion_csv.py --complet" force le recalcul de tout l'historique (ex: après une modif des règles).
+MODE_COMPLET = "--complet" in sys.argv
+
+# Fusion par morceaux pour un historique trop gros pour la mémoire (ex: millions d'offres sur une petite VM) :
+# "python fusion_csv.py --flux" ; la taille des morceaux découle du budget mémoire FUSION_BUDGET_MO (voir fusion_flux.py)
+MODE_FLUX = "--flux" in sys.argv
+BUDGET_MEMOIRE_MO = float(os.getenv("FUSION_BUDGET_MO", "256"))
+
+# Colonnes qui définissent le "contenu" d'une offre (si elles changent, on ré-enrichit) :
+# toutes celles que lit l'enrichissement, sinon une offre reprise de l'historique garderait un Niveau périmé (Ville)
+COLS_EMPREINTE = COLONNES_A_ENRICHIR
+
+# Les 3 sources : fichier propre + spécificités à appliquer au chargement
+SOURCES = {
+    "francetravail": {"fichier": FILE_FT, "nom": "France Travail", "source": None, "teletravail_inconnu": True},
+    "wttj": {"fichier": FILE_WTTJ, "nom": "WTTJ", "source": "Welcome to the Jungle", "teletravail_inconnu": False},
+    "apec": {"fichier": FILE_APEC, "nom": "APEC", "source": "Apec", "teletravail_inconnu": True},
+}
+RENOMMAGE = {
+    "Ville_Clean": "Ville",
+    "Salaire_Annuel_Estime": "Salaire_Annuel",
+    "Description_Propre": "Description",
+    "Date": "Date_Publication"
+}
+cols_globales = [
+    "Titre", "Entreprise", "Ville", "Salaire_Annuel", "Salaire_Annuel_Min", "Salaire_Annuel_Max", "Type_Contrat",
+    "Teletravail", "Date_Publication", "Date_Expiration", "Source", "URL", "Description"
+]
+# Colonnes du fichier global (ordre d'une fusion complète)
+cols_sortie = cols_globales + ["Empreinte", "Id_Canonique", "Annees_Exp", "Niveau", "Tech_Stack", "Handicap_Friendly"] + COLONNES_TECH
+
+# Préparation d'une source seule (lancée par run_pipeline dès que son fichier propre est prêt) :
+# "python fusion_csv.py --preparer wttj" écrit data/staging/fusion_wttj.csv, relu ensuite par la fusion
+DOSSIER_PREPARATION = os.path.join(project_root, "data", "staging")
+SOURCE_A_PREPARER = sys.argv[sys.argv.index("--preparer") + 1] if "--preparer" in sys.argv else None
 
 # Création du dossier final s'il n'existe pas
 os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
 
-print("🧪 Démarrage de la fusion...")
+if SOURCE_A_PREPARER is None:
+    print("🧪 Démarrage de la fusion...")
 # endregion
 
 # ======================================================================================================================================================
@@ -38,6 +103,9 @@ def normaliser_date(date_str):
     """Force le format AAAA-MM-JJ pour éviter les bugs Streamlit"""
     if pd.isna(date_str) or date_str == "" or str(date_str).lower() == "nan":
         return None
+    # Historique Parquet : les dates y sont déjà typées (datetime64)
+    if isinstance(date_str, datetime):
+        return date_str.strftime("%Y-%m-%d")
     date_str = str(date_str).strip()
     try:
         # Tente le format français (31/01/2025)
@@ -50,416 +118,510 @@ def normaliser_date(date_str):
             return None
 # --------------------------------------------------        
 
-def extraire_annees_exp(description):
+def standardiser_textes(df, verbeux=True):
     """
-    Extrait le nombre d'années d'expérience du texte.
-    Renvoie un entier ou None.
+    Harmonise les villes (arrondissements) et nettoie les guillemets résiduels
+    des colonnes texte (Titre, Entreprise, Ville).
     """
-    if pd.isna(description): return None
-    description = description.lower()
-
-    annees = None
-    #pattern_a = r"(\d{1,2})\s*?(?:-|\s)?\s*?(?:ans|années|years|year).*?(?:exp|expérience|experience)"  
-    pattern_a = r"(\d{1,2})\s*(?:-|à)?\s*(?:\d{1,2})?\s*(?:ans|années|years).{0,20}exp"  
-    match_a = re.search(pattern_a, description)
-    #pattern_b = r"(?:exp|expérience|experience).{0,20}?(\d{1,2})"
-    pattern_b = r"exp.{0,20}(\d{1,2})\s*(?:ans|années|years)"
-    match_b = re.search(pattern_b, description)
-
-    if match_a:
-        try: annees = int(match_a.group(1))
-        except ValueError: pass
-    elif match_b:
-        try: annees = int(match_b.group(1))
-        except ValueError: pass
-        
-    # Filtre de sécurité pour éviter les chiffres aberrants
-    if annees is not None and (annees > 15 or annees < 0):
-        return None
-        
-    return annees
+    if verbeux:
+        print("🧹 Standardisation des grandes villes (Arrondissements)...")
+
+    df['Ville'] = df['Ville'].astype(str).str.replace(r'(?i)^paris.*', 'Paris', regex=True)
+    df['Ville'] = df['Ville'].str.replace(r'(?i)^lyon.*', 'Lyon', regex=True)
+    df['Ville'] = df['Ville'].str.replace(r'(?i)^marseille.*', 'Marseille', regex=True)
+
+    # Correction spécifique pour "La Défense" qui apparaît parfois comme "Puteaux" ou "Courbevoie"
+    # (Optionnel, mais utile pour regrouper les offres de ce hub)
+    # df['Ville'] = df['Ville'].replace(['Courbevoie', 'Puteaux', 'Nanterre'], 'La Défense')
+
+    if verbeux:
+        print("✨ Nettoyage des guillemets résiduels...")
+    cols_text = ['Titre', 'Entreprise', 'Ville']
+    for col in cols_text:
+        # On force en string, on remplace les " et on enlève les espaces vides
+        df[col] = df[col].astype(str).str.replace('"', '', regex=False).str.strip()
+
+        # On enlève les "nan" qui apparaissent parfois lors de la conversion string
+        df[col] = df[col].replace('nan', 'Non spécifié')
+
+    return df
 # --------------------------------------------------
 
-def nettoyer_contrats(df):
+def calculer_empreinte(df):
+    """
+    Hash du contenu d'une offre (COLS_EMPREINTE), calculé en une passe vectorisée.
+    Renvoyé en texte pour être relu sans perte depuis le CSV.
     """
-    Nettoie et standardise la colonne Type_Contrat.
+    contenu = df[COLS_EMPREINTE].astype(str)
+    return pd.util.hash_pandas_object(contenu, index=False).astype(str)
 
+# --------------------------------------------------
+
+def reprendre_enrichissement(df, historique):
     """
-    print("✨ Nettoyage et Harmonisation des Contrats...")
-    
-    # 1. Nettoyage de base : String + Strip + Capitalize
-    df["Type_Contrat"] = df["Type_Contrat"].astype(str).str.strip().str.capitalize()
-
-    # 2. Dictionnaire de traduction (Codes -> Libellés propres)
-    corrections_contrat = {
-        "Mis": "Intérim",
-        "Lib": "Freelance",
-        "Fra": "Freelance",
-        "Ind": "Freelance",
-        "Din": "CDI Intérimaire",
-        "Cdi": "CDI",
-        "Cdd": "CDD",
-        "Ddi": "CDD",  # Contrat à Durée Déterminée d'Insertion
-        "Cui": "CDD",  # Contrat Unique Insertion
-        "Cae": "CDD",  # Contrat d'accompagnement dans l'emploi
-        "Stage": "Stage / Alternance",
-        "Alternance": "Stage / Alternance",
-        "Apprentissage": "Stage / Alternance",
-        "Contrat pro": "Stage / Alternance",
-        "Stage / alternance": "Stage / Alternance",
-        "Professionalisation": "Stage / Alternance",
-        "Nan": "Non spécifié"
-    }
-    df["Type_Contrat"] = df["Type_Contrat"].replace(corrections_contrat)
-
-
-
-    # --- PRÉPARATION DES MASQUES (Les "Détecteurs") ---
-
-    # A. DÉTECTEUR CDI & CDD
-    mask_source_cdi = df['Type_Contrat'] == "CDI"
-    mask_titre_cdi = df['Titre'].astype(str).str.contains(r"\bCDI\b", case=False, regex=True, na=False)
-    mask_is_cdi_officiel = mask_source_cdi | mask_titre_cdi
-
-    mask_source_cdd = df['Type_Contrat'] == "CDD"
-    mask_titre_cdd = df['Titre'].astype(str).str.contains(r"\bCDD\b", case=False, regex=True, na=False)
-    mask_is_cdd_officiel = mask_source_cdd | mask_titre_cdd
-
-    # A. DÉTECTEUR SENIOR / MANAGER (Liste Noire pour Stage)
-    regex_titre_senior = r"\b(?:senior|lead|manager|directeur|head of|chef de projet|international|freelance|expert|responsable)\b"
-    mask_titre_senior = df['Titre'].astype(str).str.contains(regex_titre_senior, case=False, regex=True, na=False)
-
-    # B. DÉTECTEUR ÉTUDIANT
-    regex_etudiants = r"\b(?:stage|stagiaire|internship|alternance|alternant|apprentissage|contrat pro|pfe)\b"    
-    mask_titre_etudiant = df['Titre'].astype(str).str.contains(regex_etudiants, case=False, regex=True, na=False)
-
-    # C. DÉTECTEUR CDI CACHÉ (Le plus complexe)
-    # 1. Inclusion : On cherche "CDI" ou "Durée indéterminée"
-    regex_cdi = r"\b(?:CDI|durée indéterminée)\b"
-    mask_contient_cdi = df['Description'].astype(str).str.contains(regex_cdi, case=False, regex=True, na=False)
-
-    # 2. Exclusion : On fuit "possibilité de CDI", "vue sur CDI", etc.
-    #regex_cdi_piege = r"(?:possibilit|perspective|débouch|vue|objectif|finalité|suite|embauche|stage|futur|après).{0,30}\bCDI\b"
-    #mask_cdi_piege = df['Description'].astype(str).str.contains(regex_cdi_piege, case=False, regex=True, na=False)
-
-    # 3. Résultat : C'est un VRAI CDI Caché
-    mask_vrai_cdi_cache = mask_contient_cdi 
-    #& (~mask_cdi_piege)
-
-
-    # --- APPLICATION DES RÈGLES (Ordre Chronologique) ---
-    
-    df.loc[mask_titre_etudiant, 'Type_Contrat'] = "Stage / Alternance"
-    # On écrase "Stage" par CDI si...
-    # - La source dit CDI (et ce n'est pas "Stagiaire" explicite)
-    # - OU C'est un Senior (Titre)
-    # - OU On a trouvé un CDI propre dans la description
-    
-    mask_force_cdi = (
-        (mask_is_cdi_officiel & ~mask_titre_etudiant) |  # Source CDI (sauf si titre "Stagiaire")
-        mask_titre_senior |                              # Senior / Expert
-        mask_vrai_cdi_cache                              # Description CDI clean
-    )
-    
-    # On applique le CDI uniquement si ce n'est pas déjà détecté comme Freelance    
-    mask_final_cdi = mask_force_cdi & (df['Type_Contrat'] != "Freelance")
-    
-    if mask_final_cdi.sum() > 0:
-        df.loc[mask_final_cdi, 'Type_Contrat'] = "CDI"
-    
-    # 3. Correction Freelance (Le dernier mot)
-    regex_freelance = r"\b(?:freelance|indépendant|independant|free-lance|b2b)\b"
-    mask_freelance = df['Titre'].astype(str).str.contains(regex_freelance, case=False, regex=True, na=False)
-    df.loc[mask_freelance, 'Type_Contrat'] = "Freelance"
-    df.loc[mask_is_cdd_officiel, 'Type_Contrat'] = "CDD"
-
-    return df    
+    Offres inchangées (même empreinte) : la ligne de la source est gardée telle quelle (Ville, Entreprise, Source,
+    dates...), seules les colonnes calculées (COLONNES_ENRICHIES) sont reprises de l'historique, aligné sur df.
+    """
+    df = df.copy()
+    colonnes = [c for c in COLONNES_ENRICHIES if c in historique.columns]
+    df[colonnes] = historique[colonnes].set_axis(df.index)
+    return df
+
 # --------------------------------------------------
 
-def determiner_niveau(row):
+def appliquer_doublons(df, resume):
+    """Ne garde que l'offre retenue de chaque groupe de quasi-doublons, avec les dates et l'identifiant du groupe."""
+    df = df.copy()
+    df[["Date_Publication", "Date_Expiration", "Id_Canonique"]] = resume[["Date_Publication", "Date_Expiration", "Id_Canonique"]]
+    return df[resume["Garder"]]
+
+# --------------------------------------------------
+
+def chemin_preparation(cle):
+    return os.path.join(DOSSIER_PREPARATION, f"fusion_{cle}.csv")
+
+
+def charger_source(cle):
+    """Charge le fichier propre d'une source et le met au format commun (cols_globales)."""
+    conf = SOURCES[cle]
+    if not donnees_existent(conf["fichier"]):
+        print(f"⚠️ Fichier {conf['nom']} introuvable !")
+        return None
+
+    print(f"🔹 Chargement {conf['nom']}...")
+    return mettre_au_format(charger_donnees(conf["fichier"]), cle)
+
+
+def mettre_au_format(df, cle):
+    """Fichier propre d'une source (ou un morceau de ce fichier) -> format commun (cols_globales)."""
+    conf = SOURCES[cle]
+    # Renommage pour standardiser
+    df = df.rename(columns=RENOMMAGE)
+
+    # Ajout colonnes manquantes
+    if conf["source"]:
+        df["Source"] = conf["source"]
+    if conf["teletravail_inconnu"]:
+        df["Teletravail"] = "Non spécifié"
+    df["Date_Publication"] = df["Date_Publication"].apply(normaliser_date)
+    df["Date_Expiration"] = df["Date_Expiration"].apply(normaliser_date)
+
+    # On gère si certaines colonnes manquent dans le CSV source
+    for c in cols_globales:
+        if c not in df.columns: df[c] = None
+    return df[cols_globales]
+
+
+def preparation_a_jour(cle):
+    """True si le fichier préparé par --preparer existe et est plus récent que le fichier propre."""
+    date_propre = date_modification(SOURCES[cle]["fichier"])
+    date_preparee = date_modification(chemin_preparation(cle))
+    return date_propre is not None and date_preparee is not None and date_preparee >= date_propre
+
+
+def charger_source_preparee(cle):
+    """Relit le fichier préparé par --preparer s'il est plus récent que le fichier propre, sinon charge la source."""
+    if preparation_a_jour(cle):
+        print(f"🔹 {SOURCES[cle]['nom']} : fichier préparé à jour.")
+        # Fichier préparé avant l'ajout d'une colonne (ex: Salaire_Annuel_Min/Max) : colonne vide
+        return charger_donnees(chemin_preparation(cle)).reindex(columns=cols_globales)
+    return charger_source(cle)
+
+# --------------------------------------------------
+
+def enrichir(df, verbeux=True):
+    """Colonnes calculées : années d'expérience, contrat harmonisé, niveau, stack technique, RQTH."""
+    if df.empty:
+        return df
+    if verbeux:
+        print(f"🧠 Enrichissement de {len(df)} offres (expérience, contrats, niveau, stack Tech, RQTH)...")
+    # Chaque offre est indépendante : partitions réparties sur les cœurs disponibles au-delà de
+    # parallele.SEUIL_PARALLELE lignes (FUSION_WORKERS pour forcer le nombre de process)
+    enrichies = executer_par_partitions(enrichir_offres, df)
+    existantes = [c for c in COLONNES_ENRICHIES if c in df.columns]
+    df[existantes] = enrichies[existantes]
+    return pd.concat([df, enrichies.drop(columns=existantes)], axis=1)
+
+
+def completer_tech(df, verbeux=True):
+    """Historique écrit avant les colonnes Tech_ (ou nouvelle techno dans keywords) : on les déduit de Tech_Stack."""
+    df = df.reindex(columns=list(df.columns) + [c for c in COLONNES_TECH if c not in df.columns])
+    a_completer = df[COLONNES_TECH].isna().any(axis=1)
+    if a_completer.any():
+        if verbeux:
+            print(f"🧩 Colonnes Tech_ reconstruites depuis Tech_Stack pour {a_completer.sum()} offres historiques.")
+        df.loc[a_completer, COLONNES_TECH] = matrice_depuis_stack(df.loc[a_completer, 'Tech_Stack']).to_numpy()
+    df[COLONNES_TECH] = df[COLONNES_TECH].astype("uint8")
+    return df
+
+
+def publier_manifeste(nb_offres):
     """
-    Déduit le niveau d'expérience (Etudiant, Junior, Confirmé, Senior) 
-    basé sur le salaire (distingue idf des autres zones) et les mots-clés du titre.
+    Écrit en dernier : le dashboard ne bascule qu'une fois le fichier global, le cube et l'index en place.
+    La version est le hash du fichier global ; le cube et l'index portent la version dont ils sont tirés.
     """
-    titre = str(row['Titre']).lower() if pd.notna(row['Titre']) else ""
-    # desc = str(row['Description']).lower() if pd.notna(row['Description']) else "" 
-    lieu = str(row['Ville']).lower() if pd.notna(row['Ville']) else "" 
-    salaire = row['Salaire_Annuel']
-    contrat = str(row['Type_Contrat']).lower() if pd.notna(row['Type_Contrat']) else ""
-    annees = row['Annees_Exp']
-
-    # 1. Extraction des années
-    
-    if pd.notna(annees):
-        if annees > 5: return "Senior"
-        if annees > 2: return "Confirmé"
-
-    # 2. Détection des stages ---
-    if "Stage / Alternance" in contrat:
-        return "En formation"
-    
-    if any(k in titre for k in ["senior", "lead", "manager", "head of", "directeur", "expert", "principal", "vp", "chef"]):
-        return "Senior"       
-
-    # 3. Définition des seuils selon la géographie    
-    # Zone A : Paris & IDF
-    mots_idf = ['paris', 'île-de-france', 'ile-de-france', 'boulogne', 'courbevoie', 'la défense', '92', '75', '93', '94']
-    
-    # Zone B : Grandes Métropoles (Marché dynamique)
-    mots_metropoles = ['lyon', 'toulouse', 'bordeaux', 'nantes', 'lille', 'aix', 'marseille', 'nice', 'rennes', 'sophia', 'antipolis']
-
-    if any(m in lieu for m in mots_idf):
-        # ZONE PARIS
-        seuil_junior = 40000
-        seuil_senior = 60000
-    elif any(m in lieu for m in mots_metropoles):
-        # ZONE GRANDES VILLES (Intermédiaire)
-        seuil_junior = 37000  # Un junior à Lyon peut toucher 36-37k
-        seuil_senior = 52000  # 52k à Bordeaux, c'est clairement un profil Senior
-    else:
-        # ZONE RESTE DE LA FRANCE
-        seuil_junior = 34000
-        seuil_senior = 48000
-
-    # --- VERDICT DU SALAIRE ---
-    if pd.notna(salaire) and salaire > 0:
-        if salaire <= seuil_junior:
-            return "Junior"
-        elif seuil_junior < salaire < seuil_senior:
-            return "Confirmé"
-        else:
-            return "Senior"    
-    
-    # --- PAR DEFAUT ---
-    if pd.notna(annees) and annees <= 2:
-        return "Junior"
-    
-    # --- FALLBACK : ANALYSE TEXTUELLE ---
-    # (Titre)
-    
-    if any(k in titre for k in ["junior", "débutant", "assistant", "graduate"]):
-        return "Junior"
-    if "confirmé" in titre:
-        return "Confirmé"    
-
-    return "Non spécifié"
+    empreinte_global = empreinte_fichier(OUTPUT_CSV)
+    if empreinte_global is not None:
+        ecrire_json({
+            "version": empreinte_global["hash"],
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "nb_offres": nb_offres,
+            "global": empreinte_global,
+            "cube": dict(empreinte_fichier(OUTPUT_CUBE) or {}, version=empreinte_global["hash"]),
+            # .npz : hors des formats csv/parquet gérés par empreinte_fichier
+            "index": {"fichier": os.path.basename(OUTPUT_INDEX), "version": empreinte_global["hash"]},
+        }, OUTPUT_MANIFESTE)
+        print(f"🏷️  Version publiée : {empreinte_global['hash'][:12]}")
+
+
+COLONNES_JOURNAL = ["URL", "Source", "Empreinte", "Date_Publication", "Date_Expiration"]
+
+def journaliser_fusion(morceaux):
+    """
+    Journal des offres (journal_offres.py) : contenus modifiés (empreinte), et rattrapage des offres
+    et expirations pas encore journalisées par les crawlers / updaters. Puis instantané si le dernier est trop vieux.
+    """
+    nb_evenements = sum(journaliser("synchroniser", morceau) or 0 for morceau in morceaux)
+    instantane = journaliser("instantane_periodique")
+    print(f"📒 Journal des offres : {nb_evenements} événements ajoutés{', nouvel instantané' if instantane else ''}.")
+
 # --------------------------------------------------
+# --- FUSION PAR MORCEAUX (--flux) ---
+# Même résultat que la fusion en mémoire, en 3 lectures des fichiers (historique puis sources, toujours dans cet ordre) :
+# 1. URL + date de publication -> index SQLite (dernière occurrence, date la plus ancienne)
+# 2. Textes des offres gardées -> signatures MinHash sur disque (np.memmap) -> groupes de quasi-doublons
+# 3. Tout -> offres retenues, enrichies (ou reprises de l'historique), écrites morceau par morceau
+
+COLONNES_DOUBLONS = ["Titre", "Entreprise", "Ville", "Source", "Description", "URL", "Date_Publication", "Date_Expiration"]
+
+
+def entrees_flux(avec_historique):
+    """Fichiers à lire, dans l'ordre de la fusion : l'historique, puis chaque source (fichier préparé s'il est à jour)."""
+    entrees = [{"nom": "Historique", "chemin": OUTPUT_CSV, "cle": None}] if avec_historique else []
+    for cle, conf in SOURCES.items():
+        if preparation_a_jour(cle):
+            entrees.append({"nom": conf["nom"], "chemin": chemin_preparation(cle), "cle": cle, "prepare": True})
+        elif donnees_existent(conf["fichier"]):
+            entrees.append({"nom": conf["nom"], "chemin": conf["fichier"], "cle": cle, "prepare": False})
+        else:
+            print(f"⚠️ Fichier {conf['nom']} introuvable !")
+    return entrees
+
+
+def lire_entree(entree, taille, colonnes=None, complet=False):
+    """Morceaux d'un fichier d'entrée, avec les mêmes traitements que le chargement complet (dates, textes, empreinte)."""
+    if entree["cle"] is None:
+        # Historique : seule la projection `colonnes` est lue (les sources, petites, sont lues en entier)
+        for morceau in lire_par_morceaux(entree["chemin"], taille, colonnes=colonnes, dtype={"Empreinte": str}):
+            morceau["Date_Publication"] = pd.to_datetime(morceau["Date_Publication"].apply(normaliser_date), errors="coerce")
+            if "Date_Expiration" in morceau.columns:
+                morceau["Date_Expiration"] = morceau["Date_Expiration"].apply(normaliser_date)
+            if complet and {"Titre", "Entreprise", "Ville"} <= set(morceau.columns):
+                morceau = standardiser_textes(morceau, verbeux=False)
+            yield morceau
+        return
+
+    for morceau in lire_par_morceaux(entree["chemin"], taille):
+        if entree["prepare"]:
+            morceau = morceau.reindex(columns=cols_globales)
+        else:
+            morceau = mettre_au_format(morceau, entree["cle"])
+        morceau = standardiser_textes(morceau, verbeux=False)
+        morceau["Date_Publication"] = pd.to_datetime(morceau["Date_Publication"], errors="coerce")
+        morceau["Empreinte"] = calculer_empreinte(morceau)
+        yield morceau
+
 
-def detecter_rqth(text):
-    if pd.isna(text): return False
-    keywords = ["rqth", "handicap", "situation de handicap", "entreprise adaptée"]
-    return any(k in text.lower() for k in keywords)
+def parcourir(index, entrees, taille, colonnes=None, complet=False):
+    """
+    Morceaux de toutes les entrées avec, pour chaque ligne : son numéro d'ordre global, les infos de l'index,
+    si elle est la dernière occurrence de son URL (gagnante) et son rang parmi les gagnantes.
+    """
+    ordre, compteur = 0, 0
+    for entree in entrees:
+        for morceau in lire_entree(entree, taille, colonnes, complet):
+            infos = index.consulter(morceau["URL"].astype(str).tolist())
+            ordres = np.arange(ordre, ordre + len(morceau))
+            gagnante = infos["dernier"].to_numpy() == ordres
+            rangs = compteur + np.cumsum(gagnante) - 1
+            ordre += len(morceau)
+            compteur += int(gagnante.sum())
+            yield entree, morceau, infos, ordres, gagnante, rangs
+
+
+def fusion_par_morceaux():
+    avec_historique = donnees_existent(OUTPUT_CSV)
+    entrees = entrees_flux(avec_historique)
+    if not entrees:
+        print("❌ Aucun fichier chargé. Arrêt.")
+        exit()
+
+    colonnes_hist = list(next(lire_par_morceaux(OUTPUT_CSV, 1)).columns) if avec_historique else []
+    complet = MODE_COMPLET or "Empreinte" not in colonnes_hist
+    echantillons = [next(lire_entree(e, LIGNES_ECHANTILLON, complet=complet), pd.DataFrame()) for e in entrees]
+    taille = taille_morceau(BUDGET_MEMOIRE_MO, echantillons)
+    print(f"🌊 Fusion par morceaux de {taille} lignes (budget {BUDGET_MEMOIRE_MO:.0f} Mo), "
+          f"{'tout est recalculé' if complet else 'mode incrémental'}.")
+
+    os.makedirs(DOSSIER_PREPARATION, exist_ok=True)
+    # Fichiers de travail sur disque (pas dans /tmp, souvent en mémoire)
+    dossier_travail = tempfile.mkdtemp(prefix="fusion_flux_", dir=DOSSIER_PREPARATION)
+    try:
+        index = IndexOffres(os.path.join(dossier_travail, "index.sqlite"))
+
+        # === 1. INDEX DES URL ===
+        print("🗂️  Passe 1 : index des URL...")
+        ordre = 0
+        for entree in entrees:
+            for morceau in lire_entree(entree, taille, colonnes=["URL", "Date_Publication"]):
+                dates = morceau["Date_Publication"].dt.strftime("%Y-%m-%d")
+                index.ajouter(
+                    morceau["URL"].astype(str).tolist(), list(range(ordre, ordre + len(morceau))),
+                    dates.where(dates.notna(), None).tolist(), historique=entree["cle"] is None,
+                )
+                ordre += len(morceau)
+        nb_offres = index.nb_offres()
+        print(f"🧹 Doublons supprimés : {ordre - nb_offres}")
+
+        # === 2. QUASI-DOUBLONS ===
+        print("🧬 Passe 2 : signatures MinHash...")
+        signatures = np.lib.format.open_memmap(
+            os.path.join(dossier_travail, "signatures.npy"), mode="w+", dtype=np.uint32, shape=(nb_offres, NB_PERMUTATIONS)
+        )
+        publication = np.empty(nb_offres, dtype="datetime64[ns]")
+        expiration = np.empty(nb_offres, dtype="datetime64[ns]")
+        hashs_urls = np.empty(nb_offres, dtype=np.uint64)
+        attributs = np.empty((nb_offres, len(COLONNES_ATTRIBUTS)), dtype=np.uint64)
+        for _, morceau, infos, _, gagnante, rangs in parcourir(index, entrees, taille, COLONNES_DOUBLONS, complet):
+            rangs, morceau = rangs[gagnante], morceau[gagnante]
+            signatures[rangs] = signatures_minhash(textes_offres(morceau).tolist())
+            publication[rangs] = pd.to_datetime(infos.loc[gagnante, "date_min"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+            expiration[rangs] = pd.to_datetime(morceau["Date_Expiration"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+            hashs_urls[rangs] = pd.util.hash_array(morceau["URL"].astype(str).to_numpy(dtype=object))
+            attributs[rangs] = attributs_offres(morceau)
+        signatures.flush()
+        resume = resumer_groupes(grouper(signatures, attributs=attributs), publication, expiration)
+        del signatures, publication, expiration, attributs
+        print(f"🧬 Quasi-doublons fusionnés : {(~resume['garder']).sum()}")
+
+        # === 3. ENRICHISSEMENT ET ÉCRITURE ===
+        print("🧠 Passe 3 : enrichissement et écriture...")
+        ecriture = EcritureParMorceaux(OUTPUT_CSV, colonnes_hist + [c for c in cols_sortie if c not in colonnes_hist])
+        nb_reprises = 0
+        for entree, morceau, infos, ordres, gagnante, rangs in parcourir(index, entrees, taille, None, complet):
+            historique = entree["cle"] is None
+            if historique and not complet:
+                # Dernière version dans l'historique d'une offre reprise par une source : ses colonnes calculées
+                # sont réutilisables si elle est inchangée
+                colonnes = ["URL", "Empreinte"] + [c for c in COLONNES_ENRICHIES if c in morceau.columns]
+                index.garder_historique(morceau.loc[(infos["dernier_hist"].to_numpy() == ordres) & ~gagnante, colonnes])
+
+            gardee = gagnante.copy()
+            gardee[gagnante] = resume["garder"][rangs[gagnante]]
+            rangs, morceau = rangs[gardee], morceau[gardee].copy()
+
+            # Dates et identifiant du groupe de quasi-doublons (une offre seule garde sa date d'expiration)
+            multiples = resume["multiples"][rangs]
+            date_expiration = morceau["Date_Expiration"].to_numpy(dtype=object).copy()
+            expiration_groupe = pd.Series(resume["date_expiration"][rangs][multiples]).dt.strftime("%Y-%m-%d")
+            date_expiration[multiples] = expiration_groupe.where(expiration_groupe.notna(), None).to_numpy(dtype=object)
+            morceau["Date_Publication"] = resume["date_publication"][rangs]
+            morceau["Date_Expiration"] = date_expiration
+            morceau["Id_Canonique"] = format_identifiants(hashs_urls[resume["retenue"][rangs]])
+
+            if complet:
+                morceau = enrichir(morceau, verbeux=False)
+            elif not historique:
+                reprises = index.historique(morceau["URL"].astype(str).tolist(), morceau["Empreinte"].astype(str).tolist())
+                if reprises.empty:
+                    morceau = enrichir(morceau, verbeux=False)
+                else:
+                    positions = reprises.index.to_numpy()
+                    reprises = reprendre_enrichissement(morceau.iloc[positions], reprises.drop(columns=["URL", "Empreinte"]))
+                    a_enrichir = np.ones(len(morceau), dtype=bool)
+                    a_enrichir[positions] = False
+                    morceau = pd.concat([reprises, enrichir(morceau[a_enrichir].copy(), verbeux=False)]).sort_index()
+                    nb_reprises += len(reprises)
+            ecriture.ecrire(completer_tech(morceau, verbeux=False))
+        index.fermer()
+        if not complet:
+            print(f"📊 {nb_reprises} offres reprises de l'historique sans ré-enrichissement.")
+        ecriture.terminer()
+    finally:
+        shutil.rmtree(dossier_travail, ignore_errors=True)
+
+    # === PUBLICATION (relue sans la colonne Description pour le cube, par morceaux pour l'index) ===
+    print("🧊 Calcul du cube d'agrégats pour le dashboard...")
+    leger = charger_donnees(OUTPUT_CSV, colonnes=[c for c in ecriture.colonnes if c != "Description"])
+    sauvegarde_securisee(construire_cube(leger), OUTPUT_CUBE)
+    repartition, nb_salaires = leger["Source"].value_counts(), leger["Salaire_Annuel"].notna().sum()
+    del leger
+    print("🔎 Construction de l'index de recherche (Titre, Entreprise, Description)...")
+    IndexInverse.construire_par_morceaux(lire_par_morceaux(OUTPUT_CSV, taille, colonnes=COLONNES_INDEX)).sauvegarder(OUTPUT_INDEX)
+    publier_manifeste(ecriture.nb_lignes)
+    journaliser_fusion(lire_par_morceaux(OUTPUT_CSV, taille, colonnes=COLONNES_JOURNAL, dtype={"Empreinte": str}))
+
+    print("\n✅ TERMINÉ ! Le fichier global est prêt :")
+    print(f"👉 {OUTPUT_CSV}")
+    print("\n📊 STATISTIQUES FINALES :")
+    print(repartition)
+    print(f"\n💰 Offres avec salaire : {nb_salaires}")
 
 # endregion
 # ======================================================================================================================================================
 
 # region 3. --- CHARGEMENT ET STANDARDISATION ---
 
+if SOURCE_A_PREPARER is not None:
+    os.makedirs(DOSSIER_PREPARATION, exist_ok=True)
+    df_source = charger_source(SOURCE_A_PREPARER)
+    if df_source is None:
+        exit(1)
+    sauvegarde_securisee(df_source, chemin_preparation(SOURCE_A_PREPARER))
+    print(f"✅ {SOURCES[SOURCE_A_PREPARER]['nom']} préparé : {len(df_source)} offres.")
+    exit()
+
+if MODE_FLUX:
+    fusion_par_morceaux()
+    exit()
+
 dataframes = []
-cols_globales = [
-    "Titre", "Entreprise", "Ville", "Salaire_Annuel", "Type_Contrat", 
-    "Teletravail", "Date_Publication", "Date_Expiration", "Source", "URL", "Description"
-]
 
 
 # --- CHARGEMENT DE L'HISTORIQUE ---
-if os.path.exists(OUTPUT_CSV):
+df_hist = None
+if donnees_existent(OUTPUT_CSV):
     print(f"📜 Chargement de l'historique : {OUTPUT_CSV}")
     try:
-        df_hist = pd.read_csv(OUTPUT_CSV)
+        # L'empreinte est un entier 64 bits non signé : on la garde en texte pour ne rien perdre
+        df_hist = charger_donnees(OUTPUT_CSV, dtype={"Empreinte": str})
         # On normalise aussi l'historique pour être sûr
         df_hist["Date_Publication"] = df_hist["Date_Publication"].apply(normaliser_date)
         df_hist["Date_Expiration"] = df_hist["Date_Expiration"].apply(normaliser_date)
-        dataframes.append(df_hist)
     except:
         print("⚠️ Historique illisible, on repart de zéro.")
+        df_hist = None
 
 # --------------------------------------------------
 
-# --- A. FRANCE TRAVAIL ---
-if os.path.exists(FILE_FT):
-    print("🔹 Chargement France Travail...")
-    df_ft = pd.read_csv(FILE_FT)
-    # Renommage pour standardiser
-    df_ft = df_ft.rename(columns={
-        "Ville_Clean": "Ville",
-        "Salaire_Annuel_Estime": "Salaire_Annuel",
-        "Description_Propre": "Description"
-    })
-    # Ajout colonnes manquantes
-    df_ft["Teletravail"] = "Non spécifié" 
-    df_ft["Date_Publication"] = df_ft["Date_Publication"].apply(normaliser_date)
-    df_ft["Date_Expiration"] = df_ft["Date_Expiration"].apply(normaliser_date)
-    
-
-    # On gère si certaines colonnes manquent dans le CSV source
-    for c in cols_globales:
-        if c not in df_ft.columns: df_ft[c] = None
-    dataframes.append(df_ft[cols_globales])
-else:
-    print("⚠️ Fichier France Travail introuvable !")
-
-# --- B. WTTJ ---
-if os.path.exists(FILE_WTTJ):
-    print("🔹 Chargement WTTJ...")
-    df_wttj = pd.read_csv(FILE_WTTJ)
-    
-    df_wttj = df_wttj.rename(columns={
-        "Ville_Clean": "Ville",
-        "Salaire_Annuel_Estime": "Salaire_Annuel",
-        "Description_Propre": "Description",
-        "Date": "Date_Publication"
-    })
-    
-    # Ajout Source et Date (Aujourd'hui)
-    df_wttj["Source"] = "Welcome to the Jungle"
-    df_wttj["Date_Publication"] = df_wttj["Date_Publication"].apply(normaliser_date)    
-    df_wttj["Date_Expiration"] = df_wttj["Date_Expiration"].apply(normaliser_date)
-    
-    for c in cols_globales:
-        if c not in df_wttj.columns: df_wttj[c] = None
-    dataframes.append(df_wttj[cols_globales])
-else:
-    print("⚠️ Fichier WTTJ introuvable !")
-
-# --- C. APEC ---
-if os.path.exists(FILE_APEC):
-    print("🔹 Chargement APEC...")
-    df_apec = pd.read_csv(FILE_APEC)
-    
-    df_apec = df_apec.rename(columns={
-        "Ville_Clean": "Ville",
-        "Salaire_Annuel_Estime": "Salaire_Annuel",
-        "Description_Propre": "Description",
-        "Date": "Date_Publication"
-    })
-    
-    df_apec["Source"] = "Apec"    
-    df_apec["Teletravail"] = "Non spécifié"
-    df_apec["Date_Publication"] = df_apec["Date_Publication"].apply(normaliser_date)
-    df_apec["Date_Expiration"] = df_apec["Date_Expiration"].apply(normaliser_date)
-    
-    for c in cols_globales:
-        if c not in df_apec.columns: df_apec[c] = None
-    dataframes.append(df_apec[cols_globales])
-else:
-    print("⚠️ Fichier APEC introuvable !")
+# --- SOURCES : fichier préparé (si à jour) ou fichier propre ---
+for cle in SOURCES:
+    df_source = charger_source_preparee(cle)
+    if df_source is not None:
+        dataframes.append(df_source)
 # endregion
 
 # ======================================================================================================================================================
 
 # region 4. --- FUSION ---
 
-if not dataframes:
+if not dataframes and df_hist is None:
     print("❌ Aucun fichier chargé. Arrêt.")
     exit()
 
 print("🌪️  Mélange des données...")
-df_final = pd.concat(dataframes, ignore_index=True)
+df_new = pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame(columns=cols_globales)
+df_new = standardiser_textes(df_new)
+df_new['Date_Publication'] = pd.to_datetime(df_new['Date_Publication'], errors='coerce')
+
+# L'empreinte est calculée AVANT l'enrichissement (Type_Contrat brut de la source)
+df_new['Empreinte'] = calculer_empreinte(df_new)
+
+mode_incremental = (
+    not MODE_COMPLET
+    and df_hist is not None
+    and "Empreinte" in df_hist.columns
+)
 
-# === CORRECTION DE L'ANCIENNETÉ (FIX DURÉE DE VIE) ===
+if mode_incremental:
+    print("⚡ Mode incrémental : seules les offres nouvelles ou modifiées sont enrichies.")
 
-df_final['Date_Publication'] = pd.to_datetime(df_final['Date_Publication'], errors='coerce')
-df_final['Date_Publication'] = df_final.groupby('URL')['Date_Publication'].transform('min')
+    # === CORRECTION DE L'ANCIENNETÉ (FIX DURÉE DE VIE) ===
+    df_new['Date_Publication'] = df_new.groupby('URL')['Date_Publication'].transform('min')
 
-print("🧹 Standardisation des grandes villes (Arrondissements)...")
+    len_avant = len(df_new)
+    df_new = df_new.drop_duplicates(subset=["URL"], keep='last')
+    print(f"🧹 Doublons supprimés : {len_avant - len(df_new)}")
 
-df_final['Ville'] = df_final['Ville'].astype(str).str.replace(r'(?i)^paris.*', 'Paris', regex=True)
-df_final['Ville'] = df_final['Ville'].str.replace(r'(?i)^lyon.*', 'Lyon', regex=True)
-df_final['Ville'] = df_final['Ville'].str.replace(r'(?i)^marseille.*', 'Marseille', regex=True)
+    df_hist['Date_Publication'] = pd.to_datetime(df_hist['Date_Publication'], errors='coerce')
+    hist_par_url = df_hist.drop_duplicates(subset=["URL"], keep='last').set_index("URL")
 
-# Correction spécifique pour "La Défense" qui apparaît parfois comme "Puteaux" ou "Courbevoie"
-# (Optionnel, mais utile pour regrouper les offres de ce hub)
-# df_final['Ville'] = df_final['Ville'].replace(['Courbevoie', 'Puteaux', 'Nanterre'], 'La Défense')
+    # On garde la date de publication la plus ancienne (historique vs source)
+    date_hist = df_new['URL'].map(hist_par_url['Date_Publication'])
+    df_new['Date_Publication'] = pd.concat([df_new['Date_Publication'], date_hist], axis=1).min(axis=1)
+
+    # Offres de l'historique absentes des sources du jour : inchangées
+    df_conserve = df_hist[~df_hist['URL'].isin(df_new['URL'])]
+
+    # Quasi-doublons (même offre sur plusieurs sources) : comparés à l'historique conservé, avant l'enrichissement
+    colonnes_doublons = ["Titre", "Entreprise", "Ville", "Source", "Description", "URL", "Date_Publication", "Date_Expiration"]
+    resume = dedoublonner(
+        pd.concat([df_conserve[colonnes_doublons], df_new[colonnes_doublons]], keys=["conserve", "new"]),
+        OUTPUT_SIGNATURES,
+    )
+    partie = resume.index.get_level_values(0)
+    df_conserve = appliquer_doublons(df_conserve, resume[partie == "conserve"].droplevel(0))
+    df_new = appliquer_doublons(df_new, resume[partie == "new"].droplevel(0))
+    print(f"🧬 Quasi-doublons fusionnés : {(~resume['Garder']).sum()}")
+
+    # Offre déjà connue ET contenu identique -> on réutilise l'enrichissement de l'historique
+    mask_inchange = df_new['URL'].map(hist_par_url['Empreinte']) == df_new['Empreinte']
+
+    df_inchange = reprendre_enrichissement(df_new[mask_inchange], hist_par_url.loc[df_new.loc[mask_inchange, 'URL']])
+
+    df_a_enrichir = df_new[~mask_inchange].copy()
+    print(f"📊 {len(df_conserve)} offres historiques conservées, {len(df_inchange)} inchangées, {len(df_a_enrichir)} à enrichir.")
+
+else:
+    if MODE_COMPLET:
+        print("🔁 Mode complet : tout l'historique est recalculé.")
+    df_a_enrichir = df_new
+    if df_hist is not None:
+        df_a_enrichir = pd.concat([standardiser_textes(df_hist), df_new], ignore_index=True)
+
+    # === CORRECTION DE L'ANCIENNETÉ (FIX DURÉE DE VIE) ===
+    df_a_enrichir['Date_Publication'] = pd.to_datetime(df_a_enrichir['Date_Publication'], errors='coerce')
+    df_a_enrichir['Date_Publication'] = df_a_enrichir.groupby('URL')['Date_Publication'].transform('min')
+
+    # Suppression des doublons (basé sur l'URL)
+    len_avant = len(df_a_enrichir)
+    df_a_enrichir = df_a_enrichir.drop_duplicates(subset=["URL"], keep='last').copy()
+    len_apres = len(df_a_enrichir)
+
+    print(f"🧹 Doublons supprimés : {len_avant - len_apres}")
+
+    # Quasi-doublons (même offre sur plusieurs sources, URL différentes) : une seule offre enrichie par groupe
+    resume = dedoublonner(df_a_enrichir, OUTPUT_SIGNATURES)
+    df_a_enrichir = appliquer_doublons(df_a_enrichir, resume)
+    print(f"🧬 Quasi-doublons fusionnés : {(~resume['Garder']).sum()}")
 
 # --------------------------------------------------
 
-# --- Application des corrections ---
-
-print("✨ Nettoyage des guillemets résiduels...")
-cols_text = ['Titre', 'Entreprise', 'Ville']
-for col in cols_text:
-    # On force en string, on remplace les " et on enlève les espaces vides
-    df_final[col] = df_final[col].astype(str).str.replace('"', '', regex=False).str.strip()
-    
-    # On enlève les "nan" qui apparaissent parfois lors de la conversion string
-    df_final[col] = df_final[col].replace('nan', 'Non spécifié')
-
-# Suppression des doublons (basé sur l'URL)
-len_avant = len(df_final)
-df_final = df_final.drop_duplicates(subset=["URL"], keep='last')
-len_apres = len(df_final)
-
-print(f"🧹 Doublons supprimés : {len_avant - len_apres}")
-
-# === NETTOYAGE CONTRATS ===
-
-print("🧮 Extraction des années d'expérience...")
-df_final['Annees_Exp'] = df_final['Description'].apply(extraire_annees_exp)
-df_final = nettoyer_contrats(df_final)
-
-# === CALCUL DU NIVEAU D'EXPÉRIENCE ===
-print("🧠 Calcul des niveaux d'expérience (Analyse Salaires & Texte)...")
-# On applique la fonction ligne par ligne (axis=1)
-df_final['Niveau'] = df_final.apply(determiner_niveau, axis=1)
-
-# === STACKS ===
-
-keywords = {
-        "Python": r"\bpython\b",
-        "SQL": r"\bsql\b",
-        "Excel": r"\bexcel\b",
-        "Power BI": r"power\s?bi", # Accepte "PowerBI" ou "Power BI"
-        "Tableau": r"\btableau\b",
-        "R": r"\bR\b",             # Attention, peut capter "R&D", mais souvent OK
-        "SAS": r"\bsas\b",
-        "VBA": r"\bvba\b",
-        "AWS": r"\baws\b",
-        "Azure": r"\bazure\b",
-        "GCP": r"\bgcp\b|google\scloud",
-        "Spark": r"\bspark\b",
-        "Hadoop": r"\bhadoop\b",
-        "Kafka": r"\bkafka\b",
-        "Airflow": r"\bairflow\b",
-        "Snowflake": r"\bsnowflake\b",
-        "Databricks": r"\bdatabricks\b",
-        "Docker": r"\bdocker\b",
-        "Kubernetes": r"\bkubernetes\b|k8s",
-        "Git": r"\bgit\b",
-        "Linux": r"\blinux\b",
-        "Pandas": r"\bpandas\b",
-        "TensorFlow": r"\btensorflow\b",
-        "PyTorch": r"\bpytorch\b",
-        "Scikit-learn": r"scikit[\s\-]learn|sklearn",
-        "Java": r"\bjava\b",       # Exclut Javascript grâce aux \b
-        "Scala": r"\bscala\b",
-        "C++": r"\bc\+\+",
-        "NoSQL": r"no\s?sql|mongo|cassandra",
-        "Dbt": r"\bdbt\b"
-    }
-
-def detecter_stack(description):
-    if pd.isna(description): return ""
-    desc_lower = str(description).lower()
-    found = []
-    for tech, pattern in keywords.items():        
-        if re.search(pattern, desc_lower):
-            found.append(tech)
-            
-    return ", ".join(found)
-
-print("🧠 Analyse des compétences Tech...")
-df_final['Tech_Stack'] = df_final['Description'].apply(detecter_stack)
-
-# === INCLUSION ===
-
-df_final['Handicap_Friendly'] = df_final['Description'].apply(detecter_rqth)
+df_a_enrichir = enrichir(df_a_enrichir)
+
+if mode_incremental:
+    # On remet les offres des sources dans leur ordre d'origine, après l'historique conservé
+    df_sources = pd.concat([df_inchange, df_a_enrichir]).sort_index()
+    df_final = pd.concat([df_conserve, df_sources], ignore_index=True)
+else:
+    df_final = df_a_enrichir
+
+df_final = completer_tech(df_final)
 
 # endregion
 # ======================================================================================================================================================
 
 # region 5. --- SAUVEGARDE ---
-df_final.to_csv(OUTPUT_CSV, index=False)
+sauvegarde_securisee(df_final, OUTPUT_CSV)
+
+print("🧊 Calcul du cube d'agrégats pour le dashboard...")
+sauvegarde_securisee(construire_cube(df_final), OUTPUT_CUBE)
+
+print("🔎 Construction de l'index de recherche (Titre, Entreprise, Description)...")
+IndexInverse.construire(df_final).sauvegarder(OUTPUT_INDEX)
+
+publier_manifeste(len(df_final))
+journaliser_fusion([df_final[COLONNES_JOURNAL]])
 
 print(f"\n✅ TERMINÉ ! Le fichier global est prêt :")
 print(f"👉 {OUTPUT_CSV}")
@@ -0,0 +1,114 @@
+import io
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Outils de la fusion par morceaux (fusion_csv.py --flux).
+# Au lieu de tout charger puis de faire concat + groupby('URL') + drop_duplicates en mémoire, la fusion lit ses
+# fichiers plusieurs fois par morceaux et garde l'état "par URL" dans un index SQLite sur disque :
+# - dernière occurrence de l'URL (c'est elle qui est gardée, comme drop_duplicates(keep='last'))
+# - dernière occurrence dans l'historique (offre réutilisable si son contenu n'a pas changé)
+# - date de publication la plus ancienne vue pour l'URL
+# La taille des morceaux découle d'un budget mémoire : la mémoire ne dépend plus de la taille de l'historique
+# (hors quelques tableaux de 8 octets par offre pour les quasi-doublons).
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+FACTEUR_COPIES = 8         # Copies d'un morceau en mémoire au pire moment (lecture, textes, enrichissement, écriture)
+TAILLE_MORCEAU_MIN = 200
+TAILLE_MORCEAU_MAX = 200_000
+LIGNES_ECHANTILLON = 500   # Lignes lues par fichier pour estimer le poids d'une offre
+
+
+def taille_morceau(budget_mo, echantillons):
+    """Nombre de lignes par morceau pour rester dans `budget_mo` Mo, d'après l'échantillon le plus lourd (octets/ligne)."""
+    octets = max([df.memory_usage(deep=True).sum() / len(df) for df in echantillons if len(df)] or [1000])
+    return int(np.clip(budget_mo * 1e6 / (FACTEUR_COPIES * octets), TAILLE_MORCEAU_MIN, TAILLE_MORCEAU_MAX))
+
+
+class IndexOffres:
+    """
+    Index disque (SQLite) des offres, clé = URL. Les numéros d'ordre sont les positions des lignes
+    dans la lecture enchaînée des fichiers (historique puis sources), identiques d'une passe à l'autre.
+    Exemple :
+        index = IndexOffres("data/staging/fusion_index.sqlite")
+        index.ajouter(urls, ordres, dates, historique=True)    # 1re passe, morceau par morceau
+        infos = index.consulter(urls)                          # passes suivantes : dernier, dernier_hist, date_min
+    """
+
+    def __init__(self, chemin):
+        self.connexion = sqlite3.connect(chemin, isolation_level=None)
+        # Fichier de travail jetable : pas de journal, pas de fsync
+        self.connexion.execute("PRAGMA journal_mode=OFF")
+        self.connexion.execute("PRAGMA synchronous=OFF")
+        self.connexion.execute("PRAGMA cache_size=-16000")   # 16 Mo de cache de pages, pas plus
+        self.connexion.execute(
+            "CREATE TABLE IF NOT EXISTS offres (url TEXT PRIMARY KEY, dernier INTEGER, dernier_hist INTEGER, date_min TEXT)"
+        )
+        self.connexion.execute("CREATE TABLE IF NOT EXISTS historique (url TEXT PRIMARY KEY, empreinte TEXT, ligne TEXT)")
+        self.connexion.execute("CREATE TEMP TABLE demande (position INTEGER PRIMARY KEY, url TEXT)")
+
+    def fermer(self):
+        self.connexion.close()
+
+    def ajouter(self, urls, ordres, dates, historique):
+        """Un morceau de la 1re passe : dernière occurrence et date la plus ancienne de chaque URL."""
+        dernier_hist = ordres if historique else [None] * len(ordres)
+        self.connexion.execute("BEGIN")
+        self.connexion.executemany("""
+            INSERT INTO offres VALUES (?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                dernier = excluded.dernier,
+                dernier_hist = COALESCE(excluded.dernier_hist, dernier_hist),
+                date_min = COALESCE(MIN(date_min, excluded.date_min), date_min, excluded.date_min)
+        """, zip(urls, ordres, dernier_hist, dates))
+        self.connexion.execute("COMMIT")
+
+    def nb_offres(self):
+        return self.connexion.execute("SELECT COUNT(*) FROM offres").fetchone()[0]
+
+    def consulter(self, urls):
+        """DataFrame aligné sur `urls` : dernier, dernier_hist (-1 si jamais dans l'historique), date_min."""
+        self.connexion.execute("BEGIN")
+        self.connexion.execute("DELETE FROM demande")
+        self.connexion.executemany("INSERT INTO demande VALUES (?, ?)", enumerate(urls))
+        lignes = self.connexion.execute("""
+            SELECT o.dernier, COALESCE(o.dernier_hist, -1), o.date_min
+            FROM demande d JOIN offres o ON o.url = d.url ORDER BY d.position
+        """).fetchall()
+        self.connexion.execute("COMMIT")
+        return pd.DataFrame(lignes, columns=["dernier", "dernier_hist", "date_min"])
+
+    # --- OFFRES RÉUTILISABLES DE L'HISTORIQUE ---
+
+    def garder_historique(self, df):
+        """
+        Met de côté des lignes de l'historique (URL reprise par une source, colonnes calculées seulement) :
+        réutilisées si l'empreinte n'a pas changé.
+        """
+        if df.empty:
+            return
+        lignes = df.to_json(orient="records", lines=True, double_precision=15).splitlines()
+        self.connexion.execute("BEGIN")
+        self.connexion.executemany(
+            "INSERT OR REPLACE INTO historique VALUES (?, ?, ?)",
+            zip(df["URL"].astype(str), df["Empreinte"].astype(str), lignes),
+        )
+        self.connexion.execute("COMMIT")
+
+    def historique(self, urls, empreintes):
+        """Lignes mises de côté dont l'URL et l'empreinte correspondent, indexées par position dans `urls`."""
+        self.connexion.execute("BEGIN")
+        self.connexion.execute("DELETE FROM demande")
+        self.connexion.executemany("INSERT INTO demande VALUES (?, ?)", enumerate(urls))
+        lignes = self.connexion.execute("""
+            SELECT d.position, h.empreinte, h.ligne FROM demande d JOIN historique h ON h.url = d.url ORDER BY d.position
+        """).fetchall()
+        self.connexion.execute("COMMIT")
+        lignes = [(position, ligne) for position, empreinte, ligne in lignes if empreinte == empreintes[position]]
+        if not lignes:
+            return pd.DataFrame()
+        positions, json_lignes = zip(*lignes)
+        df = pd.read_json(io.StringIO("\n".join(json_lignes)), lines=True, dtype=False, convert_dates=False)
+        df.index = list(positions)
+        return df
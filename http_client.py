@@ -0,0 +1,296 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import httpx
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Client HTTP asynchrone partagé par les scrapers :
+# - un seul pool de connexions keep-alive (pas de nouvelle connexion TCP/TLS à chaque appel)
+# - un limiteur de débit (token bucket) pour respecter le quota de chaque site
+# - des reprises automatiques sur 429 (en respectant Retry-After) et sur les erreurs réseau
+# - un cache disque des réponses GET (SQLite), partagé entre les runs : durée de fraîcheur par motif d'URL,
+#   revalidation ETag / Last-Modified (304 = rien à retélécharger), taille bornée (les moins récemment lues partent)
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+HEURE = 3600
+JOUR = 24 * HEURE
+
+# Cache : chemin du fichier SQLite ("0" = pas de cache), taille max, et mode hors ligne (réponses en cache uniquement,
+# aucune requête réseau : les pages déjà vues servent de jeu de test)
+CACHE_CHEMIN = os.getenv("HTTP_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "http_cache.sqlite"))
+CACHE_TAILLE_MAX = int(float(os.getenv("HTTP_CACHE_TAILLE_MO", "500")) * 1e6)
+CACHE_HORS_LIGNE = os.getenv("HTTP_CACHE_HORS_LIGNE", "0") == "1"
+
+# Durée pendant laquelle une réponse est resservie sans rien demander au site, par motif d'URL (le 1er qui correspond).
+# None = jamais en cache ; 0 = toujours revalidée (requête conditionnelle si le site a donné un ETag / Last-Modified)
+POLITIQUES_CACHE = [
+    (r"api\.francetravail\.io|oauth2", None),                               # API authentifiées : toujours fraîches
+    (r"candidat\.francetravail\.fr/offres/recherche/detail/", 12 * HEURE),   # Page publique d'une offre (verif_url)
+    (r"welcometothejungle\.com/.*/jobs/", 7 * JOUR),                         # Page d'une offre WTTJ (contenu stable)
+    (r"free-work\.com/.*/jobs\?", HEURE),                                    # Page de recherche
+]
+TTL_DEFAUT = 0
+
+# En-têtes qui décrivent le transport et non le contenu (le corps est stocké déjà décompressé)
+EN_TETES_NON_STOCKES = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+# region 1. --- LIMITEUR DE DÉBIT ---
+
+class LimiteurDebit:
+    """
+    Token bucket asynchrone : au plus `par_seconde` requêtes par seconde en régime établi,
+    avec une rafale possible de `rafale` requêtes. Partagé entre toutes les tâches d'un même site.
+    `suspendre()` met tout le monde en pause (ex: après un 429 avec Retry-After).
+    """
+
+    def __init__(self, par_seconde, rafale=1):
+        self.par_seconde = float(par_seconde)
+        self.capacite = max(1, int(rafale))
+        self.jetons = float(self.capacite)
+        self.dernier = time.monotonic()
+        self.reprise = 0.0
+        self._verrou = asyncio.Lock()
+
+    async def attendre(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible, puis le consomme."""
+        async with self._verrou:
+            while True:
+                maintenant = time.monotonic()
+                if maintenant < self.reprise:
+                    await asyncio.sleep(self.reprise - maintenant)
+                    continue
+
+                self.jetons = min(self.capacite, self.jetons + (maintenant - self.dernier) * self.par_seconde)
+                self.dernier = maintenant
+                if self.jetons >= 1:
+                    self.jetons -= 1
+                    return
+                await asyncio.sleep((1 - self.jetons) / self.par_seconde)
+
+    def suspendre(self, secondes):
+        """Plus aucune requête ne part avant `secondes` (la pause la plus longue l'emporte)."""
+        self.reprise = max(self.reprise, time.monotonic() + secondes)
+        self.jetons = 0.0
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- CACHE DISQUE ---
+
+class CacheHTTP:
+    """
+    Réponses GET (200) stockées dans une base SQLite : une ligne par URL, avec le corps, les en-têtes,
+    les validateurs (ETag, Last-Modified), la date de stockage et la date du dernier accès (pour l'éviction LRU).
+    Utilisé par `requete(..., cache=cache)` ; un même cache peut servir à plusieurs clients et plusieurs sites.
+    """
+
+    def __init__(self, chemin, taille_max=CACHE_TAILLE_MAX, politiques=POLITIQUES_CACHE, ttl_defaut=TTL_DEFAUT, hors_ligne=CACHE_HORS_LIGNE):
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, isolation_level=None)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS reponses (
+                url TEXT PRIMARY KEY, statut INTEGER, en_tetes TEXT, corps BLOB,
+                etag TEXT, last_modified TEXT, stockee REAL, acces REAL, taille INTEGER
+            )""")
+        self.connexion.execute("CREATE INDEX IF NOT EXISTS reponses_acces ON reponses (acces)")
+        self.taille_max = taille_max
+        self.politiques = [(re.compile(motif), ttl) for motif, ttl in politiques]
+        self.ttl_defaut = ttl_defaut
+        self.hors_ligne = hors_ligne
+        self.taille = self.connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM reponses").fetchone()[0]
+        self.stats = {"servies": 0, "revalidees": 0, "telechargees": 0, "octets_evites": 0}
+
+    def fermer(self):
+        self.connexion.close()
+
+    def ttl(self, url):
+        for motif, ttl in self.politiques:
+            if motif.search(url):
+                return ttl
+        return self.ttl_defaut
+
+    def accepte(self, methode, url, en_tetes):
+        """Seuls les GET anonymes passent par le cache (une réponse authentifiée dépend du token)."""
+        en_tetes = {cle.lower() for cle in (en_tetes or {})}
+        return methode.upper() == "GET" and "authorization" not in en_tetes and self.ttl(url) is not None
+
+    # --- LECTURE ---
+
+    def lire(self, url):
+        """(réponse reconstruite, fraîche ?, validateurs) ou None si l'URL n'est pas en cache."""
+        ligne = self.connexion.execute(
+            "SELECT statut, en_tetes, corps, etag, last_modified, stockee FROM reponses WHERE url = ?", (url,)
+        ).fetchone()
+        if ligne is None:
+            return None
+        statut, en_tetes, corps, etag, last_modified, stockee = ligne
+        self.connexion.execute("UPDATE reponses SET acces = ? WHERE url = ?", (time.time(), url))
+        reponse = httpx.Response(statut, headers=json.loads(en_tetes), content=corps, request=httpx.Request("GET", url))
+        fraiche = time.time() - stockee < self.ttl(url)
+        validateurs = {}
+        if etag:
+            validateurs["If-None-Match"] = etag
+        if last_modified:
+            validateurs["If-Modified-Since"] = last_modified
+        return reponse, fraiche, validateurs
+
+    # --- ÉCRITURE ---
+
+    def enregistrer(self, url, reponse):
+        """Stocke une réponse 200, sauf si le site l'interdit ou si elle ne pourra jamais resservir."""
+        cache_control = reponse.headers.get("Cache-Control", "").lower()
+        validateurs = reponse.headers.get("ETag") or reponse.headers.get("Last-Modified")
+        if "no-store" in cache_control or (not validateurs and not self.ttl(url)):
+            return
+        en_tetes = [(cle, valeur) for cle, valeur in reponse.headers.multi_items() if cle.lower() not in EN_TETES_NON_STOCKES]
+        corps = reponse.content
+        maintenant = time.time()
+        ancienne = self.connexion.execute("SELECT taille FROM reponses WHERE url = ?", (url,)).fetchone()
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO reponses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, reponse.status_code, json.dumps(en_tetes), corps,
+             reponse.headers.get("ETag"), reponse.headers.get("Last-Modified"), maintenant, maintenant, len(corps)),
+        )
+        self.taille += len(corps) - (ancienne[0] if ancienne else 0)
+        if self.taille > self.taille_max:
+            self.evincer()
+
+    def revalider(self, url, reponse_304):
+        """Le site a confirmé (304) : la réponse stockée repart pour une durée de fraîcheur, avec les nouveaux validateurs."""
+        self.connexion.execute(
+            "UPDATE reponses SET stockee = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+            (time.time(), reponse_304.headers.get("ETag"), reponse_304.headers.get("Last-Modified"), url),
+        )
+
+    def evincer(self):
+        """Supprime les réponses les moins récemment lues jusqu'à revenir à 90 % de la taille max."""
+        a_liberer = self.taille - int(self.taille_max * 0.9)
+        self.connexion.execute("""
+            DELETE FROM reponses WHERE url IN (
+                SELECT url FROM (SELECT url, taille, SUM(taille) OVER (ORDER BY acces, url) AS cumul FROM reponses)
+                WHERE cumul - taille < ?
+            )""", (a_liberer,))
+        self.taille = self.connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM reponses").fetchone()[0]
+
+    def resume(self):
+        s = self.stats
+        return (f"🗄️ [Cache HTTP] {s['servies']} réponses servies sans requête, {s['revalidees']} revalidées (304), "
+                f"{s['telechargees']} téléchargées ({s['octets_evites'] / 1e6:.1f} Mo évités)")
+
+
+def cache_par_defaut():
+    """Cache partagé par les scrapers (HTTP_CACHE), ou None s'il est désactivé (HTTP_CACHE=0)."""
+    if CACHE_CHEMIN in ("", "0"):
+        return None
+    return CacheHTTP(CACHE_CHEMIN)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 3. --- CLIENT ET REQUÊTES ---
+
+def creer_client_async(connexions_max=10, timeout=30.0, headers=None, **options):
+    """Client httpx.AsyncClient avec un pool keep-alive et un User-Agent de navigateur."""
+    en_tetes = {"User-Agent": USER_AGENT}
+    en_tetes.update(headers or {})
+    return httpx.AsyncClient(
+        headers=en_tetes,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=connexions_max, max_keepalive_connections=connexions_max),
+        follow_redirects=True,
+        **options
+    )
+
+
+def duree_retry_after(valeur, defaut):
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en secondes d'attente."""
+    if not valeur:
+        return defaut
+    try:
+        return max(0.0, float(valeur))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(valeur)
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return defaut
+
+
+async def requete(client, limiteur, methode, url, tentatives=4, cache=None, **kwargs):
+    """
+    Envoie une requête en passant par le limiteur.
+    - 429 : pause de tout le site pendant Retry-After (ou backoff exponentiel), puis nouvel essai
+    - erreur réseau : backoff exponentiel, puis nouvel essai
+    - avec `cache` : un GET anonyme est d'abord cherché dans le cache (voir requete_en_cache)
+    Renvoie la dernière réponse obtenue (l'appelant gère les autres codes HTTP).
+    """
+    if cache is not None and cache.accepte(methode, url, kwargs.get("headers")):
+        return await requete_en_cache(client, limiteur, cache, url, tentatives, **kwargs)
+
+    for essai in range(tentatives):
+        if limiteur is not None:
+            await limiteur.attendre()
+        try:
+            reponse = await client.request(methode, url, **kwargs)
+        except httpx.TransportError:
+            if essai == tentatives - 1:
+                raise
+            await asyncio.sleep(2 ** essai)
+            continue
+
+        if reponse.status_code == 429 and essai < tentatives - 1:
+            attente = duree_retry_after(reponse.headers.get("Retry-After"), defaut=2 ** essai)
+            print(f"⏳ [HTTP] 429 sur {httpx.URL(url).host} : pause de {attente:.1f} s")
+            if limiteur is not None:
+                limiteur.suspendre(attente)
+            else:
+                await asyncio.sleep(attente)
+            continue
+
+        return reponse
+
+
+async def requete_en_cache(client, limiteur, cache, url, tentatives=4, **kwargs):
+    """
+    GET via le cache disque :
+    - réponse fraîche (ou mode hors ligne) : resservie sans requête ni jeton du limiteur
+    - réponse périmée avec ETag / Last-Modified : requête conditionnelle, un 304 resservant la réponse stockée
+    - sinon : téléchargement, puis stockage si la réponse est un 200
+    Hors ligne, une URL absente du cache donne un 504 (comme "only-if-cached").
+    """
+    url = str(httpx.URL(url, params=kwargs.pop("params", None)))
+    en_cache = cache.lire(url)
+    if en_cache is not None and (en_cache[1] or cache.hors_ligne):
+        cache.stats["servies"] += 1
+        cache.stats["octets_evites"] += len(en_cache[0].content)
+        return en_cache[0]
+    if cache.hors_ligne:
+        return httpx.Response(504, request=httpx.Request("GET", url))
+
+    en_tetes = dict(kwargs.pop("headers", None) or {})
+    if en_cache is not None:
+        en_tetes.update(en_cache[2])
+    reponse = await requete(client, limiteur, "GET", url, tentatives, headers=en_tetes, **kwargs)
+
+    if reponse.status_code == 304 and en_cache is not None:
+        cache.revalider(url, reponse)
+        cache.stats["revalidees"] += 1
+        cache.stats["octets_evites"] += len(en_cache[0].content)
+        return en_cache[0]
+    cache.stats["telechargees"] += 1
+    if reponse.status_code == 200:
+        cache.enregistrer(url, reponse)
+    return reponse
+
+# endregion
@@ -0,0 +1,100 @@
+import threading
+import time
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Rechargement à chaud des données du dashboard.
+# Un "instantané" = les données d'une version du fichier global (offres + cube).
+# - La version est lue à bas coût (manifeste écrit par fusion_csv.py, ou date/taille du fichier)
+# - Quand elle change, la nouvelle version est chargée dans un thread pendant que l'ancienne reste servie,
+#   puis on bascule d'un coup : aucun utilisateur n'attend un rechargement à froid
+# - Seul le tout premier chargement (démarrage de l'app) est bloquant
+# L'objet est partagé par toutes les sessions (st.cache_resource) : les instantanés ne doivent pas être modifiés.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+class GestionnaireInstantanes:
+    """
+    Exemple :
+        gestionnaire = GestionnaireInstantanes(lire_version, charger_version)
+        version, donnees = gestionnaire.obtenir()   # à chaque rerun
+
+    `lire_version()` renvoie une clé (str) ou None si aucune donnée n'est publiée.
+    `charger(version)` renvoie les données de cette version (lève une exception en cas d'échec).
+    """
+
+    def __init__(self, lire_version, charger, intervalle_verif=2.0):
+        self.lire_version = lire_version
+        self.charger = charger
+        self.intervalle_verif = intervalle_verif
+
+        self.version = None
+        self.donnees = None
+        self.derniere_erreur = None
+
+        self._verrou = threading.Lock()            # Protège (version, donnees) et l'état du thread
+        self._verrou_froid = threading.Lock()      # Un seul chargement à froid à la fois
+        self._thread = None
+        self._version_en_cours = None
+        self._version_en_echec = None              # Pas de nouvel essai tant que la version publiée ne change pas
+        self._derniere_verif = 0.0
+        self._version_vue = None
+
+    def _version_actuelle(self):
+        """Relit la version publiée, au plus une fois toutes les `intervalle_verif` secondes."""
+        maintenant = time.monotonic()
+        if maintenant - self._derniere_verif >= self.intervalle_verif:
+            self._derniere_verif = maintenant
+            try:
+                self._version_vue = self.lire_version()
+            except Exception as e:
+                print(f"⚠️ [Instantanés] Version illisible : {e}")
+        return self._version_vue
+
+    def _charger_en_fond(self, version):
+        try:
+            donnees = self.charger(version)
+        except Exception as e:
+            print(f"❌ [Instantanés] Échec du chargement de la version {version} : {e} (on garde {self.version})")
+            with self._verrou:
+                self.derniere_erreur = e
+                self._version_en_cours = None
+                self._version_en_echec = version
+            return
+
+        with self._verrou:
+            self.version, self.donnees = version, donnees
+            self.derniere_erreur = None
+            self._version_en_cours = None
+        print(f"🔄 [Instantanés] Nouvelle version en ligne : {version}")
+
+    def obtenir(self):
+        """Renvoie (version, données) : la dernière version chargée, sans jamais attendre un rechargement."""
+        version = self._version_actuelle()
+
+        if self.donnees is None:
+            # Démarrage à froid : rien à servir, on charge tout de suite (une seule fois pour toutes les sessions)
+            with self._verrou_froid:
+                if self.donnees is None and version is not None:
+                    self._charger_en_fond(version)
+                    if self.derniere_erreur is not None:
+                        raise self.derniere_erreur
+            return self.version, self.donnees
+
+        with self._verrou:
+            a_lancer = (
+                version is not None
+                and version != self.version
+                and version != self._version_en_cours
+                and self._version_en_cours is None
+                and version != self._version_en_echec
+            )
+            if a_lancer:
+                self._version_en_cours = version
+                self._thread = threading.Thread(target=self._charger_en_fond, args=(version,), daemon=True)
+                self._thread.start()
+            return self.version, self.donnees
+
+    def attendre(self, timeout=None):
+        """Attend la fin d'un éventuel rechargement en cours (benchmarks, scripts)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
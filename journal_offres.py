@@ -0,0 +1,290 @@
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Journal du cycle de vie des offres : une ligne par événement, jamais modifiée ni supprimée (data/journal_offres.sqlite).
+# - premiere_vue / revue : l'offre est listée par un crawler (ou par l'API France Travail)
+# - contenu_modifie : son empreinte (fusion_csv.py) a changé depuis le dernier passage
+# - expiree : un updater l'a trouvée hors ligne
+# Un événement = (offre, jour, type) en entiers : quelques octets, au plus un événement de chaque type par offre et par jour.
+# L'état d'une offre (première / dernière vue, expiration, nb de modifications) est un agrégat de ses événements
+# (min / max / somme : l'ordre d'arrivée ne compte pas). La table `offres` garde l'état courant, et un instantané
+# en copie l'état régulièrement : l'état du marché à une date passée = l'instantané le plus proche + les événements suivants.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CHEMIN_JOURNAL = os.getenv("PATHFINDER_JOURNAL", os.path.join(current_dir, "data", "journal_offres.sqlite"))
+INTERVALLE_INSTANTANE = 7   # Jours entre deux instantanés
+ATTENTE_VERROU = 60         # Secondes d'attente si une autre étape du pipeline écrit dans le journal
+
+PREMIERE_VUE, REVUE, CONTENU_MODIFIE, EXPIREE = 0, 1, 2, 3
+TYPES = {PREMIERE_VUE: "premiere_vue", REVUE: "revue", CONTENU_MODIFIE: "contenu_modifie", EXPIREE: "expiree"}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS offres (
+        id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, source TEXT, empreinte TEXT,
+        premiere_vue INTEGER, derniere_vue INTEGER, expiration INTEGER, nb_modifications INTEGER DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS evenements (
+        id INTEGER PRIMARY KEY, offre INTEGER NOT NULL, jour INTEGER NOT NULL, type INTEGER NOT NULL,
+        UNIQUE (offre, jour, type)
+    );
+    CREATE INDEX IF NOT EXISTS idx_evenements_jour ON evenements (jour, type);
+    CREATE TABLE IF NOT EXISTS instantanes (
+        id INTEGER PRIMARY KEY, jour INTEGER UNIQUE NOT NULL, dernier_evenement INTEGER NOT NULL, nb_offres INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS etats (
+        instantane INTEGER, offre INTEGER, premiere_vue INTEGER, derniere_vue INTEGER, expiration INTEGER, nb_modifications INTEGER,
+        PRIMARY KEY (instantane, offre)
+    ) WITHOUT ROWID;
+    CREATE TEMP TABLE IF NOT EXISTS lot (url TEXT PRIMARY KEY, source TEXT, empreinte TEXT, publication INTEGER, expiration INTEGER);
+"""
+
+# État d'une offre à partir de ses événements : même calcul pour la table offres et pour rejouer le journal
+AGREGATS = f"""
+    MIN(CASE WHEN type IN ({PREMIERE_VUE}, {REVUE}) THEN jour END) AS premiere_vue,
+    MAX(CASE WHEN type IN ({PREMIERE_VUE}, {REVUE}) THEN jour END) AS derniere_vue,
+    MAX(CASE WHEN type = {EXPIREE} THEN jour END) AS expiration,
+    SUM(type = {CONTENU_MODIFIE}) AS nb_modifications
+"""
+
+# --- ÉVÉNEMENTS CRÉÉS À PARTIR DE LA TABLE TEMPORAIRE `lot` (paramètre :jour = aujourd'hui) ---
+VUES = f"""
+    INSERT OR IGNORE INTO evenements (offre, jour, type)
+    SELECT o.id, :jour, CASE WHEN o.premiere_vue IS NULL THEN {PREMIERE_VUE} ELSE {REVUE} END
+    FROM lot JOIN offres o ON o.url = lot.url
+"""
+# Une offre déjà expirée (et pas revue depuis) ne l'est pas une deuxième fois
+DEJA_EXPIREE = "o.expiration IS NOT NULL AND o.expiration >= COALESCE(o.derniere_vue, 0)"
+EXPIRATIONS = f"""
+    INSERT OR IGNORE INTO evenements (offre, jour, type)
+    SELECT o.id, :jour, {EXPIREE} FROM lot JOIN offres o ON o.url = lot.url WHERE NOT ({DEJA_EXPIREE})
+"""
+SYNCHRONISATION = [
+    # Offres jamais listées par un crawler (historique d'avant le journal) : vues à leur date de publication
+    f"""INSERT OR IGNORE INTO evenements (offre, jour, type)
+        SELECT o.id, COALESCE(lot.publication, :jour), {PREMIERE_VUE} FROM lot JOIN offres o ON o.url = lot.url
+        WHERE o.premiere_vue IS NULL""",
+    f"""INSERT OR IGNORE INTO evenements (offre, jour, type)
+        SELECT o.id, :jour, {CONTENU_MODIFIE} FROM lot JOIN offres o ON o.url = lot.url
+        WHERE o.empreinte IS NOT NULL AND lot.empreinte IS NOT NULL AND o.empreinte <> lot.empreinte""",
+    # Expirations déjà notées dans les fichiers mais pas dans le journal
+    f"""INSERT OR IGNORE INTO evenements (offre, jour, type)
+        SELECT o.id, lot.expiration, {EXPIREE} FROM lot JOIN offres o ON o.url = lot.url
+        WHERE lot.expiration IS NOT NULL AND NOT ({DEJA_EXPIREE})""",
+]
+
+
+def aujourdhui():
+    """Numéro du jour (jours depuis le 1970-01-01)."""
+    return int(np.datetime64("today", "D").astype(np.int64))
+
+
+def en_jours(dates):
+    """Série de dates (texte AAAA-MM-JJ ou datetime) -> liste de numéros de jour (None si absente ou illisible)."""
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce", format="ISO8601").to_numpy(dtype="datetime64[D]")
+    return pd.Series(dates.astype(np.int64)).astype(object).where(~np.isnat(dates), None).tolist()
+
+
+def en_dates(jours):
+    """Numéros de jour -> datetime64 (NaT pour les manquants)."""
+    return pd.to_datetime(pd.Series(jours, dtype="float64"), unit="D")
+
+
+class JournalOffres:
+    """
+    Exemple :
+        with JournalOffres() as journal:
+            journal.enregistrer_vues(urls, source="Apec")       # crawler
+            journal.enregistrer_expirations([url])               # updater
+            etat = journal.etat_au("2026-02-15")                 # marché à une date passée
+            flux = journal.flux(debut="2025-09-01")              # entrées / sorties par semaine
+    """
+
+    def __init__(self, chemin=CHEMIN_JOURNAL):
+        os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, timeout=ATTENTE_VERROU, isolation_level=None)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.executescript(SCHEMA)
+
+    def fermer(self):
+        self.connexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fermer()
+
+    # --- ÉCRITURE ---
+
+    def _ecrire(self, lignes, requetes, jour=None):
+        """
+        Une transaction : `lignes` (url, source, empreinte, publication, expiration) vont dans la table temporaire lot,
+        les offres inconnues sont créées, `requetes` ajoutent les événements, puis l'état des offres touchées est mis à jour.
+        Renvoie le nombre d'événements ajoutés.
+        """
+        connexion = self.connexion
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            connexion.execute("DELETE FROM lot")
+            connexion.executemany("INSERT OR REPLACE INTO lot VALUES (?, ?, ?, ?, ?)", lignes)
+            connexion.execute("INSERT OR IGNORE INTO offres (url, source) SELECT url, source FROM lot")
+            depuis = connexion.execute("SELECT COALESCE(MAX(id), 0) FROM evenements").fetchone()[0]
+            for requete in requetes:
+                connexion.execute(requete, {"jour": aujourdhui() if jour is None else jour})
+            connexion.execute(f"""
+                UPDATE offres SET
+                    premiere_vue = COALESCE(MIN(offres.premiere_vue, e.premiere_vue), offres.premiere_vue, e.premiere_vue),
+                    derniere_vue = COALESCE(MAX(offres.derniere_vue, e.derniere_vue), offres.derniere_vue, e.derniere_vue),
+                    expiration = COALESCE(MAX(offres.expiration, e.expiration), offres.expiration, e.expiration),
+                    nb_modifications = offres.nb_modifications + e.nb_modifications
+                FROM (SELECT offre, {AGREGATS} FROM evenements WHERE id > ? GROUP BY offre) AS e
+                WHERE offres.id = e.offre
+            """, (depuis,))
+            connexion.execute("UPDATE offres SET empreinte = lot.empreinte FROM lot WHERE offres.url = lot.url AND lot.empreinte IS NOT NULL")
+            nb = connexion.execute("SELECT COUNT(*) FROM evenements WHERE id > ?", (depuis,)).fetchone()[0]
+            connexion.execute("COMMIT")
+            return nb
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+
+    def enregistrer_vues(self, urls, source=None, jour=None):
+        """Offres listées aujourd'hui par un crawler : premiere_vue si l'URL est inconnue, sinon revue."""
+        return self._ecrire([(str(u), source, None, None, None) for u in urls if isinstance(u, str) and u], [VUES], jour)
+
+    def enregistrer_expirations(self, urls, jour=None):
+        """Offres trouvées hors ligne par un updater (ignoré si l'offre est déjà expirée)."""
+        return self._ecrire([(str(u), None, None, None, None) for u in urls if isinstance(u, str) and u], [EXPIRATIONS], jour)
+
+    def synchroniser(self, df):
+        """
+        Rapproche le journal d'un morceau du fichier global (URL, Source, Empreinte, Date_Publication, Date_Expiration) :
+        contenu_modifie quand l'empreinte a changé, et rattrapage des offres / expirations pas encore journalisées.
+        """
+        df = df[df["URL"].notna()]
+        colonnes = [
+            df["URL"].astype(str).tolist(),
+            df["Source"].tolist() if "Source" in df.columns else [None] * len(df),
+            df["Empreinte"].astype(str).where(df["Empreinte"].notna(), None).tolist() if "Empreinte" in df.columns else [None] * len(df),
+            en_jours(df["Date_Publication"]) if "Date_Publication" in df.columns else [None] * len(df),
+            en_jours(df["Date_Expiration"]) if "Date_Expiration" in df.columns else [None] * len(df),
+        ]
+        return self._ecrire(list(zip(*colonnes)), SYNCHRONISATION)
+
+    # --- INSTANTANÉS ---
+
+    def creer_instantane(self):
+        """Copie l'état courant de toutes les offres (un instantané par jour au plus). Renvoie son jour, ou None."""
+        connexion = self.connexion
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            dernier, jour_max = connexion.execute("SELECT COALESCE(MAX(id), 0), MAX(jour) FROM evenements").fetchone()
+            jour = max(aujourdhui(), jour_max or 0)   # Aucun événement de l'instantané n'est postérieur à son jour
+            if connexion.execute("SELECT 1 FROM instantanes WHERE jour = ?", (jour,)).fetchone():
+                connexion.execute("ROLLBACK")
+                return None
+            instantane = connexion.execute(
+                "INSERT INTO instantanes (jour, dernier_evenement) VALUES (?, ?)", (jour, dernier)
+            ).lastrowid
+            nb = connexion.execute("""
+                INSERT INTO etats SELECT ?, id, premiere_vue, derniere_vue, expiration, nb_modifications
+                FROM offres WHERE premiere_vue IS NOT NULL OR expiration IS NOT NULL
+            """, (instantane,)).rowcount
+            connexion.execute("UPDATE instantanes SET nb_offres = ? WHERE id = ?", (nb, instantane))
+            connexion.execute("COMMIT")
+            return jour
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+
+    def instantane_periodique(self):
+        """Nouvel instantané si le dernier a plus de INTERVALLE_INSTANTANE jours et que des événements ont suivi."""
+        jour, dernier = self.connexion.execute(
+            "SELECT jour, dernier_evenement FROM instantanes ORDER BY jour DESC LIMIT 1"
+        ).fetchone() or (None, 0)
+        if jour is not None and aujourdhui() - jour < INTERVALLE_INSTANTANE:
+            return None
+        if not self.connexion.execute("SELECT 1 FROM evenements WHERE id > ? LIMIT 1", (dernier,)).fetchone():
+            return None
+        return self.creer_instantane()
+
+    # --- LECTURE ---
+
+    def version(self):
+        """Numéro du dernier événement (change à chaque écriture) : clé de cache pour le dashboard."""
+        return self.connexion.execute("SELECT COALESCE(MAX(id), 0) FROM evenements").fetchone()[0]
+
+    def etat_au(self, date):
+        """
+        État du marché à la fin de `date` : une ligne par offre déjà vue (URL, Source, Premiere_Vue, Derniere_Vue,
+        Expiration, Nb_Modifications, Active). Rejoue les événements qui suivent l'instantané le plus proche.
+        """
+        jour = en_jours([date])[0]
+        instantane, depuis = self.connexion.execute(
+            "SELECT id, dernier_evenement FROM instantanes WHERE jour <= ? ORDER BY jour DESC LIMIT 1", (jour,)
+        ).fetchone() or (None, 0)
+        colonnes = "e.offre, o.url AS URL, o.source AS Source, e.premiere_vue AS Premiere_Vue, e.derniere_vue AS Derniere_Vue, " \
+                   "e.expiration AS Expiration, e.nb_modifications AS Nb_Modifications"
+        # Instantané (lu tel quel) + événements qui le suivent (agrégés par offre : quelques jours au plus en général)
+        instantane = pd.read_sql_query(
+            f"SELECT {colonnes} FROM etats e JOIN offres o ON o.id = e.offre WHERE e.instantane = ?", self.connexion, params=(instantane,)
+        )
+        recents = pd.read_sql_query(f"""
+            SELECT {colonnes} FROM (SELECT offre, {AGREGATS} FROM evenements WHERE id > ? AND jour <= ? GROUP BY offre) AS e
+            JOIN offres o ON o.id = e.offre
+        """, self.connexion, params=(depuis, jour))
+        df = pd.concat([d for d in [instantane, recents] if not d.empty] or [recents], ignore_index=True)
+        if not instantane.empty and not recents.empty:
+            df = df.groupby("offre", sort=False).agg({
+                "URL": "first", "Source": "first", "Premiere_Vue": "min", "Derniere_Vue": "max", "Expiration": "max", "Nb_Modifications": "sum"
+            }).reset_index()
+        df = df[df["Premiere_Vue"].notna()].drop(columns="offre").reset_index(drop=True)
+        jours = df[["Derniere_Vue", "Expiration"]].astype("float64")
+        # Active : pas d'expiration, ou revue après sa dernière expiration
+        df["Active"] = jours["Expiration"].isna() | (jours["Derniere_Vue"] > jours["Expiration"])
+        for colonne in ["Premiere_Vue", "Derniere_Vue", "Expiration"]:
+            df[colonne] = en_dates(df[colonne])
+        return df
+
+    def flux(self, debut=None, sources=None):
+        """
+        Par semaine (lundi) : offres nouvelles (premiere_vue), expirées, modifiées, et stock actif en fin de semaine
+        (cumul des nouvelles moins cumul des expirées, depuis le début du journal). `sources` : filtre sur la Source.
+        """
+        filtre, params = "", []
+        if sources is not None:
+            filtre = f"AND o.source IN ({', '.join('?' * len(sources))})"
+            params = list(sources)
+        comptes = pd.read_sql_query(f"""
+            SELECT e.jour - ((e.jour + 3) % 7) AS semaine, e.type, COUNT(*) AS nb
+            FROM evenements e JOIN offres o ON o.id = e.offre
+            WHERE e.type IN ({PREMIERE_VUE}, {CONTENU_MODIFIE}, {EXPIREE}) {filtre}
+            GROUP BY semaine, e.type
+        """, self.connexion, params=params)
+        noms = {PREMIERE_VUE: "Nouvelles", EXPIREE: "Expirées", CONTENU_MODIFIE: "Modifiées"}
+        table = comptes.pivot(index="semaine", columns="type", values="nb").reindex(columns=list(noms), fill_value=0)
+        table = table.fillna(0).astype(int).rename(columns=noms).rename_axis(columns=None).sort_index()
+        if not table.empty:   # Semaines sans événement : 0 (le stock se lit en continu)
+            table = table.reindex(range(table.index.min(), table.index.max() + 1, 7), fill_value=0)
+        table["Stock"] = table["Nouvelles"].cumsum() - table["Expirées"].cumsum()
+        table.index = en_dates(table.index).rename("Semaine")
+        if debut is not None:
+            table = table[table.index >= pd.Timestamp(debut)]
+        return table.reset_index()
+
+
+# ======================================================================================================================================================
+# Appels depuis les scripts (crawlers, updaters, fusion) : le journal ne doit jamais faire échouer une collecte.
+
+def journaliser(action, *args, **kwargs):
+    """Ouvre le journal, appelle JournalOffres.<action>(*args) et le referme. Renvoie le résultat (None en cas d'erreur)."""
+    try:
+        with JournalOffres() as journal:
+            return getattr(journal, action)(*args, **kwargs)
+    except sqlite3.Error as e:
+        print(f"⚠️ [Journal] {action} impossible : {e}")
+        return None
@@ -0,0 +1,56 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Exécution d'une fonction "ligne à ligne indépendante" (ex: enrichissement.enrichir_offres) sur plusieurs cœurs.
+# Le DataFrame est découpé en partitions de lignes contiguës, chaque partition est traitée par un process
+# du pool, puis les résultats sont recollés dans l'ordre des lignes.
+# - Les process sont créés par fork : ils héritent du DataFrame et des motifs regex déjà compilés
+#   (enrichissement.py) sans rien copier ni recompiler. Seuls les numéros de ligne partent vers les process,
+#   et seules les colonnes calculées reviennent.
+# - En dessous de SEUIL_PARALLELE lignes (ou avec 1 seul cœur, ou sans fork), tout est fait dans le process courant :
+#   démarrer un pool coûte plus cher que de traiter quelques milliers d'offres.
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+SEUIL_PARALLELE = 2000         # Lignes en dessous desquelles on reste sur un seul cœur
+PARTITIONS_PAR_WORKER = 4      # Plusieurs partitions par process : un process lent ne retarde pas tout le monde
+LIGNES_MIN_PARTITION = 500
+
+# DataFrame et fonction de l'exécution en cours, hérités par les process au moment du fork
+_tache = {}
+
+
+def nb_workers_disponibles():
+    """Cœurs utilisables par ce process (FUSION_WORKERS pour forcer un nombre)."""
+    if os.getenv("FUSION_WORKERS"):
+        return max(1, int(os.getenv("FUSION_WORKERS")))
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))   # Respecte les limites du conteneur / taskset
+    return os.cpu_count() or 1
+
+
+def _traiter_partition(debut, fin):
+    return _tache["fonction"](_tache["df"].iloc[debut:fin])
+
+
+def executer_par_partitions(fonction, df, nb_workers=None, seuil=SEUIL_PARALLELE):
+    """
+    fonction(df) pour un DataFrame : même résultat que l'appel direct, calculé par partitions sur plusieurs process.
+    `fonction` doit renvoyer un DataFrame aligné sur les lignes reçues (même index) et être définie au niveau d'un module.
+    """
+    nb_workers = min(nb_workers or nb_workers_disponibles(), -(-len(df) // LIGNES_MIN_PARTITION))
+    if nb_workers <= 1 or len(df) < seuil or "fork" not in multiprocessing.get_all_start_methods():
+        return fonction(df)
+
+    taille = max(LIGNES_MIN_PARTITION, -(-len(df) // (nb_workers * PARTITIONS_PAR_WORKER)))
+    bornes = [(debut, min(debut + taille, len(df))) for debut in range(0, len(df), taille)]
+    print(f"⚙️  {len(bornes)} partitions de {taille} lignes sur {nb_workers} process...")
+    _tache.update(fonction=fonction, df=df)
+    try:
+        with ProcessPoolExecutor(max_workers=nb_workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            resultats = list(pool.map(_traiter_partition, *zip(*bornes)))
+    finally:
+        _tache.clear()
+    return pd.concat(resultats)
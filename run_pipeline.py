@@ -2,124 +2,329 @@ import subprocess
 import os
 import sys
 import time
-import threading
-import pandas as pd
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 # --- CONFIGURATION ---
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+from utils import date_modification, compter_lignes, ecrire_json
 
-# On définit les "CHAINES" de tâches par site
-# Chaque chaîne s'exécutera toute seule, indépendamment des autres
-TASKS = {
-    "FRANCE_TRAVAIL": [
-        os.path.join(PROJECT_ROOT, "scrapers", "francetravail", "api_francetravail.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "francetravail", "updater_francetravail.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "francetravail", "clean_francetravail.py"),
-    ],
-    "WTTJ": [
-        os.path.join(PROJECT_ROOT, "scrapers", "wttj", "crawler_wttj.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "wttj", "scraper_wttj.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "wttj", "updater_wttj.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "wttj", "clean_wttj.py"),
-    ],
-    "APEC": [
-        os.path.join(PROJECT_ROOT, "scrapers", "apec", "crawler_apec.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "apec", "scraper_apec.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "apec", "updater_apec.py"),
-        os.path.join(PROJECT_ROOT, "scrapers", "apec", "clean_apec.py"),
-    ]
+MANIFESTE = os.path.join(PROJECT_ROOT, "data", "run_manifest.json")
+NB_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+
+def script(*chemin):
+    return os.path.join(PROJECT_ROOT, "scrapers", *chemin)
+
+
+def donnee(*chemin):
+    return os.path.join(PROJECT_ROOT, "data", *chemin)
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Graphe des étapes (DAG) : chaque étape déclare ses dépendances ("apres") et ses fichiers d'entrée / de sortie.
+# - Une étape démarre dès que toutes ses dépendances sont terminées (plus de barrière globale entre les sites)
+# - Une étape est sautée si toutes ses sorties existent et sont plus récentes que ses entrées
+#   (les étapes "reseau" n'ont pas d'entrée : elles tournent toujours, sauf en --hors-ligne)
+# - "tolere_echecs" : l'étape tourne même si certaines dépendances ont échoué (ex: la fusion avec 2 sources sur 3)
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+ETAPES = {
+    # --- FRANCE TRAVAIL ---
+    "ft_api": {
+        "script": script("francetravail", "api_francetravail.py"),
+        "sorties": [donnee("enriched", "offres_francetravail_full.csv")],
+        "reseau": True,
+    },
+    "ft_updater": {
+        "script": script("francetravail", "updater_francetravail.py"),
+        "apres": ["ft_api"],
+        "sorties": [donnee("enriched", "offres_francetravail_full.csv")],
+        "reseau": True,
+    },
+    "ft_clean": {
+        "script": script("francetravail", "clean_francetravail.py"),
+        "apres": ["ft_updater"],
+        "entrees": [donnee("enriched", "offres_francetravail_full.csv")],
+        "sorties": [donnee("clean", "offres_francetravail_clean.csv")],
+    },
+    "ft_preparation": {
+        "script": os.path.join(PROJECT_ROOT, "fusion_csv.py"),
+        "args": ["--preparer", "francetravail"],
+        "apres": ["ft_clean"],
+        "entrees": [donnee("clean", "offres_francetravail_clean.csv")],
+        "sorties": [donnee("staging", "fusion_francetravail.csv")],
+    },
+
+    # --- WTTJ ---
+    "wttj_crawler": {
+        "script": script("wttj", "crawler_wttj.py"),
+        "sorties": [donnee("raw", "offres_wttj_url.csv")],
+        "reseau": True,
+    },
+    "wttj_scraper": {
+        "script": script("wttj", "scraper_wttj.py"),
+        "apres": ["wttj_crawler"],
+        "sorties": [donnee("enriched", "offres_wttj_full.csv")],
+        "reseau": True,
+    },
+    "wttj_updater": {
+        "script": script("wttj", "updater_wttj.py"),
+        "apres": ["wttj_scraper"],
+        "sorties": [donnee("enriched", "offres_wttj_full.csv")],
+        "reseau": True,
+    },
+    "wttj_clean": {
+        "script": script("wttj", "clean_wttj.py"),
+        "apres": ["wttj_updater"],
+        "entrees": [donnee("enriched", "offres_wttj_full.csv")],
+        "sorties": [donnee("clean", "offres_wttj_clean.csv")],
+    },
+    "wttj_preparation": {
+        "script": os.path.join(PROJECT_ROOT, "fusion_csv.py"),
+        "args": ["--preparer", "wttj"],
+        "apres": ["wttj_clean"],
+        "entrees": [donnee("clean", "offres_wttj_clean.csv")],
+        "sorties": [donnee("staging", "fusion_wttj.csv")],
+    },
+
+    # --- APEC ---
+    "apec_crawler": {
+        "script": script("apec", "crawler_apec.py"),
+        "sorties": [donnee("raw", "offres_apec_url.csv")],
+        "reseau": True,
+    },
+    "apec_scraper": {
+        "script": script("apec", "scraper_apec.py"),
+        "apres": ["apec_crawler"],
+        "sorties": [donnee("enriched", "offres_apec_full.csv")],
+        "reseau": True,
+    },
+    "apec_updater": {
+        "script": script("apec", "updater_apec.py"),
+        "apres": ["apec_scraper"],
+        "sorties": [donnee("enriched", "offres_apec_full.csv")],
+        "reseau": True,
+    },
+    "apec_clean": {
+        "script": script("apec", "clean_apec.py"),
+        "apres": ["apec_updater"],
+        "entrees": [donnee("enriched", "offres_apec_full.csv")],
+        "sorties": [donnee("clean", "offres_apec_clean.csv")],
+    },
+    "apec_preparation": {
+        "script": os.path.join(PROJECT_ROOT, "fusion_csv.py"),
+        "args": ["--preparer", "apec"],
+        "apres": ["apec_clean"],
+        "entrees": [donnee("clean", "offres_apec_clean.csv")],
+        "sorties": [donnee("staging", "fusion_apec.csv")],
+    },
+
+    # --- FUSION (dès que les 3 sources sont préparées, même si l'une a échoué) ---
+    "fusion": {
+        "script": os.path.join(PROJECT_ROOT, "fusion_csv.py"),
+        "apres": ["ft_preparation", "wttj_preparation", "apec_preparation"],
+        "entrees": [donnee("staging", f"fusion_{cle}.csv") for cle in ("francetravail", "wttj", "apec")],
+        "sorties": [donnee("clean", "global_job_market.csv"), donnee("clean", "global_cube.csv")],
+        "tolere_echecs": True,
+    },
 }
 
-SCRIPT_FUSION = os.path.join(PROJECT_ROOT, "fusion_csv.py")
+# ======================================================================================================================================================
+
+# region 1. --- DÉCISIONS ---
+
+def verifier_graphe(etapes):
+    """Dépendances inconnues ou cycle -> ValueError (avant de lancer quoi que ce soit)."""
+    for nom, etape in etapes.items():
+        for dep in etape.get("apres", []):
+            if dep not in etapes:
+                raise ValueError(f"Étape '{nom}' : dépendance inconnue '{dep}'")
 
-# --- FONCTION WORKER (Exécutée par chaque Thread) ---
-def run_chain(source_name, script_list):
+    restantes = {nom: set(etape.get("apres", [])) for nom, etape in etapes.items()}
+    while restantes:
+        pretes = [nom for nom, deps in restantes.items() if not deps & restantes.keys()]
+        if not pretes:
+            raise ValueError(f"Cycle dans le pipeline : {sorted(restantes)}")
+        for nom in pretes:
+            del restantes[nom]
+
+
+def est_a_jour(etape):
+    """True si toutes les sorties existent et sont plus récentes que toutes les entrées."""
+    entrees = etape.get("entrees", [])
+    if etape.get("reseau") or not entrees:
+        return False
+
+    dates_sorties = [date_modification(s) for s in etape.get("sorties", [])]
+    if not dates_sorties or None in dates_sorties:
+        return False
+    dates_entrees = [d for d in (date_modification(e) for e in entrees) if d is not None]
+    return not dates_entrees or min(dates_sorties) >= max(dates_entrees)
+
+
+def raison_de_sauter(nom, etape, statuts, force, hors_ligne):
+    """Raison de ne pas lancer l'étape (None = on la lance)."""
+    if not os.path.exists(etape["script"]):
+        return "script introuvable"
+    if hors_ligne and etape.get("reseau"):
+        return "hors ligne"
+
+    echecs = [dep for dep in etape.get("apres", []) if statuts[dep] in ("echec", "annulee")]
+    if echecs and (not etape.get("tolere_echecs") or len(echecs) == len(etape["apres"])):
+        return f"dépendance en échec : {', '.join(echecs)}"
+    if etape.get("entrees") and all(date_modification(e) is None for e in etape["entrees"]):
+        return "aucune entrée"
+
+    # Si une dépendance vient de tourner, ses sorties sont neuves : la comparaison des dates suffit
+    if not force and est_a_jour(etape):
+        return "à jour"
+    return None
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- EXÉCUTION ---
+
+def executer(nom, etape):
+    """Lance le script dans son propre processus. Renvoie (code retour, durée)."""
+    debut = time.time()
+    print(f"🔵 [{nom}] Démarrage : {os.path.basename(etape['script'])} {' '.join(etape.get('args', []))}")
+    try:
+        code = subprocess.run([sys.executable, etape["script"], *etape.get("args", [])]).returncode
+    except Exception as e:
+        print(f"❌ [{nom}] Erreur imprévue : {e}")
+        code = -1
+    return code, time.time() - debut
+
+
+def lignes_sorties(etape):
+    """Nb de lignes de chaque fichier de sortie (pour le manifeste)."""
+    lignes = {}
+    for sortie in etape.get("sorties", []):
+        try:
+            lignes[os.path.basename(sortie)] = compter_lignes(sortie)
+        except Exception:
+            lignes[os.path.basename(sortie)] = None
+    return lignes
+
+
+def executer_pipeline(etapes, nb_workers=NB_WORKERS, force=False, hors_ligne=False):
     """
-    Exécute une liste de scripts les uns après les autres pour une source donnée.
+    Ordonnanceur : lance chaque étape dès que ses dépendances sont terminées, au plus `nb_workers` à la fois.
+    Renvoie le manifeste du run (statut, code retour, durée, lignes produites par étape).
     """
-    print(f"🔵 [{source_name}] Démarrage de la chaîne...")
-    
-    for script_path in script_list:
-        script_name = os.path.basename(script_path)
-        
-        if not os.path.exists(script_path):
-            print(f"❌ [{source_name}] Fichier introuvable : {script_name}")
-            return # On arrête cette chaîne
-            
-        try:
-            # On lance le script et on attend qu'il finisse avant de passer au suivant de la liste
-            subprocess.run(
-                [sys.executable, script_path], 
-                check=True                
-            )
-            print(f"✅ [{source_name}] Étape terminée : {script_name}")
-            
-        except subprocess.CalledProcessError:
-            print(f"❌ [{source_name}] ERREUR CRITIQUE sur {script_name}. Arrêt de la chaîne.")
-            return # On arrête tout pour ce site
-        except Exception as e:
-            print(f"❌ [{source_name}] Erreur imprévue : {e}")
-            return
-    print(f"🏁 [{source_name}] CHAÎNE TERMINÉE AVEC SUCCÈS !")
-
-
-# --- FONCTION ORCHESTRATEUR PRINCIPAL ---
+    verifier_graphe(etapes)
+    statuts = {nom: "en_attente" for nom in etapes}
+    rapport = {nom: {"statut": "en_attente"} for nom in etapes}
+    en_cours = {}
 
-def main():
-    print("🚀 Démarrage du Pipeline...")
-    
-    # Variable pour stocker le DataFrame en cours de travail
-    # (Doit être définie avant le try pour être accessible dans le except)
-    start_global = time.time()
-    threads = []
+    def lancer_pretes(pool):
+        for nom, etape in etapes.items():
+            if statuts[nom] != "en_attente":
+                continue
+            if any(statuts[dep] in ("en_attente", "en_cours") for dep in etape.get("apres", [])):
+                continue
 
-    try:       
+            raison = raison_de_sauter(nom, etape, statuts, force, hors_ligne)
+            if raison is None:
+                statuts[nom] = "en_cours"
+                rapport[nom]["debut"] = datetime.now().isoformat(timespec="seconds")
+                en_cours[pool.submit(executer, nom, etape)] = nom
+            else:
+                statuts[nom] = "annulee" if raison.startswith("dépendance") or raison == "script introuvable" else "sautee"
+                rapport[nom] = {"statut": statuts[nom], "raison": raison, "lignes": lignes_sorties(etape)}
+                print(f"⏭️  [{nom}] {'Annulée' if statuts[nom] == 'annulee' else 'Sautée'} ({raison})")
+                # Une étape sautée débloque peut-être d'autres étapes : on refait un tour
+                return True
+        return False
 
-        # --- ETAPE 1 : TRAITEMENTS ---        
-        
-        start_global = time.time()
-        print(f"{'='*60}")
-        print("⚙️ Démarrage parallèle (3 workers)")
-        print(f"{'='*60}")
+    with ThreadPoolExecutor(max_workers=nb_workers) as pool:
+        while True:
+            while lancer_pretes(pool):
+                pass
+            if not en_cours:
+                break
 
-        threads = []
+            finis, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in finis:
+                nom = en_cours.pop(futur)
+                code, duree = futur.result()
+                statuts[nom] = "ok" if code == 0 else "echec"
+                rapport[nom].update({
+                    "statut": statuts[nom],
+                    "code_retour": code,
+                    "duree_s": round(duree, 2),
+                    "lignes": lignes_sorties(etapes[nom]),
+                })
+                icone = "✅" if code == 0 else "❌"
+                print(f"{icone} [{nom}] Terminé en {duree:.1f} s (code {code})")
 
-        # 1. CRÉATION ET LANCEMENT DES THREADS
-        for source, scripts in TASKS.items():
-            # On crée un Thread pour chaque source
-            t = threading.Thread(target=run_chain, args=(source, scripts))
-            threads.append(t)
-            t.start()
+    return rapport
 
-        # 2. ATTENTE (BARRIÈRE)
-        # Le script principal attend ici que les 3 threads aient fini
-        for t in threads:
-            t.join()
 
-        print(f"\n{'='*60}")
-        print("⏳ TOUS LES SCRAPERS ONT FINI. LANCEMENT DE LA FUSION...")
-        print(f"{'='*60}")
+def ecrire_manifeste(rapport, duree_totale, chemin=MANIFESTE):
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    manifeste = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "duree_totale_s": round(duree_totale, 2),
+        "etapes": rapport,
+    }
+    ecrire_json(manifeste, chemin)
 
-        # 3. LANCEMENT DE LA FUSION (Seulement quand tout est fini)
-        try:
-            subprocess.run([sys.executable, SCRIPT_FUSION], check=True)
-            print("\n🏆 TERMINÉ ! Tout le pipeline s'est exécuté.")
-        except Exception as e:
-            print(f"❌ Erreur lors de la fusion : {e}")
 
-        duration = time.time() - start_global
-        print(f"⏱️ Temps total d'exécution : {duration:.2f} secondes")
+def afficher_bilan(rapport):
+    """Étapes triées par durée : on voit tout de suite où passe le temps."""
+    print(f"\n{'='*60}")
+    print("📊 BILAN DU PIPELINE")
+    print(f"{'='*60}")
+    for nom, infos in sorted(rapport.items(), key=lambda x: -x[1].get("duree_s", 0)):
+        duree = f"{infos['duree_s']:>8.1f} s" if "duree_s" in infos else " " * 10
+        lignes = ", ".join(f"{k}={v}" for k, v in (infos.get("lignes") or {}).items() if v is not None)
+        print(f"{nom:<18} {infos['statut']:<10} {duree}  {lignes or infos.get('raison', '')}")
+
+# endregion
+# ======================================================================================================================================================
 
+# region 3. --- ORCHESTRATEUR PRINCIPAL ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline PathFinder (scrapers -> nettoyage -> fusion)")
+    parser.add_argument("--workers", type=int, default=NB_WORKERS, help="Nb d'étapes lancées en même temps")
+    parser.add_argument("--force", action="store_true", help="Relance les étapes même si leurs sorties sont à jour")
+    parser.add_argument("--hors-ligne", action="store_true", help="Saute les étapes qui vont sur internet")
+    args = parser.parse_args()
+
+    print("🚀 Démarrage du Pipeline...")
+    print(f"{'='*60}")
+    print(f"⚙️ {len(ETAPES)} étapes, {args.workers} workers")
+    print(f"{'='*60}")
+    start_global = time.time()
+
+    try:
+        rapport = executer_pipeline(ETAPES, nb_workers=args.workers, force=args.force, hors_ligne=args.hors_ligne)
     except KeyboardInterrupt:
         print("\n\n🛑 INTERRUPTION MANUELLE (CTRL+C) SUR L'ORCHESTRATEUR")
         print("⚠️  Les sous-processus (scrapers) devraient s'arrêter d'eux-mêmes...")
-        # Pas besoin de sauvegarder ici, car ce script ne manipule pas de données.
         # Ce sont les scripts enfants qui géreront leur propre arrêt.
         sys.exit(0)
-
     except Exception as e:
         print(f"\n❌ ERREUR GLOBALE : {e}")
         sys.exit(1)
 
+    duration = time.time() - start_global
+    ecrire_manifeste(rapport, duration)
+    afficher_bilan(rapport)
+    print(f"\n💾 Manifeste : {MANIFESTE}")
+    print(f"⏱️ Temps total d'exécution : {duration:.2f} secondes")
+
+    if any(infos["statut"] == "echec" for infos in rapport.values()):
+        sys.exit(1)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+
+# endregion
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Normalisation des salaires, partagée par les scripts de nettoyage (clean_francetravail, clean_wttj, clean_apec).
+# Tout se fait par colonne (str.extract / str.contains + calcul NumPy), jamais ligne par ligne,
+# et une seule fois par libellé distinct (les libellés se répètent beaucoup : "35 - 45 k€", "Mensuel de 1801.80 Euros"...).
+# Chaque source renvoie 3 colonnes en € bruts annuels (NaN si pas de salaire exploitable) :
+# - Salaire_Annuel_Estime : la valeur historique de la source (inchangée, c'est celle du dashboard)
+# - Salaire_Annuel_Min / Salaire_Annuel_Max : bornes de la fourchette annoncée (égales si une seule valeur)
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+COLONNES_SALAIRE = ["Salaire_Annuel_Estime", "Salaire_Annuel_Min", "Salaire_Annuel_Max"]
+
+# Bornes de cohérence (€/an) : en dessous d'un SMIC à mi-temps / au-dessus d'un salaire de PDG, c'est un bruit de parsing
+SALAIRE_MIN = 15000
+SALAIRE_MAX = 200000
+HEURES_PAR_MOIS = 151.67
+JOURS_PAR_AN = 220     # Jours ouvrés facturables (TJM)
+
+# region 1. --- OUTILS ---
+
+def _texte(serie):
+    """Minuscules, virgule décimale -> point (NaN -> '')."""
+    return serie.fillna("").astype(str).str.lower().str.replace(",", ".", regex=False)
+
+
+def _premier_nombre(textes, motif):
+    """Premier nombre qui correspond à `motif` (un seul groupe capturant, chiffres et point), en float (NaN si absent)."""
+    return textes.str.extract(motif, expand=False).astype("float64")
+
+
+def _par_libelle_distinct(calcul, serie):
+    """Applique `calcul` aux seuls libellés distincts, puis redistribue le résultat sur toutes les lignes (NaN -> NaN)."""
+    codes, distincts = pd.factorize(serie)
+    par_libelle = calcul(pd.Series(distincts, dtype=object)).to_numpy()
+    lignes = np.full((len(serie), len(COLONNES_SALAIRE)), np.nan)
+    avec = codes >= 0
+    lignes[avec] = par_libelle[codes[avec]]
+    return pd.DataFrame(lignes, columns=COLONNES_SALAIRE, index=serie.index)
+
+
+def _resultat(index, estime, mini, maxi):
+    """Colonnes de sortie, tronquées à l'euro comme l'ancien int(valeur). Sans estimation, pas de fourchette."""
+    estime = np.trunc(estime)
+    sans = np.isnan(estime)
+    mini = np.where(sans, np.nan, np.trunc(np.fmin(mini, estime)))
+    maxi = np.where(sans, np.nan, np.trunc(np.fmax(maxi, estime)))
+    return pd.DataFrame(dict(zip(COLONNES_SALAIRE, [estime, mini, maxi])), index=index)
+
+
+def _dans_les_bornes(valeurs, bas=SALAIRE_MIN, haut=SALAIRE_MAX):
+    return np.where((valeurs >= bas) & (valeurs <= haut), valeurs, np.nan)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- SOURCES ---
+
+def salaires_francetravail(libelles):
+    """
+    Libellés France Travail ("Annuel de 35000.0 Euros à 45000.0 Euros", "Mensuel de 1801.80 Euros", "Horaire de 11.88 Euros"...).
+    L'unité vient des mots-clés (annuel > mensuel > horaire > jour/TJM), sinon de la taille du nombre.
+    Estimation = premier montant annualisé, gardé s'il est entre SALAIRE_MIN et SALAIRE_MAX.
+    """
+    return _par_libelle_distinct(_salaires_francetravail, libelles)
+
+
+def _salaires_francetravail(libelles):
+    originaux = libelles.fillna("").astype(str)
+    masques = originaux.str.contains("Non affiché", regex=False) | originaux.str.contains("Confidentiel", regex=False)
+    txt = _texte(libelles).str.replace(" ", "", regex=False)
+
+    gros = _premier_nombre(txt, r"(\d{4,6})").to_numpy()               # Montants annuels / mensuels
+    petit = _premier_nombre(txt, r"(\d{2,3}(?:\.\d+)?)").to_numpy()    # Taux horaires, TJM
+    borne_haute = _premier_nombre(txt, r"à(\d+(?:\.\d+)?)").to_numpy()  # "... à 45000.0 Euros"
+
+    def contient(*mots):
+        masque = np.zeros(len(txt), dtype=bool)
+        for mot in mots:
+            masque |= txt.str.contains(mot, regex=False).to_numpy()
+        return masque
+
+    # Priorité des mots-clés : un libellé qui contient "an" (donc aussi "annuel") est annuel, même s'il parle de mois
+    annuel = contient("an")
+    mensuel = ~annuel & contient("mensuel", "mois")
+    horaire = ~annuel & ~mensuel & contient("horaire", "heure")
+    journalier = ~annuel & ~mensuel & ~horaire & contient("jour", "tjm", "j/")
+    devine = ~annuel & ~mensuel & ~horaire & ~journalier
+    avec_gros = ~np.isnan(gros)
+
+    def annualiser(montant_gros, montant_petit):
+        # Même ordre d'opérations que l'ancien calcul ligne à ligne (x * 151.67 * 12) : mêmes arrondis flottants
+        return np.select(
+            [
+                annuel,
+                mensuel & avec_gros,
+                mensuel,
+                horaire,
+                journalier,
+                devine & (gros > 15000),                  # Sans mot-clé : gros montant = annuel...
+                devine & (gros > 1200) & (gros < 8000),   # ... montant moyen = mensuel
+            ],
+            [
+                montant_gros,
+                montant_gros * 12,
+                montant_petit * 12,
+                montant_petit * HEURES_PAR_MOIS * 12,
+                montant_petit * JOURS_PAR_AN,
+                montant_gros,
+                montant_gros * 12,
+            ],
+            default=np.nan,
+        )
+
+    estime = _dans_les_bornes(annualiser(gros, petit))
+    estime[masques.to_numpy()] = np.nan
+    maxi = _dans_les_bornes(annualiser(borne_haute, borne_haute))
+    return _resultat(libelles.index, estime, estime, maxi)
+
+
+def salaires_wttj(infos):
+    """
+    Colonne fourre-tout WTTJ ("CDI | Paris | Salaire : 45K à 55K €"...).
+    Estimation = premier montant en k entre 20k et 150k (filtre anti-bruit : "2 jours" n'est pas 2k).
+    """
+    return _par_libelle_distinct(_salaires_wttj, infos)
+
+
+def _salaires_wttj(infos):
+    txt = _texte(infos)
+    valeur = _premier_nombre(txt, r"(\d{2,3})[ ]?k").to_numpy()
+    estime = np.where((valeur >= 20) & (valeur <= 150), valeur * 1000, np.nan)
+
+    fourchette = txt.str.extract(r"(\d{2,3})[ ]?k?[ ]?(?:-|à|a)[ ]?(\d{2,3})[ ]?k").astype("float64")
+    bas = fourchette[0].to_numpy() * 1000
+    haut = fourchette[1].to_numpy() * 1000
+    return _resultat(infos.index, estime, _dans_les_bornes(bas, 20000, 150000), _dans_les_bornes(haut, 20000, 150000))
+
+
+def salaires_apec(textes):
+    """
+    Salaire APEC ("35 - 45 k€ brut annuel", "A partir de 40 k€"...).
+    Estimation = milieu de la fourchette, sinon la valeur seule si elle est entre 20k et 150k.
+    """
+    return _par_libelle_distinct(_salaires_apec, textes)
+
+
+def _salaires_apec(textes):
+    masques = textes.fillna("").astype(str).str.contains("Non spécifié", regex=False).to_numpy()
+    txt = _texte(textes)
+
+    fourchette = txt.str.extract(r"(\d{2})[ ]?[-|à][ ]?(\d{2})[ ]?k").astype("float64")
+    bas = fourchette[0].to_numpy()
+    haut = fourchette[1].to_numpy()
+    seul = _premier_nombre(txt, r"(\d{2})[ ]?k").to_numpy()
+
+    avec_fourchette = ~np.isnan(bas)
+    estime = np.where(
+        avec_fourchette,
+        (bas + haut) / 2 * 1000,
+        np.where((seul >= 20) & (seul <= 150), seul * 1000, np.nan),
+    )
+    estime[masques] = np.nan
+    return _resultat(
+        textes.index, estime,
+        np.where(avec_fourchette, bas * 1000, np.nan),
+        np.where(avec_fourchette, haut * 1000, np.nan),
+    )
+
+# endregion
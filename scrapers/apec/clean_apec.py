@@ -12,16 +12,17 @@ OUTPUT_CSV = os.path.join(project_root, "data", "clean", "offres_apec_clean.csv"
 
 if project_root not in sys.path:
     sys.path.append(project_root)
-from utils import sauvegarde_securisee
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent
+from salaires import salaires_apec, COLONNES_SALAIRE
 
 print(f"🧹 Démarrage du nettoyage APEC : {INPUT_CSV}")
 
 # --- 2. CHARGEMENT ---
-if not os.path.exists(INPUT_CSV):
+if not donnees_existent(INPUT_CSV):
     print("❌ Fichier introuvable.")
     exit()
 
-df = pd.read_csv(INPUT_CSV)
+df = charger_donnees(INPUT_CSV)
 print(f"✅ Chargé initialement : {len(df)} lignes.")
 
 # --- 3. FONCTIONS DE NETTOYAGE ---
@@ -82,23 +83,6 @@ def extraire_contrat_regex(row):
     
     return "CDI" # Valeur par défaut
 
-def extraire_salaire_apec(texte):
-    if pd.isna(texte) or "Non spécifié" in str(texte):
-        return None
-    txt = str(texte).lower().replace(',', '.')
-    
-    # Cas 1 : Fourchette "35 - 45 k€"
-    match_range = re.search(r'(\d{2})[ ]?[-|à][ ]?(\d{2})[ ]?k', txt)
-    if match_range:
-        return int((float(match_range.group(1)) + float(match_range.group(2))) / 2 * 1000)
-
-    # Cas 2 : Valeur simple "40 k€"
-    match_simple = re.search(r'(\d{2})[ ]?k', txt)
-    if match_simple:
-        val = float(match_simple.group(1))
-        if 20 <= val <= 150: return int(val * 1000)
-    return None
-
 def est_offre_valide(row):
     """
     Détecte si la ligne est une vraie offre ou du 'bruit' (cookies, login, offre expirée).
@@ -161,7 +145,7 @@ print(f"💎 Lignes valides restantes : {len(df_clean)}")
 print("⚙️ Transformation des données...")
 
 # Salaire
-df_clean['Salaire_Annuel_Estime'] = df_clean['Salaire_Brut'].apply(extraire_salaire_apec)
+df_clean[COLONNES_SALAIRE] = salaires_apec(df_clean['Salaire_Brut'])
 
 # Ville
 df_clean['Ville_Clean'] = df_clean.apply(extraire_ville_regex, axis = 1)
@@ -189,7 +173,7 @@ if nb_salaires > 0:
 # --- 6. SAUVEGARDE ---
 colonnes_finales = [
     'Titre', 'Entreprise', 'Ville_Clean', 'Type_Contrat', 
-    'Salaire_Annuel_Estime', 'URL', 'Description_Propre', 'Date', 'Date_Expiration'
+    'Salaire_Annuel_Estime', 'Salaire_Annuel_Min', 'Salaire_Annuel_Max', 'URL', 'Description_Propre', 'Date', 'Date_Expiration'
 ]
 
 df_clean['Source'] = 'Apec'
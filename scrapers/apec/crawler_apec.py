@@ -18,7 +18,8 @@ OUTPUT_CSV = os.path.join(project_root, "data", "raw", "offres_apec_url.csv")
 
 if project_root not in sys.path:
     sys.path.append(project_root)
-from utils import sauvegarde_securisee
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent
+from journal_offres import journaliser
 
 # --- FONCTION UTILITAIRE DE NETTOYAGE ---
 def extraire_id(url_brute):
@@ -46,9 +47,9 @@ chemin_history = "data/enriched/offres_apec_full.csv"
 ids_connus = set()
 
 print("🔄 Chargement de l'historique...")
-if os.path.exists(chemin_history):
+if donnees_existent(chemin_history):
     try:
-        df_history = pd.read_csv(chemin_history)
+        df_history = charger_donnees(chemin_history)
         
         # Recherche de la colonne URL
         col_url = None
@@ -67,6 +68,7 @@ else:
     print("✨ Aucun historique trouvé, on part de zéro.")
 
 urls_trouvees_ce_jour = [] # On stockera ici les URLs propres trouvées aujourd'hui
+urls_listees = [] # Toutes les offres vues en ligne aujourd'hui, nouvelles ou déjà connues (journal des offres)
 
 # --- CONFIGURATION ---
 URL_APEC = "https://www.apec.fr/candidat/recherche-emploi.html/emploi?motsCles=Data%20analyst"
@@ -128,6 +130,7 @@ try:
                     full_url = "https://www.apec.fr" + url_partielle
                 
                 id_actuel = extraire_id(full_url)
+                urls_listees.append(full_url)
                 if (id_actuel not in ids_connus) and (full_url not in urls_trouvees_ce_jour):
                     urls_trouvees_ce_jour.append(full_url)
                     compteur_doublons = 0
@@ -200,6 +203,9 @@ finally:
 
 # --- SAUVEGARDE ---
 
+# Journal : première vue des nouvelles offres, "revue" pour celles déjà connues
+journaliser("enregistrer_vues", urls_listees, source="Apec")
+
 if urls_trouvees_ce_jour:
     os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)    
     # On écrase l'ancien fichier de liste de courses, on veut repartir à neuf
@@ -1,14 +1,11 @@
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
-import random
 import os
+import sys
 from datetime import datetime
 
 # --- 0. CONFIGURATION ---
@@ -18,25 +15,30 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 INPUT_CSV = os.path.join(project_root, "data", "raw", "offres_apec_url.csv")
 OUTPUT_CSV = os.path.join(project_root, "data", "enriched", "offres_apec_full.csv")
 
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent, ajouter_lignes
+from browser_pool import PoolNavigateurs
+
 ordre_colonnes = ["Titre", "Entreprise", "Ville", "Salaire_Brut", "Details_Tags", "Description_Complete", "URL", "Date", "Date_Expiration"]
 
-if not os.path.exists(INPUT_CSV):
+if not donnees_existent(INPUT_CSV):
     print(f"❌ ERREUR : {INPUT_CSV} introuvable.")
     exit()
 
-df_source = pd.read_csv(INPUT_CSV, encoding='utf-8', header=None, names=['URL'])
+df_source = charger_donnees(INPUT_CSV, encoding='utf-8', header=None, names=['URL'])
 print(f"✅ Chargement de {len(df_source)} offres APEC.")
 
 # Reprise automatique
 deja_faites = []
-if os.path.exists(OUTPUT_CSV):
+if donnees_existent(OUTPUT_CSV):
     try:
-        df_exist = pd.read_csv(OUTPUT_CSV, encoding='utf-8-sig')
+        df_exist = charger_donnees(OUTPUT_CSV, encoding='utf-8-sig')
         if "Date_Expiration" not in df_exist.columns:
             print("⚠️ Mise à jour du fichier historique : Ajout de la colonne 'Date_Expiration'...")
             df_exist["Date_Expiration"] = "" 
             df_exist = df_exist.reindex(columns=ordre_colonnes)
-            df_exist.to_csv(OUTPUT_CSV, index=False, encoding='utf-8-sig')
+            sauvegarde_securisee(df_exist, OUTPUT_CSV)
         if "URL" in df_exist.columns:
             deja_faites = df_exist["URL"].tolist()
             print(f"🔄 Reprise : {len(deja_faites)} offres déjà faites.")
@@ -45,24 +47,19 @@ if os.path.exists(OUTPUT_CSV):
         pass
 else:
     # Création du fichier vide    
-    pd.DataFrame(columns=ordre_colonnes).to_csv(OUTPUT_CSV, index=False, encoding='utf-8-sig')
-
-# --- 1. LE ROBOT ---
-options = webdriver.ChromeOptions()
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--start-maximized")
-options.add_argument("--headless")
+    ajouter_lignes(pd.DataFrame(columns=ordre_colonnes), OUTPUT_CSV)
 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-print("🚀 Démarrage du Robot APEC (Mode Tueur de Cookies)...")
+# --- 1. LES ROBOTS ---
+# Plusieurs navigateurs en parallèle (NAVIGATEURS_MAX), cookies refusés une fois par navigateur,
+# et un budget de pages/seconde commun vers apec.fr (NAVIGATEUR_PAGES_PAR_SECONDE)
+print("🚀 Démarrage des Robots APEC (Mode Tueur de Cookies)...")
 
 # --- FONCTIONS ---
 
 def tuer_les_cookies(driver):
     """Cherche le bouton 'Tout refuser' ou 'Refuser' et clique dessus."""
     try:
-        # On attend max 3 secondes que le bouton apparaisse
+        # On attend max 10 secondes que le bouton apparaisse
         bouton = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Tout refuser') or contains(text(), 'Refuser tous') or contains(text(), 'Continuer sans accepter')]"))
         )
@@ -112,111 +109,81 @@ def extraire_date(soup):
         date_clean = time.strftime("%d/%m/%Y") # Fallback : Date d'aujourd'hui
     return date_clean
 
+def extraire_offre(driver, url):
+    """Lit la page chargée par le pool. Renvoie la ligne du CSV, ou None si l'offre a expiré entre-temps."""
+    # Petit scroll pour charger le contenu (Lazy loading)
+    driver.execute_script("window.scrollTo(0, 400);")
+    time.sleep(1)
+
+    soup = BeautifulSoup(driver.page_source, 'html.parser')
+
+    # --- A. VERIFICATION EXPIRATION ---
+    # On extrait la description pour vérifier si l'offre est morte
+    description = extraire_description(soup)
+    if "offre n'est plus en ligne" in description.lower() or "erreur inattendue" in description.lower():
+        return None
+
+    # --- A. DONNÉES ---
+    h1 = soup.find('h1')
+    titre_reel = h1.get_text(strip=True) if h1 else 'Inconnu'
+    date_clean = extraire_date(soup)
+
+    # --- B. TAGS (Salaire / Ville) ---
+    tags = []
+    salaire_brut = "Non spécifié"
+    ville = "Non spécifié"
+
+    lis = soup.find_all('li')
+    for li in lis:
+        txt = li.get_text(strip=True)
+        if not txt: continue
+        txt_low = txt.lower()
+        # Salaire
+        if ("€" in txt or "k€" in txt) and ("an" in txt_low or "brut" in txt_low):
+            if "sport" not in txt_low: # Évite les avantages CE
+                salaire_brut = txt
+        # Ville
+        elif any(v in txt_low for v in ["paris", "lyon", "marseille", "lille", "bordeaux", "nantes", "toulouse", "cedex"]):
+            if len(txt) < 50:
+                ville = txt
+
+        tags.append(txt)
+
+    return {
+        "Titre": titre_reel,
+        "Entreprise": "Apec",
+        "Ville": ville,
+        "Salaire_Brut": salaire_brut,
+        "Details_Tags": " | ".join(tags),
+        "Description_Complete": description,
+        "URL": url,
+        "Date" : date_clean,
+        "Date_Expiration" : "Offre active"
+    }
+
 # --- 2. LA BOUCLE ---
+deja_faites = set(deja_faites)
+# (la ligne d'en-tête "URL" du fichier est lue comme une URL : on ne garde que les vrais liens)
+a_faire = [url for url in df_source['URL'] if str(url).startswith("http") and url not in deja_faites]
+print(f"⏩ {len(df_source) - len(a_faire)} déjà faites, {len(a_faire)} à extraire.")
+
+pool = PoolNavigateurs(fermer_cookies=tuer_les_cookies, pause=(2, 4))
 try:
-    for index, row in df_source.iterrows():
-        url = row['URL']
-        titre_csv = 'Inconnu'
-        
-        if url in deja_faites:
-            continue
-        
-        print(f"\n🔎 ({index + 1}/{len(df_source)}) {titre_csv}")
-        # Init variables pour cette offre
-        date_expiration = "" # Vide par défaut
-        date_clean = datetime.now().strftime("%d/%m/%Y")
-        titre_reel = "Inconnu"
-        description = ""
-        try:
-            driver.get(url)
-            
-            # 🔨 ACTION : On tue les cookies dès l'arrivée (sur la 1ère page surtout)
-            if index == 0 or index % 10 == 0: # On insiste au début et de temps en temps
-                tuer_les_cookies(driver)        
-            
-            time.sleep(random.uniform(4, 8))
-            tuer_les_cookies(driver)
-            
-            # Petit scroll pour charger le contenu (Lazy loading)
-            driver.execute_script("window.scrollTo(0, 400);")
-            time.sleep(1)
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-            # --- A. VERIFICATION EXPIRATION ---
-            # On extrait la description pour vérifier si l'offre est morte
-            description = extraire_description(soup)
-            
-            # [MODIFICATION ICI] Si l'offre est morte, on l'abandonne totalement
-            if "offre n'est plus en ligne" in description.lower() or "erreur inattendue" in description.lower():
-                print("🗑️  Offre expirée entre-temps. Ignorée (pas de sauvegarde).")
-                # On l'ajoute à la liste locale pour ne pas la retenter si la boucle continue
-                deja_faites.append(url)
-                continue
-            
-            # --- A. DONNÉES ---
-            h1 = soup.find('h1')
-            titre_reel = h1.get_text(strip=True) if h1 else titre_csv
-            
-            description = extraire_description(soup)
-            date_clean = extraire_date(soup)       
-            
-            # --- B. TAGS (Salaire / Ville) ---
-            tags = []
-            salaire_brut = "Non spécifié"
-            ville = "Non spécifié"
-            entreprise = "Confidentiel"
-            
-            lis = soup.find_all('li')
-            for li in lis:
-                txt = li.get_text(strip=True)
-                if not txt: continue            
-                txt_low = txt.lower()
-                # Salaire
-                if ("€" in txt or "k€" in txt) and ("an" in txt_low or "brut" in txt_low):
-                    if "sport" not in txt_low: # Évite les avantages CE
-                        salaire_brut = txt
-                # Ville
-                elif any(v in txt_low for v in ["paris", "lyon", "marseille", "lille", "bordeaux", "nantes", "toulouse", "cedex"]):
-                    if len(txt) < 50:
-                        ville = txt
-                
-                tags.append(txt)
-                
-            details_concat = " | ".join(tags)
-
-            # --- SAUVEGARDE ---      
-            nouvelle_ligne = {
-                "Titre": titre_reel,
-                "Entreprise": "Apec",
-                "Ville": ville,
-                "Salaire_Brut": salaire_brut,
-                "Details_Tags": details_concat,
-                "Description_Complete": description,
-                "URL": url,
-                "Date" : date_clean,
-                "Date_Expiration" : "Offre active"
-            }
-            
-            df_new = pd.DataFrame([nouvelle_ligne], columns=ordre_colonnes)
-            df_new.to_csv(OUTPUT_CSV, mode='a', header=False, index=False, encoding='utf-8-sig')
-            
-            status_msg = "✅ Sauvegardé (Active)" if not date_expiration else "Sauvegardé (Expirée)"
-            print(f"{status_msg}")
-
-        except Exception as e:
-            print(f"❌ Erreur : {e}")
+    for i, (url, nouvelle_ligne, erreur) in enumerate(pool.traiter(a_faire, extraire_offre)):
+        print(f"\n🔎 ({i + 1}/{len(a_faire)}) {url}")
+        if erreur is not None:
+            print(f"❌ Erreur : {erreur}")
+        elif nouvelle_ligne is None:
+            print("🗑️  Offre expirée entre-temps. Ignorée (pas de sauvegarde).")
+        else:
+            # Sauvegarde ligne par ligne, depuis le thread principal uniquement
+            ajouter_lignes(pd.DataFrame([nouvelle_ligne], columns=ordre_colonnes), OUTPUT_CSV)
+            print(f"✅ Sauvegardé (Active) : {nouvelle_ligne['Titre'][:50]}")
 except KeyboardInterrupt:
-    print("\n🛑 INTERRUPTED ! Sauvegarde d'urgence...")
-    # Déjà sauvé ligne par ligne (mode='a')
-    driver.quit()
+    print("\n🛑 INTERRUPTED ! Arrêt des navigateurs...")
+    # Déjà sauvé ligne par ligne
     print("💾 Les offres déjà traitées sont en sécurité dans le CSV.")
     exit(0)
-except Exception as e:
-    print(f"❌ Erreur : {e}")
-    # On peut aussi sauver ici si on veut
-    driver.quit()
 
-driver.quit()
 print("\n🏁 Terminé ! Vérifiez data/enriched/offres_apec_full.csv")
-print("Fin de scraper_apec ==> Lancer updater_apec")
\ No newline at end of file
+print("Fin de scraper_apec ==> Lancer updater_apec")
@@ -1,14 +1,9 @@
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
-import time
-import random
 import os
+import sys
 from datetime import datetime
 
 # --- CONFIGURATION ---
@@ -16,16 +11,22 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 CSV_PATH = os.path.join(project_root, "data", "enriched", "offres_apec_full.csv")
 
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent, mettre_a_jour_lignes, MAJ_PAR_LIGNE
+from browser_pool import PoolNavigateurs
+from journal_offres import journaliser
+
 # Ordre des colonnes pour la réécriture propre
 ordre_colonnes = ["Titre", "Entreprise", "Ville", "Salaire_Brut", "Details_Tags", "Description_Complete", "URL", "Date", "Date_Expiration"]
 
-if not os.path.exists(CSV_PATH):
+if not donnees_existent(CSV_PATH):
     print("❌ Pas de fichier historique trouvé. Lancez d'abord le scraper.")
     exit()
 
 print("🔄 Chargement de la base de données...")
 # On charge tout en string pour éviter les conflits de types (NaN vs texte)
-df = pd.read_csv(CSV_PATH, encoding='utf-8-sig', dtype=str)
+df = charger_donnees(CSV_PATH, encoding='utf-8-sig', dtype=str)
 
 # --- FILTRAGE INTELLIGENT ---
 # On ne vérifie QUE les lignes où Date_Expiration est vide (ou NaN)
@@ -40,18 +41,43 @@ if len(indices_a_verifier) == 0:
     print("✅ Toutes vos offres expirées sont déjà marquées . Rien à faire.")
     exit()
 
-# --- ROBOT ---
-options = webdriver.ChromeOptions()
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--headless") # Décommentez pour exécuter sans fenêtre (plus rapide)
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
+# --- ROBOTS ---
 def tuer_cookies(driver):
     try:
         WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.ID, "onetrust-reject-all-handler"))).click()
+        return True
     except:
-        try: driver.find_element(By.ID, "onetrust-accept-btn-handler").click()
-        except: pass
+        try:
+            driver.find_element(By.ID, "onetrust-accept-btn-handler").click()
+            return True
+        except:
+            return False
+
+def diagnostiquer(driver, element):
+    """Verdict sur la page chargée par le pool : 'vivante', 'morte' ou 'doute' (avec photo)."""
+    i, url = element
+    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    text_page = soup.get_text().lower()
+
+    # --- LOGIQUE DE DIAGNOSTIC ---
+    # 1. Signes positifs
+    signes_vie = ["postuler", "candidater", "sauvegarder cette offre"]
+    if any(s in text_page for s in signes_vie):
+        return "vivante"
+
+    # 2. Signes négatifs
+    signes_mort = [
+        "n'est plus en ligne",
+        "n'est plus disponible",
+        "n'existe plus"
+    ]
+    if any(s in text_page for s in signes_mort):
+        return "morte"
+
+    # ZONE GRISE : Ni vivante, ni morte explicite -> C'est louche (Bot detection ?)
+    # Photo pour debug
+    driver.save_screenshot(f"debug_apec_{i}.png")
+    return "doute"
 
 print("\n🚀 Démarrage de la mise à jour des statuts...")
 
@@ -59,70 +85,46 @@ compteur_morts = 0
 compteur_vivants = 0
 compteur_doutes = 0
 modifications = False
+urls_expirees = []   # Journal des offres : écrit une seule fois en fin de run
+
+# Pause très courte par navigateur (on veut juste voir si le texte charge)
+pool = PoolNavigateurs(fermer_cookies=tuer_cookies, pause=(3, 5))
+elements = [(i, df.at[idx, 'URL']) for i, idx in enumerate(indices_a_verifier)]
 
 try:
-    for i, idx in enumerate(indices_a_verifier):
-        url = df.at[idx, 'URL']
+    for n, ((i, url), verdict, erreur) in enumerate(pool.traiter(elements, diagnostiquer, url_de=lambda e: e[1])):
+        idx = indices_a_verifier[i]
         titre = str(df.at[idx, 'Titre'])
-        
+
         # Affichage progression
-        print(f"[{i+1}/{len(indices_a_verifier)}] {titre[:30]}...", end=" ")
-        
-        try:
-            driver.get(url)
-            
-            # Gestion cookies au tout début
-            if i == 0: 
-                tuer_cookies(driver)
-                time.sleep(1)
-            
-            # Pause très courte (on veut juste voir si le texte charge)
-            time.sleep(random.uniform(3, 5))
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            text_page = soup.get_text().lower()
-            
-            # --- LOGIQUE DE DIAGNOSTIC ---
-            # 1. Signes positifs
-            signes_vie = ["postuler", "candidater", "sauvegarder cette offre"]
-            est_vivante = any(s in text_page for s in signes_vie)
-
-            # 2. Signes négatifs
-            signes_mort = [
-                "n'est plus en ligne",
-                "n'est plus disponible",
-                "n'existe plus"                
-            ]
-            est_morte_certaine = any(s in text_page for s in signes_mort)
-
-            # --- DÉCISION ---
-            if est_vivante:
-                print("✅ VIVANTE (Confirmée)")
-                compteur_vivants += 1
-
-            elif est_morte_certaine:
-                date_jour = datetime.now().strftime("%d/%m/%Y")
-                df.at[idx, 'Date_Expiration'] = date_jour
-                print(f"❌ EXPIRÉE (Preuve trouvée)")
-                compteur_morts += 1
-                modifications = True
-
-            else:
-                # ZONE GRISE : Ni vivante, ni morte explicite -> C'est louche (Bot detection ?)
-                # On ne touche pas à la date, on garde l'offre, mais on regarde pourquoi
-                print("⚠️ DOUTE (Ni bouton, ni message d'erreur -> On garde)")
-                
-                # Photo pour debug
-                nom_photo = f"debug_apec_{i}.png"
-                driver.save_screenshot(nom_photo)
-                print(f"   📸 Photo prise : {nom_photo}")
-
-            # Sauvegarde intermédiaire
-            if modifications and i > 0 and i % 10 == 0:
-                df.to_csv(CSV_PATH, index=False, encoding='utf-8-sig')
-                modifications = False
-        except Exception as e:
-                    print(f"⚠️ Erreur tech : {e}")
+        print(f"[{n+1}/{len(indices_a_verifier)}] {titre[:30]}...", end=" ")
+
+        # --- DÉCISION ---
+        if erreur is not None:
+            print(f"⚠️ Erreur tech : {erreur}")
+        elif verdict == "vivante":
+            print("✅ VIVANTE (Confirmée)")
+            compteur_vivants += 1
+        elif verdict == "morte":
+            date_jour = datetime.now().strftime("%d/%m/%Y")
+            df.at[idx, 'Date_Expiration'] = date_jour
+            if MAJ_PAR_LIGNE:
+                # Base SQLite : seule cette offre est réécrite (pas de sauvegarde du fichier entier)
+                mettre_a_jour_lignes(CSV_PATH, {df.at[idx, 'URL']: {'Date_Expiration': date_jour}})
+            urls_expirees.append(df.at[idx, 'URL'])
+            print(f"❌ EXPIRÉE (Preuve trouvée)")
+            compteur_morts += 1
+            modifications = not MAJ_PAR_LIGNE
+        else:
+            # On ne touche pas à la date, on garde l'offre, mais on regarde pourquoi
+            print("⚠️ DOUTE (Ni bouton, ni message d'erreur -> On garde)")
+            print(f"   📸 Photo prise : debug_apec_{i}.png")
+            compteur_doutes += 1
+
+        # Sauvegarde intermédiaire
+        if modifications and n > 0 and n % 10 == 0:
+            sauvegarde_securisee(df, CSV_PATH)
+            modifications = False
 
 # --- GESTION DE L'ARRÊT MANUEL (CTRL+C) ---
 except KeyboardInterrupt:
@@ -130,12 +132,14 @@ except KeyboardInterrupt:
 
 # --- FERMETURE PROPRE ---
 finally:
-    # SAUVEGARDE FINALE
+    # SAUVEGARDE FINALE (déjà faite offre par offre avec la base SQLite)
     # On s'assure de garder l'ordre des colonnes propre
-    df = df.reindex(columns=ordre_colonnes)
-    df.to_csv(CSV_PATH, index=False, encoding='utf-8-sig')
-    
-    driver.quit()
+    if not MAJ_PAR_LIGNE:
+        df = df.reindex(columns=ordre_colonnes)
+        sauvegarde_securisee(df, CSV_PATH)
+    if urls_expirees:
+        journaliser("enregistrer_expirations", urls_expirees)
+
     print("\n🏁 Bilan Updater :")
     print(f"   ⚰️  Offres passées en 'Expirée' : {compteur_morts}")
     print(f"   ✅  Offres confirmées actives : {compteur_vivants}")
@@ -1,4 +1,5 @@
-import requests
+import asyncio
+import re
 import pandas as pd
 import time
 import os
@@ -13,163 +14,225 @@ load_dotenv(dotenv_path)
 CLIENT_ID = os.getenv("FT_CLIENT_ID")
 CLIENT_SECRET = os.getenv("FT_CLIENT_SECRET")
 
-if not CLIENT_ID or not CLIENT_SECRET:
-    print("❌ ERREUR : Clés France Travail introuvables. Vérifiez le fichier .env")
-    exit()
-
 nom_fichier = "offres_francetravail_full.csv"
 CSV_PATH = os.path.join(root_dir, "data", "enriched", nom_fichier)
 
+# URLs surchargeables (ex: serveur local qui simule l'API pour les tests)
+URL_AUTH = os.getenv("FT_URL_AUTH", "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=%2Fpartenaire")
+URL_SEARCH = os.getenv("FT_URL_SEARCH", "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search")
+
+# Quota de l'API (appels/seconde) et nombre de requêtes simultanées
+REQUETES_PAR_SECONDE = float(os.getenv("FT_REQUETES_PAR_SECONDE", "8"))
+CONNEXIONS_MAX = int(os.getenv("FT_CONNEXIONS_MAX", "8"))
+
+STEP = 140             # Taille d'une page (le max autorisé par l'API par appel est 150)
+MAX_RESULTATS = 3150   # L'API refuse les plages au-delà de 3149
+TAILLE_LOT = 500       # Nb d'offres gardées en mémoire avant écriture sur disque
+
+liste_mots_cles = [
+    "Data Analyst",
+    "Data Scientist",
+    "Business Analyst",
+    "Business Intelligence",
+    "Analyste de données"
+]
+
 if root_dir not in sys.path:
     sys.path.append(root_dir)
-from utils import sauvegarde_securisee
-
-# --- 2. AUTHENTIFICATION (Récupération du Token) ---
-url_auth = "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=%2Fpartenaire"
-headers_auth = {"Content-Type": "application/x-www-form-urlencoded"}
-params_auth = {
-    "grant_type": "client_credentials",
-    "client_id": CLIENT_ID,
-    "client_secret": CLIENT_SECRET,
-    "scope": "api_offresdemploiv2 o2dsoffre"
-}
-
-print("🔑 Authentification...")
-resp_auth = requests.post(url_auth, headers=headers_auth, data=params_auth)
-if resp_auth.status_code != 200:
-    print("❌ Erreur Auth:", resp_auth.text)
-    exit()
-
-token = resp_auth.json()['access_token']
-print("✅ Token valide.")
-
-# --- 3. CHARGEMENT DE L'HISTORIQUE ---
-existing_ids = set()
-df_old = pd.DataFrame()
-
-if os.path.exists(CSV_PATH):
-    print(f"📂 Lecture du fichier existant : {CSV_PATH}")
-    df_old = pd.read_csv(CSV_PATH, dtype=str)
-    
+from utils import charger_donnees, donnees_existent, ajouter_lignes
+from journal_offres import journaliser
+from http_client import LimiteurDebit, creer_client_async, requete
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# region 2. --- FONCTIONS ---
+
+def extraire_infos(offre):
+    """Transforme une offre JSON de l'API en ligne du CSV."""
+    return {
+        "id": offre.get('id'),
+        "Titre": offre.get('intitule'),
+        "Entreprise": offre.get('entreprise', {}).get('nom', 'Confidentiel'),
+        "Ville": offre.get('lieuTravail', {}).get('libelle'),
+        "Type_Contrat": offre.get('typeContrat'),
+        "Salaire": offre.get('salaire', {}).get('libelle', 'Non affiché'),
+        "Date_Creation": offre.get('dateCreation'),
+        "URL": offre.get('origineOffre', {}).get('urlOrigine'),
+        "Description": offre.get('description'),
+        "Source": "France Travail",
+        "Date_Expiration": ""
+    }
+
+
+def total_content_range(valeur):
+    """'offres 0-139/1234' -> 1234 (None si l'en-tête est absent ou illisible)."""
+    match = re.search(r'/(\d+)\s*$', valeur or "")
+    return int(match.group(1)) if match else None
+
+
+def charger_ids_existants(chemin):
+    """Ids des offres déjà présentes dans l'historique (on ne les recopiera pas)."""
+    if not donnees_existent(chemin):
+        print("✨ Aucun fichier existant, on commence à zéro.")
+        return set()
+
+    print(f"📂 Lecture du fichier existant : {chemin}")
+    df_old = charger_donnees(chemin, dtype=str)
+
     # On essaye de trouver la colonne ID (souvent appelée 'id' ou 'Reference')
-    # Ajustez le nom si votre CSV a un nom de colonne différent pour l'identifiant
+    existing_ids = set()
     if 'id' in df_old.columns:
         existing_ids = set(df_old['id'].tolist())
     elif 'URL' in df_old.columns:
-        # Si on n'a pas l'ID, on extrait l'ID depuis l'URL (souvent à la fin)        
+        # Si on n'a pas l'ID, on extrait l'ID depuis l'URL (souvent à la fin)
         existing_ids = set(df_old['URL'].apply(lambda x: x.split('/')[-1] if isinstance(x, str) else ""))
-    
+
     print(f"📚 {len(existing_ids)} offres déjà en mémoire (on ne les recopiera pas).")
-else:
-    print("✨ Aucun fichier existant, on commence à zéro.")
+    return existing_ids
+
+
+class CollecteurOffres:
+    """
+    Reçoit les pages au fil de l'eau : dédoublonne par id et écrit par lots dans le fichier,
+    pour ne pas garder toute la récolte en mémoire ni la perdre en cas d'arrêt.
+    """
+
+    def __init__(self, chemin, ids_connus):
+        self.chemin = chemin
+        self.ids_vus = set(ids_connus)
+        self.lot = []
+        self.urls_listees = []   # Offres renvoyées par l'API, nouvelles ou déjà connues (journal des offres)
+        self.nb_nouvelles = 0
+
+    def ajouter(self, resultats):
+        count_new = 0
+        for offre in resultats:
+            offer_id = offre.get('id')
+            self.urls_listees.append(offre.get('origineOffre', {}).get('urlOrigine'))
+            if offer_id in self.ids_vus:
+                continue
+            self.ids_vus.add(offer_id)
+            self.lot.append(extraire_infos(offre))
+            count_new += 1
+
+        self.nb_nouvelles += count_new
+        if len(self.lot) >= TAILLE_LOT:
+            self.vider()
+        return count_new
+
+    def vider(self):
+        if self.lot:
+            ajouter_lignes(pd.DataFrame(self.lot), self.chemin)
+            self.lot = []
+        if self.urls_listees:
+            journaliser("enregistrer_vues", self.urls_listees, source="France Travail")
+            self.urls_listees = []
+
+
+async def obtenir_token(client):
+    params_auth = {
+        "grant_type": "client_credentials",
+        "client_id": CLIENT_ID,
+        "client_secret": CLIENT_SECRET,
+        "scope": "api_offresdemploiv2 o2dsoffre"
+    }
+    resp_auth = await client.post(URL_AUTH, data=params_auth)
+    if resp_auth.status_code != 200:
+        print("❌ Erreur Auth:", resp_auth.text)
+        return None
+    return resp_auth.json()['access_token']
+
+
+async def recuperer_page(client, limiteur, mot, start):
+    """Une plage de résultats. Renvoie (code HTTP, offres, total annoncé par Content-Range)."""
+    end = start + STEP - 1
+    params_search = {"motsCles": mot, "range": f"{start}-{end}"}
+    response = await requete(client, limiteur, "GET", URL_SEARCH, params=params_search)
+
+    if response.status_code in (200, 206):
+        resultats = response.json().get('resultats', [])
+        return response.status_code, resultats, total_content_range(response.headers.get("Content-Range"))
+    if response.status_code == 204:
+        return 204, [], 0
+
+    print(f"❌ [{mot}] Erreur {response.status_code} sur {start}-{end} : {response.text[:200]}")
+    return response.status_code, [], None
+
+
+async def recolter_mot_cle(client, limiteur, mot, collecteur):
+    """
+    Première page pour connaître le total (Content-Range), puis toutes les plages restantes en parallèle.
+    Sans Content-Range, on retombe sur la pagination page par page tant que l'API répond 206.
+    """
+    status, resultats, total = await recuperer_page(client, limiteur, mot, 0)
+    count_new = collecteur.ajouter(resultats)
+    print(f"🔎 '{mot}' : {total if total is not None else '?'} offres annoncées, page 0 -> {count_new} nouvelles.")
+
+    if status != 206 or len(resultats) < STEP:
+        return
+
+    if total is not None:
+        debuts = range(STEP, min(total, MAX_RESULTATS), STEP)
+        taches = [asyncio.create_task(recuperer_page(client, limiteur, mot, d)) for d in debuts]
+        for tache in asyncio.as_completed(taches):
+            _, resultats, _ = await tache
+            collecteur.ajouter(resultats)
+        return
+
+    start = STEP
+    while status == 206 and len(resultats) == STEP and start < MAX_RESULTATS:
+        status, resultats, _ = await recuperer_page(client, limiteur, mot, start)
+        collecteur.ajouter(resultats)
+        start += STEP
+
+
+async def recolter(mots_cles, chemin, ids_connus):
+    """Récolte tous les mots-clés en parallèle avec un seul client (pool keep-alive) et un seul quota."""
+    limiteur = LimiteurDebit(REQUETES_PAR_SECONDE)
+    collecteur = CollecteurOffres(chemin, ids_connus)
+
+    async with creer_client_async(connexions_max=CONNEXIONS_MAX) as client:
+        print("🔑 Authentification...")
+        token = await obtenir_token(client)
+        if token is None:
+            return None
+        print("✅ Token valide.")
+        client.headers["Authorization"] = "Bearer " + token
+
+        try:
+            await asyncio.gather(*[recolter_mot_cle(client, limiteur, mot, collecteur) for mot in mots_cles])
+        finally:
+            # On écrit ce qui reste (même en cas d'arrêt)
+            collecteur.vider()
+
+    return collecteur.nb_nouvelles
+
+# endregion
+# ======================================================================================================================================================
+
+# region 3. --- EXÉCUTION ---
+
+def main():
+    if not CLIENT_ID or not CLIENT_SECRET:
+        print("❌ ERREUR : Clés France Travail introuvables. Vérifiez le fichier .env")
+        exit()
+
+    os.makedirs(os.path.dirname(CSV_PATH), exist_ok=True)
+    existing_ids = charger_ids_existants(CSV_PATH)
+
+    start = time.time()
+    nb_nouvelles = asyncio.run(recolter(liste_mots_cles, CSV_PATH, existing_ids))
+    if nb_nouvelles is None:
+        exit(1)
+
+    print(f"\n Bilan : {nb_nouvelles} offres collectées au total en {time.time() - start:.1f} s.")
+    if nb_nouvelles:
+        print(f"💾 Sauvegardé dans '{nom_fichier}'")
+        print("Fin de api_francetravail ==> Lancer updater_francetravail")
+    else:
+        print("⚠️ Rien à sauvegarder.")
 
-# --- 3. LA BOUCLE DE RÉCUPÉRATION ---
-url_search = "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search"
-headers_search = {
-    "Authorization": "Bearer " + token,
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
 
-liste_mots_cles = [
-    "Data Analyst", 
-    "Data Scientist", 
-    "Business Analyst", 
-    "Business Intelligence",
-    "Analyste de données"
-]
-all_offres_data = [] # On va stocker toutes les offres ici
-ids_recuperes = set() #Enlever les doublons
-
-for mot in liste_mots_cles:
-    print(f"\n🔎 Recherche pour : '{mot}'")
-    start = 0
-    step = 140 # Le max autorisé par l'API par appel    
-    continuing = True
-
-    while continuing:
-        
-        # On définit la plage (ex: 0-149, puis 150-299)
-        end = start + step - 1
-        params_search = {
-            "motsCles": mot,
-            "range": f"{start}-{end}"
-        }
-        
-        print(f"📡 Récupération de {start} à {end}...", end=" ")
-        
-        response = requests.get(url_search, headers=headers_search, params=params_search)
-        
-        if response.status_code == 200 or response.status_code == 206:
-            data = response.json()
-            resultats = data.get('resultats', [])
-            
-            # Si la liste est vide, on arrête
-            if not resultats:
-                print("Vide. Fin.")                
-                break
-                
-            count_new = 0   
-                        
-            # Nettoyage et Ajout à la liste principale
-            for offre in resultats:
-                # DÉDOUBLONNAGE : On vérifie l'ID de l'offre
-                offer_id = offre.get('id')
-                if offer_id in existing_ids or offer_id in ids_recuperes:
-                    continue
-                
-                info = {
-                "id": offer_id,
-                "Titre": offre.get('intitule'),
-                "Entreprise": offre.get('entreprise', {}).get('nom', 'Confidentiel'),
-                "Ville": offre.get('lieuTravail', {}).get('libelle'),
-                "Type_Contrat": offre.get('typeContrat'),
-                "Salaire": offre.get('salaire', {}).get('libelle', 'Non affiché'),
-                "Date_Creation": offre.get('dateCreation'),
-                "URL": offre.get('origineOffre', {}).get('urlOrigine'),
-                "Description": offre.get('description'),
-                "Source": "France Travail",
-                "Date_Expiration": ""
-                }
-                all_offres_data.append(info)
-                ids_recuperes.add(offer_id)
-                count_new += 1
-
-            print(f"   ✅ {len(resultats)} reçues dont {count_new} nouvelles.")
-            if len(resultats) < step:
-                print("🏁 Dernière page détectée.")
-                break
-
-            # Logique de pagination            
-            if response.status_code == 200:
-                print("🏁 Dernière page atteinte.")
-                continuing = False
-            elif response.status_code == 206:
-                # 206 = Contenu partiel, il y a encore des résultats
-                start += step
-                time.sleep(0.3) 
-            else:
-                # Cas théoriquement impossible ici car filtré par le if initial
-                continuing = False 
-                
-        else:
-            print(f"❌ Erreur {response.status_code}. Arrêt.")
-            print(response.text)
-            continuing = False
-
-# --- 4. SAUVEGARDE FINALE ---
-print(f"\n Bilan : {len(all_offres_data)} offres collectées au total.")
-
-if all_offres_data:
-    df = pd.DataFrame(all_offres_data)
-    if not df_old.empty:
-        print("🔗 Fusion avec l'historique...")        
-        df_final = pd.concat([df_old, df], ignore_index=True)
-    else:
-        df_final = df 
-
-    #df.to_csv(CSV_PATH, index=False, encoding='utf-8')
-    sauvegarde_securisee(df_final, CSV_PATH)
-    print(f"💾 Sauvegardé dans '{nom_fichier}'")
-    print("Fin de api_francetravail ==> Lancer updater_francetravail")
-else:
-    print("⚠️ Rien à sauvegarder.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
+# endregion
@@ -1,12 +1,10 @@
-import requests
+import asyncio
 import pandas as pd
 import os
 import sys
 import time
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-# from bs4 import BeautifulSoup
-import random
 
 # --- CONFIGURATION ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,212 +16,271 @@ CLIENT_ID = os.getenv("FT_CLIENT_ID")
 CLIENT_SECRET = os.getenv("FT_CLIENT_SECRET")
 CSV_PATH = os.path.join(root_dir, "data", "enriched", "offres_francetravail_full.csv")
 
-if not CLIENT_ID or not CLIENT_SECRET:
-    print("❌ ERREUR : Clés France Travail introuvables dans .env")
-    exit()
+# URLs surchargeables (ex: serveur local qui simule l'API pour les tests)
+URL_AUTH = os.getenv("FT_URL_AUTH", "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=%2Fpartenaire")
+URL_API_OFFRE = os.getenv("FT_URL_OFFRE", "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/")
+URL_WEB_OFFRE = os.getenv("FT_URL_WEB", "https://candidat.francetravail.fr/offres/recherche/detail/")
 
-if not os.path.exists(CSV_PATH):
-    print(f"❌ Pas de fichier : {CSV_PATH}")
-    exit()
+# Quotas séparés : l'API (10 appels/s max) et le site public (on reste très poli : ~1 page / 4 s)
+API_REQUETES_PAR_SECONDE = float(os.getenv("FT_REQUETES_PAR_SECONDE", "8"))
+WEB_REQUETES_PAR_SECONDE = float(os.getenv("FT_WEB_REQUETES_PAR_SECONDE", "0.25"))
+NB_WORKERS = int(os.getenv("FT_NB_WORKERS", "8"))
+SAUVEGARDE_TOUTES = 50  # Sauvegarde intermédiaire toutes les N offres vérifiées
 
 if root_dir not in sys.path:
     sys.path.append(root_dir)
-from utils import sauvegarde_securisee
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent, mettre_a_jour_lignes, MAJ_PAR_LIGNE
+from http_client import LimiteurDebit, creer_client_async, requete, cache_par_defaut
+from journal_offres import journaliser
+
+# Phrases typiques de France Travail quand c'est fini
+mots_cloture = [
+    "cette offre n'est plus en ligne",
+    "cette offre n'est plus disponible",
+    "l'offre que vous recherchez n'existe plus",
+    "offre clôturée"
+]
 
 # ------------------------------------------------------------------------------------------------------------------------------------------------------
-# --- CHARGEMENT ---
-print("🔄 Chargement du fichier...")
-df = pd.read_csv(CSV_PATH, encoding='utf-8-sig', dtype=str)
 
-# Vérification colonne Date_Expiration
-if 'Date_Expiration' not in df.columns:
-    df['Date_Expiration'] = None
+# --- AUTHENTIFICATION ---
+class GestionnaireToken:
+    """
+    Token partagé par tous les workers.
+    Sur un 401, un seul worker renouvelle le token : les autres attendent le verrou
+    puis réutilisent le nouveau token au lieu d'en redemander un chacun.
+    """
 
-# On cherche les offres SANS date d'expiration
-mask_a_verifier = df['Date_Expiration'].isna() | (df['Date_Expiration'] == "") | (df['Date_Expiration'] == "nan")
-indices_a_verifier = df[mask_a_verifier].index
+    def __init__(self, client):
+        self.client = client
+        self.token = None
+        self.generation = 0
+        self._verrou = asyncio.Lock()
 
-print(f"📊 Total offres : {len(df)}")
-print(f"🕵️  Offres à vérifier via API : {len(indices_a_verifier)}")
+    async def _demander(self):
+        data = {
+            "grant_type": "client_credentials",
+            "client_id": CLIENT_ID,
+            "client_secret": CLIENT_SECRET,
+            "scope": "api_offresdemploiv2 o2dsoffre"
+        }
+        try:
+            r = await self.client.post(URL_AUTH, data=data)
+            if r.status_code == 200:
+                return r.json()['access_token']
+            print(f"❌ Erreur Token : {r.status_code}")
+        except Exception as e:
+            print(f"❌ Erreur connexion : {e}")
+        return None
 
-if len(indices_a_verifier) == 0:
-    print("✅ Tout est déjà à jour.")
-    exit()
+    async def renouveler(self, generation_vue):
+        """Renouvelle le token, sauf si un autre worker l'a déjà fait depuis `generation_vue`."""
+        async with self._verrou:
+            if self.generation == generation_vue:
+                if generation_vue > 0:
+                    print("🔄 Token expiré, renouvellement...")
+                self.token = await self._demander()
+                self.generation += 1
+        return self.token
 
 # ------------------------------------------------------------------------------------------------------------------------------------------------------
 
-# --- AUTHENTIFICATION ---
-def get_token():
-    url = "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=%2Fpartenaire"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {
-        "grant_type": "client_credentials",
-        "client_id": CLIENT_ID,
-        "client_secret": CLIENT_SECRET,
-        "scope": "api_offresdemploiv2 o2dsoffre"
-    }
-    try:
-        r = requests.post(url, headers=headers, data=data)
-        if r.status_code == 200:
-            return r.json()['access_token']
-        else:
-            print(f"❌ Erreur Token : {r.status_code}")
-            return None
-    except Exception as e:
-        print(f"❌ Erreur connexion : {e}")
-        return None
+# --- FONCTIONS DE VÉRIFICATION ---
 
-token = get_token()
-if not token: exit()
+def extraire_id(df, idx):
+    """ID de l'offre : colonne 'id', sinon fin de l'URL (ex: .../detail/1234567)."""
+    offer_id = df.at[idx, 'id'] if 'id' in df.columns and pd.notna(df.at[idx, 'id']) else None
+    if not offer_id:
+        url = str(df.at[idx, 'URL'])
+        if "detail/" in url:
+            offer_id = url.split("detail/")[-1].split("/")[0]
+    return offer_id
 
-# ------------------------------------------------------------------------------------------------------------------------------------------------------
 
-# --- FONCTION SCRAPING ---
+def est_recente(r):
+    """True si l'offre a été actualisée il y a moins de 3 jours."""
+    try:
+        date_actu_str = r.json().get('dateActualisation', '')
+        if date_actu_str:
+            # On coupe pour garder juste YYYY-MM-DD
+            date_obj = datetime.strptime(date_actu_str[:10], "%Y-%m-%d")
+            return (datetime.now() - date_obj).days < 3
+    except Exception:
+        pass
+    return False
+
 
-def verif_url(offer_id):
+async def verif_url(client, limiteur_web, offer_id, cache=None):
     """
     Vérifie si la page publique de l'offre affiche 'Cette offre n'est plus disponible'.
     Renvoie False si l'offre est morte sur le site web.
     Renvoie True si l'offre semble encore en ligne.
+    Une page vue il y a peu (voir http_client.POLITIQUES_CACHE) est relue depuis le cache.
     """
-    url_publique = f"https://candidat.francetravail.fr/offres/recherche/detail/{offer_id}"
-    
-    # Headers pour ressembler à un vrai navigateur (évite le blocage)
-    headers_browser = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    
     try:
-        # On ne télécharge que le HTML, c'est assez rapide
-        r_web = requests.get(url_publique, headers=headers_browser, timeout=5)
-        
+        r_web = await requete(client, limiteur_web, "GET", URL_WEB_OFFRE + offer_id, timeout=10, cache=cache)
         if r_web.status_code == 200:
-            # Phrases typiques de France Travail quand c'est fini
-            mots_cloture = [
-                "cette offre n'est plus en ligne",
-                "cette offre n'est plus disponible",
-                "l'offre que vous recherchez n'existe plus",
-                "offre clôturée"
-            ]
-            
             page_content = r_web.text.lower()
-            
             # Si on trouve une des phrases fatales
             if any(mot in page_content for mot in mots_cloture):
                 return False # OFFRE MORTE (Web)
-                
         return True # OFFRE VIVANTE (ou erreur web, dans le doute on garde)
-        
+
     except Exception as e:
         print(f"   ⚠️ Impossible de vérifier le web pour {offer_id}: {e}")
         return True # Dans le doute, on garde
-    
 
-# --- BOUCLE DE VÉRIFICATION ---
-print("\n🚀 Démarrage de la vérification API...")
-compteur_morts = 0
-compteur_vivants = 0
-modifications = False
-api_base_url = "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/"
 
-for i, idx in enumerate(indices_a_verifier):
-    try:
-        # 1. On récupère l'ID propre        
-        offer_id = df.at[idx, 'id'] if 'id' in df.columns and pd.notna(df.at[idx, 'id']) else None
-        
-        if not offer_id:
-            # Tentative d'extraction depuis l'URL (ex: .../detail/1234567)
-            url = str(df.at[idx, 'URL'])
-            if "detail/" in url:
-                offer_id = url.split("detail/")[-1].split("/")[0]
-        
-        if not offer_id:
-            print(f"⚠️  Ligne {idx} : Impossible de trouver l'ID de l'offre.")
+async def verifier_offre(client, tokens, limiteur_api, limiteur_web, offer_id, cache=None):
+    """
+    Verdict pour une offre : 'expiree', 'fantome' (active API mais morte web), 'active' ou 'erreur'.
+    Un 401 déclenche un seul renouvellement de token partagé, puis un nouvel essai.
+    """
+    for essai in range(2):
+        generation = tokens.generation
+        headers = {"Authorization": f"Bearer {tokens.token}"}
+        r = await requete(client, limiteur_api, "GET", URL_API_OFFRE + offer_id, headers=headers)
+        if r.status_code == 401 and essai == 0:
+            await tokens.renouveler(generation)
             continue
+        break
+
+    # Code 200 = L'offre existe et on reçoit ses infos -> VIVANTE
+    # Code 204 (No Content) ou 404 (Not Found) = L'offre n'existe plus -> MORTE
+    if r.status_code in (204, 404):
+        return "expiree", "EXPIRÉE"
+    if r.status_code != 200:
+        return "erreur", f"Erreur API {r.status_code}"
+    if est_recente(r):
+        return "active", "ACTIVE (Confirmé API Récente)"
+    if await verif_url(client, limiteur_web, offer_id, cache):
+        return "active", "ACTIVE (Confirmé Web)"
+    return "fantome", "FANTÔME (Active API mais Morte Web) -> SUPPRESSION"
+
+
+async def verifier_offres(df, indices_a_verifier, chemin):
+    """
+    Pool de workers : chaque worker prend la prochaine offre de la file.
+    Les quotas API et web sont partagés entre tous les workers.
+    """
+    bilan = {"morts": 0, "vivants": 0, "traitees": 0}
+    file = asyncio.Queue()
+    for i, idx in enumerate(indices_a_verifier):
+        file.put_nowait((i, idx))
+
+    limiteur_api = LimiteurDebit(API_REQUETES_PAR_SECONDE)
+    limiteur_web = LimiteurDebit(WEB_REQUETES_PAR_SECONDE)
+    cache = cache_par_defaut()
+    date_jour = datetime.now().strftime("%d/%m/%Y")
+    modifications = False
+    urls_expirees = []   # Journal des offres : écrit une seule fois en fin de run, pas dans les workers
 
-        # 2. Appel API
-        headers = {"Authorization": f"Bearer {token}"}        
-        
-        r = requests.get(api_base_url + offer_id, headers=headers)        
-
-        # 3. Verdict
-        # Code 200 = L'offre existe et on reçoit ses infos -> VIVANTE
-        # Code 204 (No Content) ou 404 (Not Found) = L'offre n'existe plus -> MORTE
-        
-        titre = str(df.at[idx, 'Titre'])[:20]       
-                    
-        if r.status_code == 204 or r.status_code == 404:
-            print(f"❌ [{i+1}] {offer_id} : EXPIRÉE")
-            df.at[idx, 'Date_Expiration'] = datetime.now().strftime("%d/%m/%Y")
-            compteur_morts += 1
-            modifications = True
-
-        elif r.status_code == 200:
-            est_recent = False
+    async def worker():
+        nonlocal modifications
+        while True:
+            try:
+                i, idx = file.get_nowait()
+            except asyncio.QueueEmpty:
+                return
             try:
-                date_actu_str = r.json().get('dateActualisation', '')                
-                if date_actu_str:
-                    try:
-                        # On coupe pour garder juste YYYY-MM-DD
-                        date_obj = datetime.strptime(date_actu_str[:10], "%Y-%m-%d")
-                        delta = datetime.now() - date_obj
-                        if delta.days < 3: # Si moins de 3 jours
-                            est_recent = True
-                    except:
-                        est_recent = False
-            except Exception:
-                est_recent = False       
-
-            if est_recent:
-                print(f"✅ [{i+1}] {offer_id} : ACTIVE (Confirmé API Récente)")
-                compteur_vivants += 1
-            else:
-                print(f"🔍 [{i+1}] {offer_id} : Date ancienne... Vérification Web...")
-                est_visible_web = verif_url(offer_id)
-                if est_visible_web:
-                    print(f"✅ [{i+1}] {offer_id} : ACTIVE (Confirmé Web)")
-                    compteur_vivants += 1
+                offer_id = extraire_id(df, idx)
+                if not offer_id:
+                    print(f"⚠️  Ligne {idx} : Impossible de trouver l'ID de l'offre.")
+                    continue
+
+                verdict, message = await verifier_offre(client, tokens, limiteur_api, limiteur_web, offer_id, cache)
+                if verdict in ("expiree", "fantome"):
+                    print(f"❌ [{i+1}] {offer_id} : {message}")
+                    df.at[idx, 'Date_Expiration'] = date_jour
+                    bilan["morts"] += 1
+                    # Fichier avec seulement la colonne 'id' (voir extraire_id) : pas d'URL pour la base ni le journal
+                    url = df.at[idx, 'URL'] if 'URL' in df.columns else None
+                    if MAJ_PAR_LIGNE and url:
+                        # Base SQLite : seule cette offre est réécrite (pas de sauvegarde du fichier entier)
+                        mettre_a_jour_lignes(chemin, {url: {'Date_Expiration': date_jour}})
+                    else:
+                        modifications = True
+                    if url:
+                        urls_expirees.append(url)
+                elif verdict == "active":
+                    print(f"✅ [{i+1}] {offer_id} : {message}")
+                    bilan["vivants"] += 1
                 else:
-                    print(f"❌ [{i+1}] {offer_id} : FANTÔME (Active API mais Morte Web) -> SUPPRESSION")
-                    df.at[idx, 'Date_Expiration'] = datetime.now().strftime("%d/%m/%Y")
-                    compteur_morts += 1
-                    modifications = True
-                
-                # Petite pause pour pas se faire bannir IP par le site web
-                sleep_time = random.uniform(3, 6)
-                print(f"⏳ Pause de {sleep_time:.2f} sec...")
-                time.sleep(sleep_time)
-
-        elif r.status_code == 401: # Token expiré
-            print("🔄 Token expiré, renouvellement...")
-            token = get_token()
-            
-        elif r.status_code == 429: # Trop de requêtes
-            print("⏳ Trop vite ! Pause de 5 sec...")
-            time.sleep(5)
-            
-        else:
-            print(f"⚠️  [{i+1}] {offer_id} : Erreur API {r.status_code}")
-
-        # Petite pause pour être gentil avec l'API (10 offres par seconde max)
-        time.sleep(0.2)
-        
-        # Sauvegarde intermédiaire
-        if modifications and i > 0 and i % 50 == 0:
-            #df.to_csv(CSV_PATH, index=False, encoding='utf-8-sig')
-            sauvegarde_securisee(df, CSV_PATH)
-            modifications = False
-            print("   💾 Sauvegarde auto...")
+                    print(f"⚠️  [{i+1}] {offer_id} : {message}")
 
-    except Exception as e:
-        print(f"⚠️ Erreur script : {e}")
+            except Exception as e:
+                print(f"⚠️ Erreur script : {e}")
+            finally:
+                bilan["traitees"] += 1
+                # Sauvegarde intermédiaire (synchrone : aucun worker ne modifie df pendant l'écriture)
+                if modifications and bilan["traitees"] % SAUVEGARDE_TOUTES == 0:
+                    sauvegarde_securisee(df, chemin)
+                    modifications = False
+                    print("   💾 Sauvegarde auto...")
+
+    async with creer_client_async(connexions_max=NB_WORKERS) as client:
+        tokens = GestionnaireToken(client)
+        if not await tokens.renouveler(0):
+            return None
+        try:
+            await asyncio.gather(*[worker() for _ in range(NB_WORKERS)])
+        finally:
+            if urls_expirees:
+                journaliser("enregistrer_expirations", urls_expirees)
+
+    if cache is not None:
+        print(cache.resume())
+        cache.fermer()
+    return bilan
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+def main():
+    if not CLIENT_ID or not CLIENT_SECRET:
+        print("❌ ERREUR : Clés France Travail introuvables dans .env")
+        exit()
+
+    if not donnees_existent(CSV_PATH):
+        print(f"❌ Pas de fichier : {CSV_PATH}")
+        exit()
+
+    # --- CHARGEMENT ---
+    print("🔄 Chargement du fichier...")
+    df = charger_donnees(CSV_PATH, encoding='utf-8-sig', dtype=str)
+
+    # Vérification colonne Date_Expiration
+    if 'Date_Expiration' not in df.columns:
+        df['Date_Expiration'] = None
+
+    # On cherche les offres SANS date d'expiration
+    mask_a_verifier = df['Date_Expiration'].isna() | (df['Date_Expiration'] == "") | (df['Date_Expiration'] == "nan")
+    indices_a_verifier = df[mask_a_verifier].index
+
+    print(f"📊 Total offres : {len(df)}")
+    print(f"🕵️  Offres à vérifier via API : {len(indices_a_verifier)}")
+
+    if len(indices_a_verifier) == 0:
+        print("✅ Tout est déjà à jour.")
+        exit()
+
+    # --- BOUCLE DE VÉRIFICATION ---
+    print(f"\n🚀 Démarrage de la vérification API ({NB_WORKERS} workers)...")
+    start = time.time()
+    bilan = None
+    try:
+        bilan = asyncio.run(verifier_offres(df, indices_a_verifier, CSV_PATH))
     except KeyboardInterrupt:
         print("\n🛑 Arrêt manuel !")
-        sauvegarde_securisee(df, CSV_PATH)
         exit(0)
+    finally:
+        if not MAJ_PAR_LIGNE or 'URL' not in df.columns:   # Base SQLite : déjà enregistré offre par offre
+            sauvegarde_securisee(df, CSV_PATH)
+
+    if bilan is None:
+        exit(1)
+    print(f"\n🏁 FIN : {bilan['morts']} expirées / {bilan['vivants']} actives en {time.time() - start:.1f} s.")
+    print("Fin de updater_francetravail ==> Lancer clean_francetravail")
+
 
-# --- FIN ---
-#df.to_csv(CSV_PATH, index=False, encoding='utf-8-sig')
-sauvegarde_securisee(df, CSV_PATH)
-print(f"\n🏁 FIN : {compteur_morts} expirées / {compteur_vivants} actives.")
-print("Fin de updater_francetravail ==> Lancer clean_francetravail")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
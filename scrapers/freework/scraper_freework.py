@@ -1,15 +1,28 @@
-import requests
+import asyncio
+import os
+import sys
 from bs4 import BeautifulSoup
 
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from http_client import creer_client_async, requete, cache_par_defaut
+
 # 1. URL de recherche (Data Analyst)
 url = "https://www.free-work.com/fr/tech-it/jobs?query=Data%20analyst"
 
-# 2. Masque (User-Agent)
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
+# 2. Téléchargement (User-Agent de navigateur fourni par creer_client_async).
+# La page de recherche est gardée 1 h dans le cache HTTP : relancer le script ne la retélécharge pas.
+async def telecharger(url):
+    cache = cache_par_defaut()
+    async with creer_client_async() as client:
+        reponse = await requete(client, None, "GET", url, cache=cache)
+    if cache is not None:
+        cache.fermer()
+    return reponse
 
-response = requests.get(url, headers=headers)
+response = asyncio.run(telecharger(url))
 
 if response.status_code == 200:
     soup = BeautifulSoup(response.text, 'html.parser')
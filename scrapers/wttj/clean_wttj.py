@@ -14,7 +14,8 @@ OUTPUT_CSV = os.path.join(project_root, "data", "clean", "offres_wttj_clean.csv"
 
 if project_root not in sys.path:
     sys.path.append(project_root)
-from utils import sauvegarde_securisee
+from utils import sauvegarde_securisee, charger_donnees
+from salaires import salaires_wttj, COLONNES_SALAIRE
 
 # =================================================
 categories_valides = ['Stage / Alternance', 'Junior', 'Confirmé', 'Senior', 'Non spécifié']
@@ -73,23 +74,6 @@ def deduire_niveau(row):
 
 # -----------------------------------------------------------------------------------------------------------------------------
 
-def extraire_salaire_wttj(infos_str):
-    """ Extrait le salaire de la colonne fourre-tout de WTTJ """
-    if pd.isna(infos_str): return None
-    # Regex pour chercher "45k", "40-50k", "45 k€"
-    # On nettoie un peu la chaîne avant
-    txt = str(infos_str).lower().replace(',', '.')
-    
-    match_k = re.search(r'(\d{2,3})[ ]?k', txt)
-    if match_k:
-        val = float(match_k.group(1))
-        # Filtre anti-bruit (évite de prendre "2 jours" pour 2k salaire)
-        if 20 <= val <= 150:
-            return int(val * 1000)
-    return None
-
-# -----------------------------------------------------------------------------------------------------------------------------
-
 def extraire_contrat_wttj(infos_str):
     """ Extrait le contrat de la colonne fourre-tout """
     txt = str(infos_str).upper()
@@ -111,7 +95,7 @@ def nettoyer_texte(texte):
 def main():
     print(f"📂 Chargement de {INPUT_CSV}...")
     try:
-        df = pd.read_csv(INPUT_CSV)
+        df = charger_donnees(INPUT_CSV)
     except FileNotFoundError:
         print("❌ Fichier introuvable.")
         return
@@ -129,11 +113,11 @@ def main():
 
     print("⚙️ Extraction Salaires & Contrats...")
     if 'Experience_Salaire_Infos' in df.columns:
-        df['Salaire_Annuel_Estime'] = df['Experience_Salaire_Infos'].apply(extraire_salaire_wttj)
+        df[COLONNES_SALAIRE] = salaires_wttj(df['Experience_Salaire_Infos'])
         df['Type_Contrat'] = df['Experience_Salaire_Infos'].apply(extraire_contrat_wttj)
     else:
         print("⚠️ Colonne 'Experience_Salaire_Infos' introuvable. Pas de salaire extrait.")
-        df['Salaire_Annuel_Estime'] = None
+        df[COLONNES_SALAIRE] = None
         df['Type_Contrat'] = "Non spécifié"
     
     print("🧠 Calcul des niveaux...")
@@ -146,7 +130,7 @@ def main():
     # Tes catégories officielles    
     cols_finales = [
         'Titre', 'Entreprise', 'Ville', 'Type_Contrat', 
-        'Salaire_Annuel_Estime', 'Niveau', 'Description_Propre', 
+        'Salaire_Annuel_Estime', 'Salaire_Annuel_Min', 'Salaire_Annuel_Max', 'Niveau', 'Description_Propre', 
         'URL', 'Date_Publication','Date_Expiration', 'Source'
     ]
     for col in cols_finales:
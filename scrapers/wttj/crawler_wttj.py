@@ -16,16 +16,17 @@ CSV_PATH = os.path.join(project_root, "data", "raw", "offres_wttj_url.csv")
 
 if project_root not in sys.path:
     sys.path.append(project_root)
-from utils import sauvegarde_securisee
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent
+from journal_offres import journaliser
 
 # --- 2. CHARGEMENT DE L'HISTORIQUE ---
 urls_vues = set()
 data_existante = []
 
-if os.path.exists(CSV_PATH):
+if donnees_existent(CSV_PATH):
     print(f"📂 Chargement de l'historique : {CSV_PATH}")
     try:
-        df_old = pd.read_csv(CSV_PATH, dtype=str)
+        df_old = charger_donnees(CSV_PATH, dtype=str)
         # On remplit la mémoire avec les URLs existantes
         urls_vues = set(df_old['URL'].tolist())
         data_existante = df_old.to_dict('records')
@@ -46,6 +47,7 @@ driver.set_window_size(1920, 1080)
 # Variables globales
 page_number = 1
 nouvelles_offres = []
+urls_listees = []   # Toutes les offres vues en ligne aujourd'hui, nouvelles ou déjà connues (journal des offres)
 continuing = True
 
 print("🐢 Mode 'Tortue' activé : On va prendre notre temps pour ne pas se faire repérer.")
@@ -83,6 +85,7 @@ while continuing:
         # Le filtre
         if href and '/companies/' in href and '/jobs/' in href and len(texte.strip()) > 0:
             full_url = "https://www.welcometothejungle.com" + href            
+            urls_listees.append(full_url)
             
             if full_url not in urls_vues:
                 titre = " ".join(texte.split())
@@ -119,6 +122,9 @@ while continuing:
 # --- SAUVEGARDE FINALE ---
 driver.quit()
 
+# Journal : première vue des nouvelles offres, "revue" pour celles déjà connues
+journaliser("enregistrer_vues", urls_listees, source="Welcome to the Jungle")
+
 print(f"\n Bilan Total : {len(nouvelles_offres)} offres récupérées sur {page_number} pages.")
 
 if len(nouvelles_offres) > 0:
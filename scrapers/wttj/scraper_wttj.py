@@ -1,11 +1,9 @@
+import asyncio
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import lxml.html
 import time
-import random
 import os
+import sys
 import json
 from datetime import datetime
 
@@ -17,209 +15,256 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 INPUT_CSV = os.path.join(project_root, "data", "raw", "offres_wttj_url.csv")
 OUTPUT_CSV = os.path.join(project_root, "data", "enriched", "offres_wttj_full.csv")
 
-# --- 1. CHARGEMENT ---
-if not os.path.exists(INPUT_CSV):
-    print(f"❌ ERREUR : Le fichier {INPUT_CSV} est introuvable.")
-    exit()
+# Mode de récupération des pages :
+# - "http" (défaut) : téléchargement direct + lecture du JSON-LD, le navigateur n'est lancé
+#   que pour les pages sans bloc JSON-LD
+# - "navigateur" : tout passe par Selenium (ancien comportement)
+MODE = os.getenv("WTTJ_MODE", "http")
+REQUETES_PAR_SECONDE = float(os.getenv("WTTJ_REQUETES_PAR_SECONDE", "1"))
+CONNEXIONS_MAX = int(os.getenv("WTTJ_CONNEXIONS_MAX", "4"))
 
-df_source = pd.read_csv(INPUT_CSV)
-# Pour tester :
-#df_source = df_source.head(5) 
-
-print(f"✅ Chargement de {len(df_source)} offres.")
-
-# --- 2. INIT FICHIER SORTIE ---
 # On prépare les colonnes précises que tu veux
 colonnes = ["Titre", "Entreprise", "Ville", "Experience_Salaire_Infos", "Description_Complete", "URL", "Date_Publication"]
 
-if not os.path.exists(OUTPUT_CSV):
-    pd.DataFrame(columns=colonnes).to_csv(OUTPUT_CSV, index=False)
-    deja_faites = []
-else:
-    try:
-        df_exist = pd.read_csv(OUTPUT_CSV)
-        # Si la colonne Date manque, on l'ajoute
-        if "Date_Publication" not in df_exist.columns:
-            print("⚠️ Ajout de la colonne 'Date_Publication' au fichier existant...")
-            df_exist["Date_Publication"] = None
-            df_exist = df_exist.reindex(columns=colonnes)
-            df_exist.to_csv(OUTPUT_CSV, index=False)
-            
-        deja_faites = df_exist["URL"].tolist()
-    except Exception as e:
-        print(f"⚠️ Fichier corrompu ou vide : {e}. On repart à zéro.")
-        deja_faites = []
-
-# --- 3. LE ROBOT ---
-options = webdriver.ChromeOptions()
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--headless") # Laisse commenté pour surveiller
-
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-driver.set_window_size(1920, 1080)
-
-print("🚀 Démarrage de l'extraction...")
-
-# --- 4. BOUCLE ---
-try:
-    for index, row in df_source.iterrows():
-        url = row['URL']
-        titre_csv = row['Titre']
-        
-        if url in deja_faites:
-            print(f"⏩ Déjà fait : {titre_csv}")
+mots_cles_bannis = [
+    "CDI", "CDD", "Stage", "Alternance", "Freelance", "Apprentissage", # Contrats
+    "Temps plein", "Temps partiel", "Partiel", # Rythme
+    "Télétravail", "Remote", "Hybride", # Mode de travail
+    "ans", "xp", "expérience", # Expérience
+    "k€", "€", "salaire", # Salaire
+    "bac", "master", "diplôme", # Etudes
+    "annonce", "sponsorisé", "pub", "cookie", "paramètre", "login", "connexion" # Interface & Pubs
+]
+
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent, ajouter_lignes
+from http_client import LimiteurDebit, creer_client_async, requete, cache_par_defaut
+from browser_pool import PoolNavigateurs
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# region 1. --- EXTRACTION (HTML -> ligne du CSV) ---
+
+def _texte(element, separateur):
+    """Équivalent de BeautifulSoup.get_text(separator, strip=True)."""
+    morceaux = (t.strip() for t in element.itertext())
+    return separateur.join(t for t in morceaux if t)
+
+
+def lire_json_ld(doc):
+    """Premier objet JobPosting trouvé dans les blocs <script type="application/ld+json">."""
+    for script in doc.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text or "")
+        except ValueError:
             continue
-        
-        print(f"\n🔎 ({index + 1}/{len(df_source)}) {titre_csv}")
-        
+        # Parfois le JSON est une liste, parfois un dictionnaire unique
+        candidats = data if isinstance(data, list) else [data]
+        job_data = next((item for item in candidats if isinstance(item, dict) and item.get('@type') == 'JobPosting'), None)
+        if job_data:
+            return job_data
+    return None
+
+
+def extraire_offre_html(html, url, titre, exiger_json_ld=False):
+    """
+    Transforme le HTML d'une page d'offre en ligne du CSV.
+    Renvoie None si `exiger_json_ld` et que la page n'a pas de bloc JobPosting
+    (page incomplète : il faudra passer par le navigateur).
+    """
+    doc = lxml.html.fromstring(html)
+
+    # --- A. ENTREPRISE (Via URL - Infaillible) ---
+    try:
+        entreprise = url.split('/companies/')[1].split('/')[0].replace('-', ' ').upper()
+    except:
+        entreprise = "INCONNU"
+
+    # --- B. LES INFOS CLÉS (Ville, Expérience, Salaire) ---
+    # 1. JSON-LD : la source la plus fiable pour la localisation précise et la date
+    ville = "Non spécifié"
+    date_pub = None
+    job_data = lire_json_ld(doc)
+    if job_data is None and exiger_json_ld:
+        return None
+
+    if job_data:
+        location = job_data.get('jobLocation') or {}
+        if isinstance(location, list):
+            location = location[0] if location else {}
+        ville_json = location.get('address', {}).get('addressLocality')
+        if ville_json:
+            ville = ville_json
+        if job_data.get('datePosted'):
+            date_pub = job_data['datePosted'].split('T')[0]
+
+    # SI PAS DE DATE TROUVÉE DANS LE JSON -> DATE DU JOUR
+    if not date_pub:
+        date_pub = datetime.now().strftime("%Y-%m-%d")
+
+    # Le texte des scripts/styles n'est pas du contenu visible
+    for element in doc.xpath('//script|//style|//template'):
+        element.drop_tree()
+
+    # 2. Les tags visuels (Contrat, Rythme, Salaire...) : tous les "petits" <li>
+    infos_cles = []
+    for li in doc.iter('li'):
+        texte = _texte(li, "")
+        if 0 < len(texte) < 50:
+            infos_cles.append(texte)
+
+            # Si le JSON n'a pas donné la ville, on la devine par élimination
+            if ville == "Non spécifié":
+                est_banni = any(banni.lower() in texte.lower() for banni in mots_cles_bannis)
+                if not est_banni and len(texte) < 30 and not any(char.isdigit() for char in texte):
+                    ville = texte
+
+    # --- C. LA DESCRIPTION (Compétences & Missions) ---
+    # Méthode "Aspirateur" : tout le texte du <main>, sinon la plus longue <section>
+    description = "Non trouvée"
+    main_content = next(doc.iter('main'), None)
+    if main_content is not None:
+        description = _texte(main_content, "\n")
+    else:
+        textes_sections = [_texte(s, "\n") for s in doc.iter('section')]
+        if textes_sections:
+            description = max(textes_sections, key=len)
+
+    return {
+        "Titre": titre,
+        "Entreprise": entreprise,
+        "Ville": ville,
+        "Experience_Salaire_Infos": " | ".join(infos_cles), # C'est ICI que tu auras l'XP et le Salaire
+        "Description_Complete": description,
+        "URL": url,
+        "Date_Publication": date_pub
+    }
+
+
+def enregistrer(ligne):
+    ajouter_lignes(pd.DataFrame([ligne], columns=colonnes), OUTPUT_CSV)
+    print(f"   ✅ {ligne['Titre'][:40]} | 📍 {ligne['Ville']} | 📅 {ligne['Date_Publication']}")
+
+# endregion
+# ======================================================================================================================================================
+
+# region 2. --- RÉCUPÉRATION DES PAGES ---
+
+async def recuperer_http(a_faire):
+    """
+    Télécharge les pages en parallèle (pool keep-alive + quota par seconde).
+    Les pages déjà vues sont resservies par le cache HTTP (run repris ou relancé : rien n'est retéléchargé).
+    Renvoie les offres à repasser au navigateur (pas de JSON-LD ou erreur HTTP).
+    """
+    limiteur = LimiteurDebit(REQUETES_PAR_SECONDE)
+    cache = cache_par_defaut()
+    pour_navigateur = []
+
+    async def traiter(client, url, titre):
+        try:
+            reponse = await requete(client, limiteur, "GET", url, cache=cache)
+            if reponse.status_code == 200:
+                ligne = extraire_offre_html(reponse.text, url, titre, exiger_json_ld=True)
+                if ligne:
+                    enregistrer(ligne)
+                    return
+            print(f"   ↪️ {titre[:40]} : pas de JSON-LD (HTTP {reponse.status_code}) -> navigateur")
+        except Exception as e:
+            print(f"   ↪️ {titre[:40]} : {e} -> navigateur")
+        pour_navigateur.append((url, titre))
+
+    async with creer_client_async(connexions_max=CONNEXIONS_MAX) as client:
+        await asyncio.gather(*[traiter(client, url, titre) for url, titre in a_faire])
+    if cache is not None:
+        print(cache.resume())
+        cache.fermer()
+    return pour_navigateur
+
+
+def lire_page_rendue(driver, element):
+    """Page chargée par le pool de navigateurs : scroll pour charger tout le texte, puis extraction."""
+    url, titre = element
+    driver.execute_script("window.scrollBy(0, 600);")
+    time.sleep(1)
+    return extraire_offre_html(driver.page_source, url, titre)
+
+
+def recuperer_navigateur(a_faire):
+    """Chemin Selenium, via le pool de navigateurs partagé (plusieurs pages à la fois)."""
+    pool = PoolNavigateurs(pause=(4, 7)) # Pause nécessaire au rendu de la page
+    for i, ((url, titre), ligne, erreur) in enumerate(pool.traiter(a_faire, lire_page_rendue, url_de=lambda e: e[0])):
+        print(f"\n🔎 [Navigateur] ({i + 1}/{len(a_faire)}) {titre}")
+        if erreur is not None:
+            print(f"❌ Erreur : {erreur}")
+        else:
+            enregistrer(ligne)
+
+# endregion
+# ======================================================================================================================================================
+
+# region 3. --- EXÉCUTION ---
+
+def main():
+    # --- 1. CHARGEMENT ---
+    if not donnees_existent(INPUT_CSV):
+        print(f"❌ ERREUR : Le fichier {INPUT_CSV} est introuvable.")
+        exit()
+
+    df_source = charger_donnees(INPUT_CSV)
+    # Pour tester :
+    #df_source = df_source.head(5)
+    print(f"✅ Chargement de {len(df_source)} offres.")
+
+    # --- 2. INIT FICHIER SORTIE ---
+    deja_faites = []
+    if not donnees_existent(OUTPUT_CSV):
+        ajouter_lignes(pd.DataFrame(columns=colonnes), OUTPUT_CSV)
+    else:
         try:
-            driver.get(url)
-            time.sleep(random.uniform(4, 7)) # Pause nécessaire
-            
-            # Scroll pour charger tout le texte
-            driver.execute_script("window.scrollBy(0, 600);")
-            time.sleep(1)
-
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # --- A. ENTREPRISE (Via URL - Infaillible) ---
-            try:
-                entreprise = url.split('/companies/')[1].split('/')[0].replace('-', ' ').upper()
-            except:
-                entreprise = "INCONNU"
-
-            # --- B. LES INFOS CLÉS (Ville, Expérience, Salaire) ---
-            # Sur WTTJ, ces infos sont souvent dans une liste <ul> avec des icônes juste sous le titre.
-            # On va récupérer TOUS les éléments de cette liste et les mettre dans une colonne.
-            infos_cles = []
-            ville = "Non spécifié"
-            date_pub = None
-            
-            # 1. On cherche d'abord dans le code caché pour Google (JSON-LD)
-            # C'est la source la plus fiable pour la localisation précise
-            try:
-                script_json = soup.find('script', type='application/ld+json')
-                if script_json:
-                    data = json.loads(script_json.string)
-                    
-                    # Parfois le JSON est une liste, parfois un dictionnaire unique
-                    if isinstance(data, list):
-                        # On cherche l'objet qui est une offre d'emploi
-                        job_data = next((item for item in data if item.get('@type') == 'JobPosting'), None)
-                    else:
-                        job_data = data if data.get('@type') == 'JobPosting' else None
-                    
-                    if job_data:
-                        if 'jobLocation' in job_data:
-                            address = job_data['jobLocation'].get('address', {})
-                            # On récupère la ville propre
-                            ville_json = address.get('addressLocality')
-                            if ville_json:
-                                ville = ville_json
-                                print(f"   🎯 Ville trouvée (JSON) : {ville}")
-                        if 'datePosted' in job_data:                        
-                            date_pub = job_data['datePosted'].split('T')[0]
-                            print(f"   📅 Date trouvée (JSON) : {date_pub}")
-            except Exception as e:
-                # Si le JSON échoue, pas grave, on continue avec la méthode visuelle
-                pass
-            # SI PAS DE DATE TROUVÉE DANS LE JSON -> DATE DU JOUR
-            if not date_pub:
-                date_pub = datetime.now().strftime("%Y-%m-%d")
-                print(f"   📅 Date introuvable -> Utilisation date du jour : {date_pub}")
-
-            # 2. On récupère quand même les tags visuels (Contrat, Rythme, Salaire...)
-            # Car le JSON ne contient pas toujours le salaire ou le télétravail de façon claire
-            try:
-                tous_li = soup.find_all('li')
-                for li in tous_li:
-                    texte = li.get_text(strip=True)
-                    # On ne garde que les "petits" textes (tags)
-                    if 0 < len(texte) < 50:
-                        infos_cles.append(texte)
-                        
-                        # Si la méthode JSON a échoué (ville toujours "Non spécifié")
-                        # On essaie de deviner la ville ici en secours
-                        if ville == "Non spécifié":
-                            mots_cles_bannis = [
-                    "CDI", "CDD", "Stage", "Alternance", "Freelance", "Apprentissage", # Contrats
-                    "Temps plein", "Temps partiel", "Partiel", # Rythme
-                    "Télétravail", "Remote", "Hybride", # Mode de travail
-                    "ans", "xp", "expérience", # Expérience
-                    "k€", "€", "salaire", # Salaire
-                    "bac", "master", "diplôme", # Etudes                
-                    "annonce", "sponsorisé", "pub", "cookie", "paramètre", "login", "connexion" # Interface & Pubs
-                ]            
-                            # Si le texte ne contient AUCUN des mots bannis, c'est probablement la ville !
-                            # (On vérifie aussi que ce n'est pas un texte trop long ou vide)
-                            est_banni = any(banni.lower() in texte.lower() for banni in mots_cles_bannis)
-                            
-                            if not est_banni and len(texte) < 30:
-                                if not any(char.isdigit() for char in texte):
-                                    ville = texte                            
-                                # On ajoute un petit print pour vérifier
-                                # print(f"   📍 Ville devinée par élimination : {ville}")
-            except:
-                pass
-
-            # On transforme la liste en une chaîne de texte propre (ex: "CDI | Paris | > 3 ans | 45k€")
-            infos_concatenees = " | ".join(infos_cles)
-
-            # --- C. LA DESCRIPTION (Compétences & Missions) ---
-            # On cherche le gros bloc de texte. 
-            # Stratégie : On cherche la balise qui contient le mot "Descriptif" ou "Profil"
-            description = "Non trouvée"
-            
-            # On cherche tous les paragraphes et les titres
-            # C'est la méthode "Aspirateur" : on prend tout le contenu textuel pertinent
-            main_content = soup.find('main')
-            if main_content:
-                # On prend le texte en gardant les sauts de ligne pour que ce soit lisible
-                description = main_content.get_text(separator="\n", strip=True)
-            else:
-                # Plan B : Si pas de main, on cherche section par section
-                sections = soup.find_all('section')
-                textes_sections = [s.get_text(separator="\n", strip=True) for s in sections]
-                # On garde la plus longue section (c'est forcément la description)
-                if textes_sections:
-                    description = max(textes_sections, key=len)
-
-            # --- SAUVEGARDE ---
-            nouvelle_ligne = {
-                "Titre": titre_csv,
-                "Entreprise": entreprise,
-                "Ville": ville,
-                "Experience_Salaire_Infos": infos_concatenees, # C'est ICI que tu auras l'XP et le Salaire
-                "Description_Complete": description,
-                "URL": url,
-                "Date_Publication": date_pub
-            }
-            
-            df_new = pd.DataFrame([nouvelle_ligne])
-            df_new.to_csv(OUTPUT_CSV, mode='a', header=False, index=False)
-            
-            # Petit feedback visuel
-            print(f"   📍 Ville: {ville}")
-            print(f"   💼 Infos: {infos_concatenees[:60]}...") # Affiche le début des infos
-            print("   ✅ Sauvegardé.")
+            df_exist = charger_donnees(OUTPUT_CSV)
+            # Si la colonne Date manque, on l'ajoute
+            if "Date_Publication" not in df_exist.columns:
+                print("⚠️ Ajout de la colonne 'Date_Publication' au fichier existant...")
+                df_exist["Date_Publication"] = None
+                df_exist = df_exist.reindex(columns=colonnes)
+                sauvegarde_securisee(df_exist, OUTPUT_CSV)
 
+            deja_faites = df_exist["URL"].tolist()
         except Exception as e:
-            print(f"❌ Erreur : {e}")
+            print(f"⚠️ Fichier corrompu ou vide : {e}. On repart à zéro.")
 
-    driver.quit()
-    print("\n🏁 Extraction terminée.")
-except KeyboardInterrupt:
-    print("\n\n🛑 Interruption manuelle détectée (Ctrl+C) !")
-    print("💾 Pas de panique : Les offres traitées jusqu'ici sont bien sauvegardées.")
+    deja_faites = set(deja_faites)
+    a_faire = [(row['URL'], row['Titre']) for _, row in df_source.iterrows() if row['URL'] not in deja_faites]
+    print(f"⏩ {len(df_source) - len(a_faire)} déjà faites, {len(a_faire)} à extraire (mode {MODE}).")
+
+    # --- 3. EXTRACTION ---
+    start = time.time()
+    try:
+        if MODE == "navigateur":
+            pour_navigateur = a_faire
+        else:
+            pour_navigateur = asyncio.run(recuperer_http(a_faire))
+            print(f"\n⚡ {len(a_faire) - len(pour_navigateur)} offres extraites en HTTP en {time.time() - start:.1f} s.")
+
+        if pour_navigateur:
+            print(f"🚀 {len(pour_navigateur)} offres à passer au navigateur...")
+            recuperer_navigateur(pour_navigateur)
+
+        print("\n🏁 Extraction terminée.")
+    except KeyboardInterrupt:
+        print("\n\n🛑 Interruption manuelle détectée (Ctrl+C) !")
+        print("💾 Pas de panique : Les offres traitées jusqu'ici sont bien sauvegardées.")
+
+    except Exception as e:
+        # Ça attrape les autres erreurs (crash global imprévu)
+        print(f"\n❌ Erreur critique du script : {e}")
 
-except Exception as e:
-    # Ça attrape les autres erreurs (crash global imprévu)
-    print(f"\n❌ Erreur critique du script : {e}")
+    finally:
+        print("\n🤖 Robot rentré au garage. Fin du programme.")
+        print("Fin du scraper_wttj ==> Lancer le updater_wttj")
 
-finally:
-    # Ce bloc s'exécute TOUJOURS (que ça finisse bien, que ça plante, ou que tu arrêtes)
-    if 'driver' in locals():
-        driver.quit()
-    print("\n🤖 Robot rentré au garage. Fin du programme.")
-    print("Fin du scraper_wttj ==> Lancer le updater_wttj")
 
+if __name__ == "__main__":
+    main()
+# endregion
@@ -1,10 +1,4 @@
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
-import time
-import random
 import os
 import sys
 from datetime import datetime
@@ -16,21 +10,23 @@ CSV_PATH = os.path.join(project_root, "data", "enriched", "offres_wttj_full.csv"
 
 if project_root not in sys.path:
     sys.path.append(project_root)
-from utils import sauvegarde_securisee
+from utils import sauvegarde_securisee, charger_donnees, donnees_existent, mettre_a_jour_lignes, MAJ_PAR_LIGNE
+from browser_pool import PoolNavigateurs
+from journal_offres import journaliser
 
 # Ordre des colonnes
 ordre_colonnes = ["Titre", "Entreprise", "Ville", "Experience_Salaire_Infos", "Description_Complete", "URL", "Date_Publication", "Date_Expiration"]
 
-if not os.path.exists(CSV_PATH):
+if not donnees_existent(CSV_PATH):
     print("❌ Pas de fichier historique trouvé.")
     exit()
 
 print("🔄 Chargement de la base de données...")
 # Moteur python pour tolérance aux erreurs
 try:
-    df = pd.read_csv(CSV_PATH, encoding='utf-8-sig', dtype=str, engine='python')
+    df = charger_donnees(CSV_PATH, encoding='utf-8-sig', dtype=str, engine='python')
 except:
-    df = pd.read_csv(CSV_PATH, encoding='utf-8', dtype=str, engine='python')
+    df = charger_donnees(CSV_PATH, encoding='utf-8', dtype=str, engine='python')
 
 if 'Date_Expiration' not in df.columns:
     df['Date_Expiration'] = None
@@ -46,92 +42,81 @@ if len(indices_a_verifier) == 0:
     print("✅ Tout est à jour.")
     exit()
 
-# --- ROBOT ---
-options = webdriver.ChromeOptions()
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--headless") 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-driver.set_window_size(1920, 1080)
+# --- ROBOTS ---
+def diagnostiquer(driver, url_cible):
+    """Verdict sur la page chargée par le pool : (est_morte, raison)."""
+    url_actuelle = driver.current_url
+    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    # On récupère tout le texte visible en minuscules
+    text_page = soup.get_text(" ", strip=True).lower()
+
+    # --- PREUVE 1 : LA REDIRECTION (Toujours le signe n°1) ---
+    # Si on voulait voir un job et qu'on est sur la page vitrine de l'entreprise
+    if len(url_actuelle) < len(url_cible) - 15 and "jobs" not in url_actuelle:
+        return True, "Redirection auto"
+
+    # --- PREUVE 2 : LE MESSAGE SPÉCIFIQUE ---
+    # On gère les deux types d'apostrophes (courbe ’ et droite ')
+    if "cette offre n’est plus disponible" in text_page or "cette offre n'est plus disponible" in text_page:
+        return True, "Message 'Plus disponible'"
+
+    # --- PREUVE 3 : LES ARCHIVES ---
+    if "archivée" in text_page or "archived" in text_page:
+        return True, "Archivée"
+    if "page introuvable" in text_page or "404" in driver.title:
+        return True, "Erreur 404"
+    return False, ""
 
 print("\n🚀 Démarrage de la mise à jour WTTJ...")
 
 compteur_morts = 0
 compteur_vivants = 0
 modifications = False
+urls_expirees = []   # Journal des offres : écrit une seule fois en fin de run
+
+pool = PoolNavigateurs(pause=(3, 5))
+elements = [(idx, str(df.at[idx, 'URL'])) for idx in indices_a_verifier]
 
 try:
-    for i, idx in enumerate(indices_a_verifier):
-        url_cible = str(df.at[idx, 'URL'])
+    for i, ((idx, url_cible), verdict, erreur) in enumerate(pool.traiter(elements, lambda d, e: diagnostiquer(d, e[1]), url_de=lambda e: e[1])):
         titre = str(df.at[idx, 'Titre'])
-        
         print(f"[{i+1}/{len(indices_a_verifier)}] {titre[:30]}...", end=" ")
-        
-        try:
-            driver.get(url_cible)
-            time.sleep(random.uniform(3, 5))
-            
-            url_actuelle = driver.current_url
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            # On récupère tout le texte visible en minuscules
-            text_page = soup.get_text(" ", strip=True).lower()
-            
-            est_morte = False
-            raison = ""
-
-            # --- PREUVE 1 : LA REDIRECTION (Toujours le signe n°1) ---
-            # Si on voulait voir un job et qu'on est sur la page vitrine de l'entreprise
-            if len(url_actuelle) < len(url_cible) - 15 and "jobs" not in url_actuelle:
-                est_morte = True
-                raison = "Redirection auto"
-
-            # --- PREUVE 2 : LE MESSAGE SPÉCIFIQUE (Votre découverte) ---
-            # On cherche exactement le texte que vous avez trouvé dans le <span>
-            # On gère les deux types d'apostrophes (courbe ’ et droite ')
-            elif "cette offre n’est plus disponible" in text_page:
-                est_morte = True
-                raison = "Message 'Plus disponible'"
-            elif "cette offre n'est plus disponible" in text_page:
-                est_morte = True
-                raison = "Message 'Plus disponible'"
-                
-            # --- PREUVE 3 : LES ARCHIVES ---
-            elif "archivée" in text_page or "archived" in text_page:
-                est_morte = True
-                raison = "Archivée"
-            elif "page introuvable" in text_page or "404" in driver.title:
-                est_morte = True
-                raison = "Erreur 404"
-
-            # --- ACTION ---
-            if est_morte:
-                date_jour = datetime.now().strftime("%Y-%m-%d")
-                df.at[idx, 'Date_Expiration'] = date_jour
-                print(f"❌ EXPIRÉE ({raison})")
-                compteur_morts += 1
-                modifications = True
-            else:
-                print("✅ VIVANTE")
-                compteur_vivants += 1
-
-            # Sauvegarde intermédiaire
-            if modifications and i > 0 and i % 10 == 0:
-                df_temp = df.reindex(columns=ordre_colonnes)
-                sauvegarde_securisee(df_temp, CSV_PATH)
-                modifications = False
-                
-        except Exception as e:
-            print(f"⚠️ Bug : {e}")
+
+        if erreur is not None:
+            print(f"⚠️ Bug : {erreur}")
+            continue
+
+        # --- ACTION ---
+        est_morte, raison = verdict
+        if est_morte:
+            date_jour = datetime.now().strftime("%Y-%m-%d")
+            df.at[idx, 'Date_Expiration'] = date_jour
+            if MAJ_PAR_LIGNE:
+                # Base SQLite : seule cette offre est réécrite (pas de sauvegarde du fichier entier)
+                mettre_a_jour_lignes(CSV_PATH, {url_cible: {'Date_Expiration': date_jour}})
+            urls_expirees.append(url_cible)
+            print(f"❌ EXPIRÉE ({raison})")
+            compteur_morts += 1
+            modifications = not MAJ_PAR_LIGNE
+        else:
+            print("✅ VIVANTE")
+            compteur_vivants += 1
+
+        # Sauvegarde intermédiaire
+        if modifications and i > 0 and i % 10 == 0:
+            df_temp = df.reindex(columns=ordre_colonnes)
+            sauvegarde_securisee(df_temp, CSV_PATH)
+            modifications = False
 
 except KeyboardInterrupt:
     print("\n🛑 Arrêt manuel !")
-    df = df.reindex(columns=ordre_colonnes)
-    sauvegarde_securisee(df, CSV_PATH)
 finally:
-    df = df.reindex(columns=ordre_colonnes)
-    #df.to_csv(CSV_PATH, index=False, encoding='utf-8-sig')
-    sauvegarde_securisee(df, CSV_PATH)
-    driver.quit()
+    if not MAJ_PAR_LIGNE:   # Base SQLite : déjà enregistré offre par offre
+        df = df.reindex(columns=ordre_colonnes)
+        sauvegarde_securisee(df, CSV_PATH)
+    if urls_expirees:
+        journaliser("enregistrer_expirations", urls_expirees)
     print("\n🏁 Bilan :")
     print(f"   ⚰️  Expirées : {compteur_morts}")
     print(f"   ✅  Actives : {compteur_vivants}")
-    print("Fin du updater_wttj ==> Lancer le clean_wttj")
\ No newline at end of file
+    print("Fin du updater_wttj ==> Lancer le clean_wttj")
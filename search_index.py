@@ -0,0 +1,164 @@
+import os
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+# Index inversé plein texte des offres (écrit par fusion_csv.py, lu par app.py).
+# mot -> liste triée des numéros de ligne (iloc) du fichier global qui le contiennent.
+# - Normalisation : minuscules + accents retirés ("Développeur" et "developpeur" sont le même mot).
+#   On découpe le texte brut en mots, puis on ne normalise que le vocabulaire (quelques milliers de mots distincts)
+# - Une requête = intersection des listes de ses mots (chaque mot de 3 lettres ou plus vaut aussi comme préfixe :
+#   "dev" trouve "developpeur", "devops"...) : on ne relit jamais les descriptions
+# Stockage compact (CSR) : mots triés, bornes de chaque liste, puis toutes les listes bout à bout (int32).
+# ------------------------------------------------------------------------------------------------------------------------------------------------------
+
+COLONNES_INDEX = ["Titre", "Entreprise", "Description"]
+LONGUEUR_MIN = 2        # Les mots d'une lettre ("l'", "d'", "à") ne sont pas indexés
+LONGUEUR_PREFIXE = 3    # Un mot de requête plus court n'est cherché qu'à l'identique
+REGEX_MOT = re.compile(r"[^\W_][\w+#]+")  # Lettres/chiffres (accents compris), garde "c++", "c#", "s3"...
+
+
+LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "Œ": "OE", "Æ": "AE"})  # NFKD ne les décompose pas
+
+
+def normaliser(mot):
+    """Sans accents ('données' -> 'donnees', 'cœur' -> 'coeur') ; les caractères sans équivalent ASCII sont retirés."""
+    return unicodedata.normalize("NFKD", mot.translate(LIGATURES)).encode("ascii", "ignore").decode("ascii")
+
+
+def mots(texte):
+    """Mots distincts (normalisés) d'un texte, dans l'ordre d'apparition."""
+    normalises = (normaliser(m) for m in REGEX_MOT.findall(str(texte).lower()))
+    return list(dict.fromkeys(m for m in normalises if len(m) >= LONGUEUR_MIN))
+
+
+class IndexInverse:
+    """
+    Exemple :
+        index = IndexInverse.construire(df)             # fusion_csv.py
+        index.sauvegarder("data/clean/global_index.npz")
+        index = IndexInverse.charger("data/clean/global_index.npz")
+        positions = index.rechercher("data engineer python")   # iloc des offres, triées
+    """
+
+    def __init__(self, vocabulaire, bornes, postings, nb_lignes):
+        self.vocabulaire = vocabulaire   # mots triés (tableau object)
+        self.bornes = bornes             # postings[bornes[i]:bornes[i + 1]] = lignes du mot i
+        self.postings = postings
+        self.nb_lignes = nb_lignes
+
+    @classmethod
+    def construire(cls, df, colonnes=COLONNES_INDEX):
+        """Index des colonnes texte de `df` (numéros de ligne = positions dans df)."""
+        return cls.construire_par_morceaux([df], colonnes)
+
+    @classmethod
+    def construire_par_morceaux(cls, morceaux, colonnes=COLONNES_INDEX):
+        """
+        Même index, à partir de DataFrames successifs (ex: utils.lire_par_morceaux) : les numéros de ligne
+        se suivent d'un morceau à l'autre. Entre deux morceaux, seules les paires (mot, ligne) sont gardées (2 x int32),
+        puis les listes sont remplies directement à leur place : pas de tri global de toutes les paires.
+        """
+        bruts = {}       # mot brut -> numéro (ordre d'apparition)
+        numeros = {}     # mot normalisé -> numéro (ordre d'apparition)
+        vers_numero = np.zeros(0, dtype="int64")   # numéro brut -> numéro normalisé ("données" et "donnees" fusionnent), -1 si trop court
+        paires, nb_lignes = [], 0
+        for df in morceaux:
+            presentes = [c for c in colonnes if c in df.columns]
+            texte = pd.Series("", index=df.index)
+            for colonne in presentes:
+                texte = texte + " " + df[colonne].fillna("").astype(str)
+            codes, nb_par_ligne = [], np.zeros(len(df), dtype="int64")
+            for ligne, contenu in enumerate(texte.str.lower().tolist()):
+                distincts = set(REGEX_MOT.findall(contenu))
+                nb_par_ligne[ligne] = len(distincts)
+                codes.extend([bruts.setdefault(m, len(bruts)) for m in distincts])
+            # Seuls les mots bruts apparus dans ce morceau sont normalisés
+            nouveaux = [normaliser(m) for m in list(bruts)[len(vers_numero):]]
+            vers_numero = np.concatenate([vers_numero, np.array(
+                [numeros.setdefault(m, len(numeros)) if len(m) >= LONGUEUR_MIN else -1 for m in nouveaux], dtype="int64"
+            )])
+            # Une paire par (mot normalisé, ligne) : deux formes brutes du même mot dans une offre n'en font qu'une
+            cles = vers_numero[np.asarray(codes, dtype="int64")] * max(len(df), 1) + np.repeat(np.arange(len(df)), nb_par_ligne)
+            cles = cles[cles >= 0]
+            cles.sort()
+            cles = cles[np.concatenate([[True], cles[1:] != cles[:-1]])] if len(cles) else cles
+            paires.append(((cles // max(len(df), 1)).astype("int32"), (nb_lignes + cles % max(len(df), 1)).astype("int32")))
+            nb_lignes += len(df)
+
+        # Vocabulaire trié : les numéros d'apparition deviennent des rangs alphabétiques
+        mots_tries = np.array(list(numeros), dtype=object)
+        ordre = np.argsort(mots_tries, kind="stable") if len(mots_tries) else np.zeros(0, dtype="int64")
+        rangs = np.empty(len(ordre), dtype="int32")
+        rangs[ordre] = np.arange(len(ordre), dtype="int32")
+        vocabulaire = mots_tries[ordre]
+
+        bornes = np.zeros(len(vocabulaire) + 1, dtype="int64")
+        for codes, _ in paires:
+            bornes[1:] += np.bincount(rangs[codes], minlength=len(vocabulaire))
+        bornes = np.cumsum(bornes)
+
+        # Les lignes d'un morceau suivent celles des précédents : chaque liste se remplit dans l'ordre
+        postings = np.empty(bornes[-1], dtype="int32")
+        remplies = bornes[:-1].copy()
+        for i, (codes, lignes) in enumerate(paires):
+            codes = rangs[codes]
+            tri = np.argsort(codes, kind="stable")   # Déjà triées par (mot, ligne) : les lignes restent croissantes
+            codes, lignes = codes[tri], lignes[tri]
+            debuts = np.searchsorted(codes, codes, side="left")   # 1re paire du même mot dans le morceau
+            postings[remplies[codes] + np.arange(len(codes)) - debuts] = lignes
+            remplies += np.bincount(codes, minlength=len(vocabulaire))
+            paires[i] = None
+        return cls(vocabulaire, bornes, postings, nb_lignes)
+
+    # --- PERSISTANCE ---
+
+    def sauvegarder(self, chemin_fichier):
+        """Écriture atomique (.npz non compressé : relu en une fois au démarrage du dashboard)."""
+        chemin_temp = chemin_fichier + ".tmp"
+        with open(chemin_temp, "wb") as f:
+            np.savez(
+                f,
+                vocabulaire=np.frombuffer("\n".join(self.vocabulaire).encode("utf-8"), dtype=np.uint8),
+                bornes=self.bornes,
+                postings=self.postings,
+                nb_lignes=np.array(self.nb_lignes),
+            )
+        os.replace(chemin_temp, chemin_fichier)
+
+    @classmethod
+    def charger(cls, chemin_fichier):
+        with np.load(chemin_fichier, allow_pickle=False) as contenu:
+            texte = contenu["vocabulaire"].tobytes().decode("utf-8")
+            vocabulaire = np.array(texte.split("\n") if texte else [], dtype=object)
+            return cls(vocabulaire, contenu["bornes"], contenu["postings"], int(contenu["nb_lignes"]))
+
+    # --- REQUÊTES ---
+
+    def _plage(self, mot):
+        """Postings du mot (et de tous les mots qui commencent par lui, s'il est assez long), bout à bout."""
+        debut = np.searchsorted(self.vocabulaire, mot, side="left")
+        if len(mot) >= LONGUEUR_PREFIXE:
+            fin = np.searchsorted(self.vocabulaire, mot + "\x7f", side="left")
+        else:
+            fin = debut + 1 if debut < len(self.vocabulaire) and self.vocabulaire[debut] == mot else debut
+        return self.postings[self.bornes[debut]:self.bornes[fin]]
+
+    def rechercher(self, requete):
+        """Positions (triées) des offres qui contiennent tous les mots de la requête. None si la requête est vide."""
+        mots_requete = mots(requete)
+        if not mots_requete:
+            return None
+        # Union des préfixes sans tri : on coche les lignes dans un masque, les doublons ne coûtent rien.
+        # Le mot le plus rare donne les candidats, les masques des autres mots les éliminent.
+        plages = sorted((self._plage(m) for m in mots_requete), key=len)
+        candidats = None
+        for plage in plages:
+            masque = np.zeros(self.nb_lignes, dtype=bool)
+            masque[plage] = True
+            candidats = np.flatnonzero(masque) if candidats is None else candidats[masque[candidats]]
+            if len(candidats) == 0:
+                break
+        return candidats.astype("int64")
@@ -1,29 +1,132 @@
 import os
+import json
+import hashlib
 import pandas as pd
 
+# --- CONFIGURATION DU STOCKAGE ---
+# Format des fichiers de données : "csv" (historique), "parquet" (colonnaire, compressé)
+# ou "sqlite" (une table par fichier dans data/pathfinder.sqlite, voir base_offres.py).
+# Les scripts gardent leurs chemins en .csv : l'extension (ou la table) est adaptée ici selon le format choisi.
+# Ex : PATHFINDER_STOCKAGE=parquet python run_pipeline.py
+FORMAT_STOCKAGE = os.environ.get("PATHFINDER_STOCKAGE", "csv").strip().lower()
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+COMPRESSION_PARQUET = "zstd"
+
+if FORMAT_STOCKAGE not in list(EXTENSIONS) + ["sqlite"]:
+    print(f"⚠️ [Utils] Format de stockage inconnu '{FORMAT_STOCKAGE}', on reste en CSV.")
+    FORMAT_STOCKAGE = "csv"
+
+BASE_SQLITE = FORMAT_STOCKAGE == "sqlite"
+# Format des fichiers lus tant qu'une table n'existe pas encore dans la base (migration depuis les CSV)
+FORMAT_FICHIERS = "csv" if BASE_SQLITE else FORMAT_STOCKAGE
+# Une offre modifiée (ex: expirée) peut être enregistrée seule, sans réécrire tout le fichier (voir mettre_a_jour_lignes)
+MAJ_PAR_LIGNE = BASE_SQLITE
+
+_base = None
+
+
+def _base_offres():
+    """Connexion partagée à la base SQLite (ouverte au premier appel)."""
+    global _base
+    if _base is None:
+        from base_offres import BaseOffres
+        _base = BaseOffres()
+    return _base
+
+
+def _table(chemin_fichier):
+    """Nom de la table du fichier si elle existe dans la base, sinon None (lecture des fichiers)."""
+    if not BASE_SQLITE:
+        return None
+    from base_offres import nom_table
+    table = nom_table(chemin_fichier)
+    return table if _base_offres().existe(table) else None
+
+
+def chemin_stockage(chemin_fichier, format_stockage=None):
+    """Retourne le chemin du fichier avec l'extension du format de stockage (csv ou parquet)."""
+    base, _ = os.path.splitext(chemin_fichier)
+    return base + EXTENSIONS[format_stockage or FORMAT_FICHIERS]
+
+
+def _chemins_candidats(chemin_fichier):
+    """Chemins à essayer en lecture : le format configuré d'abord, l'autre ensuite (migration)."""
+    autres = [f for f in EXTENSIONS if f != FORMAT_FICHIERS]
+    return [chemin_stockage(chemin_fichier, f) for f in [FORMAT_FICHIERS] + autres]
+
+
+def donnees_existent(chemin_fichier):
+    """Équivalent de os.path.exists, quel que soit le format sur disque."""
+    return _table(chemin_fichier) is not None or any(os.path.exists(c) for c in _chemins_candidats(chemin_fichier))
+
+
+def _typer_pour_parquet(df):
+    """
+    Fixe des types explicites avant l'écriture Parquet.
+    Les colonnes 'object' (souvent mixtes texte/nombres après un read_csv) passent en texte,
+    les NaN restent des NaN : les codes type "01" ou les identifiants gardent leurs zéros.
+    Les colonnes numériques, booléennes et dates gardent leur type natif.
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _appliquer_dtype(df, dtype):
+    """Émulation de read_csv(dtype=...) après une lecture Parquet / SQLite : str garde les NaN, sinon astype."""
+    if dtype is str:
+        dtype = {c: str for c in df.columns}
+    for col, type_col in (dtype or {}).items():
+        if col in df.columns and type_col is str:
+            df[col] = df[col].astype(object).where(df[col].isna(), df[col].astype(str))
+        elif col in df.columns:
+            df[col] = df[col].astype(type_col)
+    return df
+
+
+def _ecrire(df, chemin_fichier, parquet):
+    """Écriture brute (sans renommage) en Parquet ou en CSV."""
+    if parquet:
+        _typer_pour_parquet(df).to_parquet(chemin_fichier, index=False, compression=COMPRESSION_PARQUET)
+    else:
+        df.to_csv(chemin_fichier, index=False, encoding='utf-8-sig')
+
+
 def sauvegarde_securisee(df, chemin_fichier):
     """
     Sauvegarde un DataFrame de manière atomique pour éviter la corruption.
-    1. Écrit dans un fichier .tmp
-    2. Renomme le .tmp en .csv (opération instantanée et sûre)
+    1. Écrit dans un fichier .tmp (CSV ou Parquet selon FORMAT_STOCKAGE)
+    2. Renomme le .tmp en fichier final (opération instantanée et sûre)
     """
     if df is None or df.empty:
         print("⚠️ [Utils] Pas de données à sauvegarder.")
         return
 
+    if BASE_SQLITE:
+        from base_offres import nom_table
+        try:
+            print(f"💾 [Utils] Sauvegarde en cours vers la table {nom_table(chemin_fichier)} ...")
+            _base_offres().remplacer(nom_table(chemin_fichier), df)   # Une seule transaction : tout ou rien
+            print("✅ [Utils] Sauvegarde réussie (Transaction validée).")
+        except Exception as e:
+            print(f"❌ [Utils] ERREUR CRITIQUE lors de la sauvegarde : {e}")
+        return
+
+    chemin_fichier = chemin_stockage(chemin_fichier)
     chemin_temp = chemin_fichier + ".tmp"
-    
+
     try:
         print(f"💾 [Utils] Sauvegarde en cours vers {os.path.basename(chemin_fichier)} ...")
-        
+
         # 1. Écriture dans le fichier temporaire
-        df.to_csv(chemin_temp, index=False, encoding='utf-8-sig')
-        
+        _ecrire(df, chemin_temp, chemin_fichier.endswith(".parquet"))
+
         # 2. Remplacement atomique
         if os.path.exists(chemin_temp):
             os.replace(chemin_temp, chemin_fichier)
             print("✅ [Utils] Sauvegarde réussie (Fichier sécurisé).")
-            
+
     except Exception as e:
         print(f"❌ [Utils] ERREUR CRITIQUE lors de la sauvegarde : {e}")
     finally:
@@ -32,4 +135,273 @@ def sauvegarde_securisee(df, chemin_fichier):
             try:
                 os.remove(chemin_temp)
             except:
-                pass
\ No newline at end of file
+                pass
+
+
+def charger_donnees(chemin_fichier, colonnes=None, dtype=None, **options_csv):
+    """
+    Charge un fichier de données, qu'il soit stocké en CSV, en Parquet ou dans la base SQLite.
+    - colonnes : projection (ex: tout sauf 'Description'), les colonnes absentes sont ignorées
+    - dtype : comme pd.read_csv (str pour tout lire en texte, ou dict par colonne)
+    - options_csv : transmises à pd.read_csv uniquement (header, names, engine...), sauf `names` (renommage) en SQLite
+    Lève FileNotFoundError si aucun des formats n'existe.
+    """
+    table = _table(chemin_fichier)
+    if table is not None:
+        df = _appliquer_dtype(_base_offres().lire(table, colonnes), dtype)
+        noms = options_csv.get("names")
+        if noms is not None and len(noms) == len(df.columns):
+            df.columns = list(noms)
+        return df
+
+    for chemin in _chemins_candidats(chemin_fichier):
+        if not os.path.exists(chemin):
+            continue
+
+        if chemin.endswith(".parquet"):
+            if colonnes is not None:
+                import pyarrow.parquet as pq
+                presentes = pq.read_schema(chemin).names
+                colonnes = [c for c in colonnes if c in presentes]
+            # Émulation de read_csv(dtype=str) : texte partout, NaN conservés
+            return _appliquer_dtype(pd.read_parquet(chemin, columns=colonnes), dtype)
+
+        if colonnes is not None:
+            a_garder = set(colonnes)
+            options_csv["usecols"] = lambda c: c in a_garder
+        return pd.read_csv(chemin, dtype=dtype, **options_csv)
+
+    raise FileNotFoundError(chemin_stockage(chemin_fichier))
+
+
+def lire_par_morceaux(chemin_fichier, taille_morceau, colonnes=None, dtype=None):
+    """
+    Comme charger_donnees, mais par morceaux de `taille_morceau` lignes (générateur de DataFrames) :
+    la mémoire utilisée dépend de la taille d'un morceau, pas de celle du fichier.
+    """
+    table = _table(chemin_fichier)
+    if table is not None:
+        # Connexion dédiée : la lecture voit la table telle qu'au premier morceau, même si elle est réécrite entre-temps
+        from base_offres import BaseOffres
+        with BaseOffres(_base_offres().chemin) as base:
+            for df in base.morceaux(table, taille_morceau, colonnes):
+                yield _appliquer_dtype(df, dtype)
+        return
+
+    for chemin in _chemins_candidats(chemin_fichier):
+        if not os.path.exists(chemin):
+            continue
+
+        if chemin.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            fichier = pq.ParquetFile(chemin)
+            if colonnes is not None:
+                colonnes = [c for c in colonnes if c in fichier.schema_arrow.names]
+            for lot in fichier.iter_batches(batch_size=taille_morceau, columns=colonnes):
+                yield _appliquer_dtype(lot.to_pandas(), dtype)
+            return
+
+        options = {}
+        if colonnes is not None:
+            a_garder = set(colonnes)
+            options["usecols"] = lambda c: c in a_garder
+        with pd.read_csv(chemin, dtype=dtype, chunksize=taille_morceau, **options) as lecteur:
+            yield from lecteur
+        return
+
+    raise FileNotFoundError(chemin_stockage(chemin_fichier))
+
+
+class EcritureParMorceaux:
+    """
+    Écrit un fichier de données morceau par morceau (CSV ou Parquet selon FORMAT_STOCKAGE), de façon atomique :
+    tout va dans un .tmp, qui ne remplace le fichier final qu'à `terminer()`.
+    En SQLite : tout va dans une transaction, validée à `terminer()`.
+    Les colonnes sont fixées à la création (chaque morceau est réaligné dessus).
+    """
+
+    def __init__(self, chemin_fichier, colonnes):
+        self.table = None
+        if BASE_SQLITE:
+            # Connexion dédiée : la transaction ne bloque pas les lectures des autres connexions (WAL)
+            from base_offres import BaseOffres, nom_table
+            self.table = BaseOffres(_base_offres().chemin).ecriture(nom_table(chemin_fichier), colonnes)
+            self.colonnes, self.nb_lignes = self.table.colonnes, 0
+            return
+        self.chemin = chemin_stockage(chemin_fichier)
+        self.chemin_temp = self.chemin + ".tmp"
+        self.colonnes = list(colonnes)
+        self.parquet = self.chemin.endswith(".parquet")
+        self.ecrivain = None
+        self.nb_lignes = 0
+        if os.path.exists(self.chemin_temp):
+            os.remove(self.chemin_temp)
+
+    def ecrire(self, df):
+        if df.empty:
+            return
+        if self.table is not None:
+            self.table.ecrire(df)
+            self.nb_lignes = self.table.nb_lignes
+            return
+        df = df.reindex(columns=self.colonnes)
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            df = _typer_pour_parquet(df)
+            if self.ecrivain is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                # Un entier d'un morceau peut devenir un flottant (NaN) dans le suivant : on part du type le plus large
+                self.schema = pa.schema([
+                    champ.with_type(pa.float64()) if pa.types.is_signed_integer(champ.type) else champ for champ in table.schema
+                ]).remove_metadata()
+                self.ecrivain = pq.ParquetWriter(self.chemin_temp, self.schema, compression=COMPRESSION_PARQUET)
+            self.ecrivain.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+        else:
+            premier = self.nb_lignes == 0   # En-tête (et BOM) au premier morceau seulement
+            df.to_csv(self.chemin_temp, mode='a', header=premier, index=False, encoding='utf-8-sig' if premier else 'utf-8')
+        self.nb_lignes += len(df)
+
+    def terminer(self):
+        """Remplacement atomique du fichier final. Rien n'est écrit si aucun morceau n'a été reçu."""
+        if self.table is not None:
+            self.table.terminer()
+            self.table.base.fermer()
+            if self.nb_lignes == 0:
+                print("⚠️ [Utils] Pas de données à sauvegarder.")
+            else:
+                print(f"✅ [Utils] {self.nb_lignes} lignes écrites dans la table {self.table.table} (Transaction validée).")
+            return
+        if self.ecrivain is not None:
+            self.ecrivain.close()
+        if self.nb_lignes == 0:
+            print("⚠️ [Utils] Pas de données à sauvegarder.")
+            return
+        os.replace(self.chemin_temp, self.chemin)
+        print(f"✅ [Utils] {self.nb_lignes} lignes écrites dans {os.path.basename(self.chemin)} (Fichier sécurisé).")
+
+
+def ajouter_lignes(df, chemin_fichier):
+    """
+    Ajoute des lignes à la fin d'un fichier (remplace les to_csv(mode='a') des scrapers).
+    En CSV : ajout direct. En Parquet : relecture + réécriture atomique (format non 'appendable').
+    En SQLite : upsert par URL (une offre déjà présente est mise à jour au lieu d'être dupliquée).
+    """
+    if BASE_SQLITE:
+        from base_offres import nom_table, COLONNE_CLE
+        table = nom_table(chemin_fichier)
+        if COLONNE_CLE in df.columns:
+            _base_offres().upsert(table, df)
+        else:
+            _base_offres().upsert(table, df, cle=df.columns[0])
+        return
+
+    chemin_fichier = chemin_stockage(chemin_fichier)
+
+    if chemin_fichier.endswith(".parquet"):
+        if os.path.exists(chemin_fichier):
+            df = pd.concat([pd.read_parquet(chemin_fichier), _typer_pour_parquet(df)], ignore_index=True)
+        chemin_temp = chemin_fichier + ".tmp"
+        _ecrire(df, chemin_temp, parquet=True)
+        os.replace(chemin_temp, chemin_fichier)
+    else:
+        en_tete = not os.path.exists(chemin_fichier)
+        if not en_tete:
+            # On aligne les colonnes sur l'en-tête du fichier existant (l'ordre peut différer)
+            colonnes_fichier = pd.read_csv(chemin_fichier, nrows=0).columns.tolist()
+            if list(df.columns) != colonnes_fichier:
+                df = df.reindex(columns=colonnes_fichier)
+        df.to_csv(chemin_fichier, mode='a', header=en_tete, index=False, encoding='utf-8-sig')
+
+
+def date_modification(chemin_fichier):
+    """Date de dernière modification (timestamp) du fichier, quel que soit son format. None s'il n'existe pas."""
+    table = _table(chemin_fichier)
+    if table is not None:
+        return (_base_offres().infos(table) or {}).get("maj")
+    for chemin in _chemins_candidats(chemin_fichier):
+        if os.path.exists(chemin):
+            return os.path.getmtime(chemin)
+    return None
+
+
+def compter_lignes(chemin_fichier):
+    """Nombre de lignes d'un fichier de données (métadonnées en Parquet et SQLite, une seule colonne lue en CSV)."""
+    table = _table(chemin_fichier)
+    if table is not None:
+        return _base_offres().compter(table)
+    for chemin in _chemins_candidats(chemin_fichier):
+        if not os.path.exists(chemin):
+            continue
+        if chemin.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(chemin).metadata.num_rows
+        return len(pd.read_csv(chemin, usecols=[0]))
+    return None
+
+
+def empreinte_fichier(chemin_fichier, avec_hash=True):
+    """
+    Identité du fichier réellement présent (csv ou parquet) : chemin, date de modification, taille
+    et hash du contenu (blake2b, lu par blocs). None si le fichier n'existe pas.
+    En SQLite : la table, sa date d'écriture, son nombre de lignes, et un hash de son numéro de version.
+    """
+    table = _table(chemin_fichier)
+    if table is not None:
+        infos = _base_offres().infos(table) or {}
+        empreinte = {"fichier": table, "mtime": infos.get("maj"), "taille": infos.get("nb_lignes")}
+        if avec_hash:
+            empreinte["hash"] = hashlib.blake2b(f"{table}:{infos.get('version')}:{infos.get('maj')}".encode(), digest_size=16).hexdigest()
+        return empreinte
+    for chemin in _chemins_candidats(chemin_fichier):
+        if not os.path.exists(chemin):
+            continue
+        infos = os.stat(chemin)
+        empreinte = {"fichier": os.path.basename(chemin), "mtime": infos.st_mtime, "taille": infos.st_size}
+        if avec_hash:
+            h = hashlib.blake2b(digest_size=16)
+            with open(chemin, "rb") as f:
+                for bloc in iter(lambda: f.read(1 << 20), b""):
+                    h.update(bloc)
+            empreinte["hash"] = h.hexdigest()
+        return empreinte
+    return None
+
+
+def mettre_a_jour_lignes(chemin_fichier, modifications, cle="URL"):
+    """
+    Enregistre des modifications de quelques offres : {valeur de la clé: {colonne: valeur}}.
+    En SQLite : un UPDATE par offre (index sur la clé), sans réécrire la table.
+    En CSV / Parquet : relecture, modification puis sauvegarde complète (même résultat).
+    """
+    if not modifications:
+        return
+    if BASE_SQLITE:
+        from base_offres import nom_table
+        base, table = _base_offres(), nom_table(chemin_fichier)
+        for valeur_cle, valeurs in modifications.items():
+            base.mettre_a_jour(table, valeur_cle, valeurs, cle=cle)
+        return
+    df = charger_donnees(chemin_fichier)
+    for valeur_cle, valeurs in modifications.items():
+        masque = df[cle] == valeur_cle
+        for colonne, valeur in valeurs.items():
+            df.loc[masque, colonne] = valeur
+    sauvegarde_securisee(df, chemin_fichier)
+
+
+def ecrire_json(contenu, chemin_fichier):
+    """Écriture atomique d'un petit fichier JSON (manifestes)."""
+    chemin_temp = chemin_fichier + ".tmp"
+    with open(chemin_temp, "w", encoding="utf-8") as f:
+        json.dump(contenu, f, ensure_ascii=False, indent=2)
+    os.replace(chemin_temp, chemin_fichier)
+
+
+def lire_json(chemin_fichier):
+    """Contenu d'un fichier JSON, None s'il est absent ou illisible."""
+    try:
+        with open(chemin_fichier, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None